@@ -1,29 +1,77 @@
-from .compare import compare
+from .async_api import compare_async, load_snapshot_async
+from .calibration import calibrate
+from .compare import compare, compare_arrays
+from .graph import KnnGraph, graph_summary
 from .models import (
     AnchorAlignmentSummary,
     AnchorMetrics,
+    CalibrationReport,
     ComparisonConfig,
     ComparisonReport,
     ExitCode,
+    GraphStats,
+    GraphSummary,
+    MetricDistribution,
+    MonitorSummary,
+    NeighborFrequencyChange,
+    NeighborFrequencySummary,
+    NoiseProfile,
+    ProfileSummary,
     RetrievalSnapshot,
     RiskLevel,
+    ScoreSummary,
     SegmentMapping,
     SegmentSummary,
     ThresholdPreset,
+    ThresholdSweep,
 )
+from .monitor import DriftMonitor
+from .plugins import BatchMetric, MetricBatch, register_metric, unregister_metric
+from .scores import SnapshotScores
+from .sketch import QuantileSketch, merge_distributions
+from .snapshot_index import SnapshotIndex, build_snapshot_index
+from .sweep import sweep_thresholds
 
 __all__ = [
     "AnchorAlignmentSummary",
     "AnchorMetrics",
+    "BatchMetric",
+    "build_snapshot_index",
+    "calibrate",
+    "CalibrationReport",
     "compare",
+    "compare_arrays",
+    "compare_async",
     "ComparisonConfig",
     "ComparisonReport",
+    "DriftMonitor",
     "ExitCode",
+    "graph_summary",
+    "GraphStats",
+    "GraphSummary",
+    "KnnGraph",
+    "load_snapshot_async",
+    "merge_distributions",
+    "MetricBatch",
+    "MetricDistribution",
+    "MonitorSummary",
+    "NeighborFrequencyChange",
+    "NeighborFrequencySummary",
+    "NoiseProfile",
+    "ProfileSummary",
+    "QuantileSketch",
+    "register_metric",
     "RetrievalSnapshot",
     "RiskLevel",
+    "ScoreSummary",
     "SegmentMapping",
     "SegmentSummary",
+    "SnapshotIndex",
+    "SnapshotScores",
+    "sweep_thresholds",
     "ThresholdPreset",
+    "ThresholdSweep",
+    "unregister_metric",
 ]
 
 from .alignment import align_anchors, anchor_mismatch_warning
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from collections.abc import Awaitable, Callable, Mapping
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, TypeVar
+
+import numpy as np
+
+from .compare import (
+    _apply_noise_profile,
+    _build_report,
+    _check_modes,
+    _classify_rows,
+    _compare_weighted,
+    _ComparisonSteps,
+    _fail_fast_steps,
+    _sequential_steps,
+    _side_summaries,
+)
+from .engine import (
+    MetricsProfile,
+    PreparedComparison,
+    compute_identity_chunk,
+    prepare_comparison,
+    summarize_identity_metrics,
+)
+from .frequency import neighbor_frequency_drift
+from .interning import VocabLookup
+from .models import (
+    AnchorIdentityMetrics,
+    AnchorMetrics,
+    ComparisonConfig,
+    ComparisonProgress,
+    ComparisonReport,
+    GraphSummary,
+    LatencySummary,
+    NoiseProfile,
+    ScoreSummary,
+)
+from .scores import SnapshotScores
+from .snapshot_cache import SnapshotCache, load_snapshot
+from .validation import ValidatedSnapshot
+from .weights import AnchorWeights
+
+T = TypeVar("T")
+
+Snapshot = Mapping[str, list[str]]
+ProgressCallback = Callable[[ComparisonProgress], Awaitable[None] | None]
+
+
+async def load_snapshot_async(
+    path: str,
+    k: int,
+    *,
+    cache: SnapshotCache | None = None,
+    executor: Executor | None = None,
+) -> ValidatedSnapshot:
+    """`load_snapshot` in an executor, so parsing a large file does not block the loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(load_snapshot, path, k, cache=cache))
+
+
+async def compare_async(
+    baseline: Snapshot | Awaitable[Snapshot],
+    candidate: Snapshot | Awaitable[Snapshot],
+    config: ComparisonConfig | None = None,
+    *,
+    noise_profile: NoiseProfile | None = None,
+    weights: AnchorWeights | None = None,
+    baseline_latency: Mapping[str, float] | None = None,
+    candidate_latency: Mapping[str, float] | None = None,
+    baseline_scores: SnapshotScores | None = None,
+    candidate_scores: SnapshotScores | None = None,
+    executor: Executor | None = None,
+    on_progress: ProgressCallback | None = None,
+    timeout: float | None = None,
+) -> ComparisonReport:
+    """
+    `compare` for asyncio services: the same report, without blocking the event loop.
+
+    Snapshots may be mappings or awaitables (e.g. `load_snapshot_async(...)`), which are
+    awaited concurrently; the other arguments are those of `compare`. Work runs in
+    `executor` (default: the loop's thread pool) one chunk of `config.chunk_size`
+    anchors at a time; `on_progress` (sync or async) gets an event after each step.
+    Cancelling the task, or exceeding `timeout` seconds (`asyncio.TimeoutError`), stops
+    it at the next chunk boundary; the chunk already running finishes in the background
+    and is discarded.
+
+    Traffic-weighted runs evaluate their anchors in one pass, as `compare` does, so
+    they are offloaded as a single step.
+    """
+    cfg = config or ComparisonConfig()
+    _check_modes(cfg, noise_profile=noise_profile, weights=weights)
+    extras = {
+        "baseline_latency": baseline_latency,
+        "candidate_latency": candidate_latency,
+        "baseline_scores": baseline_scores,
+        "candidate_scores": candidate_scores,
+    }
+    run = _compare_async(
+        baseline, candidate, cfg, noise_profile, weights, extras, executor, on_progress
+    )
+    if timeout is None:
+        return await run
+    return await asyncio.wait_for(run, timeout)
+
+
+async def _resolve(snapshot: Snapshot | Awaitable[Snapshot]) -> Snapshot:
+    return await snapshot if inspect.isawaitable(snapshot) else snapshot
+
+
+async def _compare_async(
+    baseline: Snapshot | Awaitable[Snapshot],
+    candidate: Snapshot | Awaitable[Snapshot],
+    cfg: ComparisonConfig,
+    noise_profile: NoiseProfile | None,
+    weights: AnchorWeights | None,
+    extras: dict[str, Any],
+    executor: Executor | None,
+    on_progress: ProgressCallback | None,
+) -> ComparisonReport:
+    loop = asyncio.get_running_loop()
+
+    def offload(fn: Callable[..., T], *args: Any, **kwargs: Any) -> Awaitable[T]:
+        return loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+
+    async def emit(stage: str, done: int, total: int) -> None:
+        if on_progress is None:
+            return
+        result = on_progress(
+            ComparisonProgress(stage=stage, anchors_done=done, anchors_total=total)
+        )
+        if inspect.isawaitable(result):
+            await result
+
+    b, c = await asyncio.gather(_resolve(baseline), _resolve(candidate))
+    latency, scores, graph = await offload(_side_summaries, b, c, cfg, **extras)
+
+    if weights is not None:
+        report = await offload(_compare_weighted, b, c, cfg, weights, latency, scores, graph)
+        await emit("done", report.anchors_evaluated or 0, report.alignment.compared_anchors)
+        return report
+
+    if cfg.fail_fast or cfg.sequential_sampling:
+        run = _sequential_steps if cfg.sequential_sampling else _fail_fast_steps
+        steps = run(b, c, cfg, latency, scores, graph)
+        (_, total), _ = await offload(_step, steps)
+        await emit("prepared", 0, total)
+        while True:
+            (done, _), report = await offload(_step, steps)
+            if report is not None:
+                await emit("done", report.anchors_evaluated or 0, total)
+                return report
+            await emit("metrics", done, total)
+
+    prepared = await offload(prepare_comparison, b, c, cfg)
+    total = len(prepared.anchor_ids)
+    await emit("prepared", 0, total)
+
+    # Chunks run strictly one after another, so they can share one vocabulary
+    vocab: dict[str, int] = {}
+    id_lookup = VocabLookup(vocab)
+    profile = MetricsProfile() if cfg.profile else None
+    rows: list[AnchorIdentityMetrics] = []
+    anchor_metrics: list[AnchorMetrics] = []
+    b_parts: list[np.ndarray] = []
+    c_parts: list[np.ndarray] = []
+    any_anchor_critical = False
+
+    for start in range(0, total, cfg.chunk_size):
+        stop = min(total, start + cfg.chunk_size)
+        chunk_rows, b_codes, c_codes, chunk_metrics, chunk_critical = await offload(
+            _score_chunk, prepared, start, stop, cfg, vocab, profile, id_lookup
+        )
+        rows.extend(chunk_rows)
+        anchor_metrics.extend(chunk_metrics)
+        b_parts.append(b_codes)
+        c_parts.append(c_codes)
+        any_anchor_critical = any_anchor_critical or chunk_critical
+        await emit("metrics", stop, total)
+
+    report = await offload(
+        _finish,
+        prepared,
+        cfg,
+        rows,
+        anchor_metrics,
+        any_anchor_critical,
+        b_parts,
+        c_parts,
+        list(vocab),
+        noise_profile,
+        profile,
+        latency,
+        scores,
+        graph,
+    )
+    await emit("done", total, total)
+    return report
+
+
+def _step(steps: _ComparisonSteps) -> tuple[tuple[int, int], ComparisonReport | None]:
+    # StopIteration cannot cross an executor future, so the report comes back as a value
+    try:
+        return next(steps), None
+    except StopIteration as finished:
+        return (0, 0), finished.value
+
+
+def _score_chunk(
+    prepared: PreparedComparison,
+    start: int,
+    stop: int,
+    cfg: ComparisonConfig,
+    vocab: dict[str, int],
+    profile: MetricsProfile | None,
+    id_lookup: VocabLookup,
+) -> tuple[list[AnchorIdentityMetrics], np.ndarray, np.ndarray, list[AnchorMetrics], bool]:
+    rows, b_codes, c_codes = compute_identity_chunk(
+        prepared, start, stop, cfg, vocab, profile, id_lookup
+    )
+    anchor_metrics, any_anchor_critical = _classify_rows(rows, cfg)
+    return rows, b_codes, c_codes, anchor_metrics, any_anchor_critical
+
+
+def _first_appearance_codes(
+    baseline: np.ndarray, candidate: np.ndarray, ids: list[str]
+) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """
+    Recode so IDs are numbered by first appearance in all baseline rows, then all
+    candidate rows: the order a single-pass `compare` interns them in, which the
+    frequency pass uses to break ties.
+    """
+    flat = np.concatenate([baseline.ravel(), candidate.ravel()])
+    flat = flat[flat >= 0]
+    codes, first = np.unique(flat, return_index=True)
+    order = codes[np.argsort(first, kind="stable")]
+
+    remap = np.full(len(ids) + 1, -1, dtype=np.int64)  # remap[-1] keeps PAD as PAD
+    remap[order] = np.arange(len(order))
+    return remap[baseline], remap[candidate], [ids[i] for i in order.tolist()]
+
+
+def _finish(
+    prepared: PreparedComparison,
+    cfg: ComparisonConfig,
+    rows: list[AnchorIdentityMetrics],
+    anchor_metrics: list[AnchorMetrics],
+    any_anchor_critical: bool,
+    b_parts: list[np.ndarray],
+    c_parts: list[np.ndarray],
+    ids: list[str],
+    noise_profile: NoiseProfile | None,
+    profile: MetricsProfile | None,
+    latency: LatencySummary | None,
+    scores: ScoreSummary | None,
+    graph: GraphSummary | None,
+) -> ComparisonReport:
+    empty = np.empty((0, cfg.k), dtype=np.int64)
+    b_codes, c_codes, ids = _first_appearance_codes(
+        np.concatenate(b_parts) if b_parts else empty,
+        np.concatenate(c_parts) if c_parts else empty,
+        ids,
+    )
+    neighbor_frequency = neighbor_frequency_drift(
+        b_codes, c_codes, ids, top_n=cfg.frequency_top_n
+    )
+    overall = summarize_identity_metrics(rows, cfg, neighbor_frequency)
+    if noise_profile is not None:
+        any_anchor_critical = _apply_noise_profile(anchor_metrics, overall, cfg, noise_profile)
+    return _build_report(
+        cfg,
+        prepared.alignment,
+        overall,
+        anchor_metrics,
+        any_anchor_critical,
+        latency=latency,
+        scores=scores,
+        graph=graph,
+        profile=profile,
+    )
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from collections import Counter
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any
+
+from .compare import compare
+from .io import dump_json, load_json
+from .models import (
+    BatchJob,
+    BatchPairSummary,
+    BatchSummary,
+    ComparisonConfig,
+    ExitCode,
+)
+from .snapshot_cache import SnapshotCache, load_snapshot
+
+# Peak memory of one pair relative to the JSON bytes of its two files: parsed Python
+# lists and strings take several times their serialized size, plus the engine arrays
+MEMORY_PER_INPUT_BYTE = 6
+
+_UNSAFE_FILENAME = re.compile(r"[^\w.-]")
+
+
+def load_manifest(path: str) -> list[BatchJob]:
+    """
+    Jobs from a manifest: a JSON list of pairs, or {"defaults": {...}, "pairs": [...]}.
+
+    Each pair is {"name", "baseline", "candidate", "config"?}; "config" holds
+    ComparisonConfig overrides merged over "defaults" (nested "thresholds" merge by key).
+    Relative snapshot paths are resolved against the manifest's directory.
+    """
+    data = load_json(path)
+    defaults: Mapping[str, Any] = {}
+    if isinstance(data, dict):
+        defaults = data.get("defaults") or {}
+        pairs = data.get("pairs")
+    else:
+        pairs = data
+    if not isinstance(pairs, list) or not pairs:
+        raise ValueError("manifest must contain a non-empty list of pairs")
+    if not isinstance(defaults, dict):
+        raise ValueError("manifest 'defaults' must be an object")
+
+    root = os.path.dirname(os.path.abspath(path))
+    jobs: list[BatchJob] = []
+    for i, pair in enumerate(pairs):
+        if not isinstance(pair, dict):
+            raise ValueError(f"manifest pair #{i} must be an object")
+        missing = {"name", "baseline", "candidate"} - pair.keys()
+        if missing:
+            raise ValueError(f"manifest pair #{i} is missing {sorted(missing)}")
+        overrides = pair.get("config") or {}
+        if not isinstance(overrides, dict):
+            raise ValueError(f"manifest pair {pair['name']!r}: 'config' must be an object")
+        jobs.append(
+            BatchJob(
+                name=pair["name"],
+                baseline=os.path.join(root, pair["baseline"]),
+                candidate=os.path.join(root, pair["candidate"]),
+                config=resolve_config(_merge(defaults, overrides)),
+            )
+        )
+
+    _check_names(jobs)
+    return jobs
+
+
+def resolve_config(overrides: Mapping[str, Any]) -> ComparisonConfig:
+    """ComparisonConfig from manifest overrides; unknown keys are errors, not ignored."""
+    unknown = set(overrides) - set(ComparisonConfig.model_fields)
+    if unknown:
+        raise ValueError(f"unknown config keys in manifest: {sorted(unknown)}")
+    return ComparisonConfig.model_validate(dict(overrides))
+
+
+def _merge(base: Mapping[str, Any], overrides: Mapping[str, Any]) -> dict[str, Any]:
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merge(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def _check_names(jobs: Sequence[BatchJob]) -> None:
+    seen: set[str] = set()
+    for job in jobs:
+        # Names double as report file names, so they must stay distinct once sanitized
+        key = report_filename(job.name)
+        if key in seen:
+            raise ValueError(f"duplicate pair name in manifest: {job.name!r}")
+        seen.add(key)
+
+
+def report_filename(name: str) -> str:
+    """File name for a pair's full report: unsafe characters become '_'."""
+    return _UNSAFE_FILENAME.sub("_", name) + ".json"
+
+
+def physical_memory() -> int | None:
+    """Total physical memory in bytes, where the platform reports it."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def estimate_memory(job: BatchJob) -> int:
+    """Rough peak bytes for running `job`, from its input file sizes."""
+    size = 0
+    for path in (job.baseline, job.candidate):
+        try:
+            size += os.path.getsize(path)
+        except OSError:
+            pass  # reported when the pair runs
+    return size * MEMORY_PER_INPUT_BYTE
+
+
+def run_job(
+    job: BatchJob, cache: SnapshotCache | None = None, reports_dir: str | None = None
+) -> BatchPairSummary:
+    """Compare one pair; failures are captured in the summary instead of raised."""
+    start = time.perf_counter()
+    try:
+        baseline = load_snapshot(job.baseline, job.config.k, cache=cache)
+        candidate = load_snapshot(job.candidate, job.config.k, cache=cache)
+        report = compare(baseline, candidate, job.config)
+        if reports_dir is not None:
+            dump_json(os.path.join(reports_dir, report_filename(job.name)), report.model_dump())
+    except Exception as e:  # one bad pair must not sink the rest of the batch
+        return BatchPairSummary(
+            name=job.name,
+            exit_code=int(ExitCode.ERROR),
+            error=f"{type(e).__name__}: {e}",
+            seconds=time.perf_counter() - start,
+        )
+    return BatchPairSummary(
+        name=job.name,
+        exit_code=report.to_exit_code(),
+        risk_level=report.overall_risk_level,
+        compared_anchors=report.alignment.compared_anchors,
+        mean_overlap=report.overall_mean_overlap,
+        mean_displacement=report.overall_mean_displacement,
+        churn_rate=report.overall_churn_rate,
+        verdict_summary=report.verdict_summary,
+        seconds=time.perf_counter() - start,
+    )
+
+
+class _Scheduler:
+    """
+    Admission control for `run_batch`: a job starts when a worker is free, its memory
+    estimate fits next to the running ones (a lone job always fits), and no other
+    running job is still parsing a snapshot file it shares.
+
+    The last rule makes each shared file parse once: later jobs read it from the cache.
+    """
+
+    __slots__ = ("jobs", "estimates", "memory_limit", "shared", "ready", "loading", "in_flight")
+
+    def __init__(
+        self, jobs: Sequence[BatchJob], memory_limit: int | None, gate_shared: bool
+    ) -> None:
+        # Largest first: long pairs start early instead of trailing the batch
+        self.estimates = {id(job): estimate_memory(job) for job in jobs}
+        self.jobs = sorted(jobs, key=lambda job: -self.estimates[id(job)])
+        self.memory_limit = memory_limit
+
+        uses = Counter(path for job in jobs for path in _files(job))
+        self.shared = {path for path, n in uses.items() if n > 1} if gate_shared else set()
+        self.ready: set[str] = set()
+        self.loading: set[str] = set()
+        self.in_flight = 0
+
+    def admit(self, running: int, workers: int) -> list[BatchJob]:
+        admitted: list[BatchJob] = []
+        for job in list(self.jobs):
+            if running + len(admitted) >= workers:
+                break
+            estimate = self.estimates[id(job)]
+            busy = running + len(admitted) > 0
+            if busy and self.memory_limit is not None:
+                if self.in_flight + estimate > self.memory_limit:
+                    continue
+            if any(path in self.loading for path in _files(job)):
+                continue
+            self.jobs.remove(job)
+            self.in_flight += estimate
+            self.loading.update(p for p in _files(job) if p in self.shared - self.ready)
+            admitted.append(job)
+        return admitted
+
+    def finish(self, job: BatchJob) -> None:
+        self.in_flight -= self.estimates[id(job)]
+        for path in _files(job):
+            if path in self.loading:
+                self.loading.discard(path)
+                self.ready.add(path)
+
+
+def _files(job: BatchJob) -> tuple[str, str]:
+    return os.path.realpath(job.baseline), os.path.realpath(job.candidate)
+
+
+def run_batch(
+    jobs: Sequence[BatchJob],
+    *,
+    workers: int = 1,
+    memory_limit: int | None = None,
+    cache: SnapshotCache | None = None,
+    reports_dir: str | None = None,
+    on_result: Callable[[BatchPairSummary], None] | None = None,
+) -> BatchSummary:
+    """
+    Run every job across `workers` processes and combine the results.
+
+    `memory_limit` caps the summed memory estimates of concurrently running pairs.
+    Files shared between pairs are parsed once and reused through `cache` (without a
+    cache every pair parses its own files). `on_result` is called in this process as
+    each pair finishes; the summary lists pairs in manifest order and its exit code is
+    the worst pair's (ERROR if any pair failed).
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    if memory_limit is not None and memory_limit < 1:
+        raise ValueError("memory_limit must be >= 1")
+    if reports_dir is not None:
+        os.makedirs(reports_dir, exist_ok=True)
+
+    _check_names(jobs)
+
+    start = time.perf_counter()
+    scheduler = _Scheduler(jobs, memory_limit, gate_shared=cache is not None)
+    results: dict[str, BatchPairSummary] = {}
+
+    def record(job: BatchJob, summary: BatchPairSummary) -> None:
+        scheduler.finish(job)
+        results[job.name] = summary
+        if on_result is not None:
+            on_result(summary)
+
+    if workers == 1:
+        while scheduler.jobs:
+            for job in scheduler.admit(0, 1):
+                record(job, run_job(job, cache, reports_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            running: dict[Future[BatchPairSummary], BatchJob] = {}
+            while scheduler.jobs or running:
+                for job in scheduler.admit(len(running), workers):
+                    running[pool.submit(run_job, job, cache, reports_dir)] = job
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    try:
+                        summary = future.result()
+                    except Exception as e:  # the worker process itself died
+                        summary = BatchPairSummary(
+                            name=job.name,
+                            exit_code=int(ExitCode.ERROR),
+                            error=f"{type(e).__name__}: {e}",
+                            seconds=0.0,
+                        )
+                    record(job, summary)
+
+    pairs = [results[job.name] for job in jobs]
+    counts = Counter(
+        "ERROR" if p.risk_level is None else p.risk_level.value for p in pairs
+    )
+    return BatchSummary(
+        exit_code=max((p.exit_code for p in pairs), default=int(ExitCode.OK)),
+        pairs=pairs,
+        counts=dict(counts),
+        seconds=time.perf_counter() - start,
+    )
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from itertools import combinations
+
+import numpy as np
+
+from .interning import encode_neighbor_lists
+from .metrics import overlap_displacement_batch
+from .models import CalibrationReport, NoiseProfile, ThresholdPreset
+from .sketch import DISPLACEMENT_BINS_PER_RANK, PERCENTILES, hist_percentiles
+from .validation import validate_and_truncate_snapshot
+
+
+def suggest_thresholds(
+    overlap_percentiles: Mapping[str, float],
+    displacement_percentiles: Mapping[str, float],
+    churn_at_overlap_warning: float,
+    min_anchor_jaccard: float,
+    *,
+    margin: float = 0.05,
+    defaults: ThresholdPreset | None = None,
+) -> ThresholdPreset:
+    """
+    Thresholds that clear the observed noise by `margin`, never stricter than needed.
+
+    Defaults are kept when the noise sits well inside them; otherwise each threshold is
+    loosened just past the noise (p1 overlap, p99 displacement, worst pair churn, worst
+    anchor Jaccard), keeping the default WARNING→CRITICAL gaps.
+    """
+    d = defaults or ThresholdPreset()
+
+    def clip(x: float) -> float:
+        return float(min(1.0, max(0.0, x)))
+
+    overlap_warning = clip(min(d.overlap_warning, overlap_percentiles.get("p1", 1.0) - margin))
+    overlap_critical = clip(
+        min(d.overlap_critical, overlap_warning - (d.overlap_warning - d.overlap_critical))
+    )
+
+    disp_noise = displacement_percentiles.get("p99", 0.0)
+    displacement_warning = max(d.displacement_warning, disp_noise + 1.0)
+    displacement_critical = max(
+        d.displacement_critical,
+        displacement_warning + (d.displacement_critical - d.displacement_warning),
+    )
+
+    churn_warning = clip(max(d.churn_warning, churn_at_overlap_warning + margin))
+    churn_critical = clip(
+        max(d.churn_critical, churn_warning + (d.churn_critical - d.churn_warning))
+    )
+
+    anchor_jaccard_warning = clip(min(d.anchor_jaccard_warning, min_anchor_jaccard - margin))
+
+    return d.model_copy(
+        update={
+            "overlap_warning": overlap_warning,
+            "overlap_critical": overlap_critical,
+            "displacement_warning": displacement_warning,
+            "displacement_critical": displacement_critical,
+            "churn_warning": churn_warning,
+            "churn_critical": churn_critical,
+            "anchor_jaccard_warning": anchor_jaccard_warning,
+        }
+    )
+
+
+def calibrate(
+    snapshots: Sequence[Mapping[str, list[str]]],
+    k: int,
+    *,
+    margin: float = 0.05,
+) -> CalibrationReport:
+    """
+    Measure the noise floor from R repeated snapshots of an unchanged system.
+
+    All R*(R-1)/2 pairs are compared with the batch kernels over interned (n, k)
+    matrices. Overlap is discrete (shared/K), so its distribution is exact; displacement
+    uses a fine histogram. Per-anchor worst cases form the `NoiseProfile`.
+    """
+    if len(snapshots) < 2:
+        raise ValueError("calibration needs at least 2 repeated snapshots")
+    if margin < 0:
+        raise ValueError("margin must be >= 0")
+
+    normalized = [validate_and_truncate_snapshot(s, k=k) for s in snapshots]
+    anchor_sets = [set(s) for s in normalized]
+    anchor_ids = sorted(set.intersection(*anchor_sets))
+
+    jaccards = [
+        (len(a & b) / len(a | b)) if (a | b) else 1.0 for a, b in combinations(anchor_sets, 2)
+    ]
+
+    vocab: dict[str, int] = {}
+    codes = [encode_neighbor_lists([s[a] for a in anchor_ids], k, vocab) for s in normalized]
+
+    n = len(anchor_ids)
+    n_bins = max(1, (k - 1) * DISPLACEMENT_BINS_PER_RANK) + 1
+    shared_hist = np.zeros(k + 1, dtype=np.int64)
+    disp_hist = np.zeros(n_bins, dtype=np.int64)
+    pair_shared_hists: list[np.ndarray] = []
+
+    min_shared = np.full(n, k, dtype=np.int64)
+    max_disp = np.full(n, np.nan)
+
+    pairs = list(combinations(range(len(codes)), 2))
+    for i, j in pairs:
+        shared, disp = overlap_displacement_batch(codes[i], codes[j])
+
+        pair_hist = np.bincount(shared, minlength=k + 1)
+        pair_shared_hists.append(pair_hist)
+        shared_hist += pair_hist
+
+        defined = ~np.isnan(disp)
+        bins = np.minimum(
+            n_bins - 1, np.round(disp[defined] * DISPLACEMENT_BINS_PER_RANK).astype(np.int64)
+        )
+        disp_hist += np.bincount(bins, minlength=n_bins)
+
+        np.minimum(min_shared, shared, out=min_shared)
+        max_disp = np.fmax(max_disp, disp)
+
+    overlap_values = np.arange(k + 1) / float(k)
+    disp_values = np.arange(n_bins) / float(DISPLACEMENT_BINS_PER_RANK)
+    overlap_pcts = hist_percentiles(shared_hist, overlap_values, PERCENTILES)
+    disp_pcts = hist_percentiles(disp_hist, disp_values, PERCENTILES)
+
+    def worst_pair_churn(overlap_warning: float) -> float:
+        if n == 0:
+            return 0.0
+        below = overlap_values < overlap_warning
+        return max(float(h[below].sum()) / n for h in pair_shared_hists)
+
+    # Churn is measured at the suggested overlap_warning, so suggest overlap first
+    draft = suggest_thresholds(overlap_pcts, disp_pcts, 0.0, min(jaccards), margin=margin)
+    churn = worst_pair_churn(draft.overlap_warning)
+    suggested = suggest_thresholds(overlap_pcts, disp_pcts, churn, min(jaccards), margin=margin)
+
+    profile = NoiseProfile(
+        k=k,
+        repeats=len(snapshots),
+        anchor_ids=anchor_ids,
+        min_overlap=(min_shared / float(k)).tolist(),
+        max_displacement=[None if np.isnan(x) else float(x) for x in max_disp],
+    )
+
+    return CalibrationReport(
+        k=k,
+        repeats=len(snapshots),
+        pair_count=len(pairs),
+        calibrated_anchors=n,
+        min_anchor_jaccard=min(jaccards),
+        overlap_percentiles=overlap_pcts,
+        displacement_percentiles=disp_pcts,
+        max_pair_churn=churn,
+        suggested_thresholds=suggested,
+        noise_profile=profile,
+    )
+
+
+def within_noise(
+    overlap: float,
+    displacement: float | None,
+    noise: tuple[float, float | None] | None,
+) -> bool:
+    """True if an anchor's drift is no worse than the noise observed for it in calibration."""
+    if noise is None:
+        return False
+    min_overlap, max_displacement = noise
+    if overlap < min_overlap:
+        return False
+    if displacement is None or displacement == 0.0:
+        return True
+    return max_displacement is not None and displacement <= max_displacement
@@ -1,12 +1,83 @@
 from __future__ import annotations
 
 import argparse
+import csv
 import json
+import math
+import os
 import sys
+from collections import Counter
+from itertools import islice
 
-from vector_guardrails.compare import compare
-from vector_guardrails.io import dump_json, ensure_snapshot_shape, load_json
-from vector_guardrails.models import ComparisonConfig, ExitCode
+import numpy as np
+
+from vector_guardrails.batch import load_manifest, physical_memory, run_batch
+from vector_guardrails.calibration import calibrate
+from vector_guardrails.compare import (
+    compare,
+    compare_delta,
+    compare_external,
+    compare_fingerprinted,
+)
+from vector_guardrails.delta import (
+    ReferenceState,
+    apply_delta,
+    create_delta,
+    dump_delta,
+    dump_reference_cache,
+    file_sha256,
+    load_delta,
+    load_reference_cache,
+)
+from vector_guardrails.generate import generate_snapshot
+from vector_guardrails.io import (
+    dump_json,
+    dump_latency,
+    dump_scores,
+    dump_snapshot_json,
+    ensure_snapshot_shape,
+    iter_weight_entries,
+    load_id_list,
+    load_json,
+    load_latency,
+    load_matrix,
+    load_scores,
+)
+from vector_guardrails.models import (
+    BatchPairSummary,
+    CalibrationReport,
+    ComparisonConfig,
+    ComparisonReport,
+    ExitCode,
+    MonitorSummary,
+    RiskLevel,
+)
+from vector_guardrails.monitor import DriftMonitor, follow_events, iter_events
+from vector_guardrails.report_index import save_indexed_report
+from vector_guardrails.snapshot_cache import DEFAULT_MAX_BYTES, SnapshotCache, load_snapshot
+from vector_guardrails.snapshot_index import (
+    SnapshotIndex,
+    build_snapshot_index,
+    default_index_path,
+)
+from vector_guardrails.sweep import sweep_thresholds
+from vector_guardrails.validation import validate_and_truncate_entry
+
+_SIZE_SUFFIXES = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def _parse_size(value: str) -> int:
+    """Parse a byte size such as 1048576, 512M or 4G."""
+    text = value.strip().upper().removesuffix("B")
+    suffix = text[-1:] if text[-1:] in _SIZE_SUFFIXES else ""
+    number = text[: len(text) - len(suffix)]
+    try:
+        size = int(float(number) * _SIZE_SUFFIXES[suffix])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}") from None
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"size must be positive: {value!r}")
+    return size
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -15,12 +86,266 @@ def build_parser() -> argparse.ArgumentParser:
 
     c = sub.add_parser("compare", help="Compare two retrieval snapshots")
     c.add_argument("--baseline", required=True, help="Path to baseline snapshot JSON")
-    c.add_argument("--candidate", required=True, help="Path to candidate snapshot JSON")
+    c.add_argument("--candidate", default=None, help="Path to candidate snapshot JSON")
+    c.add_argument(
+        "--delta",
+        default=None,
+        help="Compare baseline against baseline + this delta (instead of --candidate)",
+    )
+    c.add_argument(
+        "--reference-cache",
+        default=None,
+        help="Cache file for the baseline's self-comparison metrics (with --delta)",
+    )
     c.add_argument("--k", type=int, default=None, help="Top-K neighbors to compare")
     c.add_argument("--strict", action="store_true", help="Require exact anchor_id match")
     c.add_argument("--min-anchors", type=int, default=None, help="Minimum anchors required")
+    c.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop as soon as the verdict is decided (partial report, same exit code)",
+    )
+    c.add_argument(
+        "--sample",
+        action="store_true",
+        help="Sequential sampling: stop once the churn verdict is statistically decided",
+    )
+    c.add_argument("--seed", type=int, default=None, help="Seed for the sampling order")
+    c.add_argument("--confidence", type=float, default=None, help="Sampling confidence level")
+    c.add_argument("--sample-budget", type=int, default=None, help="Max anchors to sample")
+    c.add_argument(
+        "--memory-limit",
+        type=_parse_size,
+        default=None,
+        help="External-memory mode for huge/unsorted snapshots, e.g. 512M or 4G "
+        "(at least 4M; the report lists only the worst anchors)",
+    )
+    c.add_argument("--tmp-dir", default=None, help="Directory for external-memory sort runs")
+    c.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="Hash IDs to 63-bit fingerprints at parse time instead of keeping strings",
+    )
+    c.add_argument(
+        "--noise-profile",
+        default=None,
+        help="Calibration JSON from `calibrate`: ignore drift within each anchor's noise",
+    )
+    c.add_argument(
+        "--weights",
+        default=None,
+        help="Per-anchor traffic weights ({anchor_id: weight} JSON, or anchor_id,weight lines)",
+    )
+    c.add_argument(
+        "--traffic-sample",
+        action="store_true",
+        help="With --weights: evaluate the traffic head exactly plus a weighted tail sample",
+    )
+    c.add_argument(
+        "--head-share", type=float, default=None, help="Traffic share evaluated exactly"
+    )
+    c.add_argument(
+        "--tail-samples", type=int, default=None, help="Weighted draws from the traffic tail"
+    )
+    c.add_argument(
+        "--baseline-latency",
+        default=None,
+        help="Per-anchor baseline latencies (ms): .npy side array in snapshot anchor order, "
+        "or {anchor_id: ms} JSON",
+    )
+    c.add_argument(
+        "--candidate-latency", default=None, help="Per-anchor candidate latencies (ms)"
+    )
+    c.add_argument(
+        "--baseline-scores",
+        default=None,
+        help="Baseline similarity scores: .npz side file from `generate --scores-output` "
+        "or `io.dump_scores`, in snapshot order",
+    )
+    c.add_argument("--candidate-scores", default=None, help="Candidate similarity scores")
+    c.add_argument(
+        "--graph",
+        action="store_true",
+        help="k-NN graph metrics (reciprocity, in-degree, components); anchors and "
+        "neighbors must share one ID space",
+    )
+    c.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report the metric work: distinct list pairs scored, dedup hit rates and "
+        "kernel time",
+    )
+    c.add_argument(
+        "--index",
+        action="store_true",
+        help="With --sample: read only the sampled anchors through the snapshots' offset "
+        "indexes (from `vector-guardrails index`); with --delta: read only the changed "
+        "anchors from the baseline",
+    )
+    c.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-parse snapshots instead of using the parsed-snapshot cache",
+    )
+    c.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Parsed-snapshot cache directory "
+        "(default: $VECTOR_GUARDRAILS_CACHE_DIR or ~/.cache/vector-guardrails/snapshots)",
+    )
+    c.add_argument(
+        "--cache-size",
+        type=_parse_size,
+        default=DEFAULT_MAX_BYTES,
+        help="Evict least recently used cache files above this size, e.g. 512M (default 1G)",
+    )
     c.add_argument("--output", default=None, help="Write full report JSON to this path")
+    c.add_argument(
+        "--index-output",
+        default=None,
+        help="Write an indexed, memory-mappable report directory for fast drill-down",
+    )
     c.add_argument("--format", choices=["text", "json"], default="text", help="Stdout format")
+
+    b = sub.add_parser("batch", help="Compare many snapshot pairs listed in a manifest")
+    b.add_argument(
+        "--manifest",
+        required=True,
+        help='JSON list of {"name", "baseline", "candidate", "config"?} pairs, '
+        'or {"defaults": {...}, "pairs": [...]}',
+    )
+    b.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPUs)")
+    b.add_argument(
+        "--memory-limit",
+        type=_parse_size,
+        default=None,
+        help="Cap on the estimated memory of concurrent pairs, e.g. 8G "
+        "(default: half of physical memory)",
+    )
+    b.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not share parsed snapshots between pairs through the cache",
+    )
+    b.add_argument("--cache-dir", default=None, help="Parsed-snapshot cache directory")
+    b.add_argument(
+        "--cache-size",
+        type=_parse_size,
+        default=DEFAULT_MAX_BYTES,
+        help="Evict least recently used cache files above this size (default 1G)",
+    )
+    b.add_argument("--output", default=None, help="Write the combined summary JSON here")
+    b.add_argument(
+        "--reports-dir", default=None, help="Write each pair's full report JSON to this directory"
+    )
+    b.add_argument(
+        "--format",
+        choices=["text", "json"],
+        default="text",
+        help="Stdout format (json: one line per pair, then a totals line)",
+    )
+
+    dc = sub.add_parser("delta-create", help="Record how a snapshot differs from a reference")
+    dc.add_argument("--reference", required=True, help="Path to reference snapshot JSON")
+    dc.add_argument("--snapshot", required=True, help="Path to new snapshot JSON")
+    dc.add_argument("--output", required=True, help="Write delta JSON to this path")
+
+    da = sub.add_parser("delta-apply", help="Rebuild a snapshot from a reference and a delta")
+    da.add_argument("--reference", required=True, help="Path to reference snapshot JSON")
+    da.add_argument("--delta", required=True, help="Path to delta JSON")
+    da.add_argument("--output", required=True, help="Write snapshot JSON to this path")
+
+    cal = sub.add_parser(
+        "calibrate", help="Measure the noise floor from repeated snapshots of one system"
+    )
+    cal.add_argument(
+        "--snapshots", nargs="+", required=True, help="Two or more repeated snapshot JSONs"
+    )
+    cal.add_argument("--k", type=int, default=10, help="Top-K neighbors to compare")
+    cal.add_argument(
+        "--margin", type=float, default=0.05, help="Headroom between noise and thresholds"
+    )
+    cal.add_argument("--output", required=True, help="Write calibration JSON to this path")
+
+    sw = sub.add_parser(
+        "sweep", help="Replay a saved report's verdict over a grid of threshold values"
+    )
+    sw.add_argument("--report", required=True, help="Report JSON from `compare --output`")
+    sw.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="NAME=VALUES",
+        help="Threshold to sweep, e.g. overlap_warning=0.6,0.7 or churn_warning=0.1:0.3:0.05 "
+        "(start:stop:step, inclusive); repeatable",
+    )
+    sw.add_argument("--output", default=None, help="Write the sweep JSON to this path")
+    sw.add_argument("--format", choices=["text", "json", "csv"], default="text", help="Stdout")
+    sw.add_argument("--limit", type=int, default=20, help="Combinations listed in text format")
+
+    ix = sub.add_parser("index", help="Index anchor offsets in snapshot files for random access")
+    ix.add_argument(
+        "--snapshots",
+        nargs="+",
+        required=True,
+        help="Snapshot files: JSON objects, or NDJSON (.ndjson / .jsonl) lines of "
+        '[anchor_id, neighbors] or {"anchor_id", "neighbors"}',
+    )
+    ix.add_argument(
+        "--output", default=None, help="Index path for a single snapshot (default: <file>.idx)"
+    )
+
+    sh = sub.add_parser("show", help="Show one anchor's neighbors through the snapshot indexes")
+    sh.add_argument("--anchor", required=True, help="Anchor ID to look up")
+    sh.add_argument("--baseline", required=True, help="Indexed baseline snapshot")
+    sh.add_argument("--candidate", default=None, help="Indexed candidate snapshot")
+    sh.add_argument("--k", type=int, default=10, help="Top-K neighbors to show and compare")
+    sh.add_argument("--format", choices=["text", "json"], default="text", help="Stdout format")
+
+    mon = sub.add_parser("monitor", help="Rolling-window drift monitor over streamed events")
+    mon.add_argument(
+        "--input",
+        default="-",
+        help="NDJSON events file, or - for stdin (default); "
+        'each line {"anchor_id", "baseline", "candidate"} or [anchor_id, baseline, candidate]',
+    )
+    mon.add_argument("--follow", action="store_true", help="Keep reading as the file grows")
+    mon.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="With --follow, stop after this many seconds without new events",
+    )
+    mon.add_argument("--k", type=int, default=None, help="Top-K neighbors to compare")
+    mon.add_argument("--window", type=int, default=10_000, help="Events in the rolling window")
+    mon.add_argument(
+        "--summary-every", type=int, default=10_000, help="Emit a summary every N events"
+    )
+    mon.add_argument("--format", choices=["text", "json"], default="text", help="Stdout format")
+
+    g = sub.add_parser("generate", help="Generate a snapshot by exact kNN over embeddings")
+    g.add_argument("--anchors", required=True, help="Anchor embeddings (.npy, memory-mapped)")
+    g.add_argument("--anchor-ids", required=True, help="Anchor IDs (.json array or one per line)")
+    g.add_argument("--corpus", required=True, help="Corpus embeddings (.npy, memory-mapped)")
+    g.add_argument("--corpus-ids", required=True, help="Corpus IDs (.json array or one per line)")
+    g.add_argument("--k", type=int, default=10, help="Top-K neighbors per anchor")
+    g.add_argument("--metric", choices=["cosine", "dot"], default="cosine", help="Similarity")
+    g.add_argument("--exclude-self", action="store_true", help="Drop neighbors equal to the anchor")
+    g.add_argument("--anchor-block", type=int, default=1024, help="Anchor rows per block")
+    g.add_argument("--corpus-block", type=int, default=16384, help="Corpus rows per block")
+    g.add_argument("--workers", type=int, default=1, help="Anchor blocks scored in parallel")
+    g.add_argument("--output", required=True, help="Write snapshot JSON to this path")
+    g.add_argument(
+        "--latency-output",
+        default=None,
+        help="Also write each anchor's search time (ms) as a .npy side array "
+        "(anchors are then searched one at a time)",
+    )
+    g.add_argument(
+        "--scores-output",
+        default=None,
+        help="Also write neighbor similarity scores as a float32 .npz side file",
+    )
     return p
 
 
@@ -32,6 +357,53 @@ def _print_text_report(report) -> None:
     print("=" * 70)
     print()
 
+    if report.sampling is not None:
+        sampling = report.sampling
+        print(
+            f"SAMPLED REPORT: {sampling.sample_size} of {sampling.population_size} anchors "
+            f"(seed={sampling.seed}, stopped: {sampling.stopped_reason})"
+        )
+        print(
+            f"  {sampling.confidence:.0%} bounds: churn [{sampling.churn_lower:.2f}, "
+            f"{sampling.churn_upper:.2f}], mean overlap [{sampling.mean_overlap_lower:.2f}, "
+            f"{sampling.mean_overlap_upper:.2f}]"
+        )
+        print()
+    elif report.partial and report.traffic is None:
+        print(
+            f"PARTIAL REPORT: evaluated {report.anchors_evaluated} of "
+            f"{report.alignment.compared_anchors} anchors (--fail-fast, verdict decided)"
+        )
+        print()
+
+    if report.traffic is not None:
+        traffic = report.traffic
+        print(
+            f"TRAFFIC-WEIGHTED: {traffic.weighted_anchors} anchors carry weight "
+            f"(total {traffic.total_weight:g}); overall overlap and churn are weighted"
+        )
+        print(
+            f"  Unweighted: mean overlap {traffic.unweighted_mean_overlap:.2f}, "
+            f"churn {traffic.unweighted_churn_rate:.2f}"
+        )
+        if traffic.sampled:
+            print(
+                f"  Sampled: {traffic.head_anchors} head anchors "
+                f"({traffic.head_weight_share:.0%} of traffic) + {traffic.tail_draws} tail draws "
+                f"({traffic.tail_anchors_evaluated} distinct anchors); std error: overlap "
+                f"{traffic.mean_overlap_std_error:.3f}, churn {traffic.churn_std_error:.3f}"
+            )
+        print()
+
+    if report.fingerprint is not None:
+        fp = report.fingerprint
+        print(
+            f"FINGERPRINTED IDS: {fp.distinct_ids} distinct IDs as {fp.bits}-bit fingerprints "
+            f"(collision probability ≈ {fp.collision_probability:.1e})"
+        )
+        print("  Anchors outside samples and worst-risk lists are shown as fp:<hex>")
+        print()
+
     # Anchor alignment section
     print("ANCHOR ALIGNMENT:")
     print(f"  Compared: {report.alignment.compared_anchors} anchors present in both snapshots")
@@ -67,7 +439,8 @@ def _print_text_report(report) -> None:
 
     # Churn rate
     churn_pct = report.overall_churn_rate * 100
-    print(f"  Churn Rate: {report.overall_churn_rate:.2f} ({churn_pct:.0f}% of anchors)")
+    churn_unit = "traffic" if report.traffic is not None else "anchors"
+    print(f"  Churn Rate: {report.overall_churn_rate:.2f} ({churn_pct:.0f}% of {churn_unit})")
     print(f"    → Fraction of anchors with overlap < {report.config.thresholds.overlap_warning:.2f}")
 
     if report.overall_churn_rate == 0.0:
@@ -93,6 +466,140 @@ def _print_text_report(report) -> None:
             print(f"    ✗ Significant rank instability")
         print()
 
+    # Rank-aware metrics (if available)
+    if report.overall_mean_rbo is not None:
+        print("  Rank-Aware Agreement:")
+        print(f"    RBO (p={report.config.rbo_p:.2f}): {report.overall_mean_rbo:.2f}")
+        if report.overall_mean_weighted_overlap is not None:
+            print(f"    Weighted overlap: {report.overall_mean_weighted_overlap:.2f}")
+        if report.overall_mean_kendall_tau is not None:
+            print(f"    Kendall tau (shared): {report.overall_mean_kendall_tau:.2f}")
+        print("    → Top-heavy agreement; changes near rank 1 weigh more")
+        print()
+
+    # Per-anchor distributions: the tails a mean can hide
+    distributions = (
+        ("Overlap", report.overlap_distribution),
+        ("Displacement", report.displacement_distribution),
+    )
+    if any(d is not None and d.count for _, d in distributions):
+        print("  Distributions (per anchor):")
+        for name, dist in distributions:
+            if dist is None or not dist.count:
+                continue
+            pcts = ", ".join(f"{q}={v:.2f}" for q, v in dist.percentiles.items())
+            print(f"    {name + ':':<14}{pcts}")
+        print()
+
+    # Plugin metrics (registered via vector_guardrails.plugins)
+    if report.overall_custom_metrics:
+        print("  Custom Metrics:")
+        for name, value in report.overall_custom_metrics.items():
+            print(f"    {name}: {'n/a' if value is None else f'{value:.2f}'}")
+        print()
+
+    latency = report.latency
+    if latency is not None and latency.anchors:
+        print("LATENCY:")
+        print(f"  Anchors with latency on both sides: {latency.anchors}")
+        for q, ratio in latency.ratios.items():
+            print(
+                f"  {q}: {latency.baseline_percentiles[q]:.2f} ms → "
+                f"{latency.candidate_percentiles[q]:.2f} ms (×{ratio:.2f})"
+            )
+        if latency.worst_regressions:
+            print("  Worst regressions:")
+            for r in latency.worst_regressions[:5]:
+                print(
+                    f"    {r.anchor_id}: {r.baseline_ms:.2f} ms → {r.candidate_ms:.2f} ms "
+                    f"(×{r.ratio:.2f})"
+                )
+        print()
+
+    scores = report.scores
+    if scores is not None and scores.anchors:
+        print("SCORES:")
+        print(f"  Anchors with scores on both sides: {scores.anchors}")
+        if scores.mean_shared_drift is not None:
+            print(
+                f"  Shared-neighbor drift: mean {scores.mean_shared_drift:+.4f}, "
+                f"mean |drift| {scores.mean_abs_shared_drift:.4f}, "
+                f"p95 |drift| {scores.p95_abs_shared_drift:.4f} "
+                f"({scores.shared_neighbors} neighbors)"
+            )
+        if scores.baseline_mean_top1 is not None and scores.candidate_mean_top1 is not None:
+            print(
+                f"  Mean top-1 score: {scores.baseline_mean_top1:.4f} → "
+                f"{scores.candidate_mean_top1:.4f}"
+            )
+        if scores.baseline_mean_gap is not None and scores.candidate_mean_gap is not None:
+            ratio = "n/a" if scores.gap_ratio is None else f"×{scores.gap_ratio:.2f}"
+            print(
+                f"  Mean top-1 − top-K gap: {scores.baseline_mean_gap:.4f} → "
+                f"{scores.candidate_mean_gap:.4f} ({ratio})"
+            )
+        if scores.distribution_shift is not None:
+            print(f"  Distribution shift (KS): {scores.distribution_shift:.2f}")
+        print()
+
+    graph = report.graph
+    if graph is not None:
+        b, c = graph.baseline, graph.candidate
+        print("GRAPH:")
+        print(f"  Nodes: {b.nodes} → {c.nodes}, edges: {b.edges} → {c.edges}")
+        if b.reciprocity is not None and c.reciprocity is not None:
+            ratio = "n/a" if graph.reciprocity_ratio is None else f"×{graph.reciprocity_ratio:.2f}"
+            print(f"  Reciprocity: {b.reciprocity:.2%} → {c.reciprocity:.2%} ({ratio})")
+        print(
+            f"  In-degree p99 / max: {b.in_degree_percentiles.get('p99', 0):.0f} / "
+            f"{b.max_in_degree} → {c.in_degree_percentiles.get('p99', 0):.0f} / {c.max_in_degree}"
+        )
+        print(
+            f"  Unreached anchors: {b.unreached_anchor_rate:.2%} → {c.unreached_anchor_rate:.2%}"
+        )
+        print(
+            f"  Components: {b.components} → {c.components} (largest "
+            f"{b.largest_component_share:.2%} → {c.largest_component_share:.2%} of nodes)"
+        )
+        if graph.split_edge_rate is not None:
+            print(f"  Baseline edges split across components: {graph.split_edge_rate:.2%}")
+        print()
+
+    profile = report.profile
+    if profile is not None:
+        print("PROFILE:")
+        print(
+            f"  Anchors scored: {profile.anchors}, distinct list pairs: {profile.unique_pairs} "
+            f"(dedup hit rate {profile.dedup_hit_rate:.2%})"
+        )
+        print(
+            f"  Identical list pairs: {profile.identical_pairs} "
+            f"({profile.identical_pair_rate:.2%})"
+        )
+        print(f"  Kernel time: {profile.kernel_seconds:.3f}s")
+        print()
+
+    # Global neighbor frequency (hubness / coverage)
+    freq = report.neighbor_frequency
+    if freq is not None:
+        print("NEIGHBOR FREQUENCY:")
+        print(
+            f"  Distinct neighbors surfaced: {freq.baseline_distinct_neighbors} → "
+            f"{freq.candidate_distinct_neighbors} "
+            f"(coverage ratio {freq.catalog_coverage_ratio:.2f})"
+        )
+        print(
+            f"  Occurrence skew: {freq.baseline_occurrence_skew:.2f} → "
+            f"{freq.candidate_occurrence_skew:.2f} "
+            f"(max per item {freq.baseline_max_occurrence} → {freq.candidate_max_occurrence})"
+        )
+        for change in freq.top_risers[:5]:
+            print(
+                f"    ↑ {change.neighbor_id}: {change.baseline_count} → "
+                f"{change.candidate_count} anchors"
+            )
+        print()
+
     # Risk breakdown
     crit = report.get_critical_anchors()
     warn = report.get_warning_anchors()
@@ -100,7 +607,7 @@ def _print_text_report(report) -> None:
     print("RISK BREAKDOWN:")
     print(f"  CRITICAL: {len(crit)} anchors (overlap < {report.config.thresholds.overlap_critical:.2f})")
     print(f"  WARNING:  {len(warn)} anchors (overlap < {report.config.thresholds.overlap_warning:.2f})")
-    print(f"  SAFE:     {report.alignment.compared_anchors - len(crit) - len(warn)} anchors")
+    print(f"  SAFE:     {len(report.anchor_metrics) - len(crit) - len(warn)} anchors")
     print()
 
     # Actionable guidance
@@ -124,47 +631,545 @@ def _print_json_summary(report) -> None:
         "overall_risk_level": report.overall_risk_level.value,
         "exit_code": report.to_exit_code(),
         "compared_anchors": report.alignment.compared_anchors,
+        "anchors_evaluated": report.anchors_evaluated,
+        "partial": report.partial,
+        "sampling": report.sampling.model_dump() if report.sampling is not None else None,
+        "fingerprint": (
+            report.fingerprint.model_dump() if report.fingerprint is not None else None
+        ),
+        "traffic": report.traffic.model_dump() if report.traffic is not None else None,
+        "latency": report.latency.model_dump() if report.latency is not None else None,
+        "scores": report.scores.model_dump() if report.scores is not None else None,
+        "graph": report.graph.model_dump() if report.graph is not None else None,
+        "profile": report.profile.model_dump() if report.profile is not None else None,
         "mean_overlap": report.overall_mean_overlap,
         "mean_displacement": report.overall_mean_displacement,
         "churn_rate": report.overall_churn_rate,
+        "mean_rbo": report.overall_mean_rbo,
+        "mean_kendall_tau": report.overall_mean_kendall_tau,
+        "mean_weighted_overlap": report.overall_mean_weighted_overlap,
+        "custom_metrics": report.overall_custom_metrics,
+        "overlap_percentiles": (
+            report.overlap_distribution.percentiles if report.overlap_distribution else None
+        ),
+        "displacement_percentiles": (
+            report.displacement_distribution.percentiles
+            if report.displacement_distribution
+            else None
+        ),
         "anchor_jaccard": report.alignment.anchor_jaccard,
     }
     print(json.dumps(payload, ensure_ascii=False))
 
 
-def main(argv: list[str] | None = None) -> int:
-    parser = build_parser()
-    args = parser.parse_args(argv)
+def _run_compare(args: argparse.Namespace) -> int:
+    cfg = ComparisonConfig()
+    if args.k is not None:
+        cfg = cfg.model_copy(update={"k": args.k})
+    if args.min_anchors is not None:
+        cfg = cfg.model_copy(update={"min_anchors": args.min_anchors})
+    if args.strict:
+        cfg = cfg.model_copy(update={"require_exact_match": True})
+    if args.fail_fast:
+        cfg = cfg.model_copy(update={"fail_fast": True})
+    if args.sample:
+        cfg = cfg.model_copy(update={"sequential_sampling": True})
+    if args.seed is not None:
+        cfg = cfg.model_copy(update={"sample_seed": args.seed})
+    if args.confidence is not None:
+        cfg = cfg.model_copy(update={"sample_confidence": args.confidence})
+    if args.sample_budget is not None:
+        cfg = cfg.model_copy(update={"sample_budget": args.sample_budget})
+    if args.traffic_sample:
+        cfg = cfg.model_copy(update={"traffic_sampling": True})
+    if args.graph:
+        cfg = cfg.model_copy(update={"graph_metrics": True})
+    if args.profile:
+        cfg = cfg.model_copy(update={"profile": True})
+    if args.head_share is not None:
+        cfg = cfg.model_copy(update={"traffic_head_share": args.head_share})
+    if args.tail_samples is not None:
+        cfg = cfg.model_copy(update={"traffic_tail_samples": args.tail_samples})
+
+    if (args.candidate is None) == (args.delta is None):
+        raise ValueError("exactly one of --candidate or --delta is required")
+    if args.delta is not None and args.memory_limit is not None:
+        raise ValueError("--delta cannot be combined with --memory-limit")
+    if args.noise_profile and (args.delta is not None or args.memory_limit is not None):
+        raise ValueError("--noise-profile cannot be combined with --delta or --memory-limit")
+    if args.fingerprint and (
+        args.delta is not None or args.memory_limit is not None or args.noise_profile
+    ):
+        raise ValueError(
+            "--fingerprint cannot be combined with --delta, --memory-limit or --noise-profile"
+        )
+    if args.weights and (
+        args.delta is not None or args.memory_limit is not None or args.fingerprint
+    ):
+        raise ValueError(
+            "--weights cannot be combined with --delta, --memory-limit or --fingerprint"
+        )
+    if (args.baseline_latency is None) != (args.candidate_latency is None):
+        raise ValueError("--baseline-latency and --candidate-latency must be given together")
+    if args.baseline_latency and (
+        args.delta is not None or args.memory_limit is not None or args.fingerprint
+    ):
+        raise ValueError(
+            "latency arrays cannot be combined with --delta, --memory-limit or --fingerprint"
+        )
+    if (args.baseline_scores is None) != (args.candidate_scores is None):
+        raise ValueError("--baseline-scores and --candidate-scores must be given together")
+    if args.baseline_scores and (
+        args.delta is not None or args.memory_limit is not None or args.fingerprint
+    ):
+        raise ValueError(
+            "score files cannot be combined with --delta, --memory-limit or --fingerprint"
+        )
+
+    if args.index and not (args.sample or args.delta is not None):
+        raise ValueError(
+            "--index needs --sample or --delta (a full comparison reads every entry anyway)"
+        )
+    if args.index and (
+        args.memory_limit is not None
+        or args.fingerprint
+        or args.noise_profile
+        or args.weights
+        or args.baseline_latency
+        or args.baseline_scores
+        or args.graph
+    ):
+        raise ValueError(
+            "--index cannot be combined with --memory-limit, --fingerprint, "
+            "--noise-profile, --weights, latency arrays, score files or --graph"
+        )
+
+    if args.delta is not None:
+        report = _compare_with_delta(args, cfg)
+    elif args.index:
+        report = compare(SnapshotIndex(args.baseline), SnapshotIndex(args.candidate), cfg)
+    elif args.memory_limit is not None:
+        report = compare_external(
+            args.baseline,
+            args.candidate,
+            cfg,
+            memory_limit=args.memory_limit,
+            tmp_dir=args.tmp_dir,
+        )
+    elif args.fingerprint:
+        report = compare_fingerprinted(args.baseline, args.candidate, cfg)
+    else:
+        cache = None
+        if not args.no_cache:
+            cache = SnapshotCache(args.cache_dir, max_bytes=args.cache_size)
+        baseline = load_snapshot(args.baseline, cfg.k, cache=cache)
+        candidate = load_snapshot(args.candidate, cfg.k, cache=cache)
+        noise_profile = None
+        if args.noise_profile:
+            calibration = CalibrationReport.model_validate(load_json(args.noise_profile))
+            noise_profile = calibration.noise_profile
+        # Streamed straight into an array aligned to the compared anchors
+        weights = iter_weight_entries(args.weights) if args.weights else None
+        baseline_latency = candidate_latency = None
+        if args.baseline_latency:
+            baseline_latency = load_latency(args.baseline_latency, baseline)
+            candidate_latency = load_latency(args.candidate_latency, candidate)
+        baseline_scores = candidate_scores = None
+        if args.baseline_scores:
+            baseline_scores = load_scores(args.baseline_scores, baseline)
+            candidate_scores = load_scores(args.candidate_scores, candidate)
+        report = compare(
+            baseline=baseline,
+            candidate=candidate,
+            config=cfg,
+            noise_profile=noise_profile,
+            weights=weights,
+            baseline_latency=baseline_latency,
+            candidate_latency=candidate_latency,
+            baseline_scores=baseline_scores,
+            candidate_scores=candidate_scores,
+        )
+
+    if args.output:
+        dump_json(args.output, report.model_dump())
+    if args.index_output:
+        save_indexed_report(report, args.index_output)
+
+    if args.format == "text":
+        _print_text_report(report)
+    else:
+        _print_json_summary(report)
+
+    return report.to_exit_code()
 
-    try:
-        if args.command != "compare":
-            raise ValueError(f"unknown command: {args.command}")
 
-        baseline_obj = load_json(args.baseline)
-        candidate_obj = load_json(args.candidate)
+def _compare_with_delta(args: argparse.Namespace, cfg: ComparisonConfig) -> ComparisonReport:
+    # With --index only the anchors the delta touches are read from the baseline
+    reference = (
+        SnapshotIndex(args.baseline)
+        if args.index
+        else ensure_snapshot_shape(load_json(args.baseline))
+    )
+    delta = load_delta(args.delta)
 
-        baseline = ensure_snapshot_shape(baseline_obj)
-        candidate = ensure_snapshot_shape(candidate_obj)
+    cached = None
+    if args.reference_cache:
+        cached = load_reference_cache(args.reference_cache, args.baseline, cfg)
+    reference_sha = None
+    if cached is not None:
+        reference_sha = cached.reference_sha256
+    elif delta.reference_sha256 is not None or args.reference_cache:
+        reference_sha = file_sha256(args.baseline)
+    if delta.reference_sha256 is not None and delta.reference_sha256 != reference_sha:
+        raise ValueError("delta was created against a different baseline file")
+
+    if cached is not None:
+        report, state = cached.report, ReferenceState.from_cache(cached)
+    else:
+        report = compare(reference, reference, cfg)
+        state = ReferenceState.from_report(report)
+        if args.reference_cache:
+            dump_reference_cache(args.reference_cache, args.baseline, reference_sha, report, state)
+
+    return compare_delta(reference, delta, cfg, reference_report=report, reference_state=state)
+
+
+def _run_batch(args: argparse.Namespace) -> int:
+    jobs = load_manifest(args.manifest)
+    workers = args.workers if args.workers is not None else min(len(jobs), os.cpu_count() or 1)
+    memory_limit = args.memory_limit
+    if memory_limit is None:
+        total = physical_memory()
+        memory_limit = total // 2 if total else None
+    cache = None
+    if not args.no_cache:
+        cache = SnapshotCache(args.cache_dir, max_bytes=args.cache_size)
+
+    finished = {"count": 0}
+
+    def on_result(pair: BatchPairSummary) -> None:
+        finished["count"] += 1
+        if args.format == "json":
+            print(pair.model_dump_json(), flush=True)
+            return
+        progress = f"[{finished['count']}/{len(jobs)}] {pair.name}"
+        if pair.error is not None:
+            print(f"{progress}: ERROR {pair.error}", flush=True)
+        else:
+            print(
+                f"{progress}: {pair.risk_level.value} (overlap {pair.mean_overlap:.2f}, "
+                f"displacement {pair.mean_displacement:.2f}, churn {pair.churn_rate:.2f}) "
+                f"in {pair.seconds:.1f}s",
+                flush=True,
+            )
+
+    summary = run_batch(
+        jobs,
+        workers=workers,
+        memory_limit=memory_limit,
+        cache=cache,
+        reports_dir=args.reports_dir,
+        on_result=on_result,
+    )
+    if args.output:
+        dump_json(args.output, summary.model_dump())
+
+    if args.format == "json":
+        print(json.dumps({"exit_code": summary.exit_code, "counts": summary.counts}))
+    else:
+        counts = ", ".join(f"{level} {n}" for level, n in sorted(summary.counts.items()))
+        print(f"{len(jobs)} pairs in {summary.seconds:.1f}s: {counts}")
+    return summary.exit_code
+
+
+def _run_delta_create(args: argparse.Namespace) -> int:
+    reference = ensure_snapshot_shape(load_json(args.reference))
+    snapshot = ensure_snapshot_shape(load_json(args.snapshot))
+
+    delta = create_delta(reference, snapshot, reference_sha256=file_sha256(args.reference))
+    dump_delta(args.output, delta)
+    print(
+        f"Delta written: {len(delta.changed)} changed, {len(delta.added)} added, "
+        f"{len(delta.removed)} removed → {args.output}"
+    )
+    return int(ExitCode.OK)
+
+
+def _run_delta_apply(args: argparse.Namespace) -> int:
+    reference = ensure_snapshot_shape(load_json(args.reference))
+    delta = load_delta(args.delta)
+    if delta.reference_sha256 is not None and delta.reference_sha256 != file_sha256(
+        args.reference
+    ):
+        raise ValueError("delta was created against a different reference file")
+
+    snapshot = apply_delta(reference, delta)
+    dump_json(args.output, snapshot)
+    print(f"Snapshot written: {len(snapshot)} anchors → {args.output}")
+    return int(ExitCode.OK)
+
+
+def _run_calibrate(args: argparse.Namespace) -> int:
+    snapshots = [ensure_snapshot_shape(load_json(path)) for path in args.snapshots]
+    result = calibrate(snapshots, k=args.k, margin=args.margin)
+    dump_json(args.output, result.model_dump())
+
+    t = result.suggested_thresholds
+    print(
+        f"Calibrated {result.calibrated_anchors} anchors over {result.repeats} runs "
+        f"({result.pair_count} pairs), top-{result.k}"
+    )
+    print(
+        "Noise: overlap "
+        + ", ".join(f"{q}={v:.2f}" for q, v in result.overlap_percentiles.items())
+    )
+    if result.displacement_percentiles:
+        print(
+            "       displacement "
+            + ", ".join(f"{q}={v:.2f}" for q, v in result.displacement_percentiles.items())
+        )
+    print(
+        f"       worst pair churn={result.max_pair_churn:.2f}, "
+        f"min anchor Jaccard={result.min_anchor_jaccard:.2f}"
+    )
+    print("Suggested thresholds:")
+    print(
+        f"  overlap        WARNING < {t.overlap_warning:.2f}, CRITICAL < {t.overlap_critical:.2f}"
+    )
+    print(
+        f"  displacement   WARNING > {t.displacement_warning:.1f}, "
+        f"CRITICAL > {t.displacement_critical:.1f}"
+    )
+    print(f"  churn          WARNING > {t.churn_warning:.2f}, CRITICAL > {t.churn_critical:.2f}")
+    print(f"  anchor Jaccard WARNING < {t.anchor_jaccard_warning:.2f}")
+    print(f"Calibration written → {args.output}")
+    return int(ExitCode.OK)
+
+
+def _parse_grid(specs: list[str]) -> dict[str, list[float]]:
+    grid: dict[str, list[float]] = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not values:
+            raise ValueError(f"--grid expects NAME=VALUES, got: {spec!r}")
+        try:
+            if ":" in values:
+                start, stop, step = (float(v) for v in values.split(":"))
+                if step <= 0:
+                    raise ValueError
+                count = int(math.floor((stop - start) / step + 1e-9)) + 1
+                grid[name] = [round(start + i * step, 10) for i in range(max(count, 0))]
+            else:
+                grid[name] = [float(v) for v in values.split(",")]
+        except ValueError:
+            raise ValueError(f"invalid --grid values for {name}: {values!r}") from None
+    return grid
+
+
+def _run_sweep(args: argparse.Namespace) -> int:
+    report = ComparisonReport.model_validate(load_json(args.report))
+    sweep = sweep_thresholds(report, _parse_grid(args.grid))
+    if args.output:
+        dump_json(args.output, sweep.model_dump())
+
+    names = list(sweep.thresholds)
+    columns = [*names, "risk_level", "critical", "warning", "info", "churn_rate"]
+    rows = zip(
+        *sweep.thresholds.values(),
+        (level.value for level in sweep.risk_levels),
+        sweep.critical_anchors,
+        sweep.warning_anchors,
+        sweep.info_anchors,
+        sweep.churn_rates,
+        strict=True,
+    )
+    if args.format == "json":
+        print(json.dumps(sweep.model_dump(mode="json")))
+    elif args.format == "csv":
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(rows)
+    else:
+        total = len(sweep.risk_levels)
+        counts = Counter(level.value for level in sweep.risk_levels)
+        print(f"Swept {total} threshold combinations over {sweep.anchors} anchors")
+        print("Verdicts: " + ", ".join(f"{level}={n}" for level, n in sorted(counts.items())))
+        print()
+        print("  ".join(f"{c:>12}" for c in columns))
+        for row in islice(rows, max(args.limit, 0)):
+            *values, level, critical, warning, info, churn = row
+            cells = [f"{v:>12g}" for v in values] + [f"{level:>12}"]
+            cells += [f"{x:>12d}" for x in (critical, warning, info)] + [f"{churn:>12.3f}"]
+            print("  ".join(cells))
+        if total > args.limit:
+            print(f"... {total - args.limit} more (use --format csv or --output)")
+    return int(ExitCode.OK)
 
-        cfg = ComparisonConfig()
-        if args.k is not None:
-            cfg = cfg.model_copy(update={"k": args.k})
-        if args.min_anchors is not None:
-            cfg = cfg.model_copy(update={"min_anchors": args.min_anchors})
-        if args.strict:
-            cfg = cfg.model_copy(update={"require_exact_match": True})
 
-        report = compare(baseline=baseline, candidate=candidate, config=cfg)
+def _run_monitor(args: argparse.Namespace) -> int:
+    cfg = ComparisonConfig()
+    if args.k is not None:
+        cfg = cfg.model_copy(update={"k": args.k})
 
-        if args.output:
-            dump_json(args.output, report.model_dump())
+    worst = {"exit_code": int(ExitCode.OK)}
 
-        if args.format == "text":
-            _print_text_report(report)
+    def on_summary(summary: MonitorSummary) -> None:
+        worst["exit_code"] = max(worst["exit_code"], summary.to_exit_code())
+        if args.format == "json":
+            print(summary.model_dump_json(), flush=True)
         else:
-            _print_json_summary(report)
+            print(
+                f"[{summary.events_seen} events] {summary.risk_level.value}: "
+                f"overlap {summary.mean_overlap:.2f}, "
+                f"displacement {summary.mean_displacement:.2f}, "
+                f"churn {summary.churn_rate:.2f}, "
+                f"critical {summary.critical_anchors}, warning {summary.warning_anchors} "
+                f"(window {summary.window_events})",
+                flush=True,
+            )
+
+    def on_verdict_change(previous: RiskLevel | None, summary: MonitorSummary) -> None:
+        if previous is None or args.format == "json":
+            return
+        reasons = "; ".join(summary.reasons)
+        print(
+            f"VERDICT CHANGE: {previous.value} → {summary.risk_level.value}"
+            + (f" ({reasons})" if reasons else ""),
+            flush=True,
+        )
+
+    monitor = DriftMonitor(
+        cfg,
+        window=args.window,
+        summary_every=args.summary_every,
+        on_summary=on_summary,
+        on_verdict_change=on_verdict_change,
+    )
+    if args.input == "-":
+        monitor.consume(iter_events(sys.stdin))
+    elif args.follow:
+        monitor.consume(follow_events(args.input, idle_timeout=args.idle_timeout))
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            monitor.consume(iter_events(f))
+
+    # A canary run fails on the worst verdict it went through, not just the last one
+    return worst["exit_code"]
+
+
+def _run_generate(args: argparse.Namespace) -> int:
+    latency_ms: list[float] | None = [] if args.latency_output else None
+    score_rows: list[np.ndarray] | None = [] if args.scores_output else None
+    entries = generate_snapshot(
+        anchors=load_matrix(args.anchors),
+        corpus=load_matrix(args.corpus),
+        anchor_ids=load_id_list(args.anchor_ids),
+        corpus_ids=load_id_list(args.corpus_ids),
+        k=args.k,
+        metric=args.metric,
+        exclude_self=args.exclude_self,
+        anchor_block_size=args.anchor_block,
+        corpus_block_size=args.corpus_block,
+        workers=args.workers,
+        latency_ms=latency_ms,
+        score_rows=score_rows,
+    )
+    count = dump_snapshot_json(args.output, entries)
+    print(f"Snapshot written: {count} anchors, top-{args.k} neighbors → {args.output}")
+    if latency_ms is not None:
+        dump_latency(args.latency_output, latency_ms)
+        print(f"Latencies written: {len(latency_ms)} anchors → {args.latency_output}")
+    if score_rows is not None:
+        dump_scores(args.scores_output, score_rows)
+        print(f"Scores written: {len(score_rows)} anchors → {args.scores_output}")
+    return int(ExitCode.OK)
+
+
+def _run_index(args: argparse.Namespace) -> int:
+    if args.output is not None and len(args.snapshots) > 1:
+        raise ValueError("--output needs a single snapshot")
+    for path in args.snapshots:
+        count = build_snapshot_index(path, args.output)
+        print(f"Indexed {count} anchors → {args.output or default_index_path(path)}")
+    return int(ExitCode.OK)
+
+
+def _run_show(args: argparse.Namespace) -> int:
+    paths = {"baseline": args.baseline, "candidate": args.candidate}
+    lists = {
+        side: SnapshotIndex(path).get(args.anchor)
+        for side, path in paths.items()
+        if path is not None
+    }
+    if all(neighbors is None for neighbors in lists.values()):
+        raise ValueError(f"anchor_id={args.anchor!r} is not in the given snapshots")
+    for side, neighbors in lists.items():
+        if neighbors is not None:
+            lists[side] = validate_and_truncate_entry(args.anchor, neighbors, args.k)
 
-        return report.to_exit_code()
+    metrics = None
+    if lists.get("baseline") is not None and lists.get("candidate") is not None:
+        cfg = ComparisonConfig(k=args.k)
+        pair = compare({args.anchor: lists["baseline"]}, {args.anchor: lists["candidate"]}, cfg)
+        metrics = pair.anchor_metrics[0]
+
+    if args.format == "json":
+        payload = {
+            "anchor_id": args.anchor,
+            **lists,
+            "metrics": metrics.model_dump() if metrics is not None else None,
+        }
+        print(json.dumps(payload, ensure_ascii=False))
+        return int(ExitCode.OK)
+
+    print(f"ANCHOR: {args.anchor} (top-{args.k})")
+    for side, neighbors in lists.items():
+        if neighbors is None:
+            print(f"  {side}: (not in snapshot)")
+    shown = {side: neighbors for side, neighbors in lists.items() if neighbors is not None}
+    # `*` marks neighbors present on both sides
+    shared = set.intersection(*map(set, shown.values())) if len(shown) == 2 else set()
+    print(("  rank  " + "".join(f"{side:<32}" for side in shown)).rstrip())
+    for rank in range(max(map(len, shown.values()))):
+        cells = []
+        for neighbors in shown.values():
+            cell = neighbors[rank] if rank < len(neighbors) else ""
+            cells.append(f"{cell + (' *' if cell in shared else ''):<32}")
+        print(f"  {rank + 1:>4}  " + "".join(cells).rstrip())
+    if metrics is not None:
+        displacement = (
+            "n/a" if metrics.rank_displacement is None else f"{metrics.rank_displacement:.2f}"
+        )
+        print(
+            f"  Overlap: {metrics.overlap:.2f}, displacement: {displacement}, "
+            f"risk: {metrics.risk_level.value}"
+        )
+    return int(ExitCode.OK)
+
+
+_COMMANDS = {
+    "compare": _run_compare,
+    "batch": _run_batch,
+    "delta-create": _run_delta_create,
+    "delta-apply": _run_delta_apply,
+    "generate": _run_generate,
+    "calibrate": _run_calibrate,
+    "sweep": _run_sweep,
+    "monitor": _run_monitor,
+    "index": _run_index,
+    "show": _run_show,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        handler = _COMMANDS.get(args.command)
+        if handler is None:
+            raise ValueError(f"unknown command: {args.command}")
+        return handler(args)
 
     except Exception as e:
         # Keep errors user-friendly, but don’t swallow details
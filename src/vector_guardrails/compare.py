@@ -1,33 +1,97 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+import heapq
+from bisect import bisect_left
+from collections.abc import Generator, Mapping, Sequence
+from operator import attrgetter
 
-from vector_guardrails.engine import compute_identity_metrics
-from vector_guardrails.models import AnchorMetrics, ComparisonConfig, ComparisonReport, RiskLevel
-from vector_guardrails.risk import classify_anchor_risk, classify_overall_risk
+import numpy as np
 
+from vector_guardrails.alignment import align_anchors
+from vector_guardrails.calibration import within_noise
+from vector_guardrails.delta import ReferenceState, check_delta_applies
+from vector_guardrails.engine import (
+    IdentityMetricsSummary,
+    MetricsProfile,
+    PreparedComparison,
+    compute_identity_chunk,
+    compute_identity_metrics,
+    compute_identity_rows,
+    identity_rows_from_codes,
+    identity_rows_from_flat_codes,
+    prepare_comparison,
+    summarize_identity_metrics,
+    uses_sort_merge,
+)
+from vector_guardrails.external import ExternalBudget, compute_identity_metrics_external
+from vector_guardrails.fingerprint import (
+    FINGERPRINT_BITS,
+    FingerprintLabels,
+    collision_probability,
+    fingerprint_entries,
+    fingerprint_label,
+    label_fingerprint,
+    resolve_fingerprints,
+)
+from vector_guardrails.frequency import neighbor_frequency_drift
+from vector_guardrails.graph import graph_summary, matrix_graphs, snapshot_graphs
+from vector_guardrails.interning import IndexLabels, VocabLookup
+from vector_guardrails.io import iter_snapshot_entries
+from vector_guardrails.latency import latency_summary
+from vector_guardrails.models import (
+    AnchorAlignmentSummary,
+    AnchorIdentityMetrics,
+    AnchorMetrics,
+    ComparisonConfig,
+    ComparisonReport,
+    FingerprintSummary,
+    GraphSummary,
+    LatencySummary,
+    NoiseProfile,
+    RiskLevel,
+    SamplingSummary,
+    ScoreSummary,
+    SnapshotDelta,
+    TrafficSummary,
+)
+from vector_guardrails.plugins import registered_metrics
+from vector_guardrails.risk import classify_anchor_risk, classify_overall_risk
+from vector_guardrails.sampling import (
+    bounded_interval,
+    decided_churn_level,
+    look_alpha,
+    sample_order,
+    serfling_radius,
+)
+from vector_guardrails.scores import SnapshotScores, score_summary
+from vector_guardrails.snapshot_index import IndexedLists, SnapshotIndex
+from vector_guardrails.validation import (
+    bounded_sample,
+    duplicate_matrix_rows,
+    duplicate_neighbors_error,
+    validate_and_truncate_entry,
+    validate_neighbor_matrix,
+)
+from vector_guardrails.weights import AnchorWeights, align_weights, traffic_plan, weighted_total
 
-def compare(
-    baseline: Mapping[str, list[str]],
-    candidate: Mapping[str, list[str]],
-    config: ComparisonConfig | None = None,
-) -> ComparisonReport:
-    cfg = config or ComparisonConfig()
+_RISK_CODES = list(RiskLevel)
 
-    alignment, anchor_rows, overall = compute_identity_metrics(
-        baseline=baseline,
-        candidate=candidate,
-        config=cfg,
-    )
 
+def _classify_rows(
+    rows: list[AnchorIdentityMetrics], cfg: ComparisonConfig
+) -> tuple[list[AnchorMetrics], bool]:
     anchor_metrics: list[AnchorMetrics] = []
     any_anchor_critical = False
 
-    for row in anchor_rows:
+    for row in rows:
         risk, reasons = classify_anchor_risk(
             overlap=row.overlap,
             displacement=row.rank_displacement,
             cfg=cfg,
+            rbo=row.rbo,
+            kendall_tau=row.kendall_tau,
+            weighted_overlap=row.weighted_overlap,
+            custom_metrics=row.custom_metrics,
         )
         if risk == RiskLevel.CRITICAL:
             any_anchor_critical = True
@@ -40,18 +104,85 @@ def compare(
                 shared_count=row.shared_count,
                 baseline_only_count=row.baseline_only_count,
                 candidate_only_count=row.candidate_only_count,
+                rbo=row.rbo,
+                kendall_tau=row.kendall_tau,
+                weighted_overlap=row.weighted_overlap,
+                custom_metrics=row.custom_metrics,
                 risk_level=risk,
                 reasons=reasons,
             )
         )
 
+    return anchor_metrics, any_anchor_critical
+
+
+def _apply_noise_profile(
+    anchor_metrics: list[AnchorMetrics],
+    overall: IdentityMetricsSummary,
+    cfg: ComparisonConfig,
+    profile: NoiseProfile,
+) -> bool:
+    """
+    Downgrade anchors that stay within their calibrated noise floor to INFO and drop
+    them from churn. Returns whether any anchor is still CRITICAL.
+    """
+    if profile.k != cfg.k:
+        raise ValueError(
+            f"noise profile was calibrated at k={profile.k}, comparison uses k={cfg.k}"
+        )
+
+    noise = profile.by_anchor
+    churned = 0
+    any_anchor_critical = False
+    for i, m in enumerate(anchor_metrics):
+        if m.risk_level != RiskLevel.INFO and within_noise(
+            m.overlap, m.rank_displacement, noise.get(m.anchor_id)
+        ):
+            m = anchor_metrics[i] = m.model_copy(
+                update={"risk_level": RiskLevel.INFO, "reasons": ["within calibrated noise"]}
+            )
+        elif m.overlap < cfg.thresholds.overlap_warning:
+            churned += 1
+        if m.risk_level == RiskLevel.CRITICAL:
+            any_anchor_critical = True
+
+    if anchor_metrics:
+        overall.overall_churn_rate = churned / float(len(anchor_metrics))
+    return any_anchor_critical
+
+
+def _build_report(
+    cfg: ComparisonConfig,
+    alignment: AnchorAlignmentSummary,
+    overall: IdentityMetricsSummary,
+    anchor_metrics: list[AnchorMetrics],
+    any_anchor_critical: bool,
+    *,
+    partial: bool = False,
+    anchors_evaluated: int | None = None,
+    sampling: SamplingSummary | None = None,
+    fingerprint: FingerprintSummary | None = None,
+    traffic: TrafficSummary | None = None,
+    latency: LatencySummary | None = None,
+    scores: ScoreSummary | None = None,
+    graph: GraphSummary | None = None,
+    profile: MetricsProfile | None = None,
+) -> ComparisonReport:
     overall_risk, overall_reasons = classify_overall_risk(
         churn_rate=overall.overall_churn_rate,
         anchor_jaccard=alignment.anchor_jaccard,
         cfg=cfg,
         any_anchor_critical=any_anchor_critical,
+        overlap_distribution=overall.overlap_distribution,
+        displacement_distribution=overall.displacement_distribution,
+        latency=latency,
+        scores=scores,
+        graph=graph,
     )
 
+    if anchors_evaluated is None:
+        anchors_evaluated = len(anchor_metrics)
+
     # A short, human-readable summary (we'll polish more in Slice 5)
     verdict_summary = (
         f"VERDICT: {overall_risk.value} — "
@@ -59,6 +190,30 @@ def compare(
         f"Mean overlap@{cfg.k}: {overall.overall_mean_overlap:.2f}, "
         f"Churn rate: {overall.overall_churn_rate:.2f}"
     )
+    if sampling is not None:
+        verdict_summary += (
+            f" | SAMPLED: {sampling.sample_size} of {sampling.population_size} anchors "
+            f"(seed={sampling.seed}, {sampling.confidence:.0%} churn interval "
+            f"[{sampling.churn_lower:.2f}, {sampling.churn_upper:.2f}], "
+            f"stopped: {sampling.stopped_reason})"
+        )
+    elif traffic is not None and traffic.sampled:
+        verdict_summary += (
+            f" | TRAFFIC-SAMPLED: {len(anchor_metrics)} of {alignment.compared_anchors} "
+            f"anchors ({traffic.head_anchors} head anchors = {traffic.head_weight_share:.0%} "
+            f"of traffic, {traffic.tail_draws} tail draws; churn ± {traffic.churn_std_error:.3f})"
+        )
+    elif traffic is not None:
+        verdict_summary += " | TRAFFIC-WEIGHTED overlap and churn"
+    elif partial:
+        verdict_summary += (
+            f" | PARTIAL: stopped after {len(anchor_metrics)} of "
+            f"{alignment.compared_anchors} anchors (verdict decided)"
+        )
+    elif len(anchor_metrics) < anchors_evaluated:
+        verdict_summary += (
+            f" | LISTED: the {len(anchor_metrics)} worst of {anchors_evaluated} anchors"
+        )
     if overall_reasons:
         verdict_summary += " | REASONS: " + "; ".join(overall_reasons)
 
@@ -68,9 +223,899 @@ def compare(
         overall_mean_overlap=overall.overall_mean_overlap,
         overall_mean_displacement=overall.overall_mean_displacement,
         overall_churn_rate=overall.overall_churn_rate,
+        overall_mean_rbo=overall.overall_mean_rbo,
+        overall_mean_kendall_tau=overall.overall_mean_kendall_tau,
+        overall_mean_weighted_overlap=overall.overall_mean_weighted_overlap,
+        overall_custom_metrics=overall.overall_custom_metrics,
+        overlap_distribution=overall.overlap_distribution,
+        displacement_distribution=overall.displacement_distribution,
         overall_risk_level=overall_risk,
         anchor_metrics=anchor_metrics,
         segment_summaries=None,
+        neighbor_frequency=overall.neighbor_frequency,
         verdict_summary=verdict_summary,
+        partial=partial,
+        anchors_evaluated=anchors_evaluated,
+        sampling=sampling,
+        fingerprint=fingerprint,
+        traffic=traffic,
+        latency=latency,
+        scores=scores,
+        graph=graph,
+        profile=profile.summary() if profile is not None else None,
     )
     return report
+
+
+# Chunked runs as generators: they yield (anchors_done, anchors_total) once prepared and
+# after every chunk, and return the report. `compare` drains them; `compare_async` runs
+# one step per executor call, so it can report progress and stop between chunks.
+_ComparisonSteps = Generator[tuple[int, int], None, ComparisonReport]
+
+
+def _run_steps(steps: _ComparisonSteps) -> ComparisonReport:
+    """Drive a chunked run to completion and return its report."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+def _fail_fast_steps(
+    baseline: Mapping[str, list[str]],
+    candidate: Mapping[str, list[str]],
+    cfg: ComparisonConfig,
+    latency: LatencySummary | None = None,
+    scores: ScoreSummary | None = None,
+    graph: GraphSummary | None = None,
+) -> _ComparisonSteps:
+    """
+    Evaluate anchors in chunks and stop as soon as the verdict can no longer change.
+
+    Only CRITICAL is final before all anchors are seen: either an anchor is CRITICAL,
+    or enough anchors have churned that churn over *all* compared anchors must exceed
+    churn_critical. WARNING/INFO could still escalate, so those runs finish normally.
+    """
+    prepared = prepare_comparison(baseline, candidate, cfg)
+    total = len(prepared.anchor_ids)
+    yield 0, total
+
+    profile = MetricsProfile() if cfg.profile else None
+    vocab: dict[str, int] = {}
+    id_lookup = VocabLookup(vocab)
+    rows: list[AnchorIdentityMetrics] = []
+    anchor_metrics: list[AnchorMetrics] = []
+    b_parts: list[np.ndarray] = []
+    c_parts: list[np.ndarray] = []
+    any_anchor_critical = False
+    churned = 0
+
+    for start in range(0, total, cfg.chunk_size):
+        stop = min(total, start + cfg.chunk_size)
+        chunk_rows, b_codes, c_codes = compute_identity_chunk(
+            prepared, start, stop, cfg, vocab, profile, id_lookup
+        )
+        chunk_metrics, chunk_critical = _classify_rows(chunk_rows, cfg)
+
+        rows.extend(chunk_rows)
+        anchor_metrics.extend(chunk_metrics)
+        b_parts.append(b_codes)
+        c_parts.append(c_codes)
+
+        any_anchor_critical = any_anchor_critical or chunk_critical
+        churned += sum(1 for r in chunk_rows if r.overlap < cfg.thresholds.overlap_warning)
+        churn_lower_bound = churned / float(total)
+        yield stop, total
+
+        if any_anchor_critical or churn_lower_bound > cfg.thresholds.churn_critical:
+            break
+
+    partial = len(rows) < total
+
+    # The global frequency pass only makes sense over the full anchor set
+    neighbor_frequency = None
+    if not partial and b_parts:
+        neighbor_frequency = neighbor_frequency_drift(
+            np.concatenate(b_parts),
+            np.concatenate(c_parts),
+            list(vocab),
+            top_n=cfg.frequency_top_n,
+        )
+
+    overall = summarize_identity_metrics(rows, cfg, neighbor_frequency)
+    return _build_report(
+        cfg,
+        prepared.alignment,
+        overall,
+        anchor_metrics,
+        any_anchor_critical,
+        partial=partial,
+        latency=latency,
+        scores=scores,
+        graph=graph,
+        profile=profile,
+    )
+
+
+def _prepare_indexed_sample(
+    baseline: SnapshotIndex, candidate: SnapshotIndex, cfg: ComparisonConfig
+) -> tuple[PreparedComparison, int]:
+    """Sampled anchors in evaluation order, with lists read lazily; plus the population."""
+    alignment = align_anchors(baseline=baseline, candidate=candidate, sample_limit=25)
+    if cfg.require_exact_match and (
+        alignment.baseline_only_anchor_count or alignment.candidate_only_anchor_count
+    ):
+        raise ValueError("Anchor ID sets do not match and require_exact_match=True")
+
+    common = sorted(set(baseline) & set(candidate))
+    population = len(common)
+    budget = min(population, cfg.sample_budget or population)
+    ids = [common[i] for i in sample_order(population, cfg.sample_seed)[:budget].tolist()]
+    return (
+        PreparedComparison(
+            alignment, ids, IndexedLists(baseline, ids, cfg.k), IndexedLists(candidate, ids, cfg.k)
+        ),
+        population,
+    )
+
+
+def _sequential_steps(
+    baseline: Mapping[str, list[str]],
+    candidate: Mapping[str, list[str]],
+    cfg: ComparisonConfig,
+    latency: LatencySummary | None = None,
+    scores: ScoreSummary | None = None,
+    graph: GraphSummary | None = None,
+) -> _ComparisonSteps:
+    """
+    Evaluate anchors in seeded random order, one chunk at a time, and stop when the
+    churn verdict is statistically decided (or the anchor budget is spent).
+
+    After each chunk, churn and mean overlap get Hoeffding-Serfling bounds whose error
+    budget is split across looks, so `sample_confidence` holds for the whole run.
+    An observed CRITICAL anchor decides the verdict immediately, as in a full run;
+    isolated CRITICAL anchors outside the sample can be missed.
+
+    When both snapshots are `SnapshotIndex` views, only the sampled entries are read
+    and validated: anchors are aligned on the indexes' ID lists and each chunk's
+    lists are parsed from the files as it is evaluated.
+    """
+    if isinstance(baseline, SnapshotIndex) and isinstance(candidate, SnapshotIndex):
+        ordered, population = _prepare_indexed_sample(baseline, candidate, cfg)
+        budget = len(ordered.anchor_ids)
+    else:
+        prepared = prepare_comparison(baseline, candidate, cfg)
+        population = len(prepared.anchor_ids)
+        budget = min(population, cfg.sample_budget or population)
+        ordered = prepared.reordered(sample_order(population, cfg.sample_seed)[:budget].tolist())
+    yield 0, budget
+
+    profile = MetricsProfile() if cfg.profile else None
+    vocab: dict[str, int] = {}
+    id_lookup = VocabLookup(vocab)
+    rows: list[AnchorIdentityMetrics] = []
+    anchor_metrics: list[AnchorMetrics] = []
+    any_anchor_critical = False
+    churned = 0
+    overlap_sum = 0.0
+    churn_bounds = (0.0, 1.0)
+    overlap_bounds = (0.0, 1.0)
+    stopped_reason = "budget"
+
+    for look, start in enumerate(range(0, budget, cfg.chunk_size), start=1):
+        stop = min(budget, start + cfg.chunk_size)
+        chunk_rows, _, _ = compute_identity_chunk(
+            ordered, start, stop, cfg, vocab, profile, id_lookup
+        )
+        chunk_metrics, chunk_critical = _classify_rows(chunk_rows, cfg)
+
+        rows.extend(chunk_rows)
+        anchor_metrics.extend(chunk_metrics)
+        any_anchor_critical = any_anchor_critical or chunk_critical
+        churned += sum(1 for r in chunk_rows if r.overlap < cfg.thresholds.overlap_warning)
+        overlap_sum += sum(r.overlap for r in chunk_rows)
+
+        n = len(rows)
+        radius = serfling_radius(n, population, look_alpha(cfg.sample_confidence, look))
+        churn_bounds = bounded_interval(churned / float(n), radius)
+        overlap_bounds = bounded_interval(overlap_sum / float(n), radius)
+        yield stop, budget
+
+        if n == population:
+            stopped_reason = "exhausted"
+            break
+        if any_anchor_critical or decided_churn_level(*churn_bounds, cfg.thresholds) is not None:
+            stopped_reason = "decided"
+            break
+
+    sampling = SamplingSummary(
+        seed=cfg.sample_seed,
+        confidence=cfg.sample_confidence,
+        sample_size=len(rows),
+        population_size=population,
+        churn_lower=churn_bounds[0],
+        churn_upper=churn_bounds[1],
+        mean_overlap_lower=overlap_bounds[0],
+        mean_overlap_upper=overlap_bounds[1],
+        stopped_reason=stopped_reason,
+    )
+
+    # Report sampled anchors in the usual (sorted) order
+    anchor_metrics.sort(key=lambda m: m.anchor_id)
+    overall = summarize_identity_metrics(rows, cfg)
+    return _build_report(
+        cfg,
+        ordered.alignment,
+        overall,
+        anchor_metrics,
+        any_anchor_critical,
+        partial=len(rows) < population,
+        sampling=sampling,
+        latency=latency,
+        scores=scores,
+        graph=graph,
+        profile=profile,
+    )
+
+
+def _compare_weighted(
+    baseline: Mapping[str, list[str]],
+    candidate: Mapping[str, list[str]],
+    cfg: ComparisonConfig,
+    weights: AnchorWeights,
+    latency: LatencySummary | None = None,
+    scores: ScoreSummary | None = None,
+    graph: GraphSummary | None = None,
+) -> ComparisonReport:
+    """
+    Traffic-weighted comparison: overall mean overlap, displacement and churn weight
+    each anchor by its share of traffic, and the churn rule uses the weighted churn.
+
+    With `traffic_sampling`, only the head anchors (covering `traffic_head_share` of
+    the weight) and a weight-proportional sample of the tail are evaluated; the tail
+    enters the estimates through the Hansen-Hurwitz estimator, so they stay unbiased.
+    Anchor risk rules still apply to every evaluated anchor regardless of weight.
+    """
+    prepared = prepare_comparison(baseline, candidate, cfg)
+    aligned = align_weights(weights, prepared.anchor_ids)
+    population = len(prepared.anchor_ids)
+
+    if cfg.traffic_sampling:
+        head, draws = traffic_plan(
+            aligned, cfg.traffic_head_share, cfg.traffic_tail_samples, cfg.sample_seed
+        )
+    else:
+        head, draws = np.arange(population), np.empty(0, dtype=np.int64)
+
+    # Each sampled anchor is evaluated once, however often it was drawn
+    evaluated = np.union1d(head, draws)
+    profile = MetricsProfile() if cfg.profile else None
+    vocab: dict[str, int] = {}
+    rows, b_codes, c_codes = compute_identity_chunk(
+        prepared.reordered(evaluated.tolist()), 0, len(evaluated), cfg, vocab, profile
+    )
+    anchor_metrics, any_anchor_critical = _classify_rows(rows, cfg)
+
+    partial = len(evaluated) < population
+    neighbor_frequency = None
+    if not partial:
+        neighbor_frequency = neighbor_frequency_drift(
+            b_codes, c_codes, list(vocab), top_n=cfg.frequency_top_n
+        )
+    overall = summarize_identity_metrics(rows, cfg, neighbor_frequency)
+
+    # Per-anchor values laid out as the estimator expects: head rows, then one per draw
+    pick = np.searchsorted(evaluated, np.concatenate([head, draws]))
+    overlap = np.array([r.overlap for r in rows], dtype=np.float64)[pick]
+    disp = np.array(
+        [np.nan if r.rank_displacement is None else r.rank_displacement for r in rows],
+        dtype=np.float64,
+    )[pick]
+    defined = ~np.isnan(disp)
+    churned = overlap < cfg.thresholds.overlap_warning
+
+    head_weights = aligned[head]
+    total_weight = float(aligned.sum())
+    tail_weight = total_weight - float(head_weights.sum())
+
+    def estimate(values: np.ndarray) -> tuple[float, float]:
+        return weighted_total(values.astype(np.float64), head_weights, tail_weight)
+
+    # Ratio estimates: without tail draws they cover the head's weight only
+    weight, _ = estimate(np.ones(len(pick)))
+    overlap_total, overlap_se = estimate(overlap)
+    churn_total, churn_se = estimate(churned)
+    disp_total, _ = estimate(np.where(defined, disp, 0.0))
+    defined_total, _ = estimate(defined)
+
+    traffic = TrafficSummary(
+        total_weight=total_weight,
+        weighted_anchors=int(np.count_nonzero(aligned)),
+        mean_overlap=min(1.0, overlap_total / weight),
+        mean_displacement=disp_total / defined_total if defined_total > 0.0 else 0.0,
+        churn_rate=min(1.0, churn_total / weight),
+        mean_overlap_std_error=overlap_se / weight,
+        churn_std_error=churn_se / weight,
+        unweighted_mean_overlap=overall.overall_mean_overlap,
+        unweighted_churn_rate=overall.overall_churn_rate,
+        sampled=cfg.traffic_sampling,
+        head_anchors=len(head),
+        head_weight_share=min(1.0, float(head_weights.sum()) / total_weight),
+        tail_draws=len(draws),
+        tail_anchors_evaluated=len(evaluated) - len(head),
+    )
+    overall.overall_mean_overlap = traffic.mean_overlap
+    overall.overall_mean_displacement = traffic.mean_displacement
+    overall.overall_churn_rate = traffic.churn_rate
+
+    return _build_report(
+        cfg,
+        prepared.alignment,
+        overall,
+        anchor_metrics,
+        any_anchor_critical,
+        partial=partial,
+        traffic=traffic,
+        latency=latency,
+        scores=scores,
+        graph=graph,
+        profile=profile,
+    )
+
+
+def compare(
+    baseline: Mapping[str, list[str]],
+    candidate: Mapping[str, list[str]],
+    config: ComparisonConfig | None = None,
+    *,
+    noise_profile: NoiseProfile | None = None,
+    weights: AnchorWeights | None = None,
+    baseline_latency: Mapping[str, float] | None = None,
+    candidate_latency: Mapping[str, float] | None = None,
+    baseline_scores: SnapshotScores | None = None,
+    candidate_scores: SnapshotScores | None = None,
+) -> ComparisonReport:
+    """
+    Compare two snapshots and classify drift risk.
+
+    With a `noise_profile` (from `calibrate`), anchors whose drift is no worse than
+    what repeated runs of the unchanged system showed are reported as INFO and do not
+    count towards churn.
+
+    With per-anchor `weights` (e.g. query frequency; a mapping or a stream of pairs),
+    overall overlap, displacement and churn are traffic-weighted (`report.traffic`),
+    and `traffic_sampling` may evaluate only the heavy head plus a tail sample.
+
+    With per-anchor query latencies (ms) for both snapshots, `report.latency` carries
+    the p50/p95/p99 shift and worst per-anchor regressions, and the latency ratio
+    thresholds join the overall verdict.
+
+    With similarity scores for both snapshots (`SnapshotScores`, aligned to each
+    snapshot's neighbor lists), `report.scores` carries score drift of shared neighbors,
+    top-1/top-K score gaps and the score distribution shift; the gap ratio thresholds
+    catch score collapse.
+
+    With `graph_metrics` (anchors and neighbors share one ID space), `report.graph`
+    compares the two snapshots as k-NN graphs: mutual-neighbor rate, in-degree
+    distribution and connected components, with thresholds on the reciprocity ratio
+    and on baseline edges split across candidate components.
+    """
+    cfg = config or ComparisonConfig()
+    latency, scores, graph = _side_summaries(
+        baseline,
+        candidate,
+        cfg,
+        baseline_latency=baseline_latency,
+        candidate_latency=candidate_latency,
+        baseline_scores=baseline_scores,
+        candidate_scores=candidate_scores,
+    )
+    _check_modes(cfg, noise_profile=noise_profile, weights=weights)
+
+    if weights is not None:
+        return _compare_weighted(baseline, candidate, cfg, weights, latency, scores, graph)
+    if cfg.sequential_sampling:
+        return _run_steps(_sequential_steps(baseline, candidate, cfg, latency, scores, graph))
+    if cfg.fail_fast:
+        return _run_steps(_fail_fast_steps(baseline, candidate, cfg, latency, scores, graph))
+
+    profile = MetricsProfile() if cfg.profile else None
+    alignment, anchor_rows, overall = compute_identity_metrics(
+        baseline=baseline,
+        candidate=candidate,
+        config=cfg,
+        profile=profile,
+    )
+
+    anchor_metrics, any_anchor_critical = _classify_rows(anchor_rows, cfg)
+    if noise_profile is not None:
+        any_anchor_critical = _apply_noise_profile(anchor_metrics, overall, cfg, noise_profile)
+    return _build_report(
+        cfg,
+        alignment,
+        overall,
+        anchor_metrics,
+        any_anchor_critical,
+        latency=latency,
+        scores=scores,
+        graph=graph,
+        profile=profile,
+    )
+
+
+def _side_summaries(
+    baseline: Mapping[str, list[str]],
+    candidate: Mapping[str, list[str]],
+    cfg: ComparisonConfig,
+    *,
+    baseline_latency: Mapping[str, float] | None = None,
+    candidate_latency: Mapping[str, float] | None = None,
+    baseline_scores: SnapshotScores | None = None,
+    candidate_scores: SnapshotScores | None = None,
+) -> tuple[LatencySummary | None, ScoreSummary | None, GraphSummary | None]:
+    """The latency, score and graph sections `compare` adds next to the identity metrics."""
+    latency = None
+    if (baseline_latency is None) != (candidate_latency is None):
+        raise ValueError("baseline_latency and candidate_latency must be given together")
+    if baseline_latency is not None and candidate_latency is not None:
+        latency = latency_summary(
+            baseline_latency,
+            candidate_latency,
+            (a for a in baseline if a in candidate),
+            top_n=cfg.latency_top_n,
+        )
+
+    scores = None
+    if (baseline_scores is None) != (candidate_scores is None):
+        raise ValueError("baseline_scores and candidate_scores must be given together")
+    if baseline_scores is not None and candidate_scores is not None:
+        scores = score_summary(
+            baseline,
+            candidate,
+            baseline_scores,
+            candidate_scores,
+            [a for a in baseline if a in candidate],
+            cfg.k,
+        )
+
+    graph = None
+    if cfg.graph_metrics:
+        graph = graph_summary(*snapshot_graphs(baseline, candidate, cfg.k))
+    return latency, scores, graph
+
+
+def _check_modes(
+    cfg: ComparisonConfig,
+    *,
+    noise_profile: NoiseProfile | None = None,
+    weights: AnchorWeights | None = None,
+) -> None:
+    """Reject evaluation modes `compare` cannot combine."""
+    if noise_profile is not None and (cfg.sequential_sampling or cfg.fail_fast):
+        raise ValueError("noise_profile does not support fail_fast or sequential_sampling")
+    if cfg.traffic_sampling and weights is None:
+        raise ValueError("traffic_sampling requires per-anchor weights")
+    if weights is not None and (
+        noise_profile is not None or cfg.sequential_sampling or cfg.fail_fast
+    ):
+        raise ValueError("weights do not support noise_profile, fail_fast or sequential_sampling")
+
+
+def compare_arrays(
+    baseline: np.ndarray,
+    candidate: np.ndarray,
+    config: ComparisonConfig | None = None,
+    *,
+    anchor_ids: Sequence[str] | np.ndarray | None = None,
+    neighbor_ids: Sequence[str] | None = None,
+    noise_profile: NoiseProfile | None = None,
+    anchor_nodes: np.ndarray | None = None,
+) -> ComparisonReport:
+    """
+    Compare (n, width) integer neighbor matrices, e.g. the index arrays of ANN searches.
+
+    Row i of both matrices is anchor `anchor_ids[i]` (default: the row number). -1 marks
+    a missing result and may only trail a row; columns beyond K are ignored. Metrics
+    run on the arrays themselves, with no per-neighbor strings or lists. Only the few
+    neighbors the report names are turned into text: `neighbor_ids[index]` when given,
+    otherwise the index itself.
+
+    With `graph_metrics`, row i is node `anchor_nodes[i]` (default i, as when a corpus
+    is searched against itself) of the neighbors' index space.
+    """
+    cfg = config or ComparisonConfig()
+    if cfg.fail_fast or cfg.sequential_sampling:
+        raise ValueError("compare_arrays does not support fail_fast or sequential_sampling")
+
+    k = cfg.k
+    b = validate_neighbor_matrix(baseline, k, "baseline")
+    c = validate_neighbor_matrix(candidate, k, "candidate")
+    n = b.shape[0]
+    if c.shape[0] != n:
+        raise ValueError(
+            f"baseline and candidate must have one row per anchor, got {n} and {c.shape[0]}"
+        )
+    anchors = [str(i) for i in range(n)] if anchor_ids is None else list(map(str, anchor_ids))
+    if len(anchors) != n:
+        raise ValueError(f"anchor_ids has {len(anchors)} entries for {n} rows")
+    if len(set(anchors)) != n:
+        raise ValueError("anchor_ids must be unique")
+
+    graph = None
+    if cfg.graph_metrics:
+        graph = graph_summary(*matrix_graphs(b, c, anchor_nodes, anchor_nodes))
+
+    top = int(max(b.max(initial=-1), c.max(initial=-1)))
+    if neighbor_ids is not None and top >= len(neighbor_ids):
+        raise ValueError(f"neighbor index {top} is out of range for {len(neighbor_ids)} IDs")
+    if top < 2 * (b.size + c.size):
+        # Indices are dense enough to serve as codes directly (counting stays O(n * k))
+        labels = IndexLabels(top + 1, names=neighbor_ids)
+    else:
+        # Sparse labels (e.g. 64-bit IDs): compact to dense codes, PAD staying -1
+        indices, dense = np.unique(np.concatenate((b.ravel(), c.ravel())), return_inverse=True)
+        if indices.size and indices[0] == -1:
+            indices = indices[1:]
+            dense = dense - 1
+        b, c = dense.reshape(2, *b.shape)
+        labels = IndexLabels(len(indices), indices, names=neighbor_ids)
+
+    profile = MetricsProfile() if cfg.profile else None
+    if uses_sort_merge(cfg):
+        # Trailing padding keeps each row's results contiguous in row-major order
+        b, b_offsets = _flat_rows(b)
+        c, c_offsets = _flat_rows(c)
+        rows = identity_rows_from_flat_codes(
+            anchors, b, b_offsets, c, c_offsets, cfg, id_lookup=labels, profile=profile
+        )
+    else:
+        for side in (b, c):
+            duplicates = duplicate_matrix_rows(side)
+            if duplicates.size:
+                raise duplicate_neighbors_error(anchors[int(duplicates[0])], k)
+        rows = identity_rows_from_codes(anchors, b, c, cfg, labels, profile=profile)
+
+    anchor_metrics, any_anchor_critical = _classify_rows(rows, cfg)
+    neighbor_frequency = neighbor_frequency_drift(b, c, labels, top_n=cfg.frequency_top_n)
+    overall = summarize_identity_metrics(rows, cfg, neighbor_frequency)
+    if noise_profile is not None:
+        any_anchor_critical = _apply_noise_profile(anchor_metrics, overall, cfg, noise_profile)
+
+    alignment = AnchorAlignmentSummary(
+        total_baseline_anchors=n,
+        total_candidate_anchors=n,
+        compared_anchors=n,
+        anchor_jaccard=1.0,
+        baseline_only_anchor_count=0,
+        candidate_only_anchor_count=0,
+    )
+    return _build_report(
+        cfg, alignment, overall, anchor_metrics, any_anchor_critical, graph=graph, profile=profile
+    )
+
+
+def _flat_rows(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    present = matrix >= 0
+    offsets = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(present.sum(axis=1), out=offsets[1:])
+    return matrix[present].astype(np.int64, copy=False), offsets
+
+
+def compare_external(
+    baseline_path: str,
+    candidate_path: str,
+    config: ComparisonConfig | None = None,
+    *,
+    memory_limit: int,
+    tmp_dir: str | None = None,
+    anchor_metrics_limit: int | None = None,
+) -> ComparisonReport:
+    """
+    Compare snapshot files that may be unsorted and larger than RAM.
+
+    Same report as `compare()` on the loaded files (minus `neighbor_frequency`),
+    computed through sorted on-disk runs bounded by `memory_limit` bytes. Every anchor
+    is evaluated, but `anchor_metrics` lists only the `anchor_metrics_limit` worst ones
+    (most severe risk, then lowest overlap; default: as many as fit in an eighth of
+    `memory_limit`) in anchor order, and `anchors_evaluated` counts them all.
+    """
+    cfg = config or ComparisonConfig()
+    if cfg.fail_fast or cfg.sequential_sampling:
+        raise ValueError("external-memory mode does not support fail_fast or sequential_sampling")
+    if cfg.graph_metrics:
+        raise ValueError("external-memory mode does not support graph_metrics")
+
+    listed = ExternalBudget(memory_limit).listed_rows
+    if anchor_metrics_limit is not None:
+        if anchor_metrics_limit < 0:
+            raise ValueError("anchor_metrics_limit must be >= 0")
+        listed = anchor_metrics_limit
+
+    profile = MetricsProfile() if cfg.profile else None
+    worst: list[AnchorMetrics] = []
+    any_anchor_critical = False
+
+    def classify(rows: list[AnchorIdentityMetrics]) -> None:
+        # Only the worst `listed` classified rows outlive each chunk
+        nonlocal any_anchor_critical, worst
+        metrics, any_critical = _classify_rows(rows, cfg)
+        worst = heapq.nsmallest(listed, [*worst, *metrics], key=_listing_key)
+        any_anchor_critical = any_anchor_critical or any_critical
+
+    alignment, overall = compute_identity_metrics_external(
+        baseline_path,
+        candidate_path,
+        cfg,
+        memory_limit=memory_limit,
+        tmp_dir=tmp_dir,
+        profile=profile,
+        on_rows=classify,
+    )
+
+    worst.sort(key=attrgetter("anchor_id"))
+    return _build_report(
+        cfg,
+        alignment,
+        overall,
+        worst,
+        any_anchor_critical,
+        anchors_evaluated=alignment.compared_anchors,
+        profile=profile,
+    )
+
+
+def _listing_key(m: AnchorMetrics) -> tuple[int, float, str]:
+    return -_RISK_CODES.index(m.risk_level), m.overlap, m.anchor_id
+
+
+def _row_positions(rows: list[AnchorMetrics], anchor_ids: list[str]) -> list[int]:
+    """Positions of `anchor_ids` in `rows`, which a comparison lists in anchor_id order."""
+    positions = [bisect_left(rows, a, key=attrgetter("anchor_id")) for a in anchor_ids]
+    found = zip(positions, anchor_ids, strict=True)
+    if all(p < len(rows) and rows[p].anchor_id == a for p, a in found):
+        return positions
+    index = {m.anchor_id: i for i, m in enumerate(rows)}  # not sorted: one linear pass
+    return [index[a] for a in anchor_ids]
+
+
+def compare_delta(
+    reference: Mapping[str, list[str]],
+    delta: SnapshotDelta,
+    config: ComparisonConfig | None = None,
+    *,
+    reference_report: ComparisonReport | None = None,
+    reference_state: ReferenceState | None = None,
+) -> ComparisonReport:
+    """
+    Compare `reference` (baseline) against `reference + delta` (candidate) without
+    materializing the candidate snapshot.
+
+    Unchanged anchors reuse the per-anchor metrics of `reference_report` (the reference
+    compared with itself, e.g. loaded from a cache); only changed anchors are recomputed.
+    The overall aggregates are the reference's running aggregates (`reference_state`,
+    derived from the report when not given) adjusted for the changed and removed
+    anchors, so apart from copying the anchor list the work is proportional to the
+    delta, and only changed anchors are read from `reference`. Matches
+    `compare(reference, apply_delta(reference, delta))` apart from `neighbor_frequency`,
+    which needs a global pass and is left unset.
+    """
+    cfg = config or ComparisonConfig()
+    if cfg.fail_fast or cfg.sequential_sampling:
+        raise ValueError("delta comparison does not support fail_fast or sequential_sampling")
+    if cfg.graph_metrics:
+        raise ValueError("delta comparison does not support graph_metrics")
+
+    check_delta_applies(reference, delta)
+    if reference_report is None or reference_report.config != cfg:
+        reference_report = compare(reference, reference, cfg)
+        reference_state = None
+    if reference_state is None:
+        reference_state = ReferenceState.from_report(reference_report)
+
+    k = cfg.k
+    changed_ids = sorted(delta.changed)
+    if isinstance(reference, SnapshotIndex):
+        reference_lists = reference.get_many(changed_ids)
+    else:
+        reference_lists = [reference[a] for a in changed_ids]
+    profile = MetricsProfile() if cfg.profile else None
+    changed_rows, _, _ = compute_identity_rows(
+        changed_ids,
+        [neighbors[:k] for neighbors in reference_lists],
+        [validate_and_truncate_entry(a, delta.changed[a], k) for a in changed_ids],
+        cfg,
+        {},
+        profile,
+    )
+    changed_metrics, _ = _classify_rows(changed_rows, cfg)
+    for anchor_id, neighbors in delta.added.items():
+        validate_and_truncate_entry(anchor_id, neighbors, k)
+
+    if cfg.require_exact_match and (delta.added or delta.removed):
+        raise ValueError("Anchor ID sets do not match and require_exact_match=True")
+
+    removed = sorted(delta.removed)
+    rows = reference_report.anchor_metrics
+    changed_at = _row_positions(rows, changed_ids)
+    removed_at = _row_positions(rows, removed)
+    old_rows = [rows[i] for i in (*changed_at, *removed_at)]
+
+    # Slice copies of the unchanged stretches; no per-anchor Python work
+    updated = list(rows)
+    for i, metrics in zip(changed_at, changed_metrics, strict=True):
+        updated[i] = metrics
+    bounds = [-1, *sorted(removed_at), len(updated)]
+    anchor_metrics: list[AnchorMetrics] = []
+    for lo, hi in zip(bounds[:-1], bounds[1:], strict=True):
+        anchor_metrics.extend(updated[lo + 1 : hi])
+
+    def critical(metrics: list[AnchorMetrics]) -> int:
+        return sum(1 for m in metrics if m.risk_level == RiskLevel.CRITICAL)
+
+    critical_count = (
+        reference_state.critical_count - critical(old_rows) + critical(changed_metrics)
+    )
+
+    compared = len(reference) - len(removed)
+    union = len(reference) + len(delta.added)
+    alignment = AnchorAlignmentSummary(
+        total_baseline_anchors=len(reference),
+        total_candidate_anchors=compared + len(delta.added),
+        compared_anchors=compared,
+        anchor_jaccard=(compared / union) if union else 1.0,
+        baseline_only_anchor_count=len(removed),
+        candidate_only_anchor_count=len(delta.added),
+        baseline_only_anchor_sample=bounded_sample(removed, 25),
+        candidate_only_anchor_sample=bounded_sample(delta.added, 25),
+    )
+
+    if registered_metrics():
+        # Plugin aggregates are arbitrary functions of every value
+        overall = summarize_identity_metrics(anchor_metrics, cfg)
+    else:
+        aggregates = reference_state.aggregates.copy()
+        aggregates.remove(old_rows)
+        aggregates.add(changed_metrics)
+        overall = aggregates.summary()
+    return _build_report(
+        cfg, alignment, overall, anchor_metrics, critical_count > 0, profile=profile
+    )
+
+
+def compare_fingerprinted(
+    baseline_path: str,
+    candidate_path: str,
+    config: ComparisonConfig | None = None,
+    *,
+    sample_limit: int = 25,
+) -> ComparisonReport:
+    """
+    Compare snapshot files with every ID reduced to a 63-bit fingerprint at parse time.
+
+    Alignment is a sorted intersection of fingerprint arrays and all metrics run on
+    (n, k) fingerprint matrices, so ID strings are never held for the whole snapshot.
+    A second streaming pass recovers the original strings only for what the report
+    shows: alignment samples (smallest fingerprints), up to `sample_limit` worst
+    CRITICAL and WARNING anchors, and the top neighbor-frequency movers. Every other
+    anchor is labelled `fp:<hex>`. `report.fingerprint` carries the birthday-bound
+    collision probability over the distinct IDs seen.
+    """
+    cfg = config or ComparisonConfig()
+    if cfg.fail_fast or cfg.sequential_sampling:
+        raise ValueError("fingerprint mode does not support fail_fast or sequential_sampling")
+
+    k = cfg.k
+    b = fingerprint_entries(iter_snapshot_entries(baseline_path), k)
+    c = fingerprint_entries(iter_snapshot_entries(candidate_path), k)
+    graph = None
+    if cfg.graph_metrics:
+        # Anchors and neighbors hash alike, so fingerprints are the graph's node IDs
+        graph = graph_summary(*matrix_graphs(b.neighbors, c.neighbors, b.anchors, c.anchors))
+
+    common, b_idx, c_idx = np.intersect1d(
+        b.anchors, c.anchors, assume_unique=True, return_indices=True
+    )
+    b_only = np.setdiff1d(b.anchors, c.anchors, assume_unique=True)
+    c_only = np.setdiff1d(c.anchors, b.anchors, assume_unique=True)
+    if cfg.require_exact_match and (b_only.size or c_only.size):
+        raise ValueError("Anchor ID sets do not match and require_exact_match=True")
+
+    # Dense codes over the distinct neighbor fingerprints (shared by metrics, plugins
+    # and the frequency pass); PAD (-1) sorts first and is shifted back to -1
+    b_fps = b.neighbors[b_idx]
+    neighbor_fps, dense = np.unique(
+        np.concatenate((b_fps.ravel(), c.neighbors[c_idx].ravel())), return_inverse=True
+    )
+    dense = dense.reshape(2, *b_fps.shape)
+    if neighbor_fps.size and neighbor_fps[0] == -1:
+        neighbor_fps = neighbor_fps[1:]
+        dense = dense - 1
+    b_codes, c_codes = dense[0], dense[1]
+    labels = FingerprintLabels(neighbor_fps)
+
+    profile = MetricsProfile() if cfg.profile else None
+    rows = identity_rows_from_codes(
+        [fingerprint_label(int(fp)) for fp in common],
+        b_codes,
+        c_codes,
+        cfg,
+        labels,
+        profile=profile,
+    )
+    anchor_metrics, any_anchor_critical = _classify_rows(rows, cfg)
+
+    neighbor_frequency = neighbor_frequency_drift(
+        b_codes, c_codes, labels, top_n=cfg.frequency_top_n
+    )
+
+    distinct = np.unique(
+        np.concatenate((b.anchors, c.anchors, b.neighbors.ravel(), c.neighbors.ravel()))
+    )
+    distinct_ids = int(np.count_nonzero(distinct >= 0))
+
+    # Resolve the bounded set of IDs the report actually shows
+    b_sample = [int(fp) for fp in b_only[:sample_limit]]
+    c_sample = [int(fp) for fp in c_only[:sample_limit]]
+    at_risk: list[int] = []
+    for level in (RiskLevel.CRITICAL, RiskLevel.WARNING):
+        worst = sorted(
+            (i for i, m in enumerate(anchor_metrics) if m.risk_level == level),
+            key=lambda i: (anchor_metrics[i].overlap, i),
+        )
+        at_risk.extend(worst[:sample_limit])
+    movers = [*neighbor_frequency.top_risers, *neighbor_frequency.top_fallers]
+    wanted_anchors = {*b_sample, *c_sample, *(int(common[i]) for i in at_risk)}
+    wanted_neighbors = {label_fingerprint(m.neighbor_id) for m in movers}
+
+    names: dict[int, str] = {}
+    for path in (baseline_path, candidate_path):
+        names.update(
+            resolve_fingerprints(iter_snapshot_entries(path), wanted_anchors, wanted_neighbors, k)
+        )
+
+    def name(fp: int) -> str:
+        return names.get(fp, fingerprint_label(fp))
+
+    for i in at_risk:
+        anchor_metrics[i] = anchor_metrics[i].model_copy(
+            update={"anchor_id": name(int(common[i]))}
+        )
+    neighbor_frequency = neighbor_frequency.model_copy(
+        update={
+            key: [
+                m.model_copy(update={"neighbor_id": name(label_fingerprint(m.neighbor_id))})
+                for m in getattr(neighbor_frequency, key)
+            ]
+            for key in ("top_risers", "top_fallers")
+        }
+    )
+
+    union = len(common) + len(b_only) + len(c_only)
+    alignment = AnchorAlignmentSummary(
+        total_baseline_anchors=len(b.anchors),
+        total_candidate_anchors=len(c.anchors),
+        compared_anchors=len(common),
+        anchor_jaccard=(len(common) / union) if union else 1.0,
+        baseline_only_anchor_count=len(b_only),
+        candidate_only_anchor_count=len(c_only),
+        baseline_only_anchor_sample=sorted(name(fp) for fp in b_sample),
+        candidate_only_anchor_sample=sorted(name(fp) for fp in c_sample),
+    )
+
+    overall = summarize_identity_metrics(anchor_metrics, cfg, neighbor_frequency)
+    fingerprint = FingerprintSummary(
+        bits=FINGERPRINT_BITS,
+        distinct_ids=distinct_ids,
+        collision_probability=collision_probability(distinct_ids),
+    )
+    return _build_report(
+        cfg,
+        alignment,
+        overall,
+        anchor_metrics,
+        any_anchor_critical,
+        fingerprint=fingerprint,
+        graph=graph,
+        profile=profile,
+    )
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Mapping
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from .engine import IdentityAggregates
+from .io import dump_json, load_json
+from .models import (
+    ComparisonConfig,
+    ComparisonReport,
+    ReferenceCache,
+    RiskLevel,
+    SnapshotDelta,
+)
+
+
+def file_sha256(path: str) -> str:
+    """Content hash used to tie deltas and caches to one exact reference file."""
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def create_delta(
+    reference: Mapping[str, list[str]],
+    snapshot: Mapping[str, list[str]],
+    *,
+    reference_sha256: str | None = None,
+) -> SnapshotDelta:
+    """Record only the anchors whose neighbor list changed, plus added and removed anchors."""
+    return SnapshotDelta(
+        reference_sha256=reference_sha256,
+        reference_anchor_count=len(reference),
+        changed={
+            a: list(neighbors)
+            for a, neighbors in snapshot.items()
+            if a in reference and list(reference[a]) != list(neighbors)
+        },
+        added={a: list(neighbors) for a, neighbors in snapshot.items() if a not in reference},
+        removed=sorted(a for a in reference if a not in snapshot),
+    )
+
+
+def check_delta_applies(reference: Mapping[str, list[str]], delta: SnapshotDelta) -> None:
+    """Raise ValueError if `delta` cannot have been created against `reference`."""
+    if len(reference) != delta.reference_anchor_count:
+        raise ValueError(
+            "delta does not match reference: "
+            f"expected {delta.reference_anchor_count} anchors, got {len(reference)}"
+        )
+    missing = [a for a in (*delta.changed, *delta.removed) if a not in reference]
+    if missing:
+        raise ValueError(f"delta references anchors missing from reference: {missing[:5]!r}")
+    clashing = [a for a in delta.added if a in reference]
+    if clashing:
+        raise ValueError(f"delta adds anchors already in reference: {clashing[:5]!r}")
+
+
+def apply_delta(
+    reference: Mapping[str, list[str]], delta: SnapshotDelta
+) -> dict[str, list[str]]:
+    """Reconstruct the full snapshot described by `delta`."""
+    check_delta_applies(reference, delta)
+
+    removed = set(delta.removed)
+    out = {a: list(n) for a, n in reference.items() if a not in removed}
+    out.update(delta.changed)
+    out.update(delta.added)
+    return out
+
+
+def load_delta(path: str) -> SnapshotDelta:
+    return SnapshotDelta.model_validate(load_json(path))
+
+
+def dump_delta(path: str, delta: SnapshotDelta) -> None:
+    dump_json(path, delta.model_dump())
+
+
+class ReferenceState:
+    """
+    Running aggregates of a reference self-comparison. `compare_delta` adjusts them for
+    the anchors a delta touches instead of re-summarizing every anchor.
+    """
+
+    __slots__ = ("aggregates", "critical_count")
+
+    def __init__(self, aggregates: IdentityAggregates, critical_count: int) -> None:
+        self.aggregates = aggregates
+        self.critical_count = critical_count
+
+    @classmethod
+    def from_report(cls, report: ComparisonReport) -> ReferenceState:
+        aggregates = IdentityAggregates(report.config)
+        aggregates.add(report.anchor_metrics)
+        critical = sum(1 for m in report.anchor_metrics if m.risk_level == RiskLevel.CRITICAL)
+        return cls(aggregates, critical)
+
+    @classmethod
+    def from_cache(cls, cache: ReferenceCache) -> ReferenceState:
+        aggregates = IdentityAggregates.from_state(cache.report.config, cache.aggregates)
+        return cls(aggregates, cache.critical_count)
+
+
+def load_reference_cache(
+    path: str, reference_path: str, config: ComparisonConfig
+) -> ReferenceCache | None:
+    """
+    Load a cached reference self-comparison, or None if missing, stale or built with
+    another config. The reference is only re-hashed when its size or mtime changed.
+    """
+    if not Path(path).is_file():
+        return None
+    try:
+        cache = ReferenceCache.model_validate_json(Path(path).read_bytes())
+    except ValidationError:
+        return None  # written by an older version
+    stat = Path(reference_path).stat()
+    if (stat.st_size, stat.st_mtime_ns) != (cache.reference_size, cache.reference_mtime_ns):
+        if file_sha256(reference_path) != cache.reference_sha256:
+            return None
+    return cache if cache.report.config == config else None
+
+
+def dump_reference_cache(
+    path: str,
+    reference_path: str,
+    reference_sha256: str,
+    report: ComparisonReport,
+    state: ReferenceState,
+) -> None:
+    stat = Path(reference_path).stat()
+    cache = ReferenceCache(
+        reference_sha256=reference_sha256,
+        reference_size=stat.st_size,
+        reference_mtime_ns=stat.st_mtime_ns,
+        aggregates=state.aggregates.state(),
+        critical_count=state.critical_count,
+        report=report,
+    )
+    dump_json(path, cache.model_dump())
@@ -1,11 +1,45 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+import math
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import numpy as np
 
 from vector_guardrails.alignment import align_anchors
-from vector_guardrails.metrics import overlap_at_k, rank_displacement
-from vector_guardrails.models import AnchorAlignmentSummary, AnchorIdentityMetrics, ComparisonConfig
-from vector_guardrails.validation import validate_and_truncate_snapshot
+from vector_guardrails.frequency import neighbor_frequency_drift
+from vector_guardrails.interning import (
+    encode_neighbor_lists,
+    encode_neighbor_lists_flat,
+    flat_to_matrix,
+)
+from vector_guardrails.metrics import (
+    SortedRows,
+    flat_rows_equal,
+    overlap_displacement_batch,
+    rank_aware_metrics_batch,
+    sort_merge_metrics,
+    take_flat_rows,
+    unique_flat_row_pairs,
+    unique_row_pairs,
+)
+from vector_guardrails.models import (
+    AnchorAlignmentSummary,
+    AnchorIdentityMetrics,
+    AnchorMetrics,
+    ComparisonConfig,
+    MetricDistribution,
+    NeighborFrequencySummary,
+    ProfileSummary,
+)
+from vector_guardrails.plugins import (
+    MetricBatch,
+    registered_metrics,
+    run_metric_plugins,
+)
+from vector_guardrails.sketch import QuantileSketch
+from vector_guardrails.validation import duplicate_neighbors_error, validate_and_truncate_snapshot
 
 
 class IdentityMetricsSummary:
@@ -16,34 +50,294 @@ class IdentityMetricsSummary:
     It will be folded into ComparisonReport in later slices.
     """
 
-    __slots__ = ("overall_mean_overlap", "overall_mean_displacement", "overall_churn_rate")
+    __slots__ = (
+        "overall_mean_overlap",
+        "overall_mean_displacement",
+        "overall_churn_rate",
+        "overall_mean_rbo",
+        "overall_mean_kendall_tau",
+        "overall_mean_weighted_overlap",
+        "neighbor_frequency",
+        "overall_custom_metrics",
+        "overlap_distribution",
+        "displacement_distribution",
+    )
 
     def __init__(
         self,
         overall_mean_overlap: float,
         overall_mean_displacement: float,
         overall_churn_rate: float,
+        overall_mean_rbo: float | None = None,
+        overall_mean_kendall_tau: float | None = None,
+        overall_mean_weighted_overlap: float | None = None,
+        neighbor_frequency: NeighborFrequencySummary | None = None,
+        overall_custom_metrics: dict[str, float | None] | None = None,
+        overlap_distribution: MetricDistribution | None = None,
+        displacement_distribution: MetricDistribution | None = None,
     ) -> None:
         self.overall_mean_overlap = overall_mean_overlap
         self.overall_mean_displacement = overall_mean_displacement
         self.overall_churn_rate = overall_churn_rate
+        self.overall_mean_rbo = overall_mean_rbo
+        self.overall_mean_kendall_tau = overall_mean_kendall_tau
+        self.overall_mean_weighted_overlap = overall_mean_weighted_overlap
+        self.neighbor_frequency = neighbor_frequency
+        self.overall_custom_metrics = overall_custom_metrics or {}
+        self.overlap_distribution = overlap_distribution
+        self.displacement_distribution = displacement_distribution
 
 
-def compute_identity_metrics(
-    baseline: Mapping[str, list[str]],
-    candidate: Mapping[str, list[str]],
-    config: ComparisonConfig,
-) -> tuple[AnchorAlignmentSummary, list[AnchorIdentityMetrics], IdentityMetricsSummary]:
+class MetricsProfile:
+    """
+    Running totals of a comparison's metric work, for `ComparisonConfig.profile`:
+    anchors scored, distinct (baseline, candidate) list pairs actually computed, anchors
+    with identical lists, and time spent in the identity kernels.
     """
-    Slice 3: compute identity drift metrics (overlap + rank displacement).
 
-    - Validates + normalizes snapshots (truncates to K, de-dupes if your validator does that)
-    - Aligns anchors using lenient matching (intersection)
-    - Computes per-anchor identity metrics on the intersection
-    - Computes overall aggregates (mean overlap, mean displacement, churn vs overlap_warning)
+    __slots__ = ("anchors", "unique_pairs", "identical_pairs", "seconds")
+
+    def __init__(self) -> None:
+        self.anchors = 0
+        self.unique_pairs = 0
+        self.identical_pairs = 0
+        self.seconds = 0.0
+
+    def record(self, anchors: int, unique_pairs: int, identical_pairs: int, seconds: float) -> None:
+        self.anchors += anchors
+        self.unique_pairs += unique_pairs
+        self.identical_pairs += identical_pairs
+        self.seconds += seconds
+
+    def summary(self) -> ProfileSummary:
+        n = self.anchors
+        return ProfileSummary(
+            anchors=n,
+            unique_pairs=self.unique_pairs,
+            identical_pairs=self.identical_pairs,
+            dedup_hit_rate=(n - self.unique_pairs) / n if n else 0.0,
+            identical_pair_rate=self.identical_pairs / n if n else 0.0,
+            kernel_seconds=self.seconds,
+        )
+
+
+_RANK_FIELDS = ("rbo", "kendall_tau", "weighted_overlap")
+# Sums are kept in fixed point (value * 2**60, truncated) so they are exact integers:
+# adding and removing rows in any order gives bit-identical means
+_FIXED_POINT = 1 << 60
+
+
+def _fixed(value: float) -> int:
+    return int(value * _FIXED_POINT)
+
+
+class IdentityAggregates:
+    """
+    Running sums behind `IdentityMetricsSummary`, so rows can be summarized chunk by
+    chunk without being kept, and taken back out again (`remove`) when an anchor
+    changes: overlap / displacement sums and counts, the churn count, the rank-aware
+    metric sums, both quantile sketches and the plugin metric values (plugins may
+    aggregate arbitrarily, so those are kept as floats and cannot be removed).
+    """
+
+    __slots__ = (
+        "overlap_warning",
+        "count",
+        "overlap_sum",
+        "displacement_sum",
+        "displacement_count",
+        "churn_count",
+        "rank_sums",
+        "overlap_sketch",
+        "displacement_sketch",
+        "custom_values",
+    )
+
+    def __init__(self, config: ComparisonConfig) -> None:
+        self.overlap_warning = config.thresholds.overlap_warning
+        self.count = 0
+        self.overlap_sum = 0
+        self.displacement_sum = 0
+        self.displacement_count = 0
+        self.churn_count = 0
+        self.rank_sums = {name: [0, 0] for name in _RANK_FIELDS}
+        self.overlap_sketch = QuantileSketch.for_overlap(config.k)
+        self.displacement_sketch = QuantileSketch.for_displacement(config.k)
+        self.custom_values: dict[str, list[float | None]] = {
+            metric.name: [] for metric in registered_metrics()
+        }
+
+    def add(self, rows: Sequence[AnchorIdentityMetrics | AnchorMetrics]) -> None:
+        displacements = self._update(rows, 1)
+        self.overlap_sketch.add(self._overlaps(rows))
+        self.displacement_sketch.add(displacements)
+        for name, values in self.custom_values.items():
+            values.extend(r.custom_metrics.get(name) for r in rows)
+
+    def remove(self, rows: Sequence[AnchorIdentityMetrics | AnchorMetrics]) -> None:
+        """Take back rows previously added."""
+        if self.custom_values:
+            raise ValueError("aggregates of metric plugins cannot be updated incrementally")
+        displacements = self._update(rows, -1)
+        self.overlap_sketch.remove(self._overlaps(rows))
+        self.displacement_sketch.remove(displacements)
+
+    @staticmethod
+    def _overlaps(rows: Sequence[AnchorIdentityMetrics | AnchorMetrics]) -> np.ndarray:
+        return np.fromiter((r.overlap for r in rows), dtype=np.float64, count=len(rows))
+
+    def _update(
+        self, rows: Sequence[AnchorIdentityMetrics | AnchorMetrics], sign: int
+    ) -> np.ndarray:
+        displacements: list[float] = []
+        for r in rows:
+            self.count += sign
+            self.overlap_sum += sign * _fixed(r.overlap)
+            if r.rank_displacement is not None:
+                self.displacement_sum += sign * _fixed(r.rank_displacement)
+                self.displacement_count += sign
+                displacements.append(r.rank_displacement)
+            if r.overlap < self.overlap_warning:
+                self.churn_count += sign
+            for name, sums in self.rank_sums.items():
+                value = getattr(r, name)
+                if value is not None:
+                    sums[0] += sign * _fixed(value)
+                    sums[1] += sign
+        return np.array(displacements, dtype=np.float64)
+
+    def state(self) -> dict[str, Any]:
+        """JSON-serializable sums and sketch counts (plugin values are not included)."""
+        sketches = {
+            "overlap": self.overlap_sketch.counts,
+            "displacement": self.displacement_sketch.counts,
+        }
+        # Sparse [bin indexes, counts] per sketch
+        sparse = {
+            name: [np.flatnonzero(counts).tolist(), counts[counts > 0].tolist()]
+            for name, counts in sketches.items()
+        }
+        return {
+            "count": self.count,
+            "overlap_sum": self.overlap_sum,
+            "displacement_sum": self.displacement_sum,
+            "displacement_count": self.displacement_count,
+            "churn_count": self.churn_count,
+            "rank_sums": {name: list(sums) for name, sums in self.rank_sums.items()},
+            "sketches": sparse,
+        }
+
+    @classmethod
+    def from_state(cls, config: ComparisonConfig, state: Mapping[str, Any]) -> IdentityAggregates:
+        aggregates = cls(config)
+        aggregates.count = state["count"]
+        aggregates.overlap_sum = state["overlap_sum"]
+        aggregates.displacement_sum = state["displacement_sum"]
+        aggregates.displacement_count = state["displacement_count"]
+        aggregates.churn_count = state["churn_count"]
+        aggregates.rank_sums = {name: list(state["rank_sums"][name]) for name in _RANK_FIELDS}
+        for name, sketch in (
+            ("overlap", aggregates.overlap_sketch),
+            ("displacement", aggregates.displacement_sketch),
+        ):
+            index, counts = state["sketches"][name]
+            sketch.counts[np.asarray(index, dtype=np.int64)] = counts
+        return aggregates
+
+    def copy(self) -> IdentityAggregates:
+        other = IdentityAggregates.__new__(IdentityAggregates)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.rank_sums = {name: list(sums) for name, sums in self.rank_sums.items()}
+        other.overlap_sketch = self.overlap_sketch.copy()
+        other.displacement_sketch = self.displacement_sketch.copy()
+        other.custom_values = {name: list(v) for name, v in self.custom_values.items()}
+        return other
+
+    def summary(
+        self, neighbor_frequency: NeighborFrequencySummary | None = None
+    ) -> IdentityMetricsSummary:
+        n = self.count
+        # Integer true division is correctly rounded
+        rank_means = {
+            name: (total / (count * _FIXED_POINT)) if count else None
+            for name, (total, count) in self.rank_sums.items()
+        }
+        return IdentityMetricsSummary(
+            overall_mean_overlap=(self.overlap_sum / (n * _FIXED_POINT)) if n else 0.0,
+            overall_mean_displacement=(
+                self.displacement_sum / (self.displacement_count * _FIXED_POINT)
+                if self.displacement_count
+                else 0.0
+            ),
+            overall_churn_rate=(self.churn_count / float(n)) if n else 0.0,
+            overall_mean_rbo=rank_means["rbo"],
+            overall_mean_kendall_tau=rank_means["kendall_tau"],
+            overall_mean_weighted_overlap=rank_means["weighted_overlap"],
+            neighbor_frequency=neighbor_frequency,
+            overall_custom_metrics={
+                metric.name: metric.aggregate(
+                    np.array(self.custom_values.get(metric.name, []), dtype=np.float64)
+                )
+                for metric in registered_metrics()
+            },
+            overlap_distribution=self.overlap_sketch.to_distribution(),
+            displacement_distribution=self.displacement_sketch.to_distribution(),
+        )
+
+
+def _custom_rows(columns: dict[str, np.ndarray], n: int) -> list[dict[str, float | None]]:
+    """Per-row {plugin name: value} dicts from plugin columns (NaN -> None)."""
+    if not columns:
+        return [{} for _ in range(n)]
+    lists = {name: values.tolist() for name, values in columns.items()}
+    return [
+        {name: (None if math.isnan(v[i]) else v[i]) for name, v in lists.items()}
+        for i in range(n)
+    ]
+
+
+class PreparedComparison:
+    """
+    Validated, aligned inputs for a comparison run.
+
+    Holds the sorted anchor intersection and the truncated neighbor lists in the
+    same order, so metrics can be computed over any [start, stop) slice of anchors.
     """
+
+    __slots__ = ("alignment", "anchor_ids", "baseline_lists", "candidate_lists")
+
+    def __init__(
+        self,
+        alignment: AnchorAlignmentSummary,
+        anchor_ids: list[str],
+        baseline_lists: list[list[str]],
+        candidate_lists: list[list[str]],
+    ) -> None:
+        self.alignment = alignment
+        self.anchor_ids = anchor_ids
+        self.baseline_lists = baseline_lists
+        self.candidate_lists = candidate_lists
+
+    def reordered(self, order: Sequence[int]) -> PreparedComparison:
+        """Same comparison with anchors visited in `order` (positions into anchor_ids)."""
+        return PreparedComparison(
+            alignment=self.alignment,
+            anchor_ids=[self.anchor_ids[i] for i in order],
+            baseline_lists=[self.baseline_lists[i] for i in order],
+            candidate_lists=[self.candidate_lists[i] for i in order],
+        )
+
+
+def prepare_comparison(
+    baseline: Mapping[str, list[str]],
+    candidate: Mapping[str, list[str]],
+    config: ComparisonConfig,
+) -> PreparedComparison:
+    """Validate + truncate both snapshots, align anchors, and order the intersection."""
     k = config.k
 
+    # Every list is checked here, scored or not, whatever K and the evaluation mode
     baseline_norm = validate_and_truncate_snapshot(baseline, k=k)
     candidate_norm = validate_and_truncate_snapshot(candidate, k=k)
 
@@ -59,42 +353,294 @@ def compute_identity_metrics(
 
     anchors_to_compare = sorted(set(baseline_norm) & set(candidate_norm))
 
-    rows: list[AnchorIdentityMetrics] = []
-    for anchor_id in anchors_to_compare:
-        b_list = baseline_norm.get(anchor_id, [])[:k]
-        c_list = candidate_norm.get(anchor_id, [])[:k]
-
-        b_set = set(b_list)
-        c_set = set(c_list)
-        shared = b_set & c_set
-
-        rows.append(
-            AnchorIdentityMetrics(
-                anchor_id=anchor_id,
-                overlap=overlap_at_k(b_list, c_list, k=k),
-                rank_displacement=rank_displacement(b_list, c_list, k=k),
-                shared_count=len(shared),
-                baseline_only_count=len(b_set - c_set),
-                candidate_only_count=len(c_set - b_set),
+    return PreparedComparison(
+        alignment=alignment,
+        anchor_ids=anchors_to_compare,
+        baseline_lists=[baseline_norm.get(a, [])[:k] for a in anchors_to_compare],
+        candidate_lists=[candidate_norm.get(a, [])[:k] for a in anchors_to_compare],
+    )
+
+
+def compute_identity_chunk(
+    prepared: PreparedComparison,
+    start: int,
+    stop: int,
+    config: ComparisonConfig,
+    vocab: dict[str, int],
+    profile: MetricsProfile | None = None,
+    id_lookup: Sequence[str] | None = None,
+) -> tuple[list[AnchorIdentityMetrics], np.ndarray, np.ndarray]:
+    """
+    Compute per-anchor identity metrics for anchors [start, stop).
+
+    Returns the rows plus the interned baseline/candidate top-K matrices (codes from
+    `vocab`, shared across chunks) so callers can run global passes over them. Pass
+    the same `id_lookup` (a `VocabLookup` over `vocab`) for every chunk.
+    """
+    return compute_identity_rows(
+        prepared.anchor_ids[start:stop],
+        prepared.baseline_lists[start:stop],
+        prepared.candidate_lists[start:stop],
+        config,
+        vocab,
+        profile,
+        id_lookup,
+    )
+
+
+def uses_sort_merge(config: ComparisonConfig) -> bool:
+    """Whether the engine runs the sort-merge kernels (K above `large_k_threshold`)."""
+    return config.k > config.large_k_threshold
+
+
+def compute_identity_rows(
+    anchor_ids: Sequence[str],
+    b_lists: Sequence[list[str]],
+    c_lists: Sequence[list[str]],
+    config: ComparisonConfig,
+    vocab: dict[str, int],
+    profile: MetricsProfile | None = None,
+    id_lookup: Sequence[str] | None = None,
+) -> tuple[list[AnchorIdentityMetrics], np.ndarray, np.ndarray]:
+    """
+    Per-anchor identity metrics for aligned, already-truncated neighbor lists.
+
+    Above `large_k_threshold` the returned codes are flat (padding-free) arrays rather
+    than (n, k) matrices; the frequency pass accepts either.
+    """
+    if uses_sort_merge(config):
+        return _identity_rows_sort_merge(
+            anchor_ids, b_lists, c_lists, config, vocab, profile, id_lookup
+        )
+
+    k = config.k
+    b_codes = encode_neighbor_lists(b_lists, k, vocab)
+    c_codes = encode_neighbor_lists(c_lists, k, vocab)
+    rows = identity_rows_from_codes(
+        anchor_ids, b_codes, c_codes, config, vocab=vocab, id_lookup=id_lookup, profile=profile
+    )
+    return rows, b_codes, c_codes
+
+
+def _identity_rows_sort_merge(
+    anchor_ids: Sequence[str],
+    b_lists: Sequence[list[str]],
+    c_lists: Sequence[list[str]],
+    config: ComparisonConfig,
+    vocab: dict[str, int],
+    profile: MetricsProfile | None = None,
+    id_lookup: Sequence[str] | None = None,
+) -> tuple[list[AnchorIdentityMetrics], np.ndarray, np.ndarray]:
+    """Large-K path: flat codes, one sort per side, metrics from merged rank pairs."""
+    k = config.k
+    b_codes, b_offsets = encode_neighbor_lists_flat(b_lists, k, vocab)
+    c_codes, c_offsets = encode_neighbor_lists_flat(c_lists, k, vocab)
+    rows = identity_rows_from_flat_codes(
+        anchor_ids,
+        b_codes,
+        b_offsets,
+        c_codes,
+        c_offsets,
+        config,
+        vocab=vocab,
+        id_lookup=id_lookup,
+        profile=profile,
+    )
+    return rows, b_codes, c_codes
+
+
+def identity_rows_from_flat_codes(
+    anchor_ids: Sequence[str],
+    b_codes: np.ndarray,
+    b_offsets: np.ndarray,
+    c_codes: np.ndarray,
+    c_offsets: np.ndarray,
+    config: ComparisonConfig,
+    *,
+    vocab: dict[str, int] | None = None,
+    id_lookup: Sequence[str] | None = None,
+    profile: MetricsProfile | None = None,
+) -> list[AnchorIdentityMetrics]:
+    """
+    Sort-merge counterpart of `identity_rows_from_codes`: per-anchor identity metrics
+    from flat, padding-free codes with (n + 1) row offsets (row i is
+    `codes[offsets[i]:offsets[i + 1]]`). Duplicate codes within a row raise.
+    """
+    k = config.k
+    started = time.perf_counter()
+    first, inverse = unique_flat_row_pairs(b_codes, b_offsets, c_codes, c_offsets)
+    b_sorted = SortedRows(*take_flat_rows(b_codes, b_offsets, first))
+    c_sorted = SortedRows(*take_flat_rows(c_codes, c_offsets, first))
+
+    for side in (b_sorted, c_sorted):
+        duplicates = side.duplicate_rows()
+        if duplicates.size:
+            raise duplicate_neighbors_error(anchor_ids[int(first[duplicates[0]])], k)
+
+    columns = sort_merge_metrics(b_sorted, c_sorted, k, p=config.rbo_p)
+    shared, disp, rbo, tau, wov = (column[inverse] for column in columns)
+    if profile is not None:
+        identical = flat_rows_equal(b_codes, b_offsets, first, c_codes, c_offsets, first)
+        profile.record(
+            len(inverse),
+            len(first),
+            int(np.count_nonzero(identical[inverse])),
+            time.perf_counter() - started,
+        )
+
+    # Plugins get the documented (n, k) matrices; only built when any are registered
+    custom: dict[str, np.ndarray] = {}
+    if registered_metrics():
+        custom = run_metric_plugins(
+            MetricBatch(
+                anchor_ids,
+                flat_to_matrix(b_codes, b_offsets, k),
+                flat_to_matrix(c_codes, c_offsets, k),
+                vocab=vocab,
+                id_lookup=id_lookup,
             )
         )
 
-    if rows:
-        mean_overlap = sum(r.overlap for r in rows) / float(len(rows))
-        disps = [r.rank_displacement for r in rows if r.rank_displacement is not None]
-        mean_disp = (sum(disps) / float(len(disps))) if disps else 0.0
-        churn = sum(1 for r in rows if r.overlap < config.thresholds.overlap_warning) / float(
-            len(rows)
+    return _rows_from_columns(
+        anchor_ids,
+        k,
+        shared,
+        disp,
+        rbo,
+        tau,
+        wov,
+        np.diff(b_offsets),
+        np.diff(c_offsets),
+        _custom_rows(custom, len(anchor_ids)),
+    )
+
+
+def _rows_from_columns(
+    anchor_ids: Sequence[str],
+    k: int,
+    shared: np.ndarray,
+    disp: np.ndarray,
+    rbo: np.ndarray,
+    tau: np.ndarray,
+    wov: np.ndarray,
+    b_len: np.ndarray,
+    c_len: np.ndarray,
+    custom: list[dict[str, float | None]],
+) -> list[AnchorIdentityMetrics]:
+    return [
+        AnchorIdentityMetrics(
+            anchor_id=anchor_id,
+            overlap=int(shared[i]) / float(k),
+            rank_displacement=None if math.isnan(disp[i]) else float(disp[i]),
+            shared_count=int(shared[i]),
+            baseline_only_count=int(b_len[i] - shared[i]),
+            candidate_only_count=int(c_len[i] - shared[i]),
+            rbo=float(rbo[i]),
+            kendall_tau=None if math.isnan(tau[i]) else float(tau[i]),
+            weighted_overlap=float(wov[i]),
+            custom_metrics=custom[i],
         )
-    else:
-        mean_overlap = 0.0
-        mean_disp = 0.0
-        churn = 0.0
-
-    overall = IdentityMetricsSummary(
-        overall_mean_overlap=mean_overlap,
-        overall_mean_displacement=mean_disp,
-        overall_churn_rate=churn,
+        for i, anchor_id in enumerate(anchor_ids)
+    ]
+
+
+def identity_rows_from_codes(
+    anchor_ids: Sequence[str],
+    b_codes: np.ndarray,
+    c_codes: np.ndarray,
+    config: ComparisonConfig,
+    id_lookup: Sequence[str] | None = None,
+    *,
+    vocab: dict[str, int] | None = None,
+    profile: MetricsProfile | None = None,
+) -> list[AnchorIdentityMetrics]:
+    """
+    Per-anchor identity metrics straight from aligned (n, k) code matrices (PAD = -1).
+
+    Any code space works as long as both matrices share it (interned IDs or
+    fingerprints); rows must already be duplicate-free, as validation guarantees.
+    Metrics are computed once per distinct (baseline, candidate) row pair; identical
+    rows share every neighbor at the same rank, so they skip the matching kernel.
+    """
+    started = time.perf_counter()
+    first, inverse = unique_row_pairs(b_codes, c_codes)
+    b, c = b_codes[first], c_codes[first]
+    identical = (b == c).all(axis=1)
+    differ = ~identical
+
+    shared = (b >= 0).sum(axis=1)
+    disp = np.where(shared > 0, 0.0, np.nan)
+    shared[differ], disp[differ] = overlap_displacement_batch(b[differ], c[differ])
+    rbo, tau, wov = rank_aware_metrics_batch(b, c, p=config.rbo_p)
+    shared, disp, rbo, tau, wov = (column[inverse] for column in (shared, disp, rbo, tau, wov))
+    if profile is not None:
+        profile.record(
+            len(inverse),
+            len(first),
+            int(np.count_nonzero(identical[inverse])),
+            time.perf_counter() - started,
+        )
+
+    custom = _custom_rows(
+        run_metric_plugins(
+            MetricBatch(anchor_ids, b_codes, c_codes, vocab=vocab, id_lookup=id_lookup)
+        ),
+        len(anchor_ids),
+    )
+    return _rows_from_columns(
+        anchor_ids,
+        config.k,
+        shared,
+        disp,
+        rbo,
+        tau,
+        wov,
+        (b_codes >= 0).sum(axis=1),
+        (c_codes >= 0).sum(axis=1),
+        custom,
+    )
+
+
+def summarize_identity_metrics(
+    rows: Sequence[AnchorIdentityMetrics | AnchorMetrics],
+    config: ComparisonConfig,
+    neighbor_frequency: NeighborFrequencySummary | None = None,
+) -> IdentityMetricsSummary:
+    """
+    Overall aggregates (mean overlap, mean displacement, churn vs overlap_warning) and
+    the overlap / displacement distributions.
+    """
+    aggregates = IdentityAggregates(config)
+    aggregates.add(rows)
+    return aggregates.summary(neighbor_frequency)
+
+
+def compute_identity_metrics(
+    baseline: Mapping[str, list[str]],
+    candidate: Mapping[str, list[str]],
+    config: ComparisonConfig,
+    profile: MetricsProfile | None = None,
+) -> tuple[AnchorAlignmentSummary, list[AnchorIdentityMetrics], IdentityMetricsSummary]:
+    """
+    Slice 3: compute identity drift metrics (overlap + rank displacement).
+    Rank-aware metrics (RBO, Kendall tau, weighted overlap) are computed in batch.
+
+    - Validates + normalizes snapshots (truncates to K, de-dupes if your validator does that)
+    - Aligns anchors using lenient matching (intersection)
+    - Computes per-anchor identity metrics on the intersection
+    - Computes overall aggregates (mean overlap, mean displacement, churn vs overlap_warning)
+    """
+    prepared = prepare_comparison(baseline, candidate, config)
+
+    vocab: dict[str, int] = {}
+    rows, b_codes, c_codes = compute_identity_chunk(
+        prepared, 0, len(prepared.anchor_ids), config, vocab, profile
+    )
+
+    # Global pass over the same interned matrices (hubness / catalog coverage)
+    neighbor_frequency = neighbor_frequency_drift(
+        b_codes, c_codes, list(vocab), top_n=config.frequency_top_n
     )
 
-    return alignment, rows, overall
+    overall = summarize_identity_metrics(rows, config, neighbor_frequency)
+    return prepared.alignment, rows, overall
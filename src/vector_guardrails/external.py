@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import heapq
+import json
+import sys
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from .engine import (
+    IdentityAggregates,
+    IdentityMetricsSummary,
+    MetricsProfile,
+    compute_identity_rows,
+)
+from .io import iter_snapshot_entries
+from .models import AnchorAlignmentSummary, AnchorIdentityMetrics, ComparisonConfig
+from .validation import validate_and_truncate_entry
+
+# Never spill runs smaller than this (keeps the run count sane); limits too small to
+# hold such a run next to everything else are rejected rather than exceeded
+_MIN_RUN_BYTES = 1 << 20
+# Most runs merged at once; more runs are first merged into intermediate runs
+_MERGE_FAN_IN = 64
+# Rough footprint of one open run while merging (file and decoder buffers, one record)
+_OPEN_RUN_BYTES = 1 << 14
+# Rough footprint of one compared anchor's metrics row plus its classified copy
+_ROW_BYTES = 2048
+
+
+class ExternalBudget:
+    """
+    How `memory_limit` bytes are split between the phases of an external comparison.
+
+    Spilling holds one run buffer (1/4) and the parser's read chunk (1/16, held up to
+    about three times while refilling). Merging holds `fan_in` open runs per side (1/8
+    each). Scoring holds one chunk of anchors (1/8) and the anchors listed in the
+    report (1/8, `listed_rows`).
+    """
+
+    __slots__ = ("run_bytes", "parse_bytes", "fan_in", "chunk_bytes", "listed_rows")
+
+    def __init__(self, memory_limit: int) -> None:
+        floor = 4 * _MIN_RUN_BYTES
+        if memory_limit < floor:
+            raise ValueError(f"memory_limit must be >= {floor} bytes, got: {memory_limit}")
+        self.run_bytes = memory_limit // 4
+        self.parse_bytes = memory_limit // 16
+        self.fan_in = max(2, min(_MERGE_FAN_IN, memory_limit // 8 // _OPEN_RUN_BYTES))
+        self.chunk_bytes = memory_limit // 8
+        self.listed_rows = max(1, memory_limit // 8 // _ROW_BYTES)
+
+
+def _entry_bytes(anchor_id: str, neighbors: list[str]) -> int:
+    """Rough in-memory footprint of one buffered entry (overestimates shared strings)."""
+    return (
+        sys.getsizeof(anchor_id)
+        + sys.getsizeof(neighbors)
+        + sum(sys.getsizeof(n) for n in neighbors)
+        + 64  # tuple + sort key overhead
+    )
+
+
+def _write_run(buffer: list[tuple[str, int, list[str]]], tmp_dir: Path, index: int) -> Path:
+    buffer.sort(key=lambda rec: (rec[0], rec[1]))
+    path = tmp_dir / f"run-{index:05d}.ndjson"
+    with path.open("w", encoding="utf-8") as f:
+        for record in buffer:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+    return path
+
+
+def spill_sorted_runs(
+    entries: Iterable[tuple[Any, Any]],
+    k: int,
+    run_bytes: int,
+    tmp_dir: Path,
+    prefix: str,
+) -> list[Path]:
+    """
+    Validate + truncate entries, buffer up to `run_bytes`, and spill each buffer as an
+    anchor-sorted NDJSON run of [anchor_id, file_position, neighbors] records.
+    """
+    run_dir = tmp_dir / prefix
+    run_dir.mkdir(parents=True, exist_ok=True)
+
+    runs: list[Path] = []
+    buffer: list[tuple[str, int, list[str]]] = []
+    buffered = 0
+
+    for position, (anchor_id, neighbors) in enumerate(entries):
+        topk = validate_and_truncate_entry(anchor_id, neighbors, k)
+        buffer.append((anchor_id, position, topk))
+        buffered += _entry_bytes(anchor_id, topk)
+        if buffered >= run_bytes:
+            runs.append(_write_run(buffer, run_dir, len(runs)))
+            buffer = []
+            buffered = 0
+
+    if buffer or not runs:
+        runs.append(_write_run(buffer, run_dir, len(runs)))
+    return runs
+
+
+def _read_run(path: Path) -> Iterator[tuple[str, int, list[str]]]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            anchor_id, position, neighbors = json.loads(line)
+            yield anchor_id, position, neighbors
+
+
+def _merge_records(runs: list[Path]) -> Iterator[tuple[str, int, list[str]]]:
+    return heapq.merge(*(_read_run(p) for p in runs), key=lambda rec: (rec[0], rec[1]))
+
+
+def reduce_runs(runs: list[Path], fan_in: int = _MERGE_FAN_IN) -> list[Path]:
+    """
+    Merge groups of `fan_in` runs into intermediate runs (next to the inputs, which are
+    deleted) until at most `fan_in` are left, so a final merge never holds more than
+    `fan_in` open files and read buffers.
+    """
+    if fan_in < 2:
+        raise ValueError("fan_in must be >= 2")
+    level = 0
+    while len(runs) > fan_in:
+        merged: list[Path] = []
+        for start in range(0, len(runs), fan_in):
+            group = runs[start : start + fan_in]
+            path = group[0].parent / f"merge-{level:02d}-{len(merged):05d}.ndjson"
+            with path.open("w", encoding="utf-8") as f:
+                for record in _merge_records(group):
+                    f.write(json.dumps(record, ensure_ascii=False))
+                    f.write("\n")
+            for run in group:
+                run.unlink()
+            merged.append(path)
+        runs = merged
+        level += 1
+    return runs
+
+
+def iter_merged_runs(
+    runs: list[Path], fan_in: int = _MERGE_FAN_IN
+) -> Iterator[tuple[str, list[str]]]:
+    """
+    K-way merge of sorted runs into (anchor_id, neighbors) in anchor order, at most
+    `fan_in` runs at a time (see `reduce_runs`).
+
+    Duplicate anchor IDs keep the last occurrence in the file, like `json.load`.
+    """
+    pending: tuple[str, int, list[str]] | None = None
+    for record in _merge_records(reduce_runs(runs, fan_in)):
+        if pending is not None and pending[0] != record[0]:
+            yield pending[0], pending[2]
+        pending = record
+    if pending is not None:
+        yield pending[0], pending[2]
+
+
+def _merge_join(
+    baseline: Iterator[tuple[str, list[str]]],
+    candidate: Iterator[tuple[str, list[str]]],
+) -> Iterator[tuple[str, list[str] | None, list[str] | None]]:
+    """Full outer join of two anchor-sorted streams."""
+    sentinel = (None, None)
+    b = next(baseline, sentinel)
+    c = next(candidate, sentinel)
+    while b is not sentinel or c is not sentinel:
+        if c is sentinel or (b is not sentinel and b[0] < c[0]):
+            yield b[0], b[1], None
+            b = next(baseline, sentinel)
+        elif b is sentinel or c[0] < b[0]:
+            yield c[0], None, c[1]
+            c = next(candidate, sentinel)
+        else:
+            yield b[0], b[1], c[1]
+            b = next(baseline, sentinel)
+            c = next(candidate, sentinel)
+
+
+def compute_identity_metrics_external(
+    baseline_path: str,
+    candidate_path: str,
+    config: ComparisonConfig,
+    *,
+    memory_limit: int,
+    tmp_dir: str | None = None,
+    sample_limit: int = 25,
+    profile: MetricsProfile | None = None,
+    on_rows: Callable[[list[AnchorIdentityMetrics]], None] | None = None,
+) -> tuple[AnchorAlignmentSummary, IdentityMetricsSummary]:
+    """
+    External-memory equivalent of `compute_identity_metrics` for snapshot files.
+
+    Snapshots may be unsorted and larger than RAM: entries are streamed, validated,
+    spilled into sorted on-disk runs, merged by anchor_id and merge-joined, with every
+    buffer sized by `ExternalBudget` so the working memory stays under `memory_limit`.
+    Per-anchor rows are computed one chunk at a time (at most `config.chunk_size`
+    anchors, fewer if they would not fit the budget), folded into running aggregates
+    and handed to `on_rows` (in anchor order) rather than kept.
+    Alignment, samples, rows and aggregates match the in-memory path exactly; the
+    neighbor-frequency pass needs a global ID index and is skipped (None).
+    """
+    budget = ExternalBudget(memory_limit)
+
+    with tempfile.TemporaryDirectory(prefix="vg-external-", dir=tmp_dir) as work:
+        work_dir = Path(work)
+        b_runs, c_runs = (
+            spill_sorted_runs(
+                iter_snapshot_entries(path, chunk_size=budget.parse_bytes),
+                config.k,
+                budget.run_bytes,
+                work_dir,
+                prefix,
+            )
+            for path, prefix in ((baseline_path, "baseline"), (candidate_path, "candidate"))
+        )
+
+        baseline_only_sample: list[str] = []
+        candidate_only_sample: list[str] = []
+        baseline_only = candidate_only = compared = 0
+
+        aggregates = IdentityAggregates(config)
+        chunk_ids: list[str] = []
+        chunk_b: list[list[str]] = []
+        chunk_c: list[list[str]] = []
+        chunk_bytes = 0
+
+        def flush() -> None:
+            nonlocal chunk_bytes
+            # Codes only need to agree within a chunk, so each chunk gets a fresh vocab
+            chunk_rows, _, _ = compute_identity_rows(
+                chunk_ids, chunk_b, chunk_c, config, {}, profile
+            )
+            aggregates.add(chunk_rows)
+            if on_rows is not None:
+                on_rows(chunk_rows)
+            chunk_ids.clear()
+            chunk_b.clear()
+            chunk_c.clear()
+            chunk_bytes = 0
+
+        for anchor_id, b_list, c_list in _merge_join(
+            iter_merged_runs(b_runs, budget.fan_in), iter_merged_runs(c_runs, budget.fan_in)
+        ):
+            if c_list is None:
+                baseline_only += 1
+                if len(baseline_only_sample) < sample_limit:
+                    baseline_only_sample.append(anchor_id)
+            elif b_list is None:
+                candidate_only += 1
+                if len(candidate_only_sample) < sample_limit:
+                    candidate_only_sample.append(anchor_id)
+            else:
+                compared += 1
+                chunk_ids.append(anchor_id)
+                chunk_b.append(b_list)
+                chunk_c.append(c_list)
+                chunk_bytes += (
+                    _ROW_BYTES + _entry_bytes(anchor_id, b_list) + _entry_bytes(anchor_id, c_list)
+                )
+                if len(chunk_ids) >= config.chunk_size or chunk_bytes >= budget.chunk_bytes:
+                    flush()
+
+        if chunk_ids:
+            flush()
+
+    if config.require_exact_match and (baseline_only or candidate_only):
+        raise ValueError("Anchor ID sets do not match and require_exact_match=True")
+
+    union = compared + baseline_only + candidate_only
+    alignment = AnchorAlignmentSummary(
+        total_baseline_anchors=compared + baseline_only,
+        total_candidate_anchors=compared + candidate_only,
+        compared_anchors=compared,
+        anchor_jaccard=(compared / union) if union else 1.0,
+        baseline_only_anchor_count=baseline_only,
+        candidate_only_anchor_count=candidate_only,
+        baseline_only_anchor_sample=baseline_only_sample,
+        candidate_only_anchor_sample=candidate_only_sample,
+    )
+
+    return alignment, aggregates.summary()
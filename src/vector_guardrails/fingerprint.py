@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import math
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+import numpy as np
+
+from .interning import PAD
+from .validation import validate_and_truncate_entry
+
+# Fingerprints are the top 63 bits of a 64-bit BLAKE2b digest: they fit int64 and stay
+# non-negative, so fingerprinted matrices share the PAD = -1 convention of interned ones.
+FINGERPRINT_BITS = 63
+
+
+def fingerprint(value: str) -> int:
+    """Process-independent 63-bit fingerprint of an ID string."""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") >> 1
+
+
+def fingerprint_label(fp: int) -> str:
+    """Display form for an ID whose original string was not retained."""
+    return f"fp:{fp:016x}"
+
+
+def label_fingerprint(label: str) -> int:
+    """Inverse of `fingerprint_label`."""
+    return int(label.removeprefix("fp:"), 16)
+
+
+def collision_probability(distinct_ids: int, bits: int = FINGERPRINT_BITS) -> float:
+    """Birthday bound: chance that any two of `distinct_ids` IDs share a fingerprint."""
+    pairs = distinct_ids * (distinct_ids - 1) / 2.0
+    return -math.expm1(-pairs / 2.0**bits)
+
+
+class FingerprintedSnapshot:
+    """
+    A validated snapshot held as fingerprints only.
+
+    `anchors` is sorted and unique (the last duplicate in the input wins, like
+    `json.load`); `neighbors[i]` is the (k,) top-K row of `anchors[i]`, PAD-filled.
+    """
+
+    __slots__ = ("anchors", "neighbors")
+
+    def __init__(self, anchors: np.ndarray, neighbors: np.ndarray) -> None:
+        self.anchors = anchors
+        self.neighbors = neighbors
+
+
+def fingerprint_entries(entries: Iterable[tuple[Any, Any]], k: int) -> FingerprintedSnapshot:
+    """Validate + truncate streamed entries, keeping only their 63-bit fingerprints."""
+    if k < 1:
+        raise ValueError("k must be >= 1")
+
+    anchors = array("q")
+    neighbors = array("q")
+    padding = [PAD] * k
+    for anchor_id, raw in entries:
+        topk = validate_and_truncate_entry(anchor_id, raw, k)
+        anchors.append(fingerprint(anchor_id))
+        neighbors.extend([fingerprint(n) for n in topk])
+        neighbors.extend(padding[len(topk) :])
+
+    a = np.frombuffer(anchors, dtype=np.int64)
+    m = np.frombuffer(neighbors, dtype=np.int64).reshape(len(a), k)
+
+    order = np.argsort(a, kind="stable")
+    a = a[order]
+    keep = np.append(a[1:] != a[:-1], True) if a.size else np.zeros(0, dtype=bool)
+    return FingerprintedSnapshot(a[keep], m[order[keep]])
+
+
+def resolve_fingerprints(
+    entries: Iterable[tuple[Any, Any]],
+    anchors: set[int],
+    neighbors: set[int],
+    k: int,
+) -> dict[int, str]:
+    """
+    Second pass over a snapshot recovering the strings for a bounded set of fingerprints
+    (report samples); everything else is hashed and dropped again.
+    """
+    found: dict[int, str] = {}
+    for anchor_id, raw in entries:
+        if anchors:
+            fp = fingerprint(anchor_id)
+            if fp in anchors:
+                found[fp] = anchor_id
+        if neighbors:
+            for neighbor in raw[:k]:
+                fp = fingerprint(neighbor)
+                if fp in neighbors:
+                    found[fp] = neighbor
+    return found
+
+
+class FingerprintLabels(Sequence[str]):
+    """Lazy `fp:` labels for dense codes, so lookups never materialize every ID."""
+
+    def __init__(self, fingerprints: np.ndarray) -> None:
+        self._fingerprints = fingerprints
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def __getitem__(self, code):  # type: ignore[override]
+        return fingerprint_label(int(self._fingerprints[code]))
+
+    def __iter__(self) -> Iterator[str]:
+        return (fingerprint_label(int(fp)) for fp in self._fingerprints)
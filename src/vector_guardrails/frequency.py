@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from .models import NeighborFrequencyChange, NeighborFrequencySummary
+
+
+def occurrence_counts(codes: np.ndarray, n_ids: int) -> np.ndarray:
+    """k-occurrence: how many top-K lists each interned neighbor ID appears in."""
+    flat = codes.ravel()
+    return np.bincount(flat[flat >= 0], minlength=n_ids)
+
+
+def occurrence_skew(counts: np.ndarray) -> float:
+    """Sample skewness of the k-occurrence distribution (the usual hubness statistic)."""
+    if counts.size == 0:
+        return 0.0
+    x = counts.astype(np.float64)
+    centered = x - x.mean()
+    std = np.sqrt((centered**2).mean())
+    if std == 0.0:
+        return 0.0
+    return float((centered**3).mean() / std**3)
+
+
+def _top_changes(
+    delta: np.ndarray,
+    b_counts: np.ndarray,
+    c_counts: np.ndarray,
+    id_lookup: Sequence[str],
+    top_n: int,
+) -> list[NeighborFrequencyChange]:
+    """Largest positive deltas, ties broken by interned code (deterministic)."""
+    positive = np.flatnonzero(delta > 0)
+    if positive.size == 0 or top_n == 0:
+        return []
+
+    if positive.size > top_n:
+        # Keep everything tied with the n-th largest delta, then order the small remainder
+        cutoff = np.partition(delta[positive], positive.size - top_n)[positive.size - top_n]
+        positive = positive[delta[positive] >= cutoff]
+
+    order = np.lexsort((positive, -delta[positive]))[:top_n]
+    return [
+        NeighborFrequencyChange(
+            neighbor_id=id_lookup[code],
+            baseline_count=int(b_counts[code]),
+            candidate_count=int(c_counts[code]),
+            delta=int(c_counts[code] - b_counts[code]),
+        )
+        for code in positive[order]
+    ]
+
+
+def neighbor_frequency_drift(
+    baseline: np.ndarray,
+    candidate: np.ndarray,
+    id_lookup: Sequence[str],
+    *,
+    top_n: int = 10,
+) -> NeighborFrequencySummary:
+    """Compare how often each neighbor ID is surfaced across all anchors.
+
+    `baseline` / `candidate` are interned (n, k) top-K matrices (PAD = -1), or flat
+    padding-free code arrays, sharing one code space; `id_lookup[code]` maps a code
+    back to its neighbor ID.
+    Runs in O(n * k + distinct IDs); strings are only materialized for the top movers.
+    """
+    if top_n < 0:
+        raise ValueError("top_n must be >= 0")
+
+    n_ids = len(id_lookup)
+    b_counts = occurrence_counts(baseline, n_ids)
+    c_counts = occurrence_counts(candidate, n_ids)
+
+    b_distinct = int(np.count_nonzero(b_counts))
+    c_distinct = int(np.count_nonzero(c_counts))
+
+    # Skew is measured over the union of surfaced items so both sides share a support
+    surfaced = (b_counts > 0) | (c_counts > 0)
+    delta = c_counts - b_counts
+
+    return NeighborFrequencySummary(
+        baseline_distinct_neighbors=b_distinct,
+        candidate_distinct_neighbors=c_distinct,
+        catalog_coverage_ratio=(c_distinct / b_distinct) if b_distinct else 0.0,
+        baseline_occurrence_skew=occurrence_skew(b_counts[surfaced]),
+        candidate_occurrence_skew=occurrence_skew(c_counts[surfaced]),
+        baseline_max_occurrence=int(b_counts.max()) if n_ids else 0,
+        candidate_max_occurrence=int(c_counts.max()) if n_ids else 0,
+        top_risers=_top_changes(delta, b_counts, c_counts, id_lookup, top_n),
+        top_fallers=_top_changes(-delta, b_counts, c_counts, id_lookup, top_n),
+    )
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+
+import numpy as np
+
+Metric = Literal["cosine", "dot"]
+
+
+def _row_norms(matrix: np.ndarray, block_size: int) -> np.ndarray:
+    """L2 norms computed block by block (works on memory-mapped inputs)."""
+    norms = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], block_size):
+        block = np.asarray(matrix[start : start + block_size], dtype=np.float32)
+        norms[start : start + block.shape[0]] = np.linalg.norm(block, axis=1)
+    norms[norms == 0.0] = 1.0  # zero vectors score 0 against everything
+    return norms
+
+
+def _merge_topk(
+    best_scores: np.ndarray,
+    best_idx: np.ndarray,
+    scores: np.ndarray,
+    offset: int,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merge a (b, c) score block into the running (b, k) top-K."""
+    if scores.shape[1] > k:
+        part = np.argpartition(scores, -k, axis=1)[:, -k:]
+        scores = np.take_along_axis(scores, part, axis=1)
+        idx = part + offset
+    else:
+        idx = np.broadcast_to(np.arange(offset, offset + scores.shape[1]), scores.shape)
+
+    all_scores = np.concatenate([best_scores, scores], axis=1)
+    all_idx = np.concatenate([best_idx, idx], axis=1)
+    keep = np.argpartition(all_scores, -k, axis=1)[:, -k:]
+    return np.take_along_axis(all_scores, keep, axis=1), np.take_along_axis(all_idx, keep, axis=1)
+
+
+def _topk_for_block(
+    anchors: np.ndarray,
+    corpus: np.ndarray,
+    corpus_norms: np.ndarray | None,
+    self_idx: np.ndarray | None,
+    start: int,
+    stop: int,
+    k: int,
+    corpus_block_size: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    a = np.asarray(anchors[start:stop], dtype=np.float32)
+    if corpus_norms is not None:
+        a = a / _row_norms(a, a.shape[0])[:, None]
+
+    rows = a.shape[0]
+    best_scores = np.full((rows, k), -np.inf, dtype=np.float32)
+    best_idx = np.full((rows, k), -1, dtype=np.int64)
+
+    for c_start in range(0, corpus.shape[0], corpus_block_size):
+        c = np.asarray(corpus[c_start : c_start + corpus_block_size], dtype=np.float32)
+        if corpus_norms is not None:
+            c = c / corpus_norms[c_start : c_start + c.shape[0], None]
+        scores = a @ c.T
+
+        if self_idx is not None:
+            local = self_idx[start:stop] - c_start
+            hit = np.flatnonzero((local >= 0) & (local < c.shape[0]))
+            scores[hit, local[hit]] = -np.inf
+
+        best_scores, best_idx = _merge_topk(best_scores, best_idx, scores, c_start, k)
+
+    # Final order: score descending, corpus index ascending on ties (deterministic)
+    order = np.lexsort((best_idx, -best_scores), axis=1)
+    return (
+        np.take_along_axis(best_scores, order, axis=1),
+        np.take_along_axis(best_idx, order, axis=1),
+    )
+
+
+def iter_topk(
+    anchors: np.ndarray,
+    corpus: np.ndarray,
+    k: int,
+    *,
+    metric: Metric = "cosine",
+    self_idx: np.ndarray | None = None,
+    anchor_block_size: int = 1024,
+    corpus_block_size: int = 16384,
+    workers: int = 1,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Exact brute-force top-K by blocked matrix multiplication.
+
+    Yields (start_row, scores, corpus_indices) per anchor block, in order.
+    Peak memory is roughly workers * anchor_block_size * corpus_block_size * 4 bytes;
+    inputs may be memory-mapped. Blocks are scored in parallel threads (BLAS releases the GIL).
+    Entries scored -inf are padding (only possible when self matches are excluded from a
+    corpus with fewer than K+1 rows) and should be dropped by the caller.
+    """
+    for start, scores, idx, _ in _iter_timed_topk(
+        anchors,
+        corpus,
+        k,
+        metric=metric,
+        self_idx=self_idx,
+        anchor_block_size=anchor_block_size,
+        corpus_block_size=corpus_block_size,
+        workers=workers,
+    ):
+        yield start, scores, idx
+
+
+def _iter_timed_topk(
+    anchors: np.ndarray,
+    corpus: np.ndarray,
+    k: int,
+    *,
+    metric: Metric,
+    self_idx: np.ndarray | None,
+    anchor_block_size: int,
+    corpus_block_size: int,
+    workers: int,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray, float]]:
+    """`iter_topk` plus each block's search wall time in seconds (measured in its thread)."""
+    if k < 1:
+        raise ValueError("k must be >= 1")
+    if metric not in ("cosine", "dot"):
+        raise ValueError(f"metric must be 'cosine' or 'dot', got: {metric!r}")
+    if anchors.ndim != 2 or corpus.ndim != 2 or anchors.shape[1] != corpus.shape[1]:
+        raise ValueError("anchors and corpus must be 2-D matrices with the same dimension")
+    if anchor_block_size < 1 or corpus_block_size < 1 or workers < 1:
+        raise ValueError("block sizes and workers must be >= 1")
+
+    k = min(k, corpus.shape[0])
+    if k == 0:
+        return
+    corpus_norms = _row_norms(corpus, corpus_block_size) if metric == "cosine" else None
+
+    starts = list(range(0, anchors.shape[0], anchor_block_size))
+
+    def run(start: int) -> tuple[np.ndarray, np.ndarray, float]:
+        stop = min(anchors.shape[0], start + anchor_block_size)
+        began = time.perf_counter()
+        scores, idx = _topk_for_block(
+            anchors, corpus, corpus_norms, self_idx, start, stop, k, corpus_block_size
+        )
+        return scores, idx, time.perf_counter() - began
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Submit a bounded window of blocks so memory stays proportional to `workers`
+        for window in range(0, len(starts), workers):
+            batch = starts[window : window + workers]
+            for start, (scores, idx, seconds) in zip(batch, pool.map(run, batch), strict=True):
+                yield start, scores, idx, seconds
+
+
+def generate_snapshot(
+    anchors: np.ndarray,
+    corpus: np.ndarray,
+    anchor_ids: Sequence[str],
+    corpus_ids: Sequence[str],
+    k: int,
+    *,
+    metric: Metric = "cosine",
+    exclude_self: bool = False,
+    anchor_block_size: int = 1024,
+    corpus_block_size: int = 16384,
+    workers: int = 1,
+    latency_ms: list[float] | None = None,
+    score_rows: list[np.ndarray] | None = None,
+) -> Iterator[tuple[str, list[str]]]:
+    """
+    Generate (anchor_id, [neighbor_ids]) snapshot entries from embedding matrices.
+
+    - row i of `anchors` is `anchor_ids[i]`; row j of `corpus` is `corpus_ids[j]`
+    - `exclude_self` drops a corpus row whose ID equals the anchor ID (item-to-item)
+    - `latency_ms`, if given, receives each anchor's search time in milliseconds, in
+      entry order; anchors are then searched one at a time (`anchor_block_size` is
+      ignored) so each time is the anchor's own, not a share of its block's
+    - `score_rows`, if given, receives each anchor's float32 neighbor scores (cosine or
+      dot product, aligned to its neighbor list), in entry order
+    """
+    if len(anchor_ids) != anchors.shape[0]:
+        raise ValueError("anchor_ids length must match the number of anchor rows")
+    if len(corpus_ids) != corpus.shape[0]:
+        raise ValueError("corpus_ids length must match the number of corpus rows")
+
+    self_idx = None
+    if exclude_self:
+        position = {cid: j for j, cid in enumerate(corpus_ids)}
+        self_idx = np.array([position.get(aid, -1) for aid in anchor_ids], dtype=np.int64)
+
+    if latency_ms is not None:
+        anchor_block_size = 1
+
+    for start, scores, idx, seconds in _iter_timed_topk(
+        anchors,
+        corpus,
+        k,
+        metric=metric,
+        self_idx=self_idx,
+        anchor_block_size=anchor_block_size,
+        corpus_block_size=corpus_block_size,
+        workers=workers,
+    ):
+        valid = np.isfinite(scores)
+        if latency_ms is not None:
+            latency_ms.append(1000.0 * seconds)
+        for r in range(idx.shape[0]):
+            if score_rows is not None:
+                score_rows.append(scores[r][valid[r]])
+            yield anchor_ids[start + r], [corpus_ids[j] for j in idx[r][valid[r]]]
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from .interning import encode_neighbor_lists_flat
+from .models import GraphStats, GraphSummary
+
+IN_DEGREE_PERCENTILES = (50, 90, 99)
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    # A plain sort: much faster than np.unique's hashing on large int64 arrays
+    values = np.sort(values)
+    if values.size:
+        values = values[np.append(True, values[1:] != values[:-1])]
+    return values
+
+
+class KnnGraph:
+    """
+    A snapshot as a directed k-NN graph over integer node IDs: one edge from each anchor
+    to each of its top-K neighbors.
+
+    Held as sorted, de-duplicated edge keys `src * n_nodes + dst` (self-loops dropped):
+    8 bytes per edge, and every metric is a sort, `bincount` or gather over them.
+    """
+
+    __slots__ = ("n_nodes", "anchors", "keys")
+
+    def __init__(self, n_nodes: int, anchors: np.ndarray, src: np.ndarray, dst: np.ndarray):
+        self.n_nodes = n_nodes
+        self.anchors = _sorted_unique(np.asarray(anchors, dtype=np.int64))
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        if len(src) != len(dst):
+            raise ValueError(f"src and dst differ in length ({len(src)} != {len(dst)})")
+        for name, nodes in (("anchors", self.anchors), ("src", src), ("dst", dst)):
+            if nodes.size and (nodes.min() < 0 or nodes.max() >= n_nodes):
+                raise ValueError(f"{name} node IDs must be in [0, {n_nodes})")
+        loop = src == dst
+        self.keys = _sorted_unique(src[~loop] * n_nodes + dst[~loop])
+
+    @property
+    def node_dtype(self) -> type[np.signedinteger]:
+        # 32-bit node arrays halve the memory traffic of the random gathers
+        return np.int32 if self.n_nodes <= np.iinfo(np.int32).max else np.int64
+
+    def edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """(src, dst) node arrays, ordered by source node."""
+        src, dst = np.divmod(self.keys, self.n_nodes)
+        return src.astype(self.node_dtype), dst.astype(self.node_dtype)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+def _row_edges(nodes: np.ndarray, matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    present = matrix >= 0
+    return np.repeat(nodes, present.sum(axis=1)), matrix[present]
+
+
+def matrix_graphs(
+    baseline: np.ndarray,
+    candidate: np.ndarray,
+    baseline_nodes: np.ndarray | None = None,
+    candidate_nodes: np.ndarray | None = None,
+) -> tuple[KnnGraph, KnnGraph]:
+    """
+    k-NN graphs of two PAD(-1)-filled neighbor matrices whose rows are nodes of the
+    neighbors' own ID space: row i is node `*_nodes[i]` (default i).
+
+    Node IDs are used as they are when dense; sparse IDs (e.g. 64-bit fingerprints) are
+    compacted jointly, so both graphs keep one node numbering.
+    """
+    sides = []
+    for matrix, nodes in ((baseline, baseline_nodes), (candidate, candidate_nodes)):
+        matrix = np.asarray(matrix, dtype=np.int64)
+        if matrix.ndim != 2:
+            raise ValueError(f"expected a 2-D neighbor matrix, got shape {matrix.shape}")
+        rows = np.arange(len(matrix)) if nodes is None else np.asarray(nodes, dtype=np.int64)
+        if rows.shape != (len(matrix),):
+            raise ValueError(f"expected {len(matrix)} row nodes, got shape {rows.shape}")
+        sides.append((rows, *_row_edges(rows, matrix)))
+
+    ids = np.concatenate([part for side in sides for part in side])
+    if ids.size and ids.min() < 0:
+        raise ValueError("node IDs must be >= 0 (-1 only pads neighbor rows)")
+    top = int(ids.max(initial=-1))
+    if top < 2 * ids.size:
+        n_nodes = top + 1
+    else:
+        uniques, ids = np.unique(ids, return_inverse=True)
+        n_nodes = len(uniques)
+
+    b_anchors, b_src, b_dst, c_anchors, c_src, c_dst = np.split(
+        ids, np.cumsum([len(part) for side in sides for part in side])[:-1]
+    )
+    return (
+        KnnGraph(n_nodes, b_anchors, b_src, b_dst),
+        KnnGraph(n_nodes, c_anchors, c_src, c_dst),
+    )
+
+
+def snapshot_graphs(
+    baseline: Mapping[str, Sequence[str]], candidate: Mapping[str, Sequence[str]], k: int
+) -> tuple[KnnGraph, KnnGraph]:
+    """k-NN graphs of two snapshots over one shared vocabulary of anchor and neighbor IDs."""
+    vocab: dict[str, int] = {}
+    sides = []
+    for snapshot in (baseline, candidate):
+        anchors = np.fromiter(
+            (vocab.setdefault(a, len(vocab)) for a in snapshot), np.int64, len(snapshot)
+        )
+        sides.append((anchors, *encode_neighbor_lists_flat(list(snapshot.values()), k, vocab)))
+    (b_anchors, b_codes, b_offsets), (c_anchors, c_codes, c_offsets) = sides
+    return (
+        KnnGraph(len(vocab), b_anchors, np.repeat(b_anchors, np.diff(b_offsets)), b_codes),
+        KnnGraph(len(vocab), c_anchors, np.repeat(c_anchors, np.diff(c_offsets)), c_codes),
+    )
+
+
+def component_labels(n_nodes: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """
+    Weakly connected component of every node, labelled by its smallest node ID.
+
+    Vectorized hook-and-compress: each round hooks every edge's larger root under the
+    smaller one, then follows parent pointers until each node points at its root.
+    Edges already inside one component are dropped from later rounds.
+    """
+    parent = np.arange(n_nodes, dtype=src.dtype)
+    # Every node starts as its own root
+    a, b = src, dst
+    while a.size:
+        np.minimum.at(parent, np.maximum(a, b), np.minimum(a, b))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        a = parent[src]
+        b = parent[dst]
+        cross = a != b
+        src, dst, a, b = src[cross], dst[cross], a[cross], b[cross]
+    return parent
+
+
+def _percentiles(values: np.ndarray) -> dict[str, float]:
+    if not values.size:
+        return {}
+    pct = np.percentile(values, IN_DEGREE_PERCENTILES, method="inverted_cdf")
+    return {
+        f"p{q}": float(v) for q, v in zip(IN_DEGREE_PERCENTILES, pct.tolist(), strict=True)
+    }
+
+
+def _stats(
+    graph: KnnGraph, src: np.ndarray, dst: np.ndarray
+) -> tuple[GraphStats, np.ndarray, np.ndarray]:
+    """Stats of `graph`, plus its component labels and a mask of the nodes it touches."""
+    n = graph.n_nodes
+    is_anchor = np.zeros(n, dtype=bool)
+    is_anchor[graph.anchors] = True
+    in_degree = np.bincount(dst, minlength=n)
+    # Edges only leave anchors, so a node is in the graph iff it is an anchor or a target
+    active = is_anchor | (in_degree > 0)
+
+    # Mutual neighbors: both u -> v and v -> u map to one undirected key, which then
+    # appears twice. Only edges into anchors can have a reverse edge.
+    eligible = int(np.count_nonzero(is_anchor[dst]))
+    pairs = np.minimum(src, dst).astype(np.int64) * n + np.maximum(src, dst)
+    pairs.sort()
+    mutual = 2 * int(np.count_nonzero(pairs[1:] == pairs[:-1]))
+
+    degrees = in_degree[active]
+    labels = component_labels(n, src, dst)
+    sizes = np.bincount(labels[active], minlength=n)
+    nodes = int(np.count_nonzero(active))
+
+    stats = GraphStats(
+        nodes=nodes,
+        anchors=len(graph.anchors),
+        edges=len(graph),
+        reciprocity=mutual / eligible if eligible else None,
+        in_degree_percentiles=_percentiles(degrees),
+        max_in_degree=int(degrees.max(initial=0)),
+        unreached_anchor_rate=(
+            float(np.count_nonzero(in_degree[graph.anchors] == 0) / len(graph.anchors))
+            if len(graph.anchors)
+            else 0.0
+        ),
+        components=int(np.count_nonzero(sizes)),
+        largest_component_share=float(sizes.max(initial=0) / nodes) if nodes else 0.0,
+    )
+    return stats, labels, active
+
+
+def graph_summary(baseline: KnnGraph, candidate: KnnGraph) -> GraphSummary:
+    """
+    Structure drift between two k-NN graphs over the same node numbering.
+
+    Beyond each graph's stats, `split_edge_rate` is the share of baseline edges (between
+    nodes the candidate graph still has) whose endpoints fall in different candidate
+    components: how much of the baseline's connectivity the candidate tore apart.
+    """
+    if baseline.n_nodes != candidate.n_nodes:
+        raise ValueError(
+            f"graphs must share one node numbering ({baseline.n_nodes} != {candidate.n_nodes})"
+        )
+    src, dst = baseline.edges()
+    b_stats, _, _ = _stats(baseline, src, dst)
+    c_stats, c_labels, c_active = _stats(candidate, *candidate.edges())
+
+    kept = c_active[src] & c_active[dst]
+    split = np.count_nonzero(c_labels[src[kept]] != c_labels[dst[kept]])
+    total = int(np.count_nonzero(kept))
+
+    return GraphSummary(
+        baseline=b_stats,
+        candidate=c_stats,
+        reciprocity_ratio=(
+            c_stats.reciprocity / b_stats.reciprocity
+            if b_stats.reciprocity and c_stats.reciprocity is not None
+            else None
+        ),
+        split_edge_rate=split / total if total else None,
+    )
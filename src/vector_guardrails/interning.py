@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from itertools import chain, islice
+
+import numpy as np
+
+# Padding value for missing neighbors in encoded top-K matrices.
+PAD = -1
+
+# Keeps hashed codes non-negative so they never clash with PAD.
+_HASH_MASK = np.int64((1 << 63) - 1)
+
+
+def _scatter(lengths: np.ndarray, codes: np.ndarray, k: int) -> np.ndarray:
+    """Lay flat per-item codes out as an (n, k) matrix, right-padded with PAD."""
+    n = len(lengths)
+    if codes.size == n * k:
+        return codes.reshape(n, k)  # every list is full: no padding to place
+    out = np.full((n, k), PAD, dtype=np.int64)
+    if codes.size:
+        rows = np.repeat(np.arange(n), lengths)
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        out[rows, np.arange(codes.size) - starts] = codes
+    return out
+
+
+def _lengths(truncated: list[Sequence[str]]) -> np.ndarray:
+    return np.fromiter(map(len, truncated), dtype=np.int64, count=len(truncated))
+
+
+def encode_neighbor_lists_flat(
+    lists: Sequence[Sequence[str]],
+    k: int,
+    vocab: dict[str, int],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Encode neighbor lists as flat interned codes plus (n + 1) row offsets.
+
+    Same codes as `encode_neighbor_lists`, without padding: row i is
+    `codes[offsets[i]:offsets[i + 1]]`. Memory stays proportional to the IDs present,
+    which matters when K is in the thousands.
+    """
+    if k < 1:
+        raise ValueError("k must be >= 1")
+
+    truncated = [neighbors[:k] for neighbors in lists]
+    flat = list(chain.from_iterable(truncated))
+
+    # New IDs get codes in order of first appearance (dict.fromkeys keeps order)
+    new_ids = [item for item in dict.fromkeys(flat) if item not in vocab]
+    vocab.update(zip(new_ids, range(len(vocab), len(vocab) + len(new_ids)), strict=True))
+    codes = np.fromiter(map(vocab.__getitem__, flat), dtype=np.int64, count=len(flat))
+
+    offsets = np.zeros(len(truncated) + 1, dtype=np.int64)
+    np.cumsum(_lengths(truncated), out=offsets[1:])
+    return codes, offsets
+
+
+def encode_neighbor_lists(
+    lists: Sequence[Sequence[str]],
+    k: int,
+    vocab: dict[str, int],
+) -> np.ndarray:
+    """Encode neighbor lists as an (n, k) int64 matrix of interned IDs.
+
+    - each distinct neighbor ID gets a dense integer code from `vocab`
+      (updated in place, so baseline and candidate share one code space)
+    - lists shorter than k are right-padded with PAD (-1)
+    """
+    codes, offsets = encode_neighbor_lists_flat(lists, k, vocab)
+    return flat_to_matrix(codes, offsets, k)
+
+
+def flat_to_matrix(codes: np.ndarray, offsets: np.ndarray, k: int) -> np.ndarray:
+    """(n, k) PAD-padded matrix from flat codes and row offsets."""
+    return _scatter(np.diff(offsets), codes, k)
+
+
+def hash_neighbor_lists(lists: Sequence[Sequence[str]], k: int) -> np.ndarray:
+    """Encode neighbor lists as an (n, k) int64 matrix of (masked) string hashes.
+
+    Cheaper than `encode_neighbor_lists` for throwaway batches: no vocabulary, and
+    CPython caches each string's hash. Codes are only consistent within one process
+    (hash randomization), so use this when matrices are compared and discarded.
+    """
+    if k < 1:
+        raise ValueError("k must be >= 1")
+
+    truncated = [neighbors[:k] for neighbors in lists]
+    flat = list(chain.from_iterable(truncated))
+    codes = np.fromiter(map(hash, flat), dtype=np.int64, count=len(flat)) & _HASH_MASK
+    return _scatter(_lengths(truncated), codes, k)
+
+
+class IndexLabels(Sequence[str]):
+    """
+    Lazy neighbor IDs for integer codes (e.g. ANN row indices): code i is the index
+    `indices[i]` (or i itself without `indices`), named `names[index]` when names are
+    given and its decimal text otherwise. Strings exist only for codes looked up.
+    """
+
+    def __init__(
+        self, size: int, indices: np.ndarray | None = None, names: Sequence[str] | None = None
+    ) -> None:
+        self._size = size
+        self._indices = indices
+        self._names = names
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, code):  # type: ignore[override]
+        if not 0 <= code < self._size:
+            raise IndexError(code)
+        index = int(code) if self._indices is None else int(self._indices[code])
+        return str(index) if self._names is None else self._names[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(self._size))
+
+
+class VocabLookup(Sequence[str]):
+    """
+    Neighbor IDs by code for an interning `vocab` that keeps growing (codes are assigned
+    in insertion order and never change). One lookup can be shared by every chunk of a
+    run: each access only copies the IDs added since the last one, taken from the end
+    of the dict, so the total work is proportional to the vocabulary, not to
+    chunks x vocabulary.
+    """
+
+    def __init__(self, vocab: dict[str, int]) -> None:
+        self._vocab = vocab
+        self._ids: list[str] = []
+
+    def _sync(self) -> list[str]:
+        missing = len(self._vocab) - len(self._ids)
+        if missing > 0:
+            new_ids = list(islice(reversed(self._vocab), missing))
+            new_ids.reverse()
+            self._ids.extend(new_ids)
+        return self._ids
+
+    def __len__(self) -> int:
+        return len(self._sync())
+
+    def __getitem__(self, code):  # type: ignore[override]
+        return self._sync()[code]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sync())
@@ -1,17 +1,26 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Mapping
+from collections.abc import Iterable, Iterator, Mapping
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 
-def load_json(path: str) -> Any:
+from .scores import SnapshotScores
+
+
+def _existing_file(path: str) -> Path:
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"file not found: {path}")
     if not p.is_file():
         raise IsADirectoryError(f"not a file: {path}")
+    return p
+
+
+def load_json(path: str) -> Any:
+    p = _existing_file(path)
 
     with p.open("r", encoding="utf-8") as f:
         return json.load(f)
@@ -38,3 +47,241 @@ def ensure_snapshot_shape(obj: Any) -> Mapping[str, list[str]]:
         if not isinstance(v, list) or not all(isinstance(x, str) for x in v):
             raise ValueError(f"snapshot values must be list[str] for anchor_id={k!r}")
     return obj
+
+
+def load_id_list(path: str) -> list[str]:
+    """Load an ID list: a JSON array of strings, or plain text with one ID per line."""
+    p = _existing_file(path)
+    if p.suffix == ".json":
+        ids = load_json(path)
+        if not isinstance(ids, list) or not all(isinstance(x, str) for x in ids):
+            raise ValueError(f"ID list JSON must be an array of strings: {path}")
+        return ids
+
+    with p.open("r", encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def iter_weight_entries(path: str, *, chunk_size: int = 1 << 20) -> Iterator[tuple[str, float]]:
+    """
+    Stream (anchor_id, weight) pairs: a JSON object {anchor_id: weight}, or text lines
+    `anchor_id<TAB or comma>weight` (blank lines and `#` comments skipped).
+    """
+    p = _existing_file(path)
+    with p.open("r", encoding="utf-8") as f:
+        if p.suffix == ".json":
+            for anchor_id, weight in _JsonObjectReader(f, chunk_size).items():
+                if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                    raise ValueError(f"weight for anchor_id={anchor_id!r} must be a number")
+                yield anchor_id, float(weight)
+            return
+
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            anchor_id, sep, text = line.rpartition("\t" if "\t" in line else ",")
+            try:
+                weight = float(text) if sep else None
+            except ValueError:
+                weight = None
+            if weight is None:
+                raise ValueError(f"{path}:{lineno}: expected anchor_id and weight")
+            yield anchor_id, weight
+
+
+def load_matrix(path: str) -> np.ndarray:
+    """Memory-map a 2-D `.npy` embedding matrix (read-only)."""
+    matrix = np.load(_existing_file(path), mmap_mode="r")
+    if matrix.ndim != 2:
+        raise ValueError(f"expected a 2-D matrix in {path}, got shape {matrix.shape}")
+    return matrix
+
+
+def dump_latency(path: str, latency_ms: Iterable[float]) -> int:
+    """
+    Write per-anchor latencies (ms) as a float32 `.npy` side array, in the order of the
+    snapshot's anchors. Returns the number of values written.
+    """
+    values = np.fromiter(latency_ms, dtype=np.float32)
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with p.open("wb") as f:
+        np.save(f, values)
+    return len(values)
+
+
+def load_latency(path: str, anchor_ids: Iterable[str]) -> dict[str, float]:
+    """
+    Per-anchor latencies (ms): a `.npy` side array aligned to `anchor_ids` (the snapshot's
+    anchors, in file order), or a JSON object {anchor_id: ms}.
+    """
+    p = _existing_file(path)
+    if p.suffix == ".json":
+        latency = load_json(path)
+        if not isinstance(latency, dict) or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in latency.values()
+        ):
+            raise ValueError(f"latency JSON must be an object {{anchor_id: ms}}: {path}")
+        return {anchor_id: float(ms) for anchor_id, ms in latency.items()}
+
+    values = np.load(p, allow_pickle=False)
+    anchors = list(anchor_ids)
+    if values.ndim != 1 or len(values) != len(anchors):
+        raise ValueError(
+            f"latency array {path} has shape {values.shape}, expected ({len(anchors)},) "
+            "to match the snapshot's anchors"
+        )
+    return dict(zip(anchors, values.astype(np.float64).tolist(), strict=True))
+
+
+def dump_scores(path: str, rows: Iterable[np.ndarray]) -> int:
+    """
+    Write per-neighbor similarity scores as a `.npz` side file: one float32 column of
+    all scores plus an int32 row length per anchor, rows in the snapshot's anchor order.
+    Returns the number of anchors written.
+    """
+    parts = [np.asarray(row, dtype=np.float32).ravel() for row in rows]
+    lengths = np.fromiter(map(len, parts), dtype=np.int32, count=len(parts))
+    values = np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with p.open("wb") as f:
+        np.savez(f, scores=values, lengths=lengths)
+    return len(parts)
+
+
+def load_scores(path: str, anchor_ids: Iterable[str]) -> SnapshotScores:
+    """Score columns from a `dump_scores` file, aligned to `anchor_ids` (the snapshot's
+    anchors, in file order)."""
+    with np.load(_existing_file(path), allow_pickle=False) as data:
+        try:
+            values, lengths = data["scores"], data["lengths"]
+        except KeyError as e:
+            raise ValueError(f"score file {path} must hold 'scores' and 'lengths' arrays") from e
+    try:
+        return SnapshotScores(anchor_ids, values, lengths)
+    except ValueError as e:
+        raise ValueError(f"score file {path} does not match the snapshot: {e}") from e
+
+
+def dump_snapshot_json(path: str, entries: Iterable[tuple[str, list[str]]]) -> int:
+    """
+    Stream snapshot entries to a JSON object file without building the dict in memory.
+    One anchor per line; returns the number of anchors written.
+    """
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with p.open("w", encoding="utf-8") as f:
+        f.write("{")
+        for anchor_id, neighbors in entries:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(anchor_id, ensure_ascii=False))
+            f.write(": ")
+            f.write(json.dumps(neighbors, ensure_ascii=False))
+            count += 1
+        f.write("\n}\n")
+    return count
+
+
+class _JsonObjectReader:
+    """Incremental reader for a top-level JSON object, one (key, value) pair at a time."""
+
+    def __init__(self, f: Any, chunk_size: int) -> None:
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        # UTF-8 bytes consumed before self._buf[self._mark] (for `tell`)
+        self._bytes = 0
+        self._mark = 0
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._bytes += len(self._buf[self._mark : self._pos].encode("utf-8"))
+        self._mark = 0
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def tell(self) -> int:
+        """UTF-8 byte offset of the next token, relative to where reading started."""
+        self._peek()
+        self._bytes += len(self._buf[self._mark : self._pos].encode("utf-8"))
+        self._mark = self._pos
+        return self._bytes
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        c = self._peek()
+        if not c or c not in chars:
+            raise ValueError(f"malformed snapshot JSON: expected one of {chars!r}, got {c!r}")
+        self._pos += 1
+        return c
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise ValueError("malformed snapshot JSON: truncated value") from None
+                continue
+            # A value ending exactly at the buffer edge may continue (e.g. a number)
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def pair(self) -> tuple[Any, Any]:
+        """The next `key: value` pair."""
+        key = self._value()
+        self._expect(":")
+        return key, self._value()
+
+    def items(self) -> Iterator[tuple[Any, Any]]:
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            yield self.pair()
+            if self._expect(",}") == "}":
+                return
+
+    def offsets(self) -> Iterator[tuple[Any, int]]:
+        """(key, byte offset of the key) per pair; values are parsed and dropped."""
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            offset = self.tell()
+            yield self.pair()[0], offset
+            if self._expect(",}") == "}":
+                return
+
+
+def iter_snapshot_entries(path: str, *, chunk_size: int = 1 << 20) -> Iterator[tuple[Any, Any]]:
+    """
+    Stream (anchor_id, neighbors) pairs from a snapshot JSON object without loading
+    the whole file. Entries are yielded in file order and are not validated here.
+    """
+    p = _existing_file(path)
+    with p.open("r", encoding="utf-8") as f:
+        yield from _JsonObjectReader(f, chunk_size).items()
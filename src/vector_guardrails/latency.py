@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Mapping
+
+import numpy as np
+
+from .models import LatencyRegression, LatencySummary
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+def _checked(latency: Mapping[str, float], side: str) -> Mapping[str, float]:
+    for anchor_id, ms in latency.items():
+        if not (math.isfinite(ms) and ms > 0.0):
+            raise ValueError(
+                f"{side} latency for anchor_id={anchor_id!r} must be finite and > 0, got {ms!r}"
+            )
+    return latency
+
+
+def latency_summary(
+    baseline_latency: Mapping[str, float],
+    candidate_latency: Mapping[str, float],
+    anchor_ids: Iterable[str],
+    *,
+    top_n: int = 10,
+) -> LatencySummary:
+    """
+    Latency shift over `anchor_ids` that have a latency on both sides.
+
+    Percentiles are nearest-rank (like the metric distributions); worst regressions are
+    the `top_n` anchors with the largest candidate / baseline ratio above 1.
+    """
+    _checked(baseline_latency, "baseline")
+    _checked(candidate_latency, "candidate")
+    ids = [a for a in anchor_ids if a in baseline_latency and a in candidate_latency]
+    if not ids:
+        return LatencySummary(anchors=0)
+
+    b = np.array([baseline_latency[a] for a in ids], dtype=np.float64)
+    c = np.array([candidate_latency[a] for a in ids], dtype=np.float64)
+    b_pct = np.percentile(b, LATENCY_PERCENTILES, method="inverted_cdf")
+    c_pct = np.percentile(c, LATENCY_PERCENTILES, method="inverted_cdf")
+
+    ratio = c / b
+    slower = np.flatnonzero(ratio > 1.0)
+    # Worst first; ties broken by the larger absolute slowdown, then anchor order
+    order = np.lexsort((-(c - b)[slower], -ratio[slower]))[:top_n]
+    worst = [
+        LatencyRegression(
+            anchor_id=ids[i],
+            baseline_ms=float(b[i]),
+            candidate_ms=float(c[i]),
+            ratio=float(ratio[i]),
+        )
+        for i in slower[order].tolist()
+    ]
+
+    keys = [f"p{q}" for q in LATENCY_PERCENTILES]
+    return LatencySummary(
+        anchors=len(ids),
+        baseline_percentiles=dict(zip(keys, b_pct.tolist(), strict=True)),
+        candidate_percentiles=dict(zip(keys, c_pct.tolist(), strict=True)),
+        ratios=dict(zip(keys, (c_pct / b_pct).tolist(), strict=True)),
+        worst_regressions=worst,
+    )
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import numpy as np
+
+# Upper bound on elements in the (rows, k, k) comparison tensors built per block.
+_BLOCK_ELEMENTS = 1 << 22
+
 
 def overlap_at_k(baseline_neighbors: list[str], candidate_neighbors: list[str], k: int) -> float:
     """
@@ -40,3 +45,384 @@ def rank_displacement(
         total += abs(b_rank[item] - c_rank[item])
 
     return total / float(len(shared))
+
+
+# ---------------------------------------------------------------------------
+# Batch kernels (operate on (n, k) interned-ID matrices, PAD = -1)
+# ---------------------------------------------------------------------------
+
+
+def _row_blocks(n: int, k: int):
+    step = max(1, _BLOCK_ELEMENTS // (k * k))
+    for start in range(0, n, step):
+        yield start, min(n, start + step)
+
+
+def match_positions(baseline: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """
+    For every baseline position, the rank of the same item in the candidate row.
+
+    Returns an (n, k) int64 matrix; -1 where the baseline item is absent from the
+    candidate top-K (or the baseline slot is padding).
+    """
+    eq = (baseline[:, :, None] == candidate[:, None, :]) & (baseline[:, :, None] >= 0)
+    found = eq.any(axis=2)
+    return np.where(found, eq.argmax(axis=2), -1)
+
+
+def shared_and_displacement_batch(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Shared-item count and mean absolute rank displacement per row.
+
+    Displacement is NaN where nothing is shared (the scalar version returns None).
+    """
+    n, k = positions.shape
+    shared_mask = positions >= 0
+    shared = shared_mask.sum(axis=1)
+    shift = np.where(shared_mask, np.abs(positions - np.arange(k)[None, :]), 0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        displacement = np.where(shared > 0, shift / np.maximum(shared, 1), np.nan)
+    return shared, displacement
+
+
+def overlap_displacement_batch(
+    baseline: np.ndarray, candidate: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Batch counterpart of `overlap_at_k` / `rank_displacement` on (n, k) matrices.
+
+    Returns (shared_count, displacement); overlap is shared_count / k.
+    """
+    if baseline.shape != candidate.shape or baseline.ndim != 2:
+        raise ValueError("baseline and candidate must be (n, k) matrices of the same shape")
+
+    n, k = baseline.shape
+    shared = np.empty(n, dtype=np.int64)
+    displacement = np.empty(n, dtype=np.float64)
+    for start, stop in _row_blocks(n, k):
+        positions = match_positions(baseline[start:stop], candidate[start:stop])
+        shared[start:stop], displacement[start:stop] = shared_and_displacement_batch(positions)
+    return shared, displacement
+
+
+def rank_biased_overlap_batch(positions: np.ndarray, p: float) -> np.ndarray:
+    """
+    Extrapolated rank-biased overlap (Webber et al.) per row, evaluated to depth K.
+
+    RBO = (1-p)/p * sum_d A_d p^d + A_K p^K, where A_d = |top-d(B) ∩ top-d(C)| / d.
+    Agreement at depth d is divided by d up to K, like overlap@K, so only identical
+    lists of K items score 1.0: identical lists shorter than K score below it (e.g.
+    identical 3-item lists at K=10, p=0.9 give about 0.566). Disjoint lists score 0.0.
+    """
+    n, k = positions.shape
+    depths = np.arange(1, k + 1)
+
+    # A shared item at baseline rank i / candidate rank j is in both prefixes from depth
+    # max(i, j) + 1 onwards.
+    deepest = np.maximum(np.arange(k)[None, :], positions)
+    enters = np.where(positions >= 0, deepest, k)
+    agree_count = (enters[:, :, None] < depths[None, None, :]).sum(axis=1)
+    agreement = agree_count / depths
+
+    weights = p ** depths.astype(np.float64)
+    rbo = (1.0 - p) / p * (agreement * weights).sum(axis=1) + agreement[:, -1] * weights[-1]
+    return np.clip(rbo, 0.0, 1.0)
+
+
+def kendall_tau_shared_batch(positions: np.ndarray) -> np.ndarray:
+    """
+    Kendall tau between baseline and candidate order, restricted to shared items.
+
+    Returns NaN for rows with fewer than two shared items (undefined).
+    """
+    n, k = positions.shape
+    shared = positions >= 0
+    upper = np.triu(np.ones((k, k), dtype=bool), 1)
+
+    pairs = shared[:, :, None] & shared[:, None, :] & upper[None, :, :]
+    concordant = (pairs & (positions[:, :, None] < positions[:, None, :])).sum(axis=(1, 2))
+    total = pairs.sum(axis=(1, 2))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, (2.0 * concordant - total) / total, np.nan)
+
+
+def weighted_overlap_batch(positions: np.ndarray) -> np.ndarray:
+    """
+    Position-weighted (DCG-style) overlap.
+
+    Each baseline item retained in the candidate top-K contributes 1/log2(rank+2);
+    the sum is normalized by the ideal gain at K, so losing rank 1 costs the most.
+    """
+    n, k = positions.shape
+    gains = 1.0 / np.log2(np.arange(k) + 2.0)
+    retained = ((positions >= 0) * gains[None, :]).sum(axis=1) / gains.sum()
+    return np.clip(retained, 0.0, 1.0)
+
+
+def rank_aware_metrics_batch(
+    baseline: np.ndarray, candidate: np.ndarray, *, p: float = 0.9
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute (rbo, kendall_tau, weighted_overlap) for every row at once.
+
+    Rows are processed in blocks so the (rows, k, k) intermediates stay bounded.
+    """
+    if baseline.shape != candidate.shape or baseline.ndim != 2:
+        raise ValueError("baseline and candidate must be (n, k) matrices of the same shape")
+
+    n, k = baseline.shape
+    rbo = np.empty(n, dtype=np.float64)
+    tau = np.empty(n, dtype=np.float64)
+    wov = np.empty(n, dtype=np.float64)
+
+    for start, stop in _row_blocks(n, k):
+        positions = match_positions(baseline[start:stop], candidate[start:stop])
+        rbo[start:stop] = rank_biased_overlap_batch(positions, p)
+        tau[start:stop] = kendall_tau_shared_batch(positions)
+        wov[start:stop] = weighted_overlap_batch(positions)
+
+    return rbo, tau, wov
+
+
+# ---------------------------------------------------------------------------
+# Sort-merge kernels for large K (flat codes + row offsets, no padding)
+# ---------------------------------------------------------------------------
+
+
+class SortedRows:
+    """
+    Flat top-K rows with each row's codes sorted ascending, original ranks carried along.
+
+    Built once per side with a single sort; matching and duplicate detection are then
+    merges over these arrays, O(n * K log K) overall instead of the O(n * K^2) tensors
+    of the dense kernels.
+    """
+
+    __slots__ = ("n", "rows", "codes", "ranks")
+
+    def __init__(self, codes: np.ndarray, offsets: np.ndarray) -> None:
+        self.n = len(offsets) - 1
+        rows = np.repeat(np.arange(self.n), np.diff(offsets))
+        order = np.lexsort((codes, rows))
+        self.rows = rows  # already grouped by row, so unchanged by the sort
+        self.codes = codes[order]
+        self.ranks = (np.arange(len(codes)) - offsets[rows])[order]
+
+    def duplicate_rows(self) -> np.ndarray:
+        """Rows that hold some code more than once (adjacent after sorting)."""
+        dup = (self.codes[1:] == self.codes[:-1]) & (self.rows[1:] == self.rows[:-1])
+        return np.unique(self.rows[1:][dup])
+
+    def keys(self, stride: int) -> np.ndarray:
+        # (row, code) packed into one ascending int64 key
+        return self.rows * stride + self.codes
+
+
+def _row_inversions(rows: np.ndarray, values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Inversions per row of `values` in their given order (rows ascending, values distinct
+    within a row): a bottom-up merge sort run on all rows at once.
+
+    Each level stably sorts by (parent block, value); an element of a right half moves
+    left past exactly the larger elements of its left half, so the moves add up to the
+    inversions crossing that level.
+    """
+    inversions = np.zeros(n, dtype=np.int64)
+    if values.size == 0:
+        return inversions
+
+    starts = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=starts[1:])
+    row_start = starts[rows]
+    position = np.arange(values.size) - row_start
+    span = int(values.max()) + 1
+
+    width = 1
+    longest = int(position.max()) + 1
+    while width < longest:
+        block = row_start + (position // (2 * width)) * (2 * width)
+        perm = np.argsort(block * span + values, kind="stable")
+        moved = position[perm] - position
+        inversions += np.bincount(rows[moved > 0], weights=moved[moved > 0], minlength=n).astype(
+            np.int64
+        )
+        values = values[perm]
+        width *= 2
+    return inversions
+
+
+def sort_merge_metrics(
+    baseline: SortedRows, candidate: SortedRows, k: int, *, p: float = 0.9
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (shared_count, displacement, rbo, kendall_tau, weighted_overlap) per row from the
+    matched (baseline rank, candidate rank) pairs; same values as the dense kernels.
+    """
+    if baseline.n != candidate.n:
+        raise ValueError("baseline and candidate must have the same number of rows")
+
+    n = baseline.n
+    stride = int(max(baseline.codes.max(initial=-1), candidate.codes.max(initial=-1))) + 1
+    b_keys = baseline.keys(stride)
+    c_keys = candidate.keys(stride)
+
+    pos = np.searchsorted(c_keys, b_keys)
+    found = pos < len(c_keys)
+    found[found] = c_keys[pos[found]] == b_keys[found]
+    rows = baseline.rows[found]
+    b_rank = baseline.ranks[found]
+    c_rank = candidate.ranks[pos[found]]
+
+    # Baseline-rank order within each row: sums no longer depend on how codes were
+    # numbered, and Kendall tau needs exactly this order
+    order = np.lexsort((b_rank, rows))
+    rows, b_rank, c_rank = rows[order], b_rank[order], c_rank[order]
+
+    shared = np.bincount(rows, minlength=n)
+    shift = np.bincount(rows, weights=np.abs(b_rank - c_rank), minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        displacement = np.where(shared > 0, shift / np.maximum(shared, 1), np.nan)
+
+    # RBO: a pair first agrees at depth m = max(ranks) + 1 and counts 1/d at every d >= m,
+    # so its weight is the suffix sum of p^d / d from m to K
+    depths = np.arange(1, k + 1, dtype=np.float64)
+    terms = p**depths / depths
+    suffix = np.cumsum(terms[::-1])[::-1]
+    enters = np.maximum(b_rank, c_rank)
+    rbo = (1.0 - p) / p * np.bincount(rows, weights=suffix[enters], minlength=n)
+    rbo = np.clip(rbo + shared / float(k) * p**k, 0.0, 1.0)
+
+    gains = 1.0 / np.log2(np.arange(k) + 2.0)
+    retained = np.bincount(rows, weights=gains[b_rank], minlength=n) / gains.sum()
+    weighted_overlap = np.clip(retained, 0.0, 1.0)
+
+    # Kendall tau: candidate ranks of shared items in baseline order, counted by inversions
+    discordant = _row_inversions(rows, c_rank, n)
+    pairs = shared * (shared - 1) // 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tau = np.where(pairs > 0, (pairs - 2.0 * discordant) / pairs, np.nan)
+
+    return shared, displacement, rbo, tau, weighted_overlap
+
+
+# ---------------------------------------------------------------------------
+# Row-pair deduplication: metrics are a function of the (baseline, candidate) rows
+# alone, so anchors with identical row pairs can share one computation
+# ---------------------------------------------------------------------------
+
+_HASH_SEED = 0x5EED
+
+
+def _hash_weights(n: int) -> np.ndarray:
+    # Fixed odd multipliers; a row hash is sum((code + 1) * weight[rank]), wrapping at 64 bits
+    return np.random.default_rng(_HASH_SEED).integers(1, 2**62, size=n, dtype=np.int64) | 1
+
+
+def _group_rows(hashes: np.ndarray, equal) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (first, inverse) over rows keyed by `hashes`: the first row of every distinct row
+    (ascending) and, per row, the position of its representative in `first`.
+
+    `equal(rows, reps)` confirms each hash match, so a collision only costs a missed merge.
+    """
+    n = len(hashes)
+    order = np.argsort(hashes, kind="stable")
+    ordered = hashes[order]
+    head = np.ones(n, dtype=bool)
+    head[1:] = ordered[1:] != ordered[:-1]
+    rep = np.empty(n, dtype=np.int64)
+    rep[order] = order[head][np.cumsum(head) - 1]
+
+    moved = np.flatnonzero(rep != np.arange(n))
+    collided = moved[~equal(moved, rep[moved])]
+    rep[collided] = collided
+
+    is_first = np.zeros(n, dtype=bool)
+    is_first[rep] = True
+    return np.flatnonzero(is_first), (np.cumsum(is_first) - 1)[rep]
+
+
+def unique_row_pairs(baseline: np.ndarray, candidate: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct (baseline row, candidate row) pairs of two (n, k) matrices.
+
+    Returns `(first, inverse)`: the first row of each distinct pair, ascending, and for
+    every row the position of its pair in `first`, so per-pair results computed on
+    `baseline[first]` / `candidate[first]` broadcast back with `values[inverse]`.
+    """
+    if baseline.shape != candidate.shape or baseline.ndim != 2:
+        raise ValueError("baseline and candidate must be (n, k) matrices of the same shape")
+
+    k = baseline.shape[1]
+    weights = _hash_weights(2 * k)
+    b = baseline.astype(np.int64, copy=False) + 1
+    c = candidate.astype(np.int64, copy=False) + 1
+    hashes = b @ weights[:k] + c @ weights[k:]
+
+    def equal(rows: np.ndarray, reps: np.ndarray) -> np.ndarray:
+        return (baseline[rows] == baseline[reps]).all(axis=1) & (
+            candidate[rows] == candidate[reps]
+        ).all(axis=1)
+
+    return _group_rows(hashes, equal)
+
+
+def _flat_row_hashes(codes: np.ndarray, offsets: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    lengths = np.diff(offsets)
+    ranks = np.arange(len(codes)) - np.repeat(offsets[:-1], lengths)
+    sums = np.zeros(len(codes) + 1, dtype=np.int64)
+    np.cumsum((codes.astype(np.int64, copy=False) + 1) * weights[ranks], out=sums[1:])
+    return sums[offsets[1:]] - sums[offsets[:-1]]
+
+
+def flat_rows_equal(
+    codes: np.ndarray,
+    offsets: np.ndarray,
+    rows: np.ndarray,
+    other_codes: np.ndarray,
+    other_offsets: np.ndarray,
+    other_rows: np.ndarray,
+) -> np.ndarray:
+    """Whether flat row `rows[i]` of (codes, offsets) equals row `other_rows[i]` of the other."""
+    lengths = offsets[rows + 1] - offsets[rows]
+    equal = lengths == other_offsets[other_rows + 1] - other_offsets[other_rows]
+    pairs = np.flatnonzero(equal)
+    spans = lengths[pairs]
+    within = np.arange(int(spans.sum())) - np.repeat(np.cumsum(spans) - spans, spans)
+    mine = codes[np.repeat(offsets[rows[pairs]], spans) + within]
+    theirs = other_codes[np.repeat(other_offsets[other_rows[pairs]], spans) + within]
+    equal[np.repeat(pairs, spans)[mine != theirs]] = False
+    return equal
+
+
+def unique_flat_row_pairs(
+    b_codes: np.ndarray, b_offsets: np.ndarray, c_codes: np.ndarray, c_offsets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """`unique_row_pairs` for flat, padding-free rows with (n + 1) row offsets."""
+    if len(b_offsets) != len(c_offsets):
+        raise ValueError("baseline and candidate must have the same number of rows")
+
+    width = int(max(np.diff(b_offsets).max(initial=0), np.diff(c_offsets).max(initial=0)))
+    weights = _hash_weights(2 * width)
+    hashes = _flat_row_hashes(b_codes, b_offsets, weights[:width]) + _flat_row_hashes(
+        c_codes, c_offsets, weights[width:]
+    )
+
+    def equal(rows: np.ndarray, reps: np.ndarray) -> np.ndarray:
+        return flat_rows_equal(b_codes, b_offsets, rows, b_codes, b_offsets, reps) & (
+            flat_rows_equal(c_codes, c_offsets, rows, c_codes, c_offsets, reps)
+        )
+
+    return _group_rows(hashes, equal)
+
+
+def take_flat_rows(
+    codes: np.ndarray, offsets: np.ndarray, rows: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """(codes, offsets) of the given flat rows, in that order."""
+    lengths = offsets[rows + 1] - offsets[rows]
+    taken = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=taken[1:])
+    index = np.repeat(offsets[rows] - taken[:-1], lengths) + np.arange(taken[-1])
+    return codes[index], taken
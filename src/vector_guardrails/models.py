@@ -3,6 +3,8 @@ from __future__ import annotations
 from collections.abc import Mapping
 from datetime import datetime, timezone
 from enum import Enum, IntEnum
+from functools import cached_property
+from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -52,6 +54,48 @@ class ThresholdPreset(BaseModel):
 
     anchor_jaccard_warning: float = Field(0.90, ge=0.0, le=1.0)
 
+    # Rank-aware thresholds are opt-in: None disables the rule. RBO is evaluated to depth
+    # K, so lists shorter than K score below 1.0 even when unchanged (as overlap@K does).
+    rbo_warning: float | None = Field(None, ge=0.0, le=1.0)
+    rbo_critical: float | None = Field(None, ge=0.0, le=1.0)
+
+    kendall_tau_warning: float | None = Field(None, ge=-1.0, le=1.0)
+    kendall_tau_critical: float | None = Field(None, ge=-1.0, le=1.0)
+
+    weighted_overlap_warning: float | None = Field(None, ge=0.0, le=1.0)
+    weighted_overlap_critical: float | None = Field(None, ge=0.0, le=1.0)
+
+    # Latency rules (only when per-anchor latencies are given): candidate / baseline
+    # ratio of the p50, p95 and p99 query latency
+    latency_ratio_warning: float | None = Field(1.25, gt=0.0)
+    latency_ratio_critical: float | None = Field(1.5, gt=0.0)
+
+    # Score rules (only when similarity scores are given). The gap ratio is the
+    # candidate / baseline mean top-1 minus top-K score gap: near 0 means every
+    # neighbor scores alike (score collapse). Distribution shift (two-sample KS
+    # statistic of all top-K scores) is opt-in, as scores of different models differ.
+    score_gap_ratio_warning: float | None = Field(0.5, ge=0.0)
+    score_gap_ratio_critical: float | None = Field(0.25, ge=0.0)
+
+    score_shift_warning: float | None = Field(None, ge=0.0, le=1.0)
+    score_shift_critical: float | None = Field(None, ge=0.0, le=1.0)
+
+    # Graph rules (only with `graph_metrics`): candidate / baseline mutual-neighbor
+    # rate, and the share of baseline k-NN edges split across candidate components
+    reciprocity_ratio_warning: float | None = Field(0.8, ge=0.0)
+    reciprocity_ratio_critical: float | None = Field(0.6, ge=0.0)
+
+    split_edge_rate_warning: float | None = Field(0.05, ge=0.0, le=1.0)
+    split_edge_rate_critical: float | None = Field(0.15, ge=0.0, le=1.0)
+
+    # Distribution thresholds (opt-in) on the tails of the per-anchor distributions:
+    # the 5th-percentile overlap and the 95th-percentile displacement
+    overlap_p5_warning: float | None = Field(None, ge=0.0, le=1.0)
+    overlap_p5_critical: float | None = Field(None, ge=0.0, le=1.0)
+
+    displacement_p95_warning: float | None = Field(None, ge=0.0)
+    displacement_p95_critical: float | None = Field(None, ge=0.0)
+
 
 class ComparisonConfig(BaseModel):
     """Configuration for comparison behavior."""
@@ -64,13 +108,78 @@ class ComparisonConfig(BaseModel):
     require_exact_match: bool = False
     min_anchors: int = Field(10, ge=1)
 
+    # Persistence parameter for rank-biased overlap (higher = deeper lists matter more)
+    rbo_p: float = Field(0.9, gt=0.0, lt=1.0)
+
+    # Number of top rising / falling neighbor IDs kept in the frequency summary
+    frequency_top_n: int = Field(10, ge=0)
+
+    # Number of worst per-anchor latency regressions kept in the latency summary
+    latency_top_n: int = Field(10, ge=0)
+
+    # Above this K the engine switches from dense (n, K, K) kernels to sort-merge
+    # kernels over flat per-row arrays (memory and time stay ~linear in K)
+    large_k_threshold: int = Field(32, ge=1)
+
+    # k-NN graph structure (reciprocity, in-degree, components) over both snapshots;
+    # needs anchors and neighbors to share one ID space (item-to-item)
+    graph_metrics: bool = False
+
+    # Record where the metric work went (distinct list pairs, kernel time) in `report.profile`
+    profile: bool = False
+
+    # Early exit: stop evaluating anchors once the overall verdict is decided
+    fail_fast: bool = False
+    chunk_size: int = Field(4096, ge=1)
+
+    # Sequential sampling: evaluate anchors in seeded random order, stop when the
+    # churn verdict is statistically decided or `sample_budget` anchors were evaluated
+    sequential_sampling: bool = False
+    sample_seed: int = 0
+    sample_confidence: float = Field(0.95, gt=0.0, lt=1.0)
+    sample_budget: int | None = Field(None, ge=1)
+
+    # Traffic sampling (requires per-anchor weights): evaluate the heaviest anchors that
+    # cover `traffic_head_share` of total weight exactly, plus `traffic_tail_samples`
+    # weight-proportional draws from the rest (seeded by `sample_seed`)
+    traffic_sampling: bool = False
+    traffic_head_share: float = Field(0.8, ge=0.0, le=1.0)
+    traffic_tail_samples: int = Field(1000, ge=0)
+
     segment_keys: list[str] = Field(default_factory=list)
 
 
+# ---------------------------------------------------------------------------
+# Snapshot models
+# ---------------------------------------------------------------------------
+
+class SnapshotDelta(BaseModel):
+    """Changes that turn a reference snapshot into a new snapshot."""
+
+    model_config = ConfigDict(frozen=True)
+
+    format_version: int = 1
+    reference_sha256: str | None = None
+    reference_anchor_count: int = Field(ge=0)
+
+    changed: dict[str, list[str]] = Field(default_factory=dict)
+    added: dict[str, list[str]] = Field(default_factory=dict)
+    removed: list[str] = Field(default_factory=list)
+
+
 # ---------------------------------------------------------------------------
 # Report models
 # ---------------------------------------------------------------------------
 
+_SORTABLE_METRICS = (
+    "overlap",
+    "rank_displacement",
+    "rbo",
+    "kendall_tau",
+    "weighted_overlap",
+)
+
+
 class AnchorMetrics(BaseModel):
     """Per-anchor metrics and risk classification."""
 
@@ -85,6 +194,13 @@ class AnchorMetrics(BaseModel):
     baseline_only_count: int = Field(ge=0)
     candidate_only_count: int = Field(ge=0)
 
+    rbo: float | None = Field(default=None, ge=0.0, le=1.0)
+    kendall_tau: float | None = Field(default=None, ge=-1.0, le=1.0)
+    weighted_overlap: float | None = Field(default=None, ge=0.0, le=1.0)
+
+    # Values from registered metric plugins, keyed by plugin name
+    custom_metrics: dict[str, float | None] = Field(default_factory=dict)
+
     risk_level: RiskLevel
     reasons: list[str] = Field(default_factory=list)
 
@@ -121,6 +237,383 @@ class AnchorAlignmentSummary(BaseModel):
     baseline_only_anchor_sample: list[str] = Field(default_factory=list)
     candidate_only_anchor_sample: list[str] = Field(default_factory=list)
 
+class NeighborFrequencyChange(BaseModel):
+    """How often a single neighbor ID appears across all compared anchors' top-K."""
+
+    model_config = ConfigDict(frozen=True)
+
+    neighbor_id: str
+    baseline_count: int = Field(ge=0)
+    candidate_count: int = Field(ge=0)
+    delta: int
+
+
+class NeighborFrequencySummary(BaseModel):
+    """Global neighbor-frequency drift (hubness and catalog coverage)."""
+
+    model_config = ConfigDict(frozen=True)
+
+    baseline_distinct_neighbors: int = Field(ge=0)
+    candidate_distinct_neighbors: int = Field(ge=0)
+    catalog_coverage_ratio: float = Field(ge=0.0)
+
+    baseline_occurrence_skew: float
+    candidate_occurrence_skew: float
+
+    baseline_max_occurrence: int = Field(ge=0)
+    candidate_max_occurrence: int = Field(ge=0)
+
+    top_risers: list[NeighborFrequencyChange] = Field(default_factory=list)
+    top_fallers: list[NeighborFrequencyChange] = Field(default_factory=list)
+
+
+class SamplingSummary(BaseModel):
+    """Sequential-sampling estimate details (sample size, bounds, stopping reason)."""
+
+    model_config = ConfigDict(frozen=True)
+
+    seed: int
+    confidence: float = Field(gt=0.0, lt=1.0)
+
+    sample_size: int = Field(ge=0)
+    population_size: int = Field(ge=0)
+
+    churn_lower: float = Field(ge=0.0, le=1.0)
+    churn_upper: float = Field(ge=0.0, le=1.0)
+    mean_overlap_lower: float = Field(ge=0.0, le=1.0)
+    mean_overlap_upper: float = Field(ge=0.0, le=1.0)
+
+    # "decided" | "budget" | "exhausted"
+    stopped_reason: str
+
+
+class TrafficSummary(BaseModel):
+    """
+    Traffic-weighted estimates from per-anchor weights (e.g. query frequency).
+
+    When `sampled`, head anchors are exact and the tail is a Hansen-Hurwitz estimate
+    from weight-proportional draws; the std errors describe that tail estimate.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    total_weight: float = Field(gt=0.0)
+    weighted_anchors: int = Field(ge=0)
+
+    mean_overlap: float = Field(ge=0.0, le=1.0)
+    mean_displacement: float = Field(ge=0.0)
+    churn_rate: float = Field(ge=0.0, le=1.0)
+    mean_overlap_std_error: float = Field(0.0, ge=0.0)
+    churn_std_error: float = Field(0.0, ge=0.0)
+
+    # Plain per-anchor means over the evaluated anchors, for comparison
+    unweighted_mean_overlap: float = Field(ge=0.0, le=1.0)
+    unweighted_churn_rate: float = Field(ge=0.0, le=1.0)
+
+    sampled: bool = False
+    head_anchors: int = Field(0, ge=0)
+    head_weight_share: float = Field(1.0, ge=0.0, le=1.0)
+    tail_draws: int = Field(0, ge=0)
+    tail_anchors_evaluated: int = Field(0, ge=0)
+
+
+class LatencyRegression(BaseModel):
+    """One anchor's query latency in both systems."""
+
+    model_config = ConfigDict(frozen=True)
+
+    anchor_id: str
+    baseline_ms: float = Field(gt=0.0)
+    candidate_ms: float = Field(gt=0.0)
+    ratio: float = Field(gt=0.0)
+
+
+class LatencySummary(BaseModel):
+    """Query latency shift over anchors with a latency on both sides."""
+
+    model_config = ConfigDict(frozen=True)
+
+    anchors: int = Field(ge=0)
+    # Keyed "p50", "p95", "p99" (milliseconds); ratios are candidate / baseline
+    baseline_percentiles: dict[str, float] = Field(default_factory=dict)
+    candidate_percentiles: dict[str, float] = Field(default_factory=dict)
+    ratios: dict[str, float] = Field(default_factory=dict)
+    # Largest per-anchor slowdowns (ratio > 1), worst first
+    worst_regressions: list[LatencyRegression] = Field(default_factory=list)
+
+
+class ScoreSummary(BaseModel):
+    """Similarity-score shift over anchors with scores on both sides."""
+
+    model_config = ConfigDict(frozen=True)
+
+    anchors: int = Field(ge=0)
+    # Candidate minus baseline score of neighbors in both top-K lists
+    shared_neighbors: int = Field(0, ge=0)
+    mean_shared_drift: float | None = None
+    mean_abs_shared_drift: float | None = None
+    p95_abs_shared_drift: float | None = None
+    # Mean top-1 score, and mean gap between the top-1 and the last top-K score
+    baseline_mean_top1: float | None = None
+    candidate_mean_top1: float | None = None
+    baseline_mean_gap: float | None = None
+    candidate_mean_gap: float | None = None
+    gap_ratio: float | None = None
+    # Two-sample KS statistic between all baseline and candidate top-K scores
+    distribution_shift: float | None = Field(None, ge=0.0, le=1.0)
+    # Keyed "p5", "p50", "p95"
+    baseline_percentiles: dict[str, float] = Field(default_factory=dict)
+    candidate_percentiles: dict[str, float] = Field(default_factory=dict)
+
+
+class GraphStats(BaseModel):
+    """Structure of one snapshot's k-NN graph (anchor -> neighbor edges, no self-loops)."""
+
+    model_config = ConfigDict(frozen=True)
+
+    # Anchors plus every ID appearing in a top-K list
+    nodes: int = Field(ge=0)
+    anchors: int = Field(ge=0)
+    edges: int = Field(ge=0)
+    # Share of edges u -> v into anchors whose reverse edge v -> u exists
+    reciprocity: float | None = Field(None, ge=0.0, le=1.0)
+    # How many top-K lists each node appears in; keyed "p50", "p90", "p99"
+    in_degree_percentiles: dict[str, float] = Field(default_factory=dict)
+    max_in_degree: int = Field(0, ge=0)
+    # Anchors that appear in no top-K list at all
+    unreached_anchor_rate: float = Field(0.0, ge=0.0, le=1.0)
+    # Weakly connected components
+    components: int = Field(0, ge=0)
+    largest_component_share: float = Field(0.0, ge=0.0, le=1.0)
+
+
+class GraphSummary(BaseModel):
+    """k-NN graph structure drift between the two snapshots."""
+
+    model_config = ConfigDict(frozen=True)
+
+    baseline: GraphStats
+    candidate: GraphStats
+    # Candidate / baseline reciprocity
+    reciprocity_ratio: float | None = Field(None, ge=0.0)
+    # Share of baseline edges whose endpoints fall in different candidate components
+    split_edge_rate: float | None = Field(None, ge=0.0, le=1.0)
+
+
+class ProfileSummary(BaseModel):
+    """
+    Metric work of one run. Anchors with the same (baseline, candidate) list pair share
+    one computation; pairs of identical lists skip neighbor matching altogether.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    anchors: int = Field(ge=0)
+    # Distinct (baseline, candidate) list pairs the kernels actually scored
+    unique_pairs: int = Field(ge=0)
+    # Anchors whose baseline and candidate lists are identical
+    identical_pairs: int = Field(ge=0)
+    # Share of anchors whose metrics were reused from an earlier identical pair
+    dedup_hit_rate: float = Field(ge=0.0, le=1.0)
+    identical_pair_rate: float = Field(ge=0.0, le=1.0)
+    kernel_seconds: float = Field(ge=0.0)
+
+
+class FingerprintSummary(BaseModel):
+    """IDs were compared as `bits`-wide fingerprints; estimated chance that any two collided."""
+
+    model_config = ConfigDict(frozen=True)
+
+    bits: int = Field(ge=1)
+    distinct_ids: int = Field(ge=0)
+    collision_probability: float = Field(ge=0.0, le=1.0)
+
+
+class MetricDistribution(BaseModel):
+    """
+    Distribution of a per-anchor metric, from a mergeable `QuantileSketch`.
+
+    The sketch state is kept sparse: `bin_count[j]` values fell on grid point
+    `bin_index[j] / scale` (grid of `size` points). `merge_distributions` combines
+    distributions of the same metric and K, e.g. from shards or successive days.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    count: int = Field(ge=0)
+    min: float | None = None
+    max: float | None = None
+    # Keyed "p1", "p5", "p50", "p95", "p99"; empty when count == 0
+    percentiles: dict[str, float] = Field(default_factory=dict)
+    histogram_edges: list[float] = Field(default_factory=list)
+    histogram_counts: list[int] = Field(default_factory=list)
+
+    scale: int = Field(ge=1)
+    size: int = Field(ge=1)
+    bin_index: list[int] = Field(default_factory=list)
+    bin_count: list[int] = Field(default_factory=list)
+
+
+class MonitorSummary(BaseModel):
+    """Rolling-window drift state of an online `DriftMonitor`."""
+
+    model_config = ConfigDict(frozen=True)
+
+    timestamp: str = Field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat()
+    )
+
+    events_seen: int = Field(ge=0)
+    window_events: int = Field(ge=0)
+
+    mean_overlap: float = Field(ge=0.0, le=1.0)
+    mean_displacement: float = Field(ge=0.0)
+    churn_rate: float = Field(ge=0.0, le=1.0)
+    critical_anchors: int = Field(ge=0)
+    warning_anchors: int = Field(ge=0)
+    overlap_distribution: MetricDistribution | None = None
+    displacement_distribution: MetricDistribution | None = None
+
+    risk_level: RiskLevel
+    reasons: list[str] = Field(default_factory=list)
+
+    def to_exit_code(self) -> int:
+        if self.risk_level in (RiskLevel.SAFE, RiskLevel.INFO):
+            return int(ExitCode.OK)
+        if self.risk_level == RiskLevel.WARNING:
+            return int(ExitCode.WARNING)
+        return int(ExitCode.CRITICAL)
+
+
+class ComparisonProgress(BaseModel):
+    """Progress event from `compare_async` ("prepared", then "metrics" per chunk, "done")."""
+
+    model_config = ConfigDict(frozen=True)
+
+    stage: str
+    anchors_done: int = Field(ge=0)
+    anchors_total: int = Field(ge=0)
+
+
+class BatchJob(BaseModel):
+    """One (baseline, candidate) pair of a batch manifest."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str = Field(min_length=1)
+    baseline: str
+    candidate: str
+    config: ComparisonConfig = Field(default_factory=ComparisonConfig)
+
+
+class BatchPairSummary(BaseModel):
+    """Headline result of one batch pair; `error` is set (and metrics unset) on failure."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    exit_code: int
+    risk_level: RiskLevel | None = None
+    compared_anchors: int | None = Field(default=None, ge=0)
+    mean_overlap: float | None = Field(default=None, ge=0.0, le=1.0)
+    mean_displacement: float | None = Field(default=None, ge=0.0)
+    churn_rate: float | None = Field(default=None, ge=0.0, le=1.0)
+    verdict_summary: str | None = None
+    error: str | None = None
+    seconds: float = Field(ge=0.0)
+
+
+class BatchSummary(BaseModel):
+    """Combined result of a manifest run; `exit_code` is the worst pair exit code."""
+
+    model_config = ConfigDict(frozen=True)
+
+    timestamp: str = Field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat()
+    )
+
+    exit_code: int
+    pairs: list[BatchPairSummary] = Field(default_factory=list)
+    counts: dict[str, int] = Field(default_factory=dict)
+    seconds: float = Field(ge=0.0)
+
+
+class ThresholdSweep(BaseModel):
+    """
+    Verdicts of a threshold grid replayed over one report's per-anchor metrics.
+
+    Stored column-wise: entry i of every list belongs to grid combination i.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    anchors: int = Field(ge=0)
+    # Swept ThresholdPreset fields only; the others keep the report's values
+    thresholds: dict[str, list[float]] = Field(default_factory=dict)
+
+    risk_levels: list[RiskLevel] = Field(default_factory=list)
+    critical_anchors: list[int] = Field(default_factory=list)
+    warning_anchors: list[int] = Field(default_factory=list)
+    info_anchors: list[int] = Field(default_factory=list)
+    churn_rates: list[float] = Field(default_factory=list)
+
+    def preset(self, base: ThresholdPreset, i: int) -> ThresholdPreset:
+        """`base` with combination i's swept values."""
+        return base.model_copy(
+            update={name: values[i] for name, values in self.thresholds.items()}
+        )
+
+
+class NoiseProfile(BaseModel):
+    """
+    Per-anchor noise envelope observed across repeated runs of an unchanged system.
+
+    Stored column-wise (parallel lists) to keep large profiles compact.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    k: int = Field(ge=1)
+    repeats: int = Field(ge=2)
+
+    anchor_ids: list[str] = Field(default_factory=list)
+    min_overlap: list[float] = Field(default_factory=list)
+    max_displacement: list[float | None] = Field(default_factory=list)
+
+    @cached_property
+    def by_anchor(self) -> dict[str, tuple[float, float | None]]:
+        return {
+            a: (o, d)
+            for a, o, d in zip(
+                self.anchor_ids, self.min_overlap, self.max_displacement, strict=True
+            )
+        }
+
+
+class CalibrationReport(BaseModel):
+    """Noise-floor calibration from repeated snapshots of the same system."""
+
+    model_config = ConfigDict(frozen=True)
+
+    timestamp: str = Field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat()
+    )
+
+    k: int = Field(ge=1)
+    repeats: int = Field(ge=2)
+    pair_count: int = Field(ge=1)
+    calibrated_anchors: int = Field(ge=0)
+    min_anchor_jaccard: float = Field(ge=0.0, le=1.0)
+
+    # Percentiles over all (anchor, pair) observations, keyed "p1", "p5", "p50", ...
+    overlap_percentiles: dict[str, float] = Field(default_factory=dict)
+    displacement_percentiles: dict[str, float] = Field(default_factory=dict)
+    max_pair_churn: float = Field(ge=0.0, le=1.0)
+
+    suggested_thresholds: ThresholdPreset
+    noise_profile: NoiseProfile
+
+
 class AnchorIdentityMetrics(BaseModel):
     """Per-anchor identity metrics (no risk classification yet)."""
 
@@ -135,6 +628,13 @@ class AnchorIdentityMetrics(BaseModel):
     baseline_only_count: int = Field(ge=0)
     candidate_only_count: int = Field(ge=0)
 
+    rbo: float | None = Field(default=None, ge=0.0, le=1.0)
+    kendall_tau: float | None = Field(default=None, ge=-1.0, le=1.0)
+    weighted_overlap: float | None = Field(default=None, ge=0.0, le=1.0)
+
+    custom_metrics: dict[str, float | None] = Field(default_factory=dict)
+
+
 class ComparisonReport(BaseModel):
     """Full comparison report."""
 
@@ -151,13 +651,63 @@ class ComparisonReport(BaseModel):
     overall_mean_displacement: float = Field(ge=0.0)
     overall_churn_rate: float = Field(ge=0.0, le=1.0)
 
+    overall_mean_rbo: float | None = Field(default=None, ge=0.0, le=1.0)
+    overall_mean_kendall_tau: float | None = Field(default=None, ge=-1.0, le=1.0)
+    overall_mean_weighted_overlap: float | None = Field(default=None, ge=0.0, le=1.0)
+
+    # Plugin aggregates, keyed by plugin name
+    overall_custom_metrics: dict[str, float | None] = Field(default_factory=dict)
+
+    # Per-anchor distributions over the evaluated anchors (unweighted)
+    overlap_distribution: MetricDistribution | None = None
+    displacement_distribution: MetricDistribution | None = None
+
     overall_risk_level: RiskLevel
 
     anchor_metrics: list[AnchorMetrics] = Field(default_factory=list)
     segment_summaries: list[SegmentSummary] | None = None
+    neighbor_frequency: NeighborFrequencySummary | None = None
 
     verdict_summary: str
 
+    # Set when evaluation stopped early (fail-fast); metrics cover evaluated anchors only
+    partial: bool = False
+    anchors_evaluated: int | None = Field(default=None, ge=0)
+    sampling: SamplingSummary | None = None
+    fingerprint: FingerprintSummary | None = None
+    # Set when per-anchor weights were given; overall mean/churn are then traffic-weighted
+    traffic: TrafficSummary | None = None
+    # Set when per-anchor latencies were given for both snapshots
+    latency: LatencySummary | None = None
+    scores: ScoreSummary | None = None
+    # Set with `graph_metrics`
+    graph: GraphSummary | None = None
+    # Set with `profile`
+    profile: ProfileSummary | None = None
+
+    # Linear scans: the model is frozen but `anchor_metrics` is a plain list (and
+    # `model_copy` shares or replaces it), so a cached index could go stale. For
+    # repeated lookups into a large report use `IndexedReport`.
+
+    def get_anchor(self, anchor_id: str) -> AnchorMetrics | None:
+        return next((m for m in self.anchor_metrics if m.anchor_id == anchor_id), None)
+
+    def get_anchors_by_risk(
+        self, level: RiskLevel, *, sort_by: str | None = None
+    ) -> list[AnchorMetrics]:
+        """Anchors at `level`, optionally sorted ascending by a numeric metric field."""
+        level = RiskLevel(level)
+        bucket = [m for m in self.anchor_metrics if m.risk_level == level]
+        if sort_by is None:
+            return bucket
+        if sort_by not in _SORTABLE_METRICS:
+            raise ValueError(f"cannot sort by {sort_by!r}; choose from {_SORTABLE_METRICS}")
+        # Undefined values (None) sort last
+        return sorted(
+            bucket,
+            key=lambda m: (getattr(m, sort_by) is None, getattr(m, sort_by) or 0.0, m.anchor_id),
+        )
+
     def get_critical_anchors(self) -> list[AnchorMetrics]:
         return [m for m in self.anchor_metrics if m.risk_level == RiskLevel.CRITICAL]
 
@@ -170,3 +720,21 @@ class ComparisonReport(BaseModel):
         if self.overall_risk_level == RiskLevel.WARNING:
             return int(ExitCode.WARNING)
         return int(ExitCode.CRITICAL)
+
+
+class ReferenceCache(BaseModel):
+    """
+    A reference snapshot's cached self-comparison for `compare --delta`: the report, its
+    running aggregates and critical-anchor count, and the reference file's SHA-256
+    with the size and mtime it was computed for.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    format_version: int = 1
+    reference_sha256: str
+    reference_size: int = Field(ge=0)
+    reference_mtime_ns: int
+    aggregates: dict[str, Any]
+    critical_count: int = Field(ge=0)
+    report: ComparisonReport
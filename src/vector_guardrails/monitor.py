@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from typing import IO, Any
+
+import numpy as np
+
+from .interning import hash_neighbor_lists
+from .metrics import overlap_displacement_batch, rank_aware_metrics_batch
+from .models import ComparisonConfig, MonitorSummary, RiskLevel
+from .risk import anchor_risk_masks, classify_overall_risk
+from .sketch import QuantileSketch
+from .validation import validate_and_truncate_entry
+
+Event = tuple[str, list[str], list[str]]
+
+_RISK_CODES = list(RiskLevel)
+_CRITICAL = _RISK_CODES.index(RiskLevel.CRITICAL)
+_WARNING = _RISK_CODES.index(RiskLevel.WARNING)
+_INFO = _RISK_CODES.index(RiskLevel.INFO)
+
+
+class DriftMonitor:
+    """
+    Rolling-window drift monitor over a stream of (anchor_id, baseline, candidate) events.
+
+    Events are buffered into micro-batches of `batch_size` and scored with the batch
+    kernels (IDs are hashed per batch, so no vocabulary grows with the stream).
+    The last `window` scored events live in fixed-size ring buffers; summaries apply
+    the usual anchor and overall risk rules to that window.
+
+    `on_summary(summary)` fires every `summary_every` events; `on_verdict_change(previous,
+    summary)` fires whenever the window's risk level differs from the last summary's.
+    """
+
+    def __init__(
+        self,
+        config: ComparisonConfig | None = None,
+        *,
+        window: int = 10_000,
+        summary_every: int | None = None,
+        batch_size: int = 1024,
+        on_summary: Callable[[MonitorSummary], None] | None = None,
+        on_verdict_change: Callable[[RiskLevel | None, MonitorSummary], None] | None = None,
+    ) -> None:
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if summary_every is not None and summary_every < 1:
+            raise ValueError("summary_every must be >= 1")
+
+        self.config = config or ComparisonConfig()
+        self.window = window
+        self.summary_every = summary_every
+        self.batch_size = batch_size
+        self.on_summary = on_summary
+        self.on_verdict_change = on_verdict_change
+
+        self._overlap = np.zeros(window, dtype=np.float64)
+        self._displacement = np.full(window, np.nan)
+        self._risk = np.zeros(window, dtype=np.int8)
+        self._filled = 0
+        self._head = 0
+
+        self._pending_b: list[list[str]] = []
+        self._pending_c: list[list[str]] = []
+
+        self.events_seen = 0
+        self._next_summary = summary_every
+        self.risk_level: RiskLevel | None = None
+
+    def update(self, anchor_id: str, baseline: list[str], candidate: list[str]) -> None:
+        k = self.config.k
+        self._pending_b.append(validate_and_truncate_entry(anchor_id, baseline, k))
+        self._pending_c.append(validate_and_truncate_entry(anchor_id, candidate, k))
+        self.events_seen += 1
+
+        if len(self._pending_b) >= self.batch_size:
+            self._score_pending()
+        if self._next_summary is not None and self.events_seen >= self._next_summary:
+            self._next_summary += self.summary_every
+            self.summary()
+
+    def consume(self, events: Iterable[Event]) -> MonitorSummary:
+        """Feed every event, then return (and emit) a final summary."""
+        # Same as calling update() per event, with the hot loop kept free of lookups
+        k = self.config.k
+        pending_b, pending_c = self._pending_b, self._pending_c
+        for anchor_id, baseline, candidate in events:
+            pending_b.append(validate_and_truncate_entry(anchor_id, baseline, k))
+            pending_c.append(validate_and_truncate_entry(anchor_id, candidate, k))
+            self.events_seen += 1
+
+            if len(pending_b) >= self.batch_size:
+                self._score_pending()
+            if self._next_summary is not None and self.events_seen >= self._next_summary:
+                self._next_summary += self.summary_every
+                self.summary()
+        return self.summary()
+
+    def _score_pending(self) -> None:
+        if not self._pending_b:
+            return
+        cfg = self.config
+        t = cfg.thresholds
+        n = len(self._pending_b)
+        codes = hash_neighbor_lists(self._pending_b + self._pending_c, cfg.k)
+        b_codes, c_codes = codes[:n], codes[n:]
+        shared, disp = overlap_displacement_batch(b_codes, c_codes)
+        overlap = shared / float(cfg.k)
+
+        # Rank-aware metrics only matter here when one of their thresholds is set
+        rank_rules = (
+            t.rbo_warning,
+            t.rbo_critical,
+            t.kendall_tau_warning,
+            t.kendall_tau_critical,
+            t.weighted_overlap_warning,
+            t.weighted_overlap_critical,
+        )
+        if any(v is not None for v in rank_rules):
+            rbo, tau, wov = rank_aware_metrics_batch(b_codes, c_codes, p=cfg.rbo_p)
+        else:
+            rbo = tau = wov = None
+
+        critical, warning = anchor_risk_masks(
+            overlap, disp, cfg, rbo=rbo, kendall_tau=tau, weighted_overlap=wov
+        )
+        risk = np.full(n, _INFO, dtype=np.int8)
+        risk[warning] = _WARNING
+        risk[critical] = _CRITICAL
+
+        self._push(overlap, disp, risk)
+        self._pending_b.clear()
+        self._pending_c.clear()
+
+    def _push(self, overlap: np.ndarray, disp: np.ndarray, risk: np.ndarray) -> None:
+        # Only the newest `window` values of a large batch survive anyway
+        if len(overlap) > self.window:
+            keep = slice(-self.window, None)
+            overlap, disp, risk = overlap[keep], disp[keep], risk[keep]
+        n = len(overlap)
+        slots = (self._head + np.arange(n)) % self.window
+        self._overlap[slots] = overlap
+        self._displacement[slots] = disp
+        self._risk[slots] = risk
+        self._head = (self._head + n) % self.window
+        self._filled = min(self.window, self._filled + n)
+
+    def summary(self) -> MonitorSummary:
+        """Score buffered events and summarize the current window."""
+        self._score_pending()
+        cfg = self.config
+        n = self._filled
+        overlap = self._overlap[:n]
+        disp = self._displacement[:n]
+        risk = self._risk[:n]
+
+        defined = disp[~np.isnan(disp)]
+        churn = float((overlap < cfg.thresholds.overlap_warning).mean()) if n else 0.0
+        critical = int((risk == _CRITICAL).sum())
+
+        overlap_sketch = QuantileSketch.for_overlap(cfg.k)
+        overlap_sketch.add(overlap)
+        displacement_sketch = QuantileSketch.for_displacement(cfg.k)
+        displacement_sketch.add(defined)
+        overlap_distribution = overlap_sketch.to_distribution()
+        displacement_distribution = displacement_sketch.to_distribution()
+
+        # Alignment is not observable per event; the stream only carries paired anchors
+        level, reasons = classify_overall_risk(
+            churn_rate=churn,
+            anchor_jaccard=1.0,
+            cfg=cfg,
+            any_anchor_critical=critical > 0,
+            overlap_distribution=overlap_distribution,
+            displacement_distribution=displacement_distribution,
+        )
+        summary = MonitorSummary(
+            events_seen=self.events_seen,
+            window_events=n,
+            mean_overlap=float(overlap.mean()) if n else 0.0,
+            mean_displacement=float(defined.mean()) if defined.size else 0.0,
+            churn_rate=churn,
+            critical_anchors=critical,
+            warning_anchors=int((risk == _WARNING).sum()),
+            overlap_distribution=overlap_distribution,
+            displacement_distribution=displacement_distribution,
+            risk_level=level,
+            reasons=reasons,
+        )
+
+        if self.on_summary is not None:
+            self.on_summary(summary)
+        if level != self.risk_level:
+            previous, self.risk_level = self.risk_level, level
+            if self.on_verdict_change is not None:
+                self.on_verdict_change(previous, summary)
+        return summary
+
+
+def _as_event(raw: Any) -> Event:
+    if isinstance(raw, dict):
+        return raw["anchor_id"], raw["baseline"], raw["candidate"]
+    if isinstance(raw, list) and len(raw) == 3:
+        return raw[0], raw[1], raw[2]
+    raise ValueError(f"unrecognized event: {str(raw)[:80]!r}")
+
+
+def parse_event(line: str) -> Event:
+    """One NDJSON event: {"anchor_id", "baseline", "candidate"} or [anchor_id, b, c]."""
+    return _as_event(json.loads(line))
+
+
+def parse_events(lines: list[str]) -> list[Event]:
+    """Decode a block of NDJSON lines with one `json.loads` call (much faster per event)."""
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return []
+    try:
+        raw = json.loads("[" + ",".join(lines) + "]")
+    except json.JSONDecodeError:
+        return [parse_event(line) for line in lines]  # re-raise on the offending line
+    return [_as_event(item) for item in raw]
+
+
+def iter_events(stream: IO[str], *, block_lines: int = 256) -> Iterator[Event]:
+    """
+    Events from an NDJSON text stream (stdin or an open file); blank lines skipped.
+
+    Lines are decoded `block_lines` at a time; use 1 for low-rate interactive input.
+    """
+    while True:
+        block = list(islice(stream, block_lines))
+        if not block:
+            return
+        yield from parse_events(block)
+
+
+def follow_events(
+    path: str,
+    *,
+    poll_interval: float = 0.2,
+    idle_timeout: float | None = None,
+    block_lines: int = 256,
+) -> Iterator[Event]:
+    """
+    Tail an NDJSON file like `tail -f`: yield existing and newly appended events.
+
+    Stops after `idle_timeout` seconds without new data (None = follow forever).
+    Partial trailing lines are held back until their newline arrives.
+    """
+    with open(path, encoding="utf-8") as f:
+        partial = ""
+        block: list[str] = []
+        idle_since = time.monotonic()
+        while True:
+            line = f.readline()
+            if line:
+                partial += line
+                if partial.endswith("\n"):
+                    block.append(partial)
+                    partial = ""
+                    if len(block) >= block_lines:
+                        yield from parse_events(block)
+                        block = []
+                idle_since = time.monotonic()
+                continue
+            if block:
+                yield from parse_events(block)
+                block = []
+            if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                return
+            time.sleep(poll_interval)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+import numpy as np
+
+from vector_guardrails.interning import VocabLookup
+
+
+class MetricBatch:
+    """
+    One slice of the aligned engine pass, as handed to metric plugins.
+
+    `baseline` / `candidate` are (n, k) int64 matrices of neighbor codes (PAD = -1)
+    for `anchor_ids`, in the same row order. `id_lookup[code]` is the neighbor ID for
+    a code; build per-ID attribute arrays from it and index them with the matrices.
+    The engine passes one `VocabLookup` shared by all batches of a run.
+    """
+
+    __slots__ = ("anchor_ids", "baseline", "candidate", "_vocab", "_id_lookup")
+
+    def __init__(
+        self,
+        anchor_ids: Sequence[str],
+        baseline: np.ndarray,
+        candidate: np.ndarray,
+        vocab: dict[str, int] | None = None,
+        id_lookup: Sequence[str] | None = None,
+    ) -> None:
+        self.anchor_ids = anchor_ids
+        self.baseline = baseline
+        self.candidate = candidate
+        self._vocab = vocab
+        self._id_lookup = id_lookup
+
+    @property
+    def id_lookup(self) -> Sequence[str]:
+        # Materialized on first use only, so plugins that ignore IDs cost nothing
+        if self._id_lookup is None:
+            self._id_lookup = VocabLookup(self._vocab or {})
+        return self._id_lookup
+
+
+class BatchMetric(ABC):
+    """
+    Base class for custom per-anchor metrics computed inside the engine pass.
+
+    Subclasses set `name` and implement `compute`, returning one float per row of the
+    batch (NaN where undefined). `compute` must depend only on its batch: the engine
+    may call it on any slicing of the anchors, in any order or concurrently.
+
+    Optional `warning` / `critical` thresholds feed per-anchor risk classification:
+    values below them escalate risk, or above them when `higher_is_worse` is True.
+    """
+
+    name: str = ""
+    warning: float | None = None
+    critical: float | None = None
+    higher_is_worse: bool = False
+
+    @abstractmethod
+    def compute(self, batch: MetricBatch) -> np.ndarray:
+        """One float per row of `batch` (NaN where undefined)."""
+
+    def aggregate(self, values: np.ndarray) -> float | None:
+        """Overall value from all per-anchor values (default: mean, ignoring NaN)."""
+        defined = values[~np.isnan(values)]
+        return float(defined.mean()) if defined.size else None
+
+
+_BUILTIN_NAMES = frozenset(
+    {"overlap", "rank_displacement", "rbo", "kendall_tau", "weighted_overlap"}
+)
+_REGISTRY: dict[str, BatchMetric] = {}
+
+
+def register_metric(metric: BatchMetric) -> None:
+    """Add a plugin to every subsequent comparison."""
+    if not metric.name:
+        raise ValueError("metric plugins must define a non-empty name")
+    if metric.name in _BUILTIN_NAMES:
+        raise ValueError(f"metric name clashes with a built-in metric: {metric.name!r}")
+    if metric.name in _REGISTRY:
+        raise ValueError(f"metric already registered: {metric.name!r}")
+    _REGISTRY[metric.name] = metric
+
+
+def unregister_metric(name: str) -> None:
+    if _REGISTRY.pop(name, None) is None:
+        raise ValueError(f"metric not registered: {name!r}")
+
+
+def registered_metrics() -> list[BatchMetric]:
+    return list(_REGISTRY.values())
+
+
+def run_metric_plugins(batch: MetricBatch) -> dict[str, np.ndarray]:
+    """Per-anchor float64 columns from every registered plugin for one batch."""
+    n = len(batch.anchor_ids)
+    columns: dict[str, np.ndarray] = {}
+    for metric in _REGISTRY.values():
+        values = np.asarray(metric.compute(batch), dtype=np.float64)
+        if values.shape != (n,):
+            raise ValueError(
+                f"metric {metric.name!r} returned shape {values.shape}, expected ({n},)"
+            )
+        columns[metric.name] = values
+    return columns
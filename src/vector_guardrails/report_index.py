@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .fingerprint import fingerprint
+from .io import dump_json, load_json
+from .models import AnchorMetrics, ComparisonReport, RiskLevel
+
+# On-disk layout (one directory):
+#   report.json          report without anchor_metrics (+ index metadata)
+#   <column>.npy         one numeric column per AnchorMetrics field (NaN = None)
+#   custom-<i>.npy       one column per metric plugin (names listed in report.json)
+#   risk.npy             int8 risk code per row (position in _RISK_CODES)
+#   ids.npy, ids_off.npy UTF-8 anchor IDs concatenated, with (n + 1) offsets
+#   reasons.npy, reasons_off.npy   JSON-encoded reason lists, same scheme
+#   hash_keys.npy, hash_rows.npy   open-addressing anchor_id -> row table
+#   risk_order.npy       rows grouped by risk level, each bucket sorted by overlap
+#   overlap_order.npy    all rows sorted by overlap (worst first)
+
+_FORMAT_VERSION = 1
+_RISK_CODES = list(RiskLevel)
+_FLOAT_COLUMNS = ("overlap", "rank_displacement", "rbo", "kendall_tau", "weighted_overlap")
+_INT_COLUMNS = ("shared_count", "baseline_only_count", "candidate_only_count")
+_EMPTY = np.int64(-1)
+
+
+def _pack_strings(values: list[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum([len(v) for v in values], out=offsets[1:])
+    blob = np.frombuffer(b"".join(values), dtype=np.uint8)
+    return blob, offsets
+
+
+def _table_size(n: int) -> int:
+    size = 8
+    while size < 2 * n:
+        size *= 2
+    return size
+
+
+def save_indexed_report(report: ComparisonReport, path: str) -> None:
+    """Persist `report` as memory-mappable columns plus an anchor_id hash index."""
+    out = Path(path)
+    out.mkdir(parents=True, exist_ok=True)
+    rows = report.anchor_metrics
+    n = len(rows)
+
+    for name in _FLOAT_COLUMNS:
+        values = [getattr(m, name) for m in rows]
+        column = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        np.save(out / f"{name}.npy", column)
+    for name in _INT_COLUMNS:
+        np.save(out / f"{name}.npy", np.array([getattr(m, name) for m in rows], dtype=np.int64))
+    custom_names = sorted({name for m in rows for name in m.custom_metrics})
+    for i, name in enumerate(custom_names):
+        values = [m.custom_metrics.get(name) for m in rows]
+        np.save(out / f"custom-{i}.npy", np.array(values, dtype=np.float64))
+
+    risk = np.array([_RISK_CODES.index(m.risk_level) for m in rows], dtype=np.int8)
+    np.save(out / "risk.npy", risk)
+
+    id_bytes = [m.anchor_id.encode("utf-8") for m in rows]
+    ids, ids_off = _pack_strings(id_bytes)
+    np.save(out / "ids.npy", ids)
+    np.save(out / "ids_off.npy", ids_off)
+
+    reasons, reasons_off = _pack_strings(
+        [json.dumps(m.reasons, ensure_ascii=False).encode("utf-8") for m in rows]
+    )
+    np.save(out / "reasons.npy", reasons)
+    np.save(out / "reasons_off.npy", reasons_off)
+
+    # Linear-probing hash table: slot -> (hash, row)
+    size = _table_size(n)
+    keys = np.zeros(size, dtype=np.int64)
+    slots = np.full(size, _EMPTY, dtype=np.int64)
+    # `fingerprint` is process-independent (Python's str hash is salted per process)
+    for row, m in enumerate(rows):
+        h = fingerprint(m.anchor_id)
+        slot = h & (size - 1)
+        while slots[slot] != _EMPTY:
+            slot = (slot + 1) & (size - 1)
+        keys[slot] = h
+        slots[slot] = row
+    np.save(out / "hash_keys.npy", keys)
+    np.save(out / "hash_rows.npy", slots)
+
+    overlap = np.array([m.overlap for m in rows], dtype=np.float64)
+    row_ids = np.arange(n)
+    risk_order = np.lexsort((row_ids, overlap, risk))
+    np.save(out / "risk_order.npy", risk_order.astype(np.int64))
+    np.save(out / "overlap_order.npy", np.lexsort((row_ids, overlap)).astype(np.int64))
+
+    bucket_bounds = np.searchsorted(risk[risk_order], np.arange(len(_RISK_CODES) + 1))
+    meta = report.model_dump(mode="json", exclude={"anchor_metrics"})
+    meta["index"] = {
+        "format_version": _FORMAT_VERSION,
+        "anchor_count": n,
+        "custom_metrics": custom_names,
+        "risk_bounds": {
+            level.value: [int(bucket_bounds[i]), int(bucket_bounds[i + 1])]
+            for i, level in enumerate(_RISK_CODES)
+        },
+    }
+    dump_json(str(out / "report.json"), meta)
+
+
+class IndexedReport:
+    """
+    Read-only view over a report saved with `save_indexed_report`.
+
+    Columns are memory-mapped, so opening is O(1) regardless of size; lookups by
+    anchor_id are O(1) and per-risk views are contiguous slices of a presorted order.
+    """
+
+    def __init__(self, path: str) -> None:
+        root = Path(path)
+        meta = load_json(str(root / "report.json"))
+        index = meta.pop("index")
+        if index.get("format_version") != _FORMAT_VERSION:
+            raise ValueError(f"unsupported indexed report version: {index.get('format_version')}")
+
+        self.path = root
+        self.summary = ComparisonReport.model_validate({**meta, "anchor_metrics": []})
+        self._count = int(index["anchor_count"])
+        self._risk_bounds = {RiskLevel(k): tuple(v) for k, v in index["risk_bounds"].items()}
+
+        def load(name: str) -> np.ndarray:
+            return np.load(root / f"{name}.npy", mmap_mode="r")
+
+        self._columns = {name: load(name) for name in (*_FLOAT_COLUMNS, *_INT_COLUMNS)}
+        self._custom = {
+            name: load(f"custom-{i}") for i, name in enumerate(index.get("custom_metrics", []))
+        }
+        self._risk = load("risk")
+        self._ids, self._ids_off = load("ids"), load("ids_off")
+        self._reasons, self._reasons_off = load("reasons"), load("reasons_off")
+        self._hash_keys, self._hash_rows = load("hash_keys"), load("hash_rows")
+        self._risk_order = load("risk_order")
+        self._overlap_order = load("overlap_order")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _anchor_id(self, row: int) -> str:
+        return bytes(self._ids[self._ids_off[row] : self._ids_off[row + 1]]).decode("utf-8")
+
+    def _row(self, row: int) -> AnchorMetrics:
+        def opt(name: str, columns: dict[str, np.ndarray] = self._columns) -> float | None:
+            value = float(columns[name][row])
+            return None if np.isnan(value) else value
+
+        raw_reasons = bytes(self._reasons[self._reasons_off[row] : self._reasons_off[row + 1]])
+        return AnchorMetrics(
+            anchor_id=self._anchor_id(row),
+            overlap=float(self._columns["overlap"][row]),
+            rank_displacement=opt("rank_displacement"),
+            shared_count=int(self._columns["shared_count"][row]),
+            baseline_only_count=int(self._columns["baseline_only_count"][row]),
+            candidate_only_count=int(self._columns["candidate_only_count"][row]),
+            rbo=opt("rbo"),
+            kendall_tau=opt("kendall_tau"),
+            weighted_overlap=opt("weighted_overlap"),
+            custom_metrics={name: opt(name, self._custom) for name in self._custom},
+            risk_level=_RISK_CODES[int(self._risk[row])],
+            reasons=json.loads(raw_reasons.decode("utf-8")),
+        )
+
+    def row_of(self, anchor_id: str) -> int | None:
+        h = fingerprint(anchor_id)
+        mask = len(self._hash_rows) - 1
+        slot = h & mask
+        while True:
+            row = int(self._hash_rows[slot])
+            if row == _EMPTY:
+                return None
+            if int(self._hash_keys[slot]) == h and self._anchor_id(row) == anchor_id:
+                return row
+            slot = (slot + 1) & mask
+
+    def get(self, anchor_id: str) -> AnchorMetrics | None:
+        row = self.row_of(anchor_id)
+        return None if row is None else self._row(row)
+
+    def count(self, level: RiskLevel) -> int:
+        start, stop = self._risk_bounds[RiskLevel(level)]
+        return stop - start
+
+    def anchors_at_risk(
+        self, level: RiskLevel, *, offset: int = 0, limit: int | None = None
+    ) -> list[AnchorMetrics]:
+        """Anchors at `level`, worst overlap first, paged by offset/limit."""
+        start, stop = self._risk_bounds[RiskLevel(level)]
+        begin = min(stop, start + offset)
+        end = stop if limit is None else min(stop, begin + limit)
+        return [self._row(int(r)) for r in self._risk_order[begin:end]]
+
+    def worst_by_overlap(self, *, offset: int = 0, limit: int | None = None) -> list[AnchorMetrics]:
+        end = None if limit is None else offset + limit
+        return [self._row(int(r)) for r in self._overlap_order[offset:end]]
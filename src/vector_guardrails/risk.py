@@ -1,10 +1,69 @@
 from __future__ import annotations
 
-from vector_guardrails.models import ComparisonConfig, RiskLevel
+from collections.abc import Mapping
+
+import numpy as np
+
+from vector_guardrails.models import (
+    ComparisonConfig,
+    GraphSummary,
+    LatencySummary,
+    MetricDistribution,
+    RiskLevel,
+    ScoreSummary,
+)
+from vector_guardrails.plugins import registered_metrics
+
+
+def _apply_floor_rule(
+    level: RiskLevel,
+    reasons: list[str],
+    name: str,
+    value: float | None,
+    warning: float | None,
+    critical: float | None,
+) -> RiskLevel:
+    """Escalate `level` when a lower-is-worse metric falls below an (optional) threshold."""
+    if value is None:
+        return level
+    if critical is not None and value < critical:
+        reasons.append(f"{name} below CRITICAL threshold ({value:.2f} < {critical:.2f})")
+        return RiskLevel.CRITICAL
+    if warning is not None and value < warning:
+        reasons.append(f"{name} below WARNING threshold ({value:.2f} < {warning:.2f})")
+        return RiskLevel.WARNING if level != RiskLevel.CRITICAL else level
+    return level
+
+
+def _apply_ceiling_rule(
+    level: RiskLevel,
+    reasons: list[str],
+    name: str,
+    value: float | None,
+    warning: float | None,
+    critical: float | None,
+) -> RiskLevel:
+    """Escalate `level` when a higher-is-worse metric rises above an (optional) threshold."""
+    if value is None:
+        return level
+    if critical is not None and value > critical:
+        reasons.append(f"{name} above CRITICAL threshold ({value:.2f} > {critical:.2f})")
+        return RiskLevel.CRITICAL
+    if warning is not None and value > warning:
+        reasons.append(f"{name} above WARNING threshold ({value:.2f} > {warning:.2f})")
+        return RiskLevel.WARNING if level != RiskLevel.CRITICAL else level
+    return level
 
 
 def classify_anchor_risk(
-    overlap: float, displacement: float | None, cfg: ComparisonConfig
+    overlap: float,
+    displacement: float | None,
+    cfg: ComparisonConfig,
+    *,
+    rbo: float | None = None,
+    kendall_tau: float | None = None,
+    weighted_overlap: float | None = None,
+    custom_metrics: Mapping[str, float | None] | None = None,
 ) -> tuple[RiskLevel, list[str]]:
     t = cfg.thresholds
     reasons: list[str] = []
@@ -39,6 +98,33 @@ def classify_anchor_risk(
                 f"({displacement:.2f} > {t.displacement_warning:.2f})"
             )
 
+    # Rank-aware rules (opt-in; thresholds default to None)
+    level = _apply_floor_rule(level, reasons, "rbo", rbo, t.rbo_warning, t.rbo_critical)
+    level = _apply_floor_rule(
+        level, reasons, "kendall tau", kendall_tau, t.kendall_tau_warning, t.kendall_tau_critical
+    )
+    level = _apply_floor_rule(
+        level,
+        reasons,
+        "weighted overlap",
+        weighted_overlap,
+        t.weighted_overlap_warning,
+        t.weighted_overlap_critical,
+    )
+
+    # Plugin-declared thresholds
+    if custom_metrics:
+        for metric in registered_metrics():
+            rule = _apply_ceiling_rule if metric.higher_is_worse else _apply_floor_rule
+            level = rule(
+                level,
+                reasons,
+                metric.name,
+                custom_metrics.get(metric.name),
+                metric.warning,
+                metric.critical,
+            )
+
     # If SAFE but we computed metrics, INFO is fine (you can keep SAFE too)
     if level == RiskLevel.SAFE:
         level = RiskLevel.INFO
@@ -46,11 +132,49 @@ def classify_anchor_risk(
     return level, reasons
 
 
+def anchor_risk_masks(
+    overlap: np.ndarray,
+    displacement: np.ndarray,
+    cfg: ComparisonConfig,
+    *,
+    rbo: np.ndarray | None = None,
+    kendall_tau: np.ndarray | None = None,
+    weighted_overlap: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized `classify_anchor_risk` levels (no reasons, no plugin rules): boolean
+    (critical, warning) masks, with warning excluding critical. NaN stands for an
+    undefined metric, like None in the scalar rules; all other anchors are INFO.
+    """
+    t = cfg.thresholds
+    critical = (overlap < t.overlap_critical) | (displacement > t.displacement_critical)
+    warning = (overlap < t.overlap_warning) | (displacement > t.displacement_warning)
+    floor_rules = (
+        (rbo, t.rbo_warning, t.rbo_critical),
+        (kendall_tau, t.kendall_tau_warning, t.kendall_tau_critical),
+        (weighted_overlap, t.weighted_overlap_warning, t.weighted_overlap_critical),
+    )
+    for values, warn_at, critical_at in floor_rules:
+        if values is None:
+            continue
+        if critical_at is not None:
+            critical |= values < critical_at
+        if warn_at is not None:
+            warning |= values < warn_at
+    return critical, warning & ~critical
+
+
 def classify_overall_risk(
     churn_rate: float,
     anchor_jaccard: float,
     cfg: ComparisonConfig,
     any_anchor_critical: bool,
+    *,
+    overlap_distribution: MetricDistribution | None = None,
+    displacement_distribution: MetricDistribution | None = None,
+    latency: LatencySummary | None = None,
+    scores: ScoreSummary | None = None,
+    graph: GraphSummary | None = None,
 ) -> tuple[RiskLevel, list[str]]:
     t = cfg.thresholds
     reasons: list[str] = []
@@ -73,6 +197,76 @@ def classify_overall_risk(
     else:
         level = RiskLevel.INFO
 
+    # Distribution (tail) rules, opt-in
+    if overlap_distribution is not None:
+        level = _apply_floor_rule(
+            level,
+            reasons,
+            "p5 overlap",
+            overlap_distribution.percentiles.get("p5"),
+            t.overlap_p5_warning,
+            t.overlap_p5_critical,
+        )
+    if displacement_distribution is not None:
+        level = _apply_ceiling_rule(
+            level,
+            reasons,
+            "p95 displacement",
+            displacement_distribution.percentiles.get("p95"),
+            t.displacement_p95_warning,
+            t.displacement_p95_critical,
+        )
+
+    # Performance regressions gate alongside semantic drift
+    if latency is not None:
+        for percentile, ratio in latency.ratios.items():
+            level = _apply_ceiling_rule(
+                level,
+                reasons,
+                f"{percentile} latency ratio",
+                ratio,
+                t.latency_ratio_warning,
+                t.latency_ratio_critical,
+            )
+
+    # Score collapse: top-1 and top-K scores converge
+    if scores is not None:
+        level = _apply_floor_rule(
+            level,
+            reasons,
+            "top-1/top-K score gap ratio",
+            scores.gap_ratio,
+            t.score_gap_ratio_warning,
+            t.score_gap_ratio_critical,
+        )
+        level = _apply_ceiling_rule(
+            level,
+            reasons,
+            "score distribution shift",
+            scores.distribution_shift,
+            t.score_shift_warning,
+            t.score_shift_critical,
+        )
+
+    # Graph fragmentation: mutual neighbors vanish, clusters split
+    if graph is not None:
+        level = _apply_floor_rule(
+            level,
+            reasons,
+            "reciprocity ratio",
+            graph.reciprocity_ratio,
+            t.reciprocity_ratio_warning,
+            t.reciprocity_ratio_critical,
+        )
+        level = _apply_ceiling_rule(
+            level,
+            reasons,
+            "split edge rate",
+            graph.split_edge_rate,
+            t.split_edge_rate_warning,
+            t.split_edge_rate_critical,
+        )
+
     # Anchor mismatch (alignment signal)
     if anchor_jaccard < t.anchor_jaccard_warning:
         reasons.append(
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from .models import RiskLevel, ThresholdPreset
+
+
+def sample_order(population: int, seed: int) -> np.ndarray:
+    """Seeded random evaluation order over anchor positions (reproducible)."""
+    return np.random.default_rng(seed).permutation(population)
+
+
+def look_alpha(confidence: float, look: int) -> float:
+    """
+    Error budget for the `look`-th interim check (1-based).
+
+    Spending alpha / (look * (look + 1)) sums to alpha over all looks, so the
+    bounds stay valid even though we check them after every chunk.
+    """
+    alpha = 1.0 - confidence
+    return alpha / (look * (look + 1))
+
+
+def serfling_radius(sample_size: int, population: int, alpha: float) -> float:
+    """
+    Two-sided Hoeffding-Serfling radius for the mean of [0, 1] values sampled
+    without replacement; 0 once the whole population is sampled (exact).
+    """
+    if sample_size <= 0:
+        return 1.0
+    if sample_size >= population:
+        return 0.0
+    fpc = max(0.0, 1.0 - (sample_size - 1) / float(population))
+    return math.sqrt(fpc * math.log(2.0 / alpha) / (2.0 * sample_size))
+
+
+def bounded_interval(estimate: float, radius: float) -> tuple[float, float]:
+    return max(0.0, estimate - radius), min(1.0, estimate + radius)
+
+
+def decided_churn_level(lower: float, upper: float, t: ThresholdPreset) -> RiskLevel | None:
+    """The churn verdict if the interval lies entirely within one region, else None."""
+    if lower > t.churn_critical:
+        return RiskLevel.CRITICAL
+    if lower > t.churn_warning and upper <= t.churn_critical:
+        return RiskLevel.WARNING
+    if upper <= t.churn_warning:
+        return RiskLevel.INFO
+    return None
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+
+import numpy as np
+
+from .interning import encode_neighbor_lists_flat
+from .models import ScoreSummary
+
+SCORE_PERCENTILES = (5, 50, 95)
+
+
+class SnapshotScores:
+    """
+    Similarity scores carried next to a snapshot: one float32 column with every
+    neighbor's score (anchors in snapshot order, neighbors in rank order) plus
+    per-anchor row offsets.
+
+    Costs 4 bytes per neighbor; the snapshot itself stays IDs only, so ID-only
+    comparisons are unaffected.
+    """
+
+    __slots__ = ("index", "values", "offsets")
+
+    def __init__(
+        self, anchor_ids: Iterable[str], values: np.ndarray, lengths: np.ndarray
+    ) -> None:
+        self.index = {anchor_id: i for i, anchor_id in enumerate(anchor_ids)}
+        lengths = np.asarray(lengths, dtype=np.int64)
+        if lengths.ndim != 1 or len(lengths) != len(self.index):
+            raise ValueError(
+                f"expected one score row length per anchor ({len(self.index)}), "
+                f"got shape {lengths.shape}"
+            )
+        if (lengths < 0).any():
+            raise ValueError("score row lengths must be >= 0")
+        self.offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+
+        values = np.asarray(values, dtype=np.float32)
+        if values.ndim != 1 or len(values) != self.offsets[-1]:
+            raise ValueError(
+                f"expected {int(self.offsets[-1])} scores for the given row lengths, "
+                f"got shape {values.shape}"
+            )
+        if not np.isfinite(values).all():
+            raise ValueError("scores must be finite")
+        self.values = values
+
+    @classmethod
+    def from_mapping(cls, scores: Mapping[str, Sequence[float]]) -> SnapshotScores:
+        """Columns from {anchor_id: [score per neighbor, in rank order]}."""
+        rows = list(scores.values())
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        values = np.concatenate([np.asarray(r, dtype=np.float32) for r in rows] or [[]])
+        return cls(scores.keys(), values.astype(np.float32), lengths)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, anchor_id: object) -> bool:
+        return anchor_id in self.index
+
+    def row(self, anchor_id: str) -> np.ndarray:
+        """`anchor_id`'s scores in rank order (a view into the column)."""
+        i = self.index[anchor_id]
+        return self.values[self.offsets[i] : self.offsets[i + 1]]
+
+    def top_k(self, anchor_ids: Sequence[str], k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Flat top-`k` scores of `anchor_ids`, in that order, plus (n + 1) row offsets."""
+        rows = np.fromiter(map(self.index.__getitem__, anchor_ids), np.int64, len(anchor_ids))
+        starts = self.offsets[rows]
+        lengths = np.minimum(self.offsets[rows + 1] - starts, k)
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return self.values[positions], offsets
+
+
+def _check_rows(
+    side: str, anchor_ids: Sequence[str], score_offsets: np.ndarray, list_offsets: np.ndarray
+) -> None:
+    mismatch = np.flatnonzero(np.diff(score_offsets) != np.diff(list_offsets))
+    if mismatch.size:
+        i = int(mismatch[0])
+        raise ValueError(
+            f"{side} scores for anchor_id={anchor_ids[i]!r} cover "
+            f"{int(score_offsets[i + 1] - score_offsets[i])} neighbors, but its top-K list "
+            f"has {int(list_offsets[i + 1] - list_offsets[i])}"
+        )
+
+
+def _ends(values: np.ndarray, offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Top-1 scores of non-empty rows, and top-1 minus last score of rows with 2+ items."""
+    lengths = np.diff(offsets)
+    starts = offsets[:-1]
+    top1 = values[starts[lengths > 0]].astype(np.float64)
+    multi = lengths > 1
+    gaps = values[starts[multi]].astype(np.float64) - values[offsets[1:][multi] - 1]
+    return top1, gaps
+
+
+def ks_statistic(a: np.ndarray, b: np.ndarray) -> float:
+    """Two-sample Kolmogorov-Smirnov statistic: largest gap between the empirical CDFs."""
+    a = np.sort(a)
+    b = np.sort(b)
+    grid = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, grid, side="right") / len(a)
+    cdf_b = np.searchsorted(b, grid, side="right") / len(b)
+    return float(np.abs(cdf_a - cdf_b).max())
+
+
+def _mean(values: np.ndarray) -> float | None:
+    return float(values.mean()) if values.size else None
+
+
+def _percentiles(values: np.ndarray) -> dict[str, float]:
+    if not values.size:
+        return {}
+    pct = np.percentile(values.astype(np.float64), SCORE_PERCENTILES, method="inverted_cdf")
+    return {f"p{q}": v for q, v in zip(SCORE_PERCENTILES, pct.tolist(), strict=True)}
+
+
+def score_summary(
+    baseline: Mapping[str, Sequence[str]],
+    candidate: Mapping[str, Sequence[str]],
+    baseline_scores: SnapshotScores,
+    candidate_scores: SnapshotScores,
+    anchor_ids: Iterable[str],
+    k: int,
+) -> ScoreSummary:
+    """
+    Score drift over `anchor_ids` that have scores on both sides.
+
+    Each anchor's score row must cover its top-`k` list exactly (scores for longer
+    lists are truncated alongside). Shared neighbors are matched by ID across the two
+    lists, so rank changes do not count as score drift.
+    """
+    ids = [a for a in anchor_ids if a in baseline_scores and a in candidate_scores]
+    if not ids:
+        return ScoreSummary(anchors=0)
+
+    vocab: dict[str, int] = {}
+    b_codes, b_offsets = encode_neighbor_lists_flat([baseline[a] for a in ids], k, vocab)
+    c_codes, c_offsets = encode_neighbor_lists_flat([candidate[a] for a in ids], k, vocab)
+    b_values, b_score_offsets = baseline_scores.top_k(ids, k)
+    c_values, c_score_offsets = candidate_scores.top_k(ids, k)
+    _check_rows("baseline", ids, b_score_offsets, b_offsets)
+    _check_rows("candidate", ids, c_score_offsets, c_offsets)
+
+    # Shared neighbors: equal (row, code) keys on both sides
+    n = len(ids)
+    width = max(len(vocab), 1)
+    b_keys = np.repeat(np.arange(n, dtype=np.int64), np.diff(b_offsets)) * width + b_codes
+    c_keys = np.repeat(np.arange(n, dtype=np.int64), np.diff(c_offsets)) * width + c_codes
+    _, b_pos, c_pos = np.intersect1d(b_keys, c_keys, return_indices=True)
+    drift = c_values[c_pos].astype(np.float64) - b_values[b_pos]
+    abs_drift = np.abs(drift)
+
+    b_top1, b_gaps = _ends(b_values, b_offsets)
+    c_top1, c_gaps = _ends(c_values, c_offsets)
+    b_gap = _mean(b_gaps)
+    c_gap = _mean(c_gaps)
+
+    return ScoreSummary(
+        anchors=n,
+        shared_neighbors=len(drift),
+        mean_shared_drift=_mean(drift),
+        mean_abs_shared_drift=_mean(abs_drift),
+        p95_abs_shared_drift=(
+            float(np.percentile(abs_drift, 95, method="inverted_cdf")) if drift.size else None
+        ),
+        baseline_mean_top1=_mean(b_top1),
+        candidate_mean_top1=_mean(c_top1),
+        baseline_mean_gap=b_gap,
+        candidate_mean_gap=c_gap,
+        gap_ratio=c_gap / b_gap if b_gap and c_gap is not None else None,
+        distribution_shift=(
+            ks_statistic(b_values, c_values) if b_values.size and c_values.size else None
+        ),
+        baseline_percentiles=_percentiles(b_values),
+        candidate_percentiles=_percentiles(c_values),
+    )
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from .models import MetricDistribution
+
+PERCENTILES = (1, 5, 50, 95, 99)
+
+# Displacement resolution (bins per rank position); quantiles are within half a bin
+DISPLACEMENT_BINS_PER_RANK = 20
+
+HISTOGRAM_BINS = 10
+
+
+def hist_percentiles(
+    counts: np.ndarray, values: np.ndarray, qs: Sequence[int]
+) -> dict[str, float]:
+    """Percentiles ("p1", "p50", ...) from a histogram of `values` with `counts`."""
+    total = counts.sum()
+    if total == 0:
+        return {}
+    cdf = np.cumsum(counts)
+    return {
+        f"p{q}": float(values[min(len(values) - 1, np.searchsorted(cdf, q / 100.0 * total))])
+        for q in qs
+    }
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch for a bounded per-anchor metric: counts over a fixed grid
+    of values i / scale, i = 0 .. size-1.
+
+    Both tracked metrics are bounded by K, so a fixed grid gives a deterministic error
+    (none for overlap, whose values are exactly shared / K; half a bin for displacement)
+    and merging is exact: sketches with the same grid simply add their counts. Memory
+    is O(size) whatever the number of anchors.
+    """
+
+    __slots__ = ("scale", "counts")
+
+    def __init__(self, size: int, scale: int) -> None:
+        if size < 1 or scale < 1:
+            raise ValueError("size and scale must be >= 1")
+        self.scale = scale
+        self.counts = np.zeros(size, dtype=np.int64)
+
+    @classmethod
+    def for_overlap(cls, k: int) -> QuantileSketch:
+        return cls(k + 1, k)
+
+    @classmethod
+    def for_displacement(cls, k: int) -> QuantileSketch:
+        # Mean displacement over shared items is at most K - 1
+        return cls(max(1, (k - 1) * DISPLACEMENT_BINS_PER_RANK) + 1, DISPLACEMENT_BINS_PER_RANK)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def values(self) -> np.ndarray:
+        return np.arange(len(self.counts)) / float(self.scale)
+
+    def _bin_counts(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        bins = np.clip(np.round(values * self.scale), 0, len(self.counts) - 1).astype(np.int64)
+        return np.bincount(bins, minlength=len(self.counts))
+
+    def add(self, values: np.ndarray) -> None:
+        """Add metric values; NaN (undefined, e.g. displacement without shared items) is skipped."""
+        self.counts += self._bin_counts(values)
+
+    def remove(self, values: np.ndarray) -> None:
+        """Take back values previously added (e.g. for anchors that changed or left)."""
+        counts = self.counts - self._bin_counts(values)
+        if (counts < 0).any():
+            raise ValueError("cannot remove values that were never added to the sketch")
+        self.counts = counts
+
+    def merge(self, other: QuantileSketch) -> None:
+        """Add `other`'s counts into this sketch (both must use the same grid)."""
+        if other.scale != self.scale or len(other.counts) != len(self.counts):
+            raise ValueError("cannot merge sketches with different grids (different K?)")
+        self.counts += other.counts
+
+    def copy(self) -> QuantileSketch:
+        other = QuantileSketch(len(self.counts), self.scale)
+        other.counts = self.counts.copy()
+        return other
+
+    def quantile(self, q: float) -> float | None:
+        """The q-quantile (0 <= q <= 1), or None when the sketch is empty."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be in [0, 1]")
+        total = self.count
+        if total == 0:
+            return None
+        cdf = np.cumsum(self.counts)
+        # At least one value at or below the answer, so q = 0 gives the minimum
+        return float(np.searchsorted(cdf, max(q * total, 1.0)) / self.scale)
+
+    def to_distribution(
+        self, percentiles: Sequence[int] = PERCENTILES, histogram_bins: int = HISTOGRAM_BINS
+    ) -> MetricDistribution:
+        """Percentiles, a coarse histogram and the sparse sketch state, for the report."""
+        values = self.values()
+        nonzero = np.flatnonzero(self.counts)
+        top = float(values[-1])
+
+        # Coarse equal-width histogram over the metric's full range [0, top]
+        edges = np.linspace(0.0, top, histogram_bins + 1) if top > 0 else np.array([0.0, 0.0])
+        buckets = np.minimum(
+            np.searchsorted(edges, values, side="right") - 1, len(edges) - 2
+        )
+        histogram = np.bincount(buckets, weights=self.counts, minlength=len(edges) - 1)
+
+        return MetricDistribution(
+            count=self.count,
+            min=float(values[nonzero[0]]) if nonzero.size else None,
+            max=float(values[nonzero[-1]]) if nonzero.size else None,
+            percentiles=hist_percentiles(self.counts, values, percentiles),
+            histogram_edges=edges.tolist(),
+            histogram_counts=histogram.astype(np.int64).tolist(),
+            scale=self.scale,
+            size=len(self.counts),
+            bin_index=nonzero.tolist(),
+            bin_count=self.counts[nonzero].tolist(),
+        )
+
+    @classmethod
+    def from_distribution(cls, distribution: MetricDistribution) -> QuantileSketch:
+        sketch = cls(distribution.size, distribution.scale)
+        if len(distribution.bin_index) != len(distribution.bin_count):
+            raise ValueError("bin_index and bin_count must have the same length")
+        sketch.counts[np.asarray(distribution.bin_index, dtype=np.int64)] = distribution.bin_count
+        return sketch
+
+
+def merge_distributions(distributions: Iterable[MetricDistribution]) -> MetricDistribution:
+    """
+    Merge distributions of the same metric and K, e.g. from shards or from daily
+    reports, into the distribution of the combined anchors.
+    """
+    merged: QuantileSketch | None = None
+    for distribution in distributions:
+        sketch = QuantileSketch.from_distribution(distribution)
+        if merged is None:
+            merged = sketch
+        else:
+            merged.merge(sketch)
+    if merged is None:
+        raise ValueError("no distributions to merge")
+    return merged.to_distribution()
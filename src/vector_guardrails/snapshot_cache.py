@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import gc
+import hashlib
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+
+from .delta import file_sha256
+from .io import ensure_snapshot_shape, load_json
+from .validation import ValidatedSnapshot, _trusted_snapshot, validate_and_truncate_snapshot
+
+CACHE_DIR_ENV = "VECTOR_GUARDRAILS_CACHE_DIR"
+DEFAULT_MAX_BYTES = 1 << 30
+
+_FORMAT_VERSION = 2
+# Temp files older than this belong to writers that died mid-write
+_STALE_TMP_SECONDS = 3600.0
+
+
+def default_cache_dir() -> Path:
+    """$VECTOR_GUARDRAILS_CACHE_DIR, else <XDG cache home>/vector-guardrails/snapshots."""
+    env = os.environ.get(CACHE_DIR_ENV)
+    if env:
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "vector-guardrails" / "snapshots"
+
+
+def _pack_strings(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """UTF-8 blob of the concatenated strings plus cumulative end offsets (in characters)."""
+    ends = np.cumsum(np.fromiter(map(len, values), dtype=np.int64, count=len(values)))
+    return np.frombuffer("".join(values).encode("utf-8"), dtype=np.uint8), ends
+
+
+def _unpack_strings(blob: np.ndarray, ends: np.ndarray) -> list[str]:
+    text = blob.tobytes().decode("utf-8")
+    bounds = ends.tolist()
+    return [text[a:b] for a, b in zip([0, *bounds][:-1], bounds, strict=True)]
+
+
+def _encode(snapshot: ValidatedSnapshot) -> dict[str, np.ndarray]:
+    """Interned, flat arrays for a validated snapshot (neighbor codes index `ids`)."""
+    flat = list(chain.from_iterable(snapshot.values()))
+    ids = list(dict.fromkeys(flat))
+    index = {item: i for i, item in enumerate(ids)}
+    dtype = np.int32 if len(ids) < 2**31 else np.int64
+
+    anchor_blob, anchor_ends = _pack_strings(list(snapshot))
+    id_blob, id_ends = _pack_strings(ids)
+    return {
+        "version": np.array(_FORMAT_VERSION),
+        "k": np.array(snapshot.k),
+        "truncated": np.array(snapshot.truncated),
+        "anchor_blob": anchor_blob,
+        "anchor_ends": anchor_ends,
+        "id_blob": id_blob,
+        "id_ends": id_ends,
+        "lengths": np.fromiter(map(len, snapshot.values()), dtype=np.int32, count=len(snapshot)),
+        "codes": np.fromiter(map(index.__getitem__, flat), dtype=dtype, count=len(flat)),
+    }
+
+
+def _decode(data: np.lib.npyio.NpzFile) -> ValidatedSnapshot:
+    anchors = _unpack_strings(data["anchor_blob"], data["anchor_ends"])
+    lookup = np.array(_unpack_strings(data["id_blob"], data["id_ends"]) or [""], dtype=object)
+    codes = data["codes"]
+    lengths = data["lengths"]
+    k = int(data["k"])
+
+    # Object-array fancy indexing builds the neighbor lists without a Python-level loop
+    if codes.size == len(anchors) * k:
+        lists = lookup[codes.reshape(len(anchors), k)].tolist()
+    else:
+        flat = lookup[codes].tolist()
+        ends = np.cumsum(lengths).tolist()
+        lists = [flat[a:b] for a, b in zip([0, *ends][:-1], ends, strict=True)]
+    truncated = bool(data["truncated"])
+    return _trusted_snapshot(zip(anchors, lists, strict=True), k=k, truncated=truncated)
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Decoding allocates millions of acyclic containers; skip the collector meanwhile."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class SnapshotCache:
+    """
+    On-disk cache of parsed, validated and top-K truncated snapshots.
+
+    Entries are keyed by the file's SHA-256 and K. A small pointer file maps a file's
+    (path, size, mtime, inode) to its hash, so unchanged files are not even re-hashed.
+    Writes go through a temp file and an atomic rename, so concurrent processes can
+    share a directory; least recently used files are evicted above `max_bytes`.
+    """
+
+    __slots__ = ("directory", "max_bytes")
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str] | None = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def load(self, path: str, k: int) -> ValidatedSnapshot:
+        """The validated top-`k` snapshot in `path`, from the cache when possible."""
+        if not os.path.isfile(path):
+            return _load_uncached(path, k)  # raises the usual file errors
+
+        before = os.stat(path)
+        digest = self._content_digest(path, before)
+        entry = self.directory / f"{digest}-k{k}.npz"
+
+        snapshot = self._read(entry)
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = _load_uncached(path, k)
+        # Skip caching if the file changed while we were reading it
+        after = os.stat(path)
+        if (after.st_size, after.st_mtime_ns) == (before.st_size, before.st_mtime_ns):
+            self._write(entry, _encode(snapshot))
+        return snapshot
+
+    def _content_digest(self, path: str, st: os.stat_result) -> str:
+        key = f"{os.path.realpath(path)}\0{st.st_size}\0{st.st_mtime_ns}\0{st.st_ino}"
+        pointer = self.directory / f"stat-{hashlib.sha256(key.encode()).hexdigest()[:32]}"
+        try:
+            digest = pointer.read_text(encoding="ascii").strip()
+        except (OSError, UnicodeDecodeError):
+            digest = ""
+        if len(digest) == 64:
+            _touch(pointer)
+            return digest
+
+        digest = file_sha256(path)
+        self._write_file(pointer, digest.encode("ascii"))
+        return digest
+
+    def _read(self, entry: Path) -> ValidatedSnapshot | None:
+        try:
+            with np.load(entry, allow_pickle=False) as data, _gc_paused():
+                if int(data["version"]) != _FORMAT_VERSION:
+                    return None
+                snapshot = _decode(data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            # Unreadable entry (e.g. written by an incompatible version): drop it
+            entry.unlink(missing_ok=True)
+            return None
+        _touch(entry)
+        return snapshot
+
+    def _write(self, entry: Path, arrays: dict[str, np.ndarray]) -> None:
+        self._write_file(entry, arrays)
+        self._evict()
+
+    def _write_file(self, target: Path, content: bytes | dict[str, np.ndarray]) -> None:
+        # A cache that cannot be written (read-only, disk full) must not fail the run
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(content, bytes):
+                    f.write(content)
+                else:
+                    np.savez(f, **content)
+            os.replace(tmp, target)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        try:
+            entries = list(self.directory.iterdir())
+        except OSError:
+            return
+        now = time.time()
+        files: list[tuple[int, int, Path]] = []
+        for p in entries:
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue  # evicted by a concurrent process
+            if p.suffix == ".tmp":
+                if now - st.st_mtime > _STALE_TMP_SECONDS:
+                    p.unlink(missing_ok=True)
+                continue  # another writer's file in flight
+            files.append((st.st_mtime_ns, st.st_size, p))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, p in sorted(files):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+
+def _touch(path: Path) -> None:
+    """Mark `path` as recently used (mtime drives LRU eviction)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _load_uncached(path: str, k: int) -> ValidatedSnapshot:
+    raw = ensure_snapshot_shape(load_json(path))
+    validated = validate_and_truncate_snapshot(raw, k=k)
+    truncated = any(len(neighbors) > k for neighbors in raw.values())
+    return _trusted_snapshot(validated.items(), k=k, truncated=truncated)
+
+
+def load_snapshot(path: str, k: int, *, cache: SnapshotCache | None = None) -> ValidatedSnapshot:
+    """Load, validate and truncate a snapshot JSON file, through `cache` when given."""
+    if cache is None:
+        return _load_uncached(path, k)
+    return cache.load(path, k)
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+from bisect import bisect_left
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .io import _existing_file, _JsonObjectReader
+from .validation import validate_and_truncate_entry
+
+# Sidecar layout (one file, memory-mapped on open):
+#   magic                8 bytes
+#   header               int64[6]: version, anchors, id bytes, source size,
+#                        source mtime (ns), source format (0 JSON object, 1 NDJSON)
+#   offsets              int64[anchors]  byte offset of each entry in the snapshot
+#   ends                 int64[anchors]  cumulative end of each ID in `ids`
+#   ids                  uint8[id bytes] UTF-8 anchor IDs, sorted, concatenated
+
+INDEX_SUFFIX = ".idx"
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+_MAGIC = b"VGSNPIDX"
+_FORMAT_VERSION = 1
+_HEADER_BYTES = len(_MAGIC) + 6 * 8
+_JSON, _NDJSON = 0, 1
+# Read size when parsing one entry at an offset (grows until the entry is complete)
+_ENTRY_CHUNK = 1 << 16
+
+
+def default_index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def _source_format(path: str) -> int:
+    return _NDJSON if Path(path).suffix.lower() in NDJSON_SUFFIXES else _JSON
+
+
+def _ndjson_entry(line: bytes) -> tuple[Any, Any]:
+    """An NDJSON snapshot line: [anchor_id, neighbors] or {"anchor_id", "neighbors"}."""
+    record = json.loads(line)
+    if isinstance(record, list) and len(record) == 2:
+        return record[0], record[1]
+    if isinstance(record, dict) and {"anchor_id", "neighbors"} <= record.keys():
+        return record["anchor_id"], record["neighbors"]
+    raise ValueError(
+        'NDJSON snapshot lines must be [anchor_id, neighbors] or {"anchor_id", "neighbors"}'
+    )
+
+
+def _iter_offsets(path: str, fmt: int) -> Iterator[tuple[Any, int]]:
+    if fmt == _NDJSON:
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    yield _ndjson_entry(line)[0], offset
+                offset += len(line)
+        return
+    # newline="" keeps "\r\n" as two characters, so offsets stay byte-exact
+    with open(path, encoding="utf-8", newline="") as f:
+        yield from _JsonObjectReader(f, 1 << 20).offsets()
+
+
+def build_snapshot_index(path: str, index_path: str | None = None) -> int:
+    """
+    Record the byte offset of every anchor's entry in a snapshot file (a JSON object,
+    or NDJSON when the name ends in .ndjson / .jsonl) in a sidecar next to it
+    (`<path>.idx` by default). Returns the number of anchors indexed.
+
+    One streaming pass; a repeated anchor resolves to its last entry, like `json.load`.
+    """
+    source = _existing_file(path)
+    fmt = _source_format(path)
+    positions: dict[str, int] = {}
+    for anchor_id, offset in _iter_offsets(path, fmt):
+        if not isinstance(anchor_id, str) or not anchor_id:
+            raise ValueError(f"anchor_id must be a non-empty string, got: {anchor_id!r}")
+        positions[anchor_id] = offset
+
+    ids = sorted(positions)
+    encoded = [a.encode("utf-8") for a in ids]
+    ends = np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(ids)))
+    stat = source.stat()
+    id_bytes = int(ends[-1]) if ids else 0
+    header = np.array(
+        [_FORMAT_VERSION, len(ids), id_bytes, stat.st_size, stat.st_mtime_ns, fmt],
+        dtype=np.int64,
+    )
+
+    target = Path(index_path or default_index_path(path))
+    tmp = target.with_name(target.name + f".tmp-{os.getpid()}")
+    with tmp.open("wb") as f:
+        f.write(_MAGIC)
+        f.write(header.tobytes())
+        f.write(np.fromiter(map(positions.__getitem__, ids), np.int64, len(ids)).tobytes())
+        f.write(ends.tobytes())
+        f.write(b"".join(encoded))
+    os.replace(tmp, target)
+    return len(ids)
+
+
+class SnapshotIndex(Mapping[str, Any]):
+    """
+    Read-only mapping view of a snapshot file through its offset sidecar.
+
+    Opening memory-maps the sidecar (O(1)); a lookup is a binary search over the
+    sorted IDs plus one seek and the parse of that single entry. Values are the raw
+    neighbor lists, unvalidated, as `load_json` would return them. Iterating yields
+    the anchor IDs in sorted order without touching the snapshot file.
+    """
+
+    def __init__(self, path: str, index_path: str | None = None) -> None:
+        self.path = path
+        self.index_path = index_path or default_index_path(path)
+        if not os.path.exists(self.index_path):
+            raise FileNotFoundError(
+                f"no index for {path}: build it with `vector-guardrails index --snapshots {path}`"
+            )
+        with _existing_file(self.index_path).open("rb") as f:
+            raw = f.read(_HEADER_BYTES)
+        if raw[: len(_MAGIC)] != _MAGIC or len(raw) < _HEADER_BYTES:
+            raise ValueError(f"not a snapshot index: {self.index_path}")
+        version, count, id_bytes, size, mtime_ns, fmt = np.frombuffer(
+            raw[len(_MAGIC) :], dtype=np.int64
+        ).tolist()
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot index version: {version}")
+        stat = _existing_file(path).stat()
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+            raise ValueError(
+                f"snapshot index {self.index_path} is stale ({path} changed since it was "
+                "built); rebuild it with `vector-guardrails index`"
+            )
+        self._format = fmt
+        self._count = count
+        start = _HEADER_BYTES
+        self._offsets = self._map(np.int64, start, count)
+        self._ends = self._map(np.int64, start + 8 * count, count)
+        self._ids = self._map(np.uint8, start + 16 * count, id_bytes)
+
+    def _map(self, dtype: Any, offset: int, count: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self.index_path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+    def _id(self, i: int) -> bytes:
+        start = int(self._ends[i - 1]) if i else 0
+        return bytes(self._ids[start : int(self._ends[i])])
+
+    def _position(self, anchor_id: object) -> int | None:
+        if not isinstance(anchor_id, str):
+            return None
+        raw = anchor_id.encode("utf-8")
+        i = bisect_left(range(self._count), raw, key=self._id)
+        return i if i < self._count and self._id(i) == raw else None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        text = bytes(self._ids).decode("utf-8")
+        # Character and byte positions differ for non-ASCII IDs
+        if text.isascii():
+            bounds = [0, *self._ends.tolist()]
+            return (text[a:b] for a, b in zip(bounds[:-1], bounds[1:], strict=True))
+        return (self._id(i).decode("utf-8") for i in range(self._count))
+
+    def __contains__(self, anchor_id: object) -> bool:
+        return self._position(anchor_id) is not None
+
+    def __getitem__(self, anchor_id: str) -> Any:
+        return self.get_many([anchor_id])[0]
+
+    def get_many(self, anchor_ids: Sequence[str]) -> list[Any]:
+        """Neighbor lists of `anchor_ids` (in that order), read in file order."""
+        positions = []
+        for anchor_id in anchor_ids:
+            i = self._position(anchor_id)
+            if i is None:
+                raise KeyError(anchor_id)
+            positions.append(i)
+
+        found: dict[int, Any] = {}
+        with open(self.path, "rb") as f:
+            for i in sorted(set(positions), key=lambda i: int(self._offsets[i])):
+                f.seek(int(self._offsets[i]))
+                anchor_id, neighbors = self._read_entry(f)
+                if anchor_id != self._id(i).decode("utf-8"):
+                    raise ValueError(
+                        f"snapshot index {self.index_path} does not match {self.path}; "
+                        "rebuild it with `vector-guardrails index`"
+                    )
+                found[i] = neighbors
+        return [found[i] for i in positions]
+
+    def _read_entry(self, f: Any) -> tuple[Any, Any]:
+        if self._format == _NDJSON:
+            return _ndjson_entry(f.readline())
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        try:
+            return _JsonObjectReader(text, _ENTRY_CHUNK).pair()
+        finally:
+            text.detach()
+
+
+class IndexedLists(Sequence[list[str]]):
+    """
+    Validated top-`k` lists of `anchor_ids`, read through `index` only when accessed.
+
+    Slicing reads the slice's entries in one pass, so a chunked consumer (sequential
+    sampling) parses only the anchors it actually evaluates.
+    """
+
+    def __init__(self, index: SnapshotIndex, anchor_ids: Sequence[str], k: int) -> None:
+        self._index = index
+        self._anchor_ids = anchor_ids
+        self._k = k
+
+    def __len__(self) -> int:
+        return len(self._anchor_ids)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        ids = self._anchor_ids[i] if isinstance(i, slice) else [self._anchor_ids[i]]
+        lists = [
+            validate_and_truncate_entry(anchor_id, neighbors, self._k)
+            for anchor_id, neighbors in zip(ids, self._index.get_many(ids), strict=True)
+        ]
+        return lists if isinstance(i, slice) else lists[0]
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from .models import ComparisonReport, RiskLevel, ThresholdPreset, ThresholdSweep
+from .risk import classify_anchor_risk, classify_overall_risk
+
+SWEEP_PARAMETERS = (
+    "overlap_warning",
+    "overlap_critical",
+    "displacement_warning",
+    "displacement_critical",
+    "churn_warning",
+    "churn_critical",
+)
+
+_LEVELS = (RiskLevel.INFO, RiskLevel.WARNING, RiskLevel.CRITICAL)
+
+
+def _rank(level: RiskLevel) -> int:
+    return _LEVELS.index(RiskLevel.INFO if level == RiskLevel.SAFE else level)
+
+
+def _grid_axes(
+    base: ThresholdPreset, grid: Mapping[str, Sequence[float]]
+) -> dict[str, list[float]]:
+    unknown = set(grid) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"cannot sweep {sorted(unknown)}; sweepable: {list(SWEEP_PARAMETERS)}")
+    axes: dict[str, list[float]] = {}
+    for name in SWEEP_PARAMETERS:
+        if name not in grid:
+            continue
+        values = [float(v) for v in grid[name]]
+        if not values:
+            raise ValueError(f"no values to sweep for {name}")
+        for value in dict.fromkeys(values):
+            # Same bounds as the preset itself
+            ThresholdPreset.model_validate({**base.model_dump(), name: value})
+        axes[name] = values
+    return axes
+
+
+def _fixed_anchor_levels(report: ComparisonReport) -> np.ndarray:
+    """Per-anchor level from the rules the sweep keeps fixed (rank-aware, plugins)."""
+    t = report.config.thresholds
+    opt_in = (
+        t.rbo_warning,
+        t.rbo_critical,
+        t.kendall_tau_warning,
+        t.kendall_tau_critical,
+        t.weighted_overlap_warning,
+        t.weighted_overlap_critical,
+    )
+    has_custom = any(m.custom_metrics for m in report.anchor_metrics)
+    levels = np.zeros(len(report.anchor_metrics), dtype=np.int64)
+    if all(v is None for v in opt_in) and not has_custom:
+        return levels
+
+    # Overlap and displacement rules switched off: only the fixed rules can fire
+    neutral = report.config.model_copy(
+        update={
+            "thresholds": t.model_copy(
+                update={
+                    "overlap_warning": 0.0,
+                    "overlap_critical": 0.0,
+                    "displacement_warning": math.inf,
+                    "displacement_critical": math.inf,
+                }
+            )
+        }
+    )
+    for i, m in enumerate(report.anchor_metrics):
+        level, _ = classify_anchor_risk(
+            overlap=m.overlap,
+            displacement=m.rank_displacement,
+            cfg=neutral,
+            rbo=m.rbo,
+            kendall_tau=m.kendall_tau,
+            weighted_overlap=m.weighted_overlap,
+            custom_metrics=m.custom_metrics,
+        )
+        levels[i] = _rank(level)
+    return levels
+
+
+def _fixed_overall_level(report: ComparisonReport) -> int:
+    """Overall level from the report-level rules the sweep keeps fixed (churn at 0)."""
+    level, _ = classify_overall_risk(
+        churn_rate=0.0,
+        anchor_jaccard=report.alignment.anchor_jaccard,
+        cfg=report.config,
+        any_anchor_critical=False,
+        overlap_distribution=report.overlap_distribution,
+        displacement_distribution=report.displacement_distribution,
+        latency=report.latency,
+        scores=report.scores,
+        graph=report.graph,
+    )
+    return _rank(level)
+
+
+def sweep_thresholds(
+    report: ComparisonReport, grid: Mapping[str, Sequence[float]]
+) -> ThresholdSweep:
+    """
+    Replay the risk rules over `report`'s per-anchor metrics for every combination of
+    the `grid` values (a cartesian product over `SWEEP_PARAMETERS`; parameters not in
+    the grid keep the report's thresholds).
+
+    Verdicts, anchor risk counts and churn match what `compare` would report with each
+    preset. Anchors are binned once against the distinct grid values, so every
+    combination costs O(1) after one O(anchors) pass.
+
+    Not supported for partial (fail-fast / sampled) or traffic-weighted reports, whose
+    verdicts depend on more than the evaluated anchors' metrics. Noise-profile
+    downgrades are not replayed.
+    """
+    if report.partial:
+        raise ValueError("cannot sweep a partial report; rerun without fail_fast / sampling")
+    if report.traffic is not None:
+        raise ValueError("cannot sweep a traffic-weighted report")
+
+    base = report.config.thresholds
+    axes = _grid_axes(base, grid)
+    columns = np.meshgrid(*axes.values(), indexing="ij") if axes else []
+    size = columns[0].size if axes else 1
+    combo = {name: np.full(size, float(getattr(base, name))) for name in SWEEP_PARAMETERS}
+    combo.update({name: col.ravel() for name, col in zip(axes, columns, strict=True)})
+
+    metrics = report.anchor_metrics
+    n = len(metrics)
+    overlap = np.fromiter((m.overlap for m in metrics), dtype=np.float64, count=n)
+    displacement = np.fromiter(
+        (np.nan if m.rank_displacement is None else m.rank_displacement for m in metrics),
+        dtype=np.float64,
+        count=n,
+    )
+    fixed = _fixed_anchor_levels(report)
+
+    # Distinct thresholds per metric; an anchor's bin says which of them it trips:
+    # overlap < o_values[j] iff j >= o_bin, displacement > d_values[j] iff j < d_bin
+    o_values = np.unique(np.concatenate([combo["overlap_warning"], combo["overlap_critical"]]))
+    d_values = np.unique(
+        np.concatenate([combo["displacement_warning"], combo["displacement_critical"]])
+    )
+    o_bin = np.searchsorted(o_values, overlap, side="right")
+    d_bin = np.where(
+        np.isnan(displacement), 0, np.searchsorted(d_values, np.nan_to_num(displacement))
+    )
+
+    hist = np.zeros((len(_LEVELS), len(o_values) + 1, len(d_values) + 1), dtype=np.int64)
+    np.add.at(hist, (fixed, o_bin, d_bin), 1)
+    # calm[e, j, l]: anchors with fixed level <= e, overlap >= o_values[j] and
+    # displacement <= d_values[l] (or undefined)
+    calm = np.cumsum(hist, axis=0)
+    calm = np.cumsum(calm[:, ::-1], axis=1)[:, ::-1]
+    calm = np.cumsum(calm, axis=2)
+
+    o_crit = np.searchsorted(o_values, combo["overlap_critical"])
+    o_warn = np.searchsorted(
+        o_values, np.maximum(combo["overlap_warning"], combo["overlap_critical"])
+    )
+    d_crit = np.searchsorted(d_values, combo["displacement_critical"])
+    d_warn = np.searchsorted(
+        d_values, np.minimum(combo["displacement_warning"], combo["displacement_critical"])
+    )
+    not_critical = calm[1, o_crit + 1, d_crit]
+    info = calm[0, o_warn + 1, d_warn]
+    critical = n - not_critical
+    warning = not_critical - info
+
+    # Churn counts anchors below overlap_warning
+    below = np.cumsum(np.bincount(o_bin, minlength=len(o_values) + 1))
+    churned = below[np.searchsorted(o_values, combo["overlap_warning"])]
+    churn = churned / float(n) if n else np.zeros(size)
+
+    level = np.where(
+        churn > combo["churn_critical"], 2, np.where(churn > combo["churn_warning"], 1, 0)
+    )
+    level = np.maximum(level, _fixed_overall_level(report))
+    level[critical > 0] = 2
+
+    return ThresholdSweep(
+        anchors=n,
+        thresholds={name: combo[name].tolist() for name in axes},
+        risk_levels=[_LEVELS[i] for i in level.tolist()],
+        critical_anchors=critical.tolist(),
+        warning_anchors=warning.tolist(),
+        info_anchors=info.tolist(),
+        churn_rates=np.asarray(churn, dtype=np.float64).tolist(),
+    )
@@ -1,11 +1,55 @@
 from __future__ import annotations
 
 from collections.abc import Iterable, Mapping
+from itertools import repeat
 from typing import Any
 
+import numpy as np
+
 
 def _is_sequence_of_str(value: Any) -> bool:
-    return isinstance(value, list) and all(isinstance(x, str) for x in value)
+    # map() keeps the per-item isinstance check in C (hot path for large snapshots)
+    return isinstance(value, list) and all(map(isinstance, value, repeat(str)))
+
+
+class ValidatedSnapshot(dict):
+    """A loaded snapshot truncated to top-`k`, as returned by `load_snapshot`.
+
+    `truncated` records whether any list was cut at `k`. Snapshots built by the loader
+    carry a private marker so `validate_and_truncate_snapshot` can skip re-validating
+    them; any insertion or update clears it (removals keep the remaining entries valid).
+    """
+
+    __slots__ = ("k", "truncated", "_trusted")
+
+    def __init__(self, entries: Any = (), *, k: int, truncated: bool = False) -> None:
+        super().__init__(entries)
+        self.k = k
+        self.truncated = truncated
+        self._trusted = False
+
+    def __setitem__(self, key: str, value: list[str]) -> None:
+        self._trusted = False
+        super().__setitem__(key, value)
+
+    def __ior__(self, other: Any) -> ValidatedSnapshot:
+        self._trusted = False
+        return super().__ior__(other)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self._trusted = False
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        self._trusted = False
+        return super().setdefault(key, default)
+
+
+def _trusted_snapshot(entries: Any, *, k: int, truncated: bool) -> ValidatedSnapshot:
+    """A `ValidatedSnapshot` of entries the caller has just validated at `k`."""
+    snapshot = ValidatedSnapshot(entries, k=k, truncated=truncated)
+    snapshot._trusted = True
+    return snapshot
 
 
 def validate_and_truncate_snapshot(
@@ -21,33 +65,93 @@ def validate_and_truncate_snapshot(
     - neighbors must be a list[str]
     - neighbors are truncated to k
     - duplicates within the truncated top-k neighbors are not allowed (ValueError)
+
+    An unmodified snapshot from `load_snapshot` is not re-validated: it is returned as-is
+    at its own k and re-truncated for a smaller k. At a larger k it is validated again
+    unless the loader cut some list short, which raises.
     """
     if not isinstance(k, int) or k < 1:
         raise ValueError(f"k must be an int >= 1, got: {k!r}")
 
+    if isinstance(snapshot, ValidatedSnapshot) and snapshot._trusted:
+        if k == snapshot.k:
+            return snapshot
+        if k < snapshot.k:
+            return {a: n[:k] for a, n in snapshot.items()}
+        if snapshot.truncated:
+            raise ValueError(
+                f"snapshot was truncated to k={snapshot.k}, cannot use it at k={k}"
+            )
+
     if not isinstance(snapshot, Mapping):
         raise ValueError("snapshot must be a mapping of anchor_id -> list[str]")
 
     out: dict[str, list[str]] = {}
     for anchor_id, neighbors in snapshot.items():
-        if not isinstance(anchor_id, str) or not anchor_id.strip():
-            raise ValueError(f"anchor_id must be a non-empty string, got: {anchor_id!r}")
+        out[anchor_id] = validate_and_truncate_entry(anchor_id, neighbors, k)
 
-        if not _is_sequence_of_str(neighbors):
-            raise ValueError(
-                f"neighbors for anchor_id={anchor_id!r} must be a list[str], "
-                f"got: {type(neighbors).__name__}"
-            )
+    return out
 
-        topk = neighbors[:k]
 
-        # Disallow duplicates in top-k (prevents misleading metrics later)
-        if len(set(topk)) != len(topk):
-            raise ValueError(f"duplicate neighbor IDs found in top-{k} for anchor_id={anchor_id!r}")
+def validate_and_truncate_entry(anchor_id: Any, neighbors: Any, k: int) -> list[str]:
+    """Validate a single snapshot entry and return its top-k neighbors (same rules as above)."""
+    if not isinstance(anchor_id, str) or not anchor_id.strip():
+        raise ValueError(f"anchor_id must be a non-empty string, got: {anchor_id!r}")
 
-        out[anchor_id] = topk
+    if not _is_sequence_of_str(neighbors):
+        raise ValueError(
+            f"neighbors for anchor_id={anchor_id!r} must be a list[str], "
+            f"got: {type(neighbors).__name__}"
+        )
 
-    return out
+    topk = neighbors[:k]
+
+    # Disallow duplicates in top-k (prevents misleading metrics later)
+    if len(set(topk)) != len(topk):
+        raise duplicate_neighbors_error(anchor_id, k)
+
+    return topk
+
+
+def duplicate_neighbors_error(anchor_id: Any, k: int) -> ValueError:
+    return ValueError(f"duplicate neighbor IDs found in top-{k} for anchor_id={anchor_id!r}")
+
+
+def validate_neighbor_matrix(matrix: Any, k: int, name: str) -> np.ndarray:
+    """Validate an (n, width) integer neighbor matrix and return its top-k as (n, k).
+
+    Rules:
+    - integer dtype, two dimensions
+    - -1 marks a missing result and may only trail a row (as ANN searches pad)
+    - other values must be >= 0
+
+    Wider matrices are returned as a view of their first k columns; narrower ones are
+    padded with -1 (the only case that copies).
+    """
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2 or not np.issubdtype(matrix.dtype, np.integer):
+        raise ValueError(
+            f"{name} must be a 2-D integer matrix, got {matrix.dtype} with shape {matrix.shape}"
+        )
+    if matrix.shape[1] < k:
+        padded = np.full((matrix.shape[0], k), -1, dtype=np.result_type(matrix.dtype, np.int8))
+        padded[:, : matrix.shape[1]] = matrix
+        matrix = padded
+    top = matrix[:, :k]
+
+    if (top < -1).any():
+        raise ValueError(f"{name} holds negative IDs other than the -1 padding")
+    gaps = np.flatnonzero(((top[:, 1:] >= 0) & (top[:, :-1] < 0)).any(axis=1))
+    if gaps.size:
+        raise ValueError(f"{name} row {int(gaps[0])} has a result after -1 padding")
+    return top
+
+
+def duplicate_matrix_rows(matrix: np.ndarray) -> np.ndarray:
+    """Rows of an (n, k) neighbor matrix that hold some ID more than once."""
+    ordered = np.sort(matrix, axis=1)
+    dup = (ordered[:, 1:] == ordered[:, :-1]) & (ordered[:, 1:] >= 0)
+    return np.flatnonzero(dup.any(axis=1))
 
 
 def bounded_sample(values: Iterable[str], limit: int) -> list[str]:
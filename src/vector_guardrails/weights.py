@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Mapping, Sequence
+
+import numpy as np
+
+AnchorWeights = Mapping[str, float] | Iterable[tuple[str, float]]
+
+
+def align_weights(weights: AnchorWeights, anchor_ids: Sequence[str]) -> np.ndarray:
+    """
+    Per-anchor weights as a float64 array aligned to `anchor_ids`.
+
+    `weights` is a mapping or a stream of (anchor_id, weight) pairs, consumed once;
+    entries for anchors outside `anchor_ids` are dropped, missing anchors weigh 0.
+    """
+    items = weights.items() if isinstance(weights, Mapping) else weights
+    position = {anchor_id: i for i, anchor_id in enumerate(anchor_ids)}
+    aligned = np.zeros(len(anchor_ids), dtype=np.float64)
+    for anchor_id, weight in items:
+        if not (math.isfinite(weight) and weight >= 0.0):
+            raise ValueError(f"weight for anchor_id={anchor_id!r} must be finite and >= 0")
+        i = position.get(anchor_id)
+        if i is not None:
+            aligned[i] = weight
+    if not aligned.any():
+        raise ValueError("weights give no positive weight to any compared anchor")
+    return aligned
+
+
+def traffic_plan(
+    weights: np.ndarray, head_share: float, tail_samples: int, seed: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Head positions (heaviest anchors covering `head_share` of total weight) and
+    `tail_samples` seeded draws, with replacement and proportional to weight, from the rest.
+    """
+    order = np.argsort(-weights, kind="stable")
+    cumulative = np.cumsum(weights[order])
+    n_head = int(np.searchsorted(cumulative, head_share * cumulative[-1], side="left")) + 1
+    if head_share == 0.0:
+        n_head = 0
+    head, tail = order[:n_head], order[n_head:]
+
+    tail_weights = weights[tail]
+    tail_total = tail_weights.sum()
+    if tail_samples == 0 or tail_total <= 0.0:
+        return np.sort(head), np.empty(0, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    draws = rng.choice(tail, size=tail_samples, p=tail_weights / tail_total)
+    return np.sort(head), draws
+
+
+def weighted_total(
+    values: np.ndarray, head_weights: np.ndarray, tail_weight: float
+) -> tuple[float, float]:
+    """
+    Estimate sum(w * y) over all anchors and its standard error.
+
+    `values` holds y for the head anchors followed by y for each tail draw; the head
+    is summed exactly, the tail by Hansen-Hurwitz: tail_weight * mean(y over draws).
+    """
+    n_head = len(head_weights)
+    total = float(head_weights @ values[:n_head])
+    tail_values = values[n_head:]
+    if len(tail_values) == 0:
+        return total, 0.0
+    total += tail_weight * float(tail_values.mean())
+    if len(tail_values) < 2:
+        return total, 0.0
+    return total, tail_weight * float(tail_values.std(ddof=1)) / math.sqrt(len(tail_values))
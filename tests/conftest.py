@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_snapshot_cache(tmp_path, monkeypatch):
+    # Keep CLI runs from writing parsed-snapshot caches into the real user cache
+    monkeypatch.setenv("VECTOR_GUARDRAILS_CACHE_DIR", str(tmp_path / "snapshot-cache"))
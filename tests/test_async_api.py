@@ -0,0 +1,210 @@
+import asyncio
+import json
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from vector_guardrails.async_api import compare_async, load_snapshot_async
+from vector_guardrails.compare import compare
+from vector_guardrails.models import ComparisonConfig
+from vector_guardrails.scores import SnapshotScores
+
+
+@pytest.fixture
+def snapshots():
+    rng = random.Random(11)
+    docs = [f"d{j}" for j in range(80)]
+    baseline = {f"a{i:03d}": rng.sample(docs, 10) for i in range(300)}
+    candidate = {}
+    for a, neighbors in baseline.items():
+        neighbors = list(neighbors)
+        for slot in rng.sample(range(10), rng.choice([0, 1, 4])):
+            neighbors[slot] = next(d for d in docs if d not in neighbors)
+        candidate[a] = neighbors
+    return baseline, candidate
+
+
+def _same_report(a, b):
+    assert a.model_dump(exclude={"timestamp"}) == b.model_dump(exclude={"timestamp"})
+
+
+def test_chunked_async_report_equals_compare(snapshots):
+    baseline, candidate = snapshots
+    cfg = ComparisonConfig(k=10, chunk_size=64)
+    events = []
+
+    report = asyncio.run(compare_async(baseline, candidate, cfg, on_progress=events.append))
+
+    _same_report(report, compare(baseline, candidate, cfg))
+    assert [e.stage for e in events] == ["prepared", *["metrics"] * 5, "done"]
+    assert [e.anchors_done for e in events if e.stage == "metrics"] == [64, 128, 192, 256, 300]
+    assert all(e.anchors_total == 300 for e in events)
+
+
+def test_chunked_async_graph_metrics():
+    rng = random.Random(5)
+    nodes = [f"n{i:03d}" for i in range(120)]
+    baseline = {a: rng.sample([n for n in nodes if n != a], 6) for a in nodes}
+    candidate = {a: list(reversed(neighbors)) for a, neighbors in baseline.items()}
+    candidate["n000"] = ["n001"]
+    cfg = ComparisonConfig(k=6, chunk_size=32, graph_metrics=True)
+
+    report = asyncio.run(compare_async(baseline, candidate, cfg))
+
+    assert report.graph is not None
+    _same_report(report, compare(baseline, candidate, cfg))
+
+
+def test_async_loaders_and_async_progress(snapshots, tmp_path):
+    baseline, candidate = snapshots
+    b = tmp_path / "b.json"
+    c = tmp_path / "c.json"
+    b.write_text(json.dumps(baseline), encoding="utf-8")
+    c.write_text(json.dumps(candidate), encoding="utf-8")
+    seen = []
+
+    async def record(event):
+        await asyncio.sleep(0)
+        seen.append(event.stage)
+
+    async def main():
+        return await compare_async(
+            load_snapshot_async(str(b), 10),
+            load_snapshot_async(str(c), 10),
+            ComparisonConfig(k=10),
+            on_progress=record,
+        )
+
+    _same_report(asyncio.run(main()), compare(baseline, candidate, ComparisonConfig(k=10)))
+    assert seen[-1] == "done"
+
+
+def test_event_loop_stays_responsive(snapshots):
+    baseline, candidate = snapshots
+    big_b = {f"{a}-{i}": n for i in range(10) for a, n in baseline.items()}
+    big_c = {f"{a}-{i}": n for i in range(10) for a, n in candidate.items()}
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        reports = await asyncio.gather(
+            compare_async(big_b, big_c, ComparisonConfig(k=10, chunk_size=256)),
+            compare_async(big_c, big_b, ComparisonConfig(k=10, chunk_size=256)),
+        )
+        task.cancel()
+        return reports, ticks
+
+    reports, ticks = asyncio.run(main())
+    assert [r.alignment.compared_anchors for r in reports] == [3000, 3000]
+    assert ticks > 5
+
+
+def test_cancellation_stops_at_chunk_boundary(snapshots):
+    baseline, candidate = snapshots
+    cfg = ComparisonConfig(k=10, chunk_size=16)
+    started = threading.Event()
+
+    async def main():
+        events = []
+
+        def on_progress(event):
+            events.append(event)
+            if event.stage == "metrics":
+                started.set()
+
+        task = asyncio.create_task(
+            compare_async(baseline, candidate, cfg, on_progress=on_progress)
+        )
+        while not started.is_set():
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return events
+
+    events = asyncio.run(main())
+    assert events[-1].stage == "metrics"
+    assert events[-1].anchors_done < 300
+
+
+def test_timeout(snapshots):
+    baseline, candidate = snapshots
+
+    def slow(event):
+        time.sleep(0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            compare_async(
+                baseline,
+                candidate,
+                ComparisonConfig(k=10, chunk_size=8),
+                on_progress=slow,
+                timeout=0.2,
+            )
+        )
+
+
+@pytest.mark.parametrize(
+    "update",
+    [
+        {"fail_fast": True},
+        {"sequential_sampling": True, "sample_budget": 200},
+    ],
+)
+def test_fail_fast_and_sequential_runs_are_chunked(snapshots, update):
+    baseline, candidate = snapshots
+    cfg = ComparisonConfig(k=10, chunk_size=32, **update)
+    events = []
+
+    report = asyncio.run(compare_async(baseline, candidate, cfg, on_progress=events.append))
+
+    _same_report(report, compare(baseline, candidate, cfg))
+    stages = [e.stage for e in events]
+    assert stages[0] == "prepared" and stages[-1] == "done"
+    metrics = [e.anchors_done for e in events if e.stage == "metrics"]
+    assert len(metrics) >= 2 and metrics == sorted(metrics)
+    assert metrics[-1] == report.anchors_evaluated
+
+
+def test_weights_latency_and_scores_are_forwarded(snapshots):
+    baseline, candidate = snapshots
+    cfg = ComparisonConfig(k=10, chunk_size=64)
+    rng = np.random.default_rng(2)
+    latency = [{a: float(rng.uniform(5, 10)) for a in baseline} for _ in range(2)]
+    scores = [
+        SnapshotScores(
+            list(s),
+            np.sort(rng.uniform(size=10 * len(s)).astype(np.float32)),
+            np.full(len(s), 10),
+        )
+        for s in (baseline, candidate)
+    ]
+    extras = {
+        "baseline_latency": latency[0],
+        "candidate_latency": latency[1],
+        "baseline_scores": scores[0],
+        "candidate_scores": scores[1],
+    }
+    report = asyncio.run(compare_async(baseline, candidate, cfg, **extras))
+    assert report.latency is not None and report.scores is not None
+    _same_report(report, compare(baseline, candidate, cfg, **extras))
+
+    weights = {a: float(i % 7 + 1) for i, a in enumerate(baseline)}
+    sampled = cfg.model_copy(update={"traffic_sampling": True})
+    report = asyncio.run(compare_async(baseline, candidate, sampled, weights=weights))
+    assert report.traffic is not None and report.traffic.sampled
+    _same_report(report, compare(baseline, candidate, sampled, weights=weights))
+
+    with pytest.raises(ValueError, match="traffic_sampling requires"):
+        asyncio.run(compare_async(baseline, candidate, sampled))
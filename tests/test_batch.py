@@ -0,0 +1,178 @@
+import json
+
+import pytest
+
+from vector_guardrails import snapshot_cache
+from vector_guardrails.batch import _Scheduler, load_manifest, run_batch
+from vector_guardrails.cli import main
+from vector_guardrails.models import BatchJob, ComparisonConfig, ExitCode, RiskLevel
+from vector_guardrails.snapshot_cache import SnapshotCache
+
+BASELINE = {f"a{i}": [f"d{j}" for j in range(i, i + 4)] for i in range(20)}
+DRIFTED = {a: ["x1", "x2", "x3", n[0]] for a, n in BASELINE.items()}
+
+
+def _write(path, payload):
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    return path.name
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    base = _write(tmp_path / "base.json", BASELINE)
+    same = _write(tmp_path / "same.json", BASELINE)
+    drifted = _write(tmp_path / "drifted.json", DRIFTED)
+    path = tmp_path / "pairs.json"
+    path.write_text(
+        json.dumps(
+            {
+                "defaults": {"k": 4, "thresholds": {"churn_warning": 0.1}},
+                "pairs": [
+                    {"name": "en-US/web", "baseline": base, "candidate": same},
+                    {"name": "de-DE", "baseline": base, "candidate": drifted},
+                    {
+                        "name": "fr-FR",
+                        "baseline": base,
+                        "candidate": drifted,
+                        "config": {"k": 1, "thresholds": {"churn_critical": 0.9}},
+                    },
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_load_manifest_merges_defaults_and_resolves_paths(manifest, tmp_path):
+    jobs = load_manifest(str(manifest))
+
+    assert [job.name for job in jobs] == ["en-US/web", "de-DE", "fr-FR"]
+    assert jobs[0].baseline == str(tmp_path / "base.json")
+    assert jobs[1].config.k == 4
+    assert jobs[2].config.k == 1
+    assert jobs[2].config.thresholds.churn_warning == 0.1
+    assert jobs[2].config.thresholds.churn_critical == 0.9
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        [],
+        [{"name": "a", "baseline": "b.json"}],
+        [{"name": "a", "baseline": "b", "candidate": "c", "config": {"kk": 3}}],
+        [
+            {"name": "a/b", "baseline": "b", "candidate": "c"},
+            {"name": "a_b", "baseline": "b", "candidate": "c"},
+        ],
+    ],
+)
+def test_invalid_manifests_raise(tmp_path, payload):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_manifest(str(path))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_aggregates_and_streams(manifest, tmp_path, workers):
+    jobs = load_manifest(str(manifest))
+    streamed = []
+    summary = run_batch(
+        jobs,
+        workers=workers,
+        cache=SnapshotCache(tmp_path / "cache"),
+        reports_dir=str(tmp_path / "reports"),
+        on_result=streamed.append,
+    )
+
+    assert sorted(p.name for p in streamed) == sorted(job.name for job in jobs)
+    assert [p.name for p in summary.pairs] == ["en-US/web", "de-DE", "fr-FR"]
+    by_name = {p.name: p for p in summary.pairs}
+    assert by_name["en-US/web"].risk_level == RiskLevel.INFO
+    assert by_name["de-DE"].risk_level == RiskLevel.CRITICAL
+    assert summary.exit_code == int(ExitCode.CRITICAL)
+    assert summary.counts == {"INFO": 1, "CRITICAL": 2}
+    assert (tmp_path / "reports" / "en-US_web.json").exists()
+
+
+def test_failed_pair_is_reported_and_others_still_run(tmp_path):
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps(BASELINE), encoding="utf-8")
+    config = ComparisonConfig(k=4)
+    jobs = [
+        BatchJob(
+            name="missing",
+            baseline=str(tmp_path / "nope.json"),
+            candidate=str(good),
+            config=config,
+        ),
+        BatchJob(name="ok", baseline=str(good), candidate=str(good), config=config),
+    ]
+    summary = run_batch(jobs)
+
+    assert summary.exit_code == int(ExitCode.ERROR)
+    assert summary.pairs[0].error and summary.pairs[0].risk_level is None
+    assert summary.pairs[1].exit_code == int(ExitCode.OK)
+    assert summary.counts == {"ERROR": 1, "INFO": 1}
+
+
+def test_shared_file_is_parsed_once(manifest, tmp_path, monkeypatch):
+    parsed = []
+    original = snapshot_cache.load_json
+
+    def counting_load(path):
+        parsed.append(path)
+        return original(path)
+
+    monkeypatch.setattr(snapshot_cache, "load_json", counting_load)
+    run_batch(load_manifest(str(manifest)), cache=SnapshotCache(tmp_path / "cache"))
+
+    # Once per file and K; same.json has base.json's content, so it is never parsed
+    assert sorted(p.rsplit("/", 1)[-1] for p in parsed) == [
+        "base.json",
+        "base.json",
+        "drifted.json",
+        "drifted.json",
+    ]
+
+
+def test_scheduler_respects_memory_and_shared_files(tmp_path):
+    for name, size in [("big", 300), ("mid", 200), ("small", 100)]:
+        (tmp_path / f"{name}.json").write_text(" " * size, encoding="utf-8")
+    jobs = [
+        BatchJob(name=n, baseline=str(tmp_path / f"{n}.json"), candidate=str(tmp_path / "0.json"))
+        for n in ("small", "mid", "big")
+    ]
+    scheduler = _Scheduler(jobs, memory_limit=6 * 450, gate_shared=False)
+
+    # Largest first; "mid" no longer fits next to "big", the smaller job does
+    first = scheduler.admit(0, 3)
+    assert [job.name for job in first] == ["big", "small"]
+    assert scheduler.admit(2, 3) == []
+    scheduler.finish(first[0])
+    assert [job.name for job in scheduler.admit(1, 3)] == ["mid"]
+
+    shared = [
+        BatchJob(name=f"p{i}", baseline=str(tmp_path / "big.json"), candidate=str(tmp_path / "x"))
+        for i in range(3)
+    ]
+    gated = _Scheduler(shared, memory_limit=None, gate_shared=True)
+    leader = gated.admit(0, 3)
+    assert len(leader) == 1
+    gated.finish(leader[0])
+    assert len(gated.admit(0, 3)) == 2
+
+
+def test_cli_batch_writes_combined_summary(manifest, tmp_path, capsys):
+    output = tmp_path / "summary.json"
+    code = main(
+        ["batch", "--manifest", str(manifest), "--workers", "1", "--format", "json"]
+        + ["--output", str(output), "--cache-dir", str(tmp_path / "cache")]
+    )
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert code == int(ExitCode.CRITICAL)
+    assert {line.get("name") for line in lines[:-1]} == {"en-US/web", "de-DE", "fr-FR"}
+    assert lines[-1] == {"exit_code": code, "counts": {"INFO": 1, "CRITICAL": 2}}
+    assert json.loads(output.read_text(encoding="utf-8"))["exit_code"] == code
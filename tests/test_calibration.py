@@ -0,0 +1,142 @@
+import pytest
+
+from vector_guardrails.calibration import calibrate
+from vector_guardrails.cli import main
+from vector_guardrails.compare import compare
+from vector_guardrails.interning import encode_neighbor_lists
+from vector_guardrails.io import dump_json
+from vector_guardrails.metrics import overlap_at_k, overlap_displacement_batch, rank_displacement
+from vector_guardrails.models import ComparisonConfig, RiskLevel, ThresholdPreset
+
+
+def test_overlap_displacement_batch_matches_scalar_metrics():
+    b_lists = [["A", "B", "C", "D"], ["A", "B", "C", "D"], ["A", "B", "C", "D"]]
+    c_lists = [["D", "C", "B", "A"], ["E", "F", "G", "H"], ["A", "B"]]
+    vocab: dict[str, int] = {}
+    shared, disp = overlap_displacement_batch(
+        encode_neighbor_lists(b_lists, 4, vocab), encode_neighbor_lists(c_lists, 4, vocab)
+    )
+
+    for i, (b, c) in enumerate(zip(b_lists, c_lists, strict=True)):
+        assert shared[i] / 4 == pytest.approx(overlap_at_k(b, c, 4))
+        expected = rank_displacement(b, c, 4)
+        if expected is None:
+            assert disp[i] != disp[i]  # NaN
+        else:
+            assert disp[i] == pytest.approx(expected)
+
+
+def _noisy_runs():
+    # a00: stable; a01: last two slots replaced between runs; a02: adjacent swap in one run
+    runs = []
+    for r in range(4):
+        runs.append(
+            {
+                "a00": ["A", "B", "C", "D"],
+                "a01": ["A", "B", *(["X", "Y"] if r % 2 else ["P", "Q"])],
+                "a02": ["B", "A", "C", "D"] if r == 3 else ["A", "B", "C", "D"],
+            }
+        )
+    return runs
+
+
+def test_calibrate_builds_noise_profile_and_percentiles():
+    report = calibrate(_noisy_runs(), k=4)
+
+    assert report.repeats == 4
+    assert report.pair_count == 6
+    assert report.calibrated_anchors == 3
+    assert report.min_anchor_jaccard == 1.0
+
+    noise = report.noise_profile.by_anchor
+    assert noise["a00"] == (1.0, 0.0)
+    assert noise["a01"] == (0.5, 0.0)
+    assert noise["a02"] == (1.0, 0.5)
+    assert report.overlap_percentiles["p1"] == pytest.approx(0.5)
+    assert report.overlap_percentiles["p50"] == pytest.approx(1.0)
+    assert report.displacement_percentiles["p99"] == pytest.approx(0.5)
+
+
+def test_suggested_thresholds_clear_noise_but_keep_defaults_when_quiet():
+    defaults = ThresholdPreset()
+
+    quiet = calibrate([{"a": ["A", "B", "C"]}] * 3, k=3)
+    assert quiet.suggested_thresholds == defaults
+
+    # Every anchor loses half its neighbors between runs: overlap must be loosened
+    noisy = calibrate(
+        [
+            {f"a{i}": ["A", "B", "C", "D"] for i in range(10)},
+            {f"a{i}": ["A", "B", "E", "F"] for i in range(10)},
+        ],
+        k=4,
+    )
+    t = noisy.suggested_thresholds
+    assert t.overlap_warning < 0.5
+    assert t.overlap_warning - t.overlap_critical == pytest.approx(
+        defaults.overlap_warning - defaults.overlap_critical
+    )
+    assert noisy.max_pair_churn == 0.0  # below the loosened overlap_warning, nothing churns
+
+
+def test_calibrate_requires_two_snapshots():
+    with pytest.raises(ValueError):
+        calibrate([{"a": ["A"]}], k=1)
+
+
+def test_compare_with_noise_profile_downgrades_anchors_within_noise():
+    profile = calibrate(_noisy_runs(), k=4).noise_profile
+    baseline = {a: ["A", "B", "C", "D"] for a in ("a00", "a01", "a02")}
+    candidate = {
+        "a00": ["A", "B", "Y", "Z"],  # beyond its (zero) noise
+        "a01": ["A", "B", "M", "N"],  # two replaced, as seen in calibration
+        "a02": ["A", "B", "C", "D"],
+    }
+    cfg = ComparisonConfig(k=4)
+
+    plain = compare(baseline, candidate, cfg)
+    calibrated = compare(baseline, candidate, cfg, noise_profile=profile)
+
+    assert calibrated.get_anchor("a00").risk_level == plain.get_anchor("a00").risk_level
+    assert calibrated.get_anchor("a00").risk_level != RiskLevel.INFO
+    assert plain.get_anchor("a01").risk_level == RiskLevel.WARNING
+    a01 = calibrated.get_anchor("a01")
+    assert a01.risk_level == RiskLevel.INFO
+    assert a01.reasons == ["within calibrated noise"]
+    assert calibrated.overall_churn_rate < plain.overall_churn_rate
+
+
+def test_noise_profile_must_match_k():
+    profile = calibrate(_noisy_runs(), k=4).noise_profile
+    with pytest.raises(ValueError):
+        compare({"a00": ["A"]}, {"a00": ["A"]}, ComparisonConfig(k=3), noise_profile=profile)
+
+
+def test_cli_calibrate_then_compare_with_noise_profile(tmp_path, capsys):
+    paths = []
+    for i, run in enumerate(_noisy_runs()):
+        path = tmp_path / f"run{i}.json"
+        dump_json(str(path), run)
+        paths.append(str(path))
+    calibration = tmp_path / "calibration.json"
+
+    code = main(["calibrate", "--snapshots", *paths, "--k", "4", "--output", str(calibration)])
+    assert code == 0
+    assert "Suggested thresholds" in capsys.readouterr().out
+
+    code = main(
+        [
+            "compare",
+            "--baseline",
+            paths[0],
+            "--candidate",
+            paths[1],
+            "--k",
+            "4",
+            "--noise-profile",
+            str(calibration),
+            "--format",
+            "json",
+        ]
+    )
+    assert code == 0
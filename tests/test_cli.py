@@ -66,3 +66,32 @@ def test_cli_error_on_missing_file(tmp_path: Path):
     res = _run_cli(["compare", "--baseline", str(missing), "--candidate", str(missing)])
     assert res.returncode == 3
     assert "ERROR:" in res.stderr
+
+
+def test_cli_fail_fast_reports_partial(tmp_path: Path):
+    baseline = {f"A{i}": ["X", "Y", "Z"] for i in range(20)}
+    candidate = {f"A{i}": ["P", "Q", "R"] for i in range(20)}
+
+    b = tmp_path / "baseline.json"
+    c = tmp_path / "candidate.json"
+    b.write_text(json.dumps(baseline), encoding="utf-8")
+    c.write_text(json.dumps(candidate), encoding="utf-8")
+
+    res = _run_cli(
+        [
+            "compare",
+            "--baseline",
+            str(b),
+            "--candidate",
+            str(c),
+            "--k",
+            "3",
+            "--fail-fast",
+            "--format",
+            "json",
+        ]
+    )
+    assert res.returncode == 2
+    payload = json.loads(res.stdout)
+    assert payload["overall_risk_level"] == "CRITICAL"
+    assert "partial" in payload
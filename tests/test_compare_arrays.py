@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from vector_guardrails import compare, compare_arrays
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+
+
+def _matrices(n=60, k=8, seed=0):
+    rng = np.random.default_rng(seed)
+    baseline = np.array([rng.choice(500, k, replace=False) for _ in range(n)])
+    candidate = baseline.copy()
+    candidate[:, k // 2 :] = [
+        rng.choice(np.arange(500, 900), k - k // 2, replace=False) for _ in range(n)
+    ]
+    candidate[::7, k - 2 :] = -1  # missing results
+    return baseline, candidate
+
+
+def _as_snapshot(matrix, anchor_ids):
+    rows = zip(anchor_ids, matrix.tolist(), strict=True)
+    return {a: [str(x) for x in row if x >= 0] for a, row in rows}
+
+
+@pytest.mark.parametrize("large_k_threshold", [32, 4])
+@pytest.mark.parametrize("scale", [1, 10**15])
+def test_matches_compare_on_stringified_ids(large_k_threshold, scale):
+    baseline, candidate = _matrices()
+    baseline = baseline * scale
+    candidate = np.where(candidate >= 0, candidate * scale, -1)
+    anchor_ids = [f"q{i}" for i in range(len(baseline))]
+    cfg = ComparisonConfig(k=8, large_k_threshold=large_k_threshold)
+
+    report = compare_arrays(baseline, candidate, cfg, anchor_ids=anchor_ids)
+    expected = compare(_as_snapshot(baseline, anchor_ids), _as_snapshot(candidate, anchor_ids), cfg)
+
+    by_anchor = {m.anchor_id: m for m in expected.anchor_metrics}
+    assert {m.anchor_id: m for m in report.anchor_metrics} == by_anchor
+    assert report.overall_mean_overlap == pytest.approx(expected.overall_mean_overlap)
+    assert report.overall_churn_rate == expected.overall_churn_rate
+    assert report.overall_risk_level == expected.overall_risk_level
+    assert report.overlap_distribution == expected.overlap_distribution
+    freq, expected_freq = report.neighbor_frequency, expected.neighbor_frequency
+    assert freq.candidate_distinct_neighbors == expected_freq.candidate_distinct_neighbors
+    assert {m.neighbor_id for m in freq.top_fallers} <= {str(x) for x in baseline.ravel().tolist()}
+
+
+def test_wide_int32_matrices_and_neighbor_names():
+    baseline = np.array([[0, 1, 2, 3], [2, 3, -1, -1]], dtype=np.int32)
+    candidate = np.array([[1, 0, 2, 3], [3, 1, -1, -1]], dtype=np.int32)
+    names = ["doc-a", "doc-b", "doc-c", "doc-d"]
+    cfg = ComparisonConfig(k=2, min_anchors=1)
+
+    report = compare_arrays(baseline, candidate, cfg, neighbor_ids=names)
+
+    assert [m.anchor_id for m in report.anchor_metrics] == ["0", "1"]
+    assert [m.overlap for m in report.anchor_metrics] == [1.0, 0.5]
+    assert report.anchor_metrics[0].rank_displacement == 1.0
+    assert report.alignment.compared_anchors == 2
+    freq = report.neighbor_frequency
+    assert (freq.baseline_distinct_neighbors, freq.candidate_distinct_neighbors) == (4, 3)
+    assert [m.neighbor_id for m in freq.top_risers] == ["doc-b"]
+    assert [m.neighbor_id for m in freq.top_fallers] == ["doc-c"]
+
+    # Narrower than K: padded, so overlap still divides by K
+    narrow = compare_arrays(baseline[:, :1], candidate[:, :1], ComparisonConfig(k=2))
+    assert [m.overlap for m in narrow.anchor_metrics] == [0.0, 0.0]
+    assert narrow.overall_risk_level == RiskLevel.CRITICAL
+
+
+def test_invalid_matrices_raise():
+    ok = np.array([[0, 1], [2, 3]])
+    with pytest.raises(ValueError, match="integer"):
+        compare_arrays(ok.astype(float), ok, ComparisonConfig(k=2))
+    with pytest.raises(ValueError, match="after -1"):
+        compare_arrays(np.array([[-1, 1], [2, 3]]), ok, ComparisonConfig(k=2))
+    with pytest.raises(ValueError, match="duplicate"):
+        compare_arrays(np.array([[1, 1], [2, 3]]), ok, ComparisonConfig(k=2))
+    with pytest.raises(ValueError, match="duplicate"):
+        compare_arrays(np.array([[1, 1], [2, 3]]), ok, ComparisonConfig(k=2, large_k_threshold=1))
+    with pytest.raises(ValueError, match="one row per anchor"):
+        compare_arrays(ok, ok[:1], ComparisonConfig(k=2))
+    with pytest.raises(ValueError, match="anchor_ids"):
+        compare_arrays(ok, ok, ComparisonConfig(k=2), anchor_ids=["a"])
+    with pytest.raises(ValueError, match="out of range"):
+        compare_arrays(ok, ok, ComparisonConfig(k=2), neighbor_ids=["a", "b"])
@@ -0,0 +1,185 @@
+import importlib
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from vector_guardrails import cli
+from vector_guardrails.cli import main
+from vector_guardrails.compare import compare, compare_delta
+from vector_guardrails.delta import (
+    ReferenceState,
+    apply_delta,
+    create_delta,
+    dump_delta,
+    file_sha256,
+)
+from vector_guardrails.models import ComparisonConfig
+from vector_guardrails.snapshot_index import SnapshotIndex
+
+# The package re-exports the `compare` function under the module's name
+compare_module = importlib.import_module("vector_guardrails.compare")
+
+REFERENCE = {
+    "a1": ["x", "y", "z"],
+    "a2": ["m", "n", "o"],
+    "a3": ["p", "q", "r"],
+    "a4": ["s", "t"],
+}
+SNAPSHOT = {
+    "a1": ["x", "y", "z"],
+    "a2": ["o", "n", "w"],  # changed
+    "a4": ["s", "t"],
+    "a5": ["u", "v", "w"],  # added; a3 removed
+}
+
+
+def test_create_and_apply_round_trip():
+    delta = create_delta(REFERENCE, SNAPSHOT)
+
+    assert set(delta.changed) == {"a2"}
+    assert set(delta.added) == {"a5"}
+    assert delta.removed == ["a3"]
+    assert apply_delta(REFERENCE, delta) == SNAPSHOT
+
+
+def test_apply_rejects_mismatched_reference():
+    delta = create_delta(REFERENCE, SNAPSHOT)
+    with pytest.raises(ValueError):
+        apply_delta({"a1": ["x"]}, delta)
+
+
+def test_compare_delta_matches_full_compare():
+    cfg = ComparisonConfig(k=3)
+    delta = create_delta(REFERENCE, SNAPSHOT)
+
+    expected = compare(REFERENCE, SNAPSHOT, cfg)
+    cached = compare(REFERENCE, REFERENCE, cfg)
+    actual = compare_delta(REFERENCE, delta, cfg, reference_report=cached)
+
+    assert actual.alignment == expected.alignment
+    assert actual.anchor_metrics == expected.anchor_metrics
+    assert actual.overall_mean_overlap == expected.overall_mean_overlap
+    assert actual.overall_mean_displacement == expected.overall_mean_displacement
+    assert actual.overall_churn_rate == expected.overall_churn_rate
+    assert actual.overall_risk_level == expected.overall_risk_level
+    assert actual.verdict_summary == expected.verdict_summary
+
+
+def test_compare_delta_ignores_cache_built_with_other_config():
+    delta = create_delta(REFERENCE, SNAPSHOT)
+    stale = compare(REFERENCE, REFERENCE, ComparisonConfig(k=2))
+    report = compare_delta(REFERENCE, delta, ComparisonConfig(k=3), reference_report=stale)
+    assert report.config.k == 3
+    expected = compare(REFERENCE, SNAPSHOT, ComparisonConfig(k=3))
+    assert report.anchor_metrics == expected.anchor_metrics
+
+
+def test_cli_delta_create_apply_and_compare(tmp_path: Path):
+    ref = tmp_path / "ref.json"
+    new = tmp_path / "new.json"
+    ref.write_text(json.dumps(REFERENCE), encoding="utf-8")
+    new.write_text(json.dumps(SNAPSHOT), encoding="utf-8")
+    delta = tmp_path / "delta.json"
+    rebuilt = tmp_path / "rebuilt.json"
+    cache = tmp_path / "cache.json"
+
+    def run(args: list[str]) -> subprocess.CompletedProcess[str]:
+        cmd = [sys.executable, "-m", "vector_guardrails"] + args
+        return subprocess.run(cmd, capture_output=True, text=True)
+
+    res = run(
+        ["delta-create", "--reference", str(ref), "--snapshot", str(new), "--output", str(delta)]
+    )
+    assert res.returncode == 0, res.stderr
+
+    res = run(
+        ["delta-apply", "--reference", str(ref), "--delta", str(delta), "--output", str(rebuilt)]
+    )
+    assert res.returncode == 0, res.stderr
+    assert json.loads(rebuilt.read_text(encoding="utf-8")) == SNAPSHOT
+
+    args = [
+        "compare", "--baseline", str(ref), "--delta", str(delta), "--k", "3",
+        "--reference-cache", str(cache), "--format", "json",
+    ]
+    first = run(args)
+    second = run(args)  # served from cache
+    assert cache.exists()
+    assert json.loads(first.stdout) == json.loads(second.stdout)
+    assert json.loads(first.stdout)["compared_anchors"] == 3
+
+
+def _random_pair(seed: int) -> tuple[dict[str, list[str]], dict[str, list[str]]]:
+    rng = random.Random(seed)
+    pool = [f"d{j}" for j in range(30)]
+    reference = {f"a{i:03d}": rng.sample(pool, 8) for i in range(300)}
+    snapshot = {a: list(n) for a, n in reference.items() if rng.random() > 0.05}
+    for a in rng.sample(sorted(snapshot), 40):
+        snapshot[a] = rng.sample(pool, rng.randint(0, 8))
+    snapshot.update({f"b{i}": rng.sample(pool, 8) for i in range(10)})
+    return reference, snapshot
+
+
+def test_compare_delta_adjusts_running_aggregates(monkeypatch):
+    cfg = ComparisonConfig(k=8)
+    reference, snapshot = _random_pair(3)
+    delta = create_delta(reference, snapshot)
+    cached = compare(reference, reference, cfg)
+    state = ReferenceState.from_report(cached)
+    expected = compare(reference, snapshot, cfg)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("reference rows re-summarized")
+
+    monkeypatch.setattr(compare_module, "summarize_identity_metrics", fail)
+    actual = compare_delta(reference, delta, cfg, reference_report=cached, reference_state=state)
+
+    assert actual.model_dump(exclude={"timestamp", "neighbor_frequency"}) == expected.model_dump(
+        exclude={"timestamp", "neighbor_frequency"}
+    )
+    # The cached state itself is left untouched for the next delta
+    assert state.aggregates.state() == ReferenceState.from_report(cached).aggregates.state()
+
+
+def test_cli_delta_reuses_cached_hash_and_reads_only_changed_anchors(tmp_path, monkeypatch):
+    reference, snapshot = _random_pair(4)
+    ref = tmp_path / "ref.json"
+    ref.write_text(json.dumps(reference), encoding="utf-8")
+    delta = create_delta(reference, snapshot, reference_sha256=file_sha256(str(ref)))
+    delta_path = tmp_path / "delta.json"
+    dump_delta(str(delta_path), delta)
+    assert main(["index", "--snapshots", str(ref)]) == 0
+
+    hashes: list[str] = []
+    monkeypatch.setattr(cli, "file_sha256", lambda path: hashes.append(path) or file_sha256(path))
+    reads: list[int] = []
+    get_many = SnapshotIndex.get_many
+    monkeypatch.setattr(
+        SnapshotIndex, "get_many", lambda self, ids: reads.append(len(ids)) or get_many(self, ids)
+    )
+
+    args = ["compare", "--baseline", str(ref), "--delta", str(delta_path), "--k", "8"]
+    args += ["--reference-cache", str(tmp_path / "cache.json"), "--format", "json", "--index"]
+    first_code = main(args)
+    assert len(hashes) == 1  # no cache yet
+    hashes.clear()
+    reads.clear()
+
+    assert main(args) == first_code
+    assert hashes == []  # size and mtime unchanged: the cached hash is trusted
+    assert reads == [len(delta.changed)]
+
+
+def test_cli_delta_rejects_memory_limit(tmp_path, capsys):
+    ref = tmp_path / "ref.json"
+    ref.write_text(json.dumps(REFERENCE), encoding="utf-8")
+    delta = tmp_path / "delta.json"
+    dump_delta(str(delta), create_delta(REFERENCE, SNAPSHOT))
+
+    args = ["compare", "--baseline", str(ref), "--delta", str(delta), "--k", "3"]
+    assert main([*args, "--memory-limit", "64M"]) == 3
+    assert "--memory-limit" in capsys.readouterr().err
@@ -0,0 +1,185 @@
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from vector_guardrails import external
+from vector_guardrails.compare import compare, compare_external
+from vector_guardrails.io import iter_snapshot_entries
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+
+
+def _random_snapshot(rng: random.Random, anchors: list[str]) -> dict[str, list[str]]:
+    pool = [f"n{j}" for j in range(40)]
+    return {a: rng.sample(pool, rng.randint(0, 12)) for a in anchors}
+
+
+@pytest.fixture
+def snapshot_files(tmp_path: Path):
+    rng = random.Random(0)
+    anchors = [f"a{i:04d}" for i in range(600)]
+    rng.shuffle(anchors)  # unsorted on disk
+    baseline = _random_snapshot(rng, anchors[:500])
+    candidate = _random_snapshot(rng, anchors[100:])
+
+    b = tmp_path / "baseline.json"
+    c = tmp_path / "candidate.json"
+    b.write_text(json.dumps(baseline), encoding="utf-8")
+    c.write_text(json.dumps(candidate, indent=2), encoding="utf-8")
+    return baseline, candidate, b, c
+
+
+def test_iter_snapshot_entries_streams_small_chunks(snapshot_files):
+    baseline, _, b, _ = snapshot_files
+    assert dict(iter_snapshot_entries(str(b), chunk_size=7)) == baseline
+
+
+def test_external_matches_in_memory(snapshot_files, tmp_path: Path, monkeypatch):
+    baseline, candidate, b, c = snapshot_files
+    monkeypatch.setattr(external, "_MIN_RUN_BYTES", 1)
+
+    cfg = ComparisonConfig(k=10, chunk_size=64)
+    expected = compare(baseline, candidate, cfg)
+    actual = compare_external(
+        str(b), str(c), cfg, memory_limit=20_000, tmp_dir=str(tmp_path), anchor_metrics_limit=1000
+    )
+
+    assert actual.alignment == expected.alignment
+    assert actual.anchor_metrics == expected.anchor_metrics
+    assert actual.anchors_evaluated == expected.anchors_evaluated
+    assert actual.overall_mean_overlap == expected.overall_mean_overlap
+    assert actual.overall_mean_displacement == expected.overall_mean_displacement
+    assert actual.overall_churn_rate == expected.overall_churn_rate
+    assert actual.overall_mean_rbo == expected.overall_mean_rbo
+    assert actual.overall_risk_level == expected.overall_risk_level
+    assert actual.neighbor_frequency is None
+
+
+def test_spill_produces_multiple_runs_and_last_duplicate_wins(tmp_path: Path):
+    entries = [("b", ["x"]), ("a", ["y"]), ("c", ["z"]), ("a", ["w"])]
+    runs = external.spill_sorted_runs(entries, k=5, run_bytes=1, tmp_dir=tmp_path, prefix="t")
+
+    assert len(runs) == 4
+    assert list(external.iter_merged_runs(runs)) == [("a", ["w"]), ("b", ["x"]), ("c", ["z"])]
+
+
+def test_external_validates_entries(tmp_path: Path):
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps({"a1": ["x", "x"]}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        compare_external(str(bad), str(bad), ComparisonConfig(k=3), memory_limit=4 << 20)
+
+
+def test_merge_caps_fan_in_with_intermediate_runs(tmp_path: Path, monkeypatch):
+    rng = random.Random(1)
+    entries = [(f"a{rng.randrange(50):02d}", [f"n{i}"]) for i in range(200)]
+    runs = external.spill_sorted_runs(entries, k=5, run_bytes=1, tmp_dir=tmp_path, prefix="t")
+    assert len(runs) == 200
+
+    widths: list[int] = []
+    merge_records = external._merge_records
+
+    def recording(group):
+        widths.append(len(group))
+        return merge_records(group)
+
+    monkeypatch.setattr(external, "_merge_records", recording)
+    merged = list(external.iter_merged_runs(runs, fan_in=8))
+
+    assert max(widths) <= 8
+    assert len(widths) > 1  # intermediate passes happened
+    assert merged == sorted(dict(entries).items())  # last occurrence still wins
+
+
+def test_external_streams_rows_instead_of_keeping_them(snapshot_files, tmp_path: Path):
+    _, _, b, c = snapshot_files
+    cfg = ComparisonConfig(k=10, chunk_size=64)
+    chunks: list[int] = []
+    alignment, overall = external.compute_identity_metrics_external(
+        str(b),
+        str(c),
+        cfg,
+        memory_limit=4 << 20,
+        tmp_dir=str(tmp_path),
+        on_rows=lambda rows: chunks.append(len(rows)),
+    )
+
+    assert max(chunks) <= 64
+    assert sum(chunks) == alignment.compared_anchors
+    expected = compare(*(json.loads(p.read_text(encoding="utf-8")) for p in (b, c)), cfg)
+    assert overall.overall_mean_overlap == expected.overall_mean_overlap
+    assert overall.overlap_distribution == expected.overlap_distribution
+
+
+def test_external_lists_only_the_worst_anchors(snapshot_files, tmp_path: Path):
+    baseline, candidate, b, c = snapshot_files
+    cfg = ComparisonConfig(k=10, chunk_size=64)
+    expected = compare(baseline, candidate, cfg)
+    actual = compare_external(
+        str(b), str(c), cfg, memory_limit=4 << 20, tmp_dir=str(tmp_path), anchor_metrics_limit=20
+    )
+
+    severity = list(RiskLevel)
+    worst = sorted(
+        expected.anchor_metrics,
+        key=lambda m: (-severity.index(m.risk_level), m.overlap, m.anchor_id),
+    )[:20]
+    assert actual.anchor_metrics == sorted(worst, key=lambda m: m.anchor_id)
+    assert actual.anchors_evaluated == expected.alignment.compared_anchors
+    assert actual.overall_risk_level == expected.overall_risk_level
+    assert "LISTED: the 20 worst of" in actual.verdict_summary
+
+    with pytest.raises(ValueError, match="memory_limit"):
+        compare_external(str(b), str(c), cfg, memory_limit=2 << 20)
+
+
+# getrusage's ru_maxrss survives exec (it would report pytest's own peak), so the
+# child reads its current and peak RSS from /proc instead
+_PEAK_RSS_SCRIPT = """
+import sys
+from vector_guardrails.compare import compare_external
+from vector_guardrails.models import ComparisonConfig
+
+def status_kib(field):
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ":"))
+
+b, c, warm, limit = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+cfg = ComparisonConfig(k=10)
+compare_external(warm, warm, cfg, memory_limit=limit)  # one-time imports and caches
+base = status_kib("VmRSS")
+report = compare_external(b, c, cfg, memory_limit=limit)
+print(1024 * (status_kib("VmHWM") - base), report.anchors_evaluated)
+"""
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/self/status")
+def test_external_peak_rss_stays_under_memory_limit(tmp_path: Path):
+    rng = random.Random(2)
+    pool = [f"doc-{j:06d}" for j in range(50_000)]
+    anchors = [f"anchor-{i:06d}" for i in range(30_000)]
+    rng.shuffle(anchors)
+    paths = []
+    for name in ("b.json", "c.json"):
+        path = tmp_path / name
+        path.write_text(json.dumps({a: rng.sample(pool, 10) for a in anchors}), encoding="utf-8")
+        paths.append(str(path))
+    warm = tmp_path / "warm.json"
+    warm.write_text(json.dumps({"a": ["x", "y"]}), encoding="utf-8")
+    limit = 4 << 20
+    assert min(os.path.getsize(p) for p in paths) > limit  # the files do not fit
+
+    result = subprocess.run(
+        [sys.executable, "-c", _PEAK_RSS_SCRIPT, *paths, str(warm), str(limit)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    growth, evaluated = map(int, result.stdout.split())
+
+    assert evaluated == len(anchors)
+    assert growth <= limit
@@ -0,0 +1,48 @@
+from vector_guardrails.compare import compare
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+
+
+def _snapshots(n: int, bad: set[int]):
+    baseline = {f"a{i:03d}": ["X", "Y", "Z"] for i in range(n)}
+    candidate = {
+        f"a{i:03d}": (["P", "Q", "R"] if i in bad else ["X", "Y", "Z"]) for i in range(n)
+    }
+    return baseline, candidate
+
+
+def test_fail_fast_stops_on_first_critical_anchor():
+    baseline, candidate = _snapshots(100, bad={5})
+    cfg = ComparisonConfig(k=3, fail_fast=True, chunk_size=10)
+    report = compare(baseline, candidate, cfg)
+
+    assert report.overall_risk_level == RiskLevel.CRITICAL
+    assert report.partial is True
+    assert report.anchors_evaluated == 10
+    assert len(report.anchor_metrics) == 10
+    assert report.neighbor_frequency is None
+    assert "PARTIAL" in report.verdict_summary
+
+
+def test_fail_fast_stops_once_churn_provably_critical():
+    # Low-but-not-critical overlap (2/3): WARNING anchors that only add churn
+    baseline = {f"a{i:03d}": ["X", "Y", "Z"] for i in range(100)}
+    candidate = {f"a{i:03d}": ["X", "Y", "Q"] for i in range(100)}
+    cfg = ComparisonConfig(k=3, fail_fast=True, chunk_size=10)
+    report = compare(baseline, candidate, cfg)
+
+    # 40 churned anchors out of 100 is the first chunk boundary above churn_critical=0.35
+    assert report.overall_risk_level == RiskLevel.CRITICAL
+    assert report.anchors_evaluated == 40
+    assert report.partial is True
+
+
+def test_fail_fast_matches_full_run_when_verdict_not_critical():
+    baseline, candidate = _snapshots(50, bad=set())
+    full = compare(baseline, candidate, ComparisonConfig(k=3))
+    fast = compare(baseline, candidate, ComparisonConfig(k=3, fail_fast=True, chunk_size=7))
+
+    assert fast.partial is False
+    assert fast.anchors_evaluated == full.anchors_evaluated == 50
+    assert fast.overall_risk_level == full.overall_risk_level
+    assert fast.anchor_metrics == full.anchor_metrics
+    assert fast.neighbor_frequency == full.neighbor_frequency
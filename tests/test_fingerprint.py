@@ -0,0 +1,123 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from vector_guardrails.cli import main
+from vector_guardrails.compare import compare, compare_fingerprinted
+from vector_guardrails.fingerprint import (
+    collision_probability,
+    fingerprint,
+    fingerprint_entries,
+    fingerprint_label,
+    label_fingerprint,
+)
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+
+
+@pytest.fixture
+def snapshot_files(tmp_path: Path):
+    rng = random.Random(3)
+    docs = [f"https://example.com/doc/{j}" for j in range(60)]
+    anchors = [f"https://example.com/query/{i}" for i in range(400)]
+    baseline = {a: rng.sample(docs, 10) for a in anchors[:350]}
+    candidate = {}
+    for a in anchors[50:]:
+        neighbors = list(baseline.get(a, rng.sample(docs, 10)))
+        if rng.random() < 0.4:
+            neighbors[rng.randrange(4, 10)] = next(d for d in docs if d not in neighbors)
+            rng.shuffle(neighbors)
+        candidate[a] = neighbors
+
+    b = tmp_path / "baseline.json"
+    c = tmp_path / "candidate.json"
+    b.write_text(json.dumps(baseline), encoding="utf-8")
+    c.write_text(json.dumps(candidate), encoding="utf-8")
+    return baseline, candidate, b, c
+
+
+def test_fingerprint_is_stable_and_fits_int64():
+    fp = fingerprint("https://example.com/a")
+    assert fp == fingerprint("https://example.com/a")
+    assert 0 <= fp < 2**63
+    assert label_fingerprint(fingerprint_label(fp)) == fp
+
+
+def test_collision_probability_birthday_bound():
+    assert collision_probability(0) == 0.0
+    assert collision_probability(1) == 0.0
+    assert collision_probability(10**6) == pytest.approx(10**12 / 2 / 2**63, rel=1e-3)
+    assert collision_probability(10**6, bits=16) == pytest.approx(1.0)
+
+
+def test_fingerprint_entries_sorts_pads_and_keeps_last_duplicate():
+    snap = fingerprint_entries([("a", ["x", "y"]), ("b", ["z"]), ("a", ["w"])], k=2)
+
+    assert list(snap.anchors) == sorted([fingerprint("a"), fingerprint("b")])
+    rows = dict(zip(snap.anchors.tolist(), snap.neighbors.tolist(), strict=True))
+    assert rows[fingerprint("a")] == [fingerprint("w"), -1]
+    assert rows[fingerprint("b")] == [fingerprint("z"), -1]
+
+
+def test_fingerprint_entries_still_validates():
+    with pytest.raises(ValueError):
+        fingerprint_entries([("a", ["x", "x"])], k=2)
+
+
+def test_fingerprinted_matches_string_comparison(snapshot_files):
+    baseline, candidate, b, c = snapshot_files
+    cfg = ComparisonConfig(k=10)
+    expected = compare(baseline, candidate, cfg)
+    actual = compare_fingerprinted(str(b), str(c), cfg)
+
+    assert actual.overall_risk_level == expected.overall_risk_level
+    assert actual.overall_mean_overlap == pytest.approx(expected.overall_mean_overlap)
+    assert actual.overall_mean_displacement == pytest.approx(expected.overall_mean_displacement)
+    assert actual.overall_churn_rate == expected.overall_churn_rate
+    assert actual.overall_mean_rbo == pytest.approx(expected.overall_mean_rbo)
+    # Ties among top movers are broken by code, which differs between the two modes
+    movers = {"top_risers", "top_fallers"}
+    assert actual.neighbor_frequency.model_dump(exclude=movers) == (
+        expected.neighbor_frequency.model_dump(exclude=movers)
+    )
+    assert [m.delta for m in actual.neighbor_frequency.top_risers] == [
+        m.delta for m in expected.neighbor_frequency.top_risers
+    ]
+
+    exp_alignment = expected.alignment
+    act_alignment = actual.alignment
+    assert act_alignment.compared_anchors == exp_alignment.compared_anchors
+    assert act_alignment.anchor_jaccard == exp_alignment.anchor_jaccard
+    assert set(act_alignment.baseline_only_anchor_sample) <= set(baseline) - set(candidate)
+
+    # The worst at-risk anchors (up to the sample limit per level) get their IDs back
+    expected_by_id = {m.anchor_id: m for m in expected.anchor_metrics}
+    for level in (RiskLevel.CRITICAL, RiskLevel.WARNING):
+        at_risk = actual.get_anchors_by_risk(level)
+        resolved = [m for m in at_risk if not m.anchor_id.startswith("fp:")]
+        assert len(resolved) == min(25, len(at_risk))
+        for m in resolved:
+            assert expected_by_id[m.anchor_id].overlap == m.overlap
+    assert all(
+        m.anchor_id.startswith("fp:")
+        for m in actual.anchor_metrics
+        if m.risk_level == RiskLevel.INFO
+    )
+
+    assert actual.fingerprint is not None
+    assert actual.fingerprint.bits == 63
+    assert actual.fingerprint.distinct_ids == 400 + 60
+    assert 0.0 < actual.fingerprint.collision_probability < 1e-12
+
+
+def test_cli_compare_fingerprint(snapshot_files, capsys):
+    _, _, b, c = snapshot_files
+    code = main(
+        ["compare", "--baseline", str(b), "--candidate", str(c), "--fingerprint"]
+        + ["--format", "json"]
+    )
+    payload = json.loads(capsys.readouterr().out)
+
+    assert code == payload["exit_code"]
+    assert payload["fingerprint"]["distinct_ids"] == 460
@@ -0,0 +1,62 @@
+import numpy as np
+
+from vector_guardrails.compare import compare
+from vector_guardrails.frequency import neighbor_frequency_drift, occurrence_skew
+from vector_guardrails.interning import encode_neighbor_lists
+from vector_guardrails.models import ComparisonConfig
+
+
+def _drift(baseline: list[list[str]], candidate: list[list[str]], k: int, top_n: int = 10):
+    vocab: dict[str, int] = {}
+    b = encode_neighbor_lists(baseline, k, vocab)
+    c = encode_neighbor_lists(candidate, k, vocab)
+    return neighbor_frequency_drift(b, c, list(vocab), top_n=top_n)
+
+
+def test_identical_snapshots_have_no_movers():
+    lists = [["A", "B"], ["C", "D"]]
+    summary = _drift(lists, lists, k=2)
+
+    assert summary.baseline_distinct_neighbors == 4
+    assert summary.candidate_distinct_neighbors == 4
+    assert summary.catalog_coverage_ratio == 1.0
+    assert summary.top_risers == []
+    assert summary.top_fallers == []
+
+
+def test_hub_appears_as_top_riser_and_coverage_drops():
+    baseline = [["A", "B"], ["C", "D"], ["E", "F"]]
+    candidate = [["H", "B"], ["H", "D"], ["H", "F"]]
+    summary = _drift(baseline, candidate, k=2)
+
+    assert summary.top_risers[0].neighbor_id == "H"
+    assert summary.top_risers[0].baseline_count == 0
+    assert summary.top_risers[0].candidate_count == 3
+    assert [c.neighbor_id for c in summary.top_fallers] == ["A", "C", "E"]
+
+    assert summary.candidate_distinct_neighbors == 4
+    assert summary.catalog_coverage_ratio == 4 / 6
+    assert summary.candidate_max_occurrence == 3
+    assert summary.candidate_occurrence_skew > summary.baseline_occurrence_skew
+
+
+def test_top_n_limits_movers():
+    baseline = [["A"], ["B"], ["C"]]
+    candidate = [["X"], ["Y"], ["Z"]]
+    summary = _drift(baseline, candidate, k=1, top_n=2)
+    assert len(summary.top_risers) == 2
+    assert len(summary.top_fallers) == 2
+
+
+def test_occurrence_skew_of_uniform_counts_is_zero():
+    assert occurrence_skew(np.array([3, 3, 3])) == 0.0
+    assert occurrence_skew(np.array([], dtype=np.int64)) == 0.0
+
+
+def test_compare_attaches_neighbor_frequency():
+    baseline = {"A1": ["X", "Y"], "A2": ["M", "N"]}
+    candidate = {"A1": ["X", "H"], "A2": ["M", "H"]}
+    report = compare(baseline, candidate, ComparisonConfig(k=2))
+
+    assert report.neighbor_frequency is not None
+    assert report.neighbor_frequency.top_risers[0].neighbor_id == "H"
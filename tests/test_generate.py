@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from vector_guardrails.generate import generate_snapshot
+
+
+def _reference_topk(anchors: np.ndarray, corpus: np.ndarray, k: int, cosine: bool) -> np.ndarray:
+    if cosine:
+        anchors = anchors / np.linalg.norm(anchors, axis=1, keepdims=True)
+        corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    scores = anchors @ corpus.T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+@pytest.mark.parametrize("metric", ["cosine", "dot"])
+def test_blocked_topk_matches_full_sort(metric: str):
+    rng = np.random.default_rng(0)
+    anchors = rng.standard_normal((37, 8)).astype(np.float32)
+    corpus = rng.standard_normal((101, 8)).astype(np.float32)
+    anchor_ids = [f"a{i}" for i in range(37)]
+    corpus_ids = [f"c{j}" for j in range(101)]
+
+    snapshot = dict(
+        generate_snapshot(
+            anchors,
+            corpus,
+            anchor_ids,
+            corpus_ids,
+            k=5,
+            metric=metric,
+            anchor_block_size=8,
+            corpus_block_size=16,
+            workers=3,
+        )
+    )
+
+    expected = _reference_topk(anchors, corpus, 5, cosine=(metric == "cosine"))
+    assert list(snapshot) == anchor_ids
+    for i, aid in enumerate(anchor_ids):
+        assert snapshot[aid] == [corpus_ids[j] for j in expected[i]]
+
+
+def test_exclude_self_drops_anchor_from_its_neighbors():
+    vectors = np.eye(4, dtype=np.float32) + 0.1
+    ids = ["w", "x", "y", "z"]
+
+    snapshot = dict(generate_snapshot(vectors, vectors, ids, ids, k=2, exclude_self=True))
+    assert all(aid not in neighbors for aid, neighbors in snapshot.items())
+    assert all(len(neighbors) == 2 for neighbors in snapshot.values())
+
+
+def test_small_corpus_yields_short_lists():
+    vectors = np.eye(2, dtype=np.float32)
+    snapshot = dict(generate_snapshot(vectors, vectors, ["a", "b"], ["a", "b"], k=5))
+    assert snapshot == {"a": ["a", "b"], "b": ["b", "a"]}
+
+
+def test_id_length_mismatch_raises():
+    vectors = np.eye(2, dtype=np.float32)
+    with pytest.raises(ValueError):
+        list(generate_snapshot(vectors, vectors, ["a"], ["a", "b"], k=1))
+
+
+def test_cli_generate_writes_loadable_snapshot(tmp_path: Path):
+    rng = np.random.default_rng(1)
+    np.save(tmp_path / "anchors.npy", rng.standard_normal((6, 4)).astype(np.float32))
+    np.save(tmp_path / "corpus.npy", rng.standard_normal((20, 4)).astype(np.float32))
+    (tmp_path / "anchors.txt").write_text("\n".join(f"a{i}" for i in range(6)), encoding="utf-8")
+    corpus_ids = json.dumps([f"c{j}" for j in range(20)])
+    (tmp_path / "corpus.json").write_text(corpus_ids, encoding="utf-8")
+    out = tmp_path / "snap.json"
+
+    cmd = [
+        sys.executable, "-m", "vector_guardrails", "generate",
+        "--anchors", str(tmp_path / "anchors.npy"),
+        "--anchor-ids", str(tmp_path / "anchors.txt"),
+        "--corpus", str(tmp_path / "corpus.npy"),
+        "--corpus-ids", str(tmp_path / "corpus.json"),
+        "--k", "3",
+        "--output", str(out),
+    ]
+    res = subprocess.run(cmd, capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
+
+    snapshot = json.loads(out.read_text(encoding="utf-8"))
+    assert len(snapshot) == 6
+    assert all(len(v) == 3 for v in snapshot.values())
@@ -0,0 +1,130 @@
+import json
+
+import numpy as np
+import pytest
+
+from vector_guardrails import compare, compare_arrays
+from vector_guardrails.cli import main
+from vector_guardrails.compare import compare_delta, compare_external, compare_fingerprinted
+from vector_guardrails.graph import KnnGraph, component_labels, graph_summary, matrix_graphs
+from vector_guardrails.models import ComparisonConfig, RiskLevel, SnapshotDelta
+
+CFG = ComparisonConfig(k=5, graph_metrics=True)
+
+
+def _blocks(bridged: bool) -> np.ndarray:
+    """100 items in blocks of 10: four in-block neighbors plus a bridge to the next block
+    (or, without bridges, a fifth in-block neighbor)."""
+    rows = []
+    for i in range(100):
+        block, offset = divmod(i, 10)
+        inner = [block * 10 + (offset + j) % 10 for j in range(1, 5)]
+        last = (i + 10) % 100 if bridged else block * 10 + (offset + 5) % 10
+        rows.append([*inner, last])
+    return np.array(rows)
+
+
+def _snapshot(matrix: np.ndarray) -> dict[str, list[str]]:
+    return {f"i{a}": [f"i{n}" for n in row if n >= 0] for a, row in enumerate(matrix)}
+
+
+def test_component_labels():
+    src = np.array([0, 2, 5, 4], dtype=np.int32)
+    dst = np.array([1, 1, 3, 5], dtype=np.int32)
+    labels = component_labels(7, src, dst)
+    np.testing.assert_array_equal(labels, [0, 0, 0, 3, 3, 3, 6])
+
+    # A long chain hooked in the worst order still collapses to one root
+    chain = np.arange(999, 0, -1, dtype=np.int32)
+    assert (component_labels(1000, chain, chain - 1) == 0).all()
+
+
+def test_graph_stats():
+    # 0 <-> 1 mutual, 0 -> 2, 1 -> 2, 2 -> 3 (a neighbor only), self-loop dropped
+    graph = KnnGraph(
+        5, np.array([0, 1, 2]), np.array([0, 0, 1, 1, 2, 2]), np.array([1, 2, 0, 2, 3, 2])
+    )
+    stats = graph_summary(graph, graph).baseline
+
+    assert stats.nodes == 4
+    assert stats.edges == 5
+    # Edges into anchors: 0->1, 0->2, 1->0, 1->2; mutual: 0->1, 1->0
+    assert stats.reciprocity == pytest.approx(0.5)
+    assert stats.max_in_degree == 2
+    assert stats.in_degree_percentiles["p50"] == 1.0
+    assert stats.unreached_anchor_rate == 0.0
+    assert stats.components == 1
+    assert stats.largest_component_share == 1.0
+
+    with pytest.raises(ValueError):
+        KnnGraph(3, np.array([0]), np.array([0]), np.array([3]))
+
+
+def test_fragmentation_gates_a_high_overlap_candidate():
+    baseline, candidate = _snapshot(_blocks(True)), _snapshot(_blocks(False))
+
+    plain = compare(baseline, candidate, ComparisonConfig(k=5))
+    report = compare(baseline, candidate, CFG)
+
+    # Every anchor keeps 4 of 5 neighbors at the same ranks
+    assert plain.overall_risk_level == RiskLevel.INFO
+    assert plain.graph is None
+    graph = report.graph
+    assert graph.baseline.components == 1
+    assert graph.candidate.components == 10
+    assert graph.candidate.largest_component_share == pytest.approx(0.1)
+    assert graph.split_edge_rate == pytest.approx(0.2)
+    assert graph.candidate.reciprocity == pytest.approx(0.2)
+    assert graph.reciprocity_ratio is None
+    assert report.overall_risk_level == RiskLevel.CRITICAL
+    assert "split edge rate above CRITICAL" in report.verdict_summary
+
+    # Reversed: the candidate loses every mutual pair
+    reverse = compare(candidate, baseline, CFG)
+    assert reverse.graph.reciprocity_ratio == 0.0
+    assert reverse.graph.split_edge_rate == 0.0
+    assert "reciprocity ratio below CRITICAL" in reverse.verdict_summary
+
+
+def test_matrix_and_fingerprint_paths_match_snapshots(tmp_path):
+    b, c = _blocks(True), _blocks(False)
+    c[::7, 3:] = -1
+    expected = compare(_snapshot(b), _snapshot(c), CFG).graph
+
+    assert compare_arrays(b, c, CFG).graph == expected
+    # Sparse node IDs are compacted; rows map to nodes through anchor_nodes
+    ids = np.arange(100, dtype=np.int64) * 1_000_003 + 2**40
+    sparse = compare_arrays(
+        np.where(b >= 0, ids[b], -1), np.where(c >= 0, ids[c], -1), CFG, anchor_nodes=ids
+    )
+    assert sparse.graph == expected
+    assert graph_summary(*matrix_graphs(b, c)) == expected
+
+    b_path, c_path = tmp_path / "b.json", tmp_path / "c.json"
+    b_path.write_text(json.dumps(_snapshot(b)), encoding="utf-8")
+    c_path.write_text(json.dumps(_snapshot(c)), encoding="utf-8")
+    assert compare_fingerprinted(str(b_path), str(c_path), CFG).graph == expected
+
+
+def test_graph_metrics_need_both_snapshots():
+    snapshot = _snapshot(_blocks(True))
+    with pytest.raises(ValueError, match="graph_metrics"):
+        compare_delta(snapshot, SnapshotDelta(reference_anchor_count=len(snapshot)), CFG)
+    with pytest.raises(ValueError, match="graph_metrics"):
+        compare_external("b.json", "c.json", CFG, memory_limit=2**20)
+
+
+def test_cli_compare_graph(tmp_path, capsys):
+    b_path, c_path = tmp_path / "b.json", tmp_path / "c.json"
+    b_path.write_text(json.dumps(_snapshot(_blocks(True))), encoding="utf-8")
+    c_path.write_text(json.dumps(_snapshot(_blocks(False))), encoding="utf-8")
+    args = ["compare", "--baseline", str(b_path), "--candidate", str(c_path), "--k", "5"]
+
+    assert main([*args, "--graph", "--format", "json"]) == 2
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["graph"]["candidate"]["components"] == 10
+
+    assert main([*args, "--graph"]) == 2
+    assert "GRAPH:" in capsys.readouterr().out
+    assert main([*args, "--format", "json"]) == 0
+    assert json.loads(capsys.readouterr().out)["graph"] is None
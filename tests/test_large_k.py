@@ -0,0 +1,117 @@
+import asyncio
+import random
+
+import numpy as np
+import pytest
+
+from vector_guardrails.async_api import compare_async
+from vector_guardrails.compare import compare
+from vector_guardrails.interning import encode_neighbor_lists, encode_neighbor_lists_flat
+from vector_guardrails.metrics import (
+    SortedRows,
+    overlap_displacement_batch,
+    rank_aware_metrics_batch,
+    sort_merge_metrics,
+)
+from vector_guardrails.models import ComparisonConfig
+
+
+def _snapshots(k: int, n: int, seed: int = 0):
+    rng = random.Random(seed)
+    docs = [f"d{j}" for j in range(3 * k)]
+    baseline = {f"a{i}": rng.sample(docs, rng.randint(0, k)) for i in range(n)}
+    candidate = {}
+    for anchor, neighbors in baseline.items():
+        kept = rng.sample(neighbors, rng.randint(0, len(neighbors)))
+        fresh = [d for d in docs if d not in neighbors]
+        candidate[anchor] = kept + rng.sample(fresh, rng.randint(0, k - len(kept)))
+    return baseline, candidate
+
+
+def test_sort_merge_kernels_match_dense_kernels():
+    k = 40
+    baseline, candidate = _snapshots(k, 300)
+    b_lists, c_lists = list(baseline.values()), list(candidate.values())
+
+    vocab: dict[str, int] = {}
+    dense_b = encode_neighbor_lists(b_lists, k, vocab)
+    dense_c = encode_neighbor_lists(c_lists, k, vocab)
+    shared, disp = overlap_displacement_batch(dense_b, dense_c)
+    rbo, tau, wov = rank_aware_metrics_batch(dense_b, dense_c, p=0.9)
+
+    flat_b = SortedRows(*encode_neighbor_lists_flat(b_lists, k, vocab))
+    flat_c = SortedRows(*encode_neighbor_lists_flat(c_lists, k, vocab))
+    m_shared, m_disp, m_rbo, m_tau, m_wov = sort_merge_metrics(flat_b, flat_c, k, p=0.9)
+
+    assert m_shared.tolist() == shared.tolist()
+    np.testing.assert_allclose(m_disp, disp, equal_nan=True)
+    np.testing.assert_allclose(m_rbo, rbo)
+    np.testing.assert_allclose(m_tau, tau, equal_nan=True)
+    np.testing.assert_allclose(m_wov, wov)
+
+
+def test_large_k_compare_matches_dense_compare():
+    k = 200
+    baseline, candidate = _snapshots(k, 60, seed=1)
+    merged = compare(baseline, candidate, ComparisonConfig(k=k, min_anchors=1))
+    dense = compare(
+        baseline, candidate, ComparisonConfig(k=k, min_anchors=1, large_k_threshold=k)
+    )
+
+    assert merged.overall_risk_level == dense.overall_risk_level
+    assert merged.overall_mean_overlap == pytest.approx(dense.overall_mean_overlap)
+    assert merged.overall_mean_rbo == pytest.approx(dense.overall_mean_rbo)
+    assert merged.neighbor_frequency == dense.neighbor_frequency
+    for a, b in zip(merged.anchor_metrics, dense.anchor_metrics, strict=True):
+        assert a.risk_level == b.risk_level
+        assert a.shared_count == b.shared_count
+        assert a.rank_displacement == pytest.approx(b.rank_displacement)
+        assert a.kendall_tau == pytest.approx(b.kendall_tau)
+        assert a.weighted_overlap == pytest.approx(b.weighted_overlap)
+
+
+def test_duplicate_rows():
+    rows = SortedRows(np.array([3, 1, 2, 5, 5, 7]), np.array([0, 3, 5, 6]))
+    assert rows.duplicate_rows().tolist() == [1]
+
+
+@pytest.mark.parametrize("side", ["baseline", "candidate"])
+def test_large_k_duplicates_still_raise(side):
+    k = 50
+    baseline, candidate = _snapshots(k, 10, seed=2)
+    snapshot = baseline if side == "baseline" else candidate
+    snapshot["a3"] = ["x1", "x2", "x1"]
+
+    with pytest.raises(ValueError, match="a3"):
+        compare(baseline, candidate, ComparisonConfig(k=k, min_anchors=1))
+
+
+@pytest.mark.parametrize(
+    "update",
+    [
+        {},
+        {"fail_fast": True, "chunk_size": 2},
+        {"sequential_sampling": True, "sample_budget": 2, "chunk_size": 2},
+    ],
+)
+@pytest.mark.parametrize("large_k_threshold", [5, 50])
+def test_unscored_duplicates_raise_at_any_k(update, large_k_threshold):
+    k = 20
+    baseline, candidate = _snapshots(k, 10, seed=4)
+    baseline["only_b"] = ["x1", "x2", "x1"]
+    cfg = ComparisonConfig(k=k, min_anchors=1, large_k_threshold=large_k_threshold, **update)
+
+    with pytest.raises(ValueError, match="only_b"):
+        compare(baseline, candidate, cfg)
+
+
+def test_large_k_fail_fast_and_async():
+    k = 100
+    baseline, candidate = _snapshots(k, 40, seed=3)
+    cfg = ComparisonConfig(k=k, min_anchors=1, chunk_size=7)
+    expected = compare(baseline, candidate, cfg)
+
+    report = asyncio.run(compare_async(baseline, candidate, cfg))
+    assert report.model_dump(exclude={"timestamp"}) == expected.model_dump(exclude={"timestamp"})
+    fail_fast = compare(baseline, candidate, cfg.model_copy(update={"fail_fast": True}))
+    assert fail_fast.anchors_evaluated >= 1
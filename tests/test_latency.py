@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+import pytest
+
+from vector_guardrails import generate
+from vector_guardrails.cli import main
+from vector_guardrails.compare import compare
+from vector_guardrails.generate import generate_snapshot
+from vector_guardrails.io import dump_latency, load_latency
+from vector_guardrails.latency import latency_summary
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+
+SNAPSHOT = {f"a{i:03d}": [f"d{j}" for j in range(i % 7, i % 7 + 5)] for i in range(200)}
+
+
+def test_latency_summary_percentiles_and_worst_anchors():
+    ids = [f"a{i}" for i in range(100)]
+    baseline = {a: 10.0 for a in ids}
+    candidate = dict(baseline, a3=40.0, a7=25.0, a9=9.0)
+    candidate["a1"] = 40.0
+    baseline["a1"] = 20.0
+
+    summary = latency_summary(baseline, candidate, [*ids, "missing"], top_n=2)
+
+    assert summary.anchors == 100
+    assert summary.ratios["p50"] == 1.0
+    assert summary.candidate_percentiles["p99"] == 40.0
+    assert summary.ratios["p99"] == pytest.approx(4.0)
+    # a3 (x4) first, then a7 (x2.5) ahead of a1 (x2)
+    assert [r.anchor_id for r in summary.worst_regressions] == ["a3", "a7"]
+
+
+def test_latency_summary_rejects_invalid_values():
+    with pytest.raises(ValueError):
+        latency_summary({"a": 0.0}, {"a": 1.0}, ["a"])
+    with pytest.raises(ValueError):
+        latency_summary({"a": 1.0}, {"a": float("nan")}, ["a"])
+    assert latency_summary({"a": 1.0}, {"b": 1.0}, ["a", "b"]).anchors == 0
+
+
+def test_tail_latency_regression_gates_an_unchanged_snapshot():
+    cfg = ComparisonConfig(k=5)
+    rng = np.random.default_rng(0)
+    baseline = dict(zip(SNAPSHOT, rng.uniform(5.0, 10.0, len(SNAPSHOT)).tolist(), strict=True))
+    slow_tail = {
+        a: ms * (3.0 if i % 25 == 0 else 1.0) for i, (a, ms) in enumerate(baseline.items())
+    }
+
+    plain = compare(SNAPSHOT, SNAPSHOT, cfg)
+    report = compare(
+        SNAPSHOT, SNAPSHOT, cfg, baseline_latency=baseline, candidate_latency=slow_tail
+    )
+
+    assert plain.overall_risk_level == RiskLevel.INFO and plain.latency is None
+    assert report.overall_mean_overlap == 1.0
+    assert report.latency.ratios["p50"] < 1.1
+    assert report.latency.ratios["p99"] > 1.5
+    assert report.overall_risk_level == RiskLevel.CRITICAL
+    assert "p99 latency ratio above CRITICAL" in report.verdict_summary
+    assert len(report.latency.worst_regressions) == len(SNAPSHOT) // 25
+
+    with pytest.raises(ValueError):
+        compare(SNAPSHOT, SNAPSHOT, cfg, baseline_latency=baseline)
+
+
+def test_side_array_round_trip_and_alignment(tmp_path):
+    path = tmp_path / "latency.npy"
+    assert dump_latency(str(path), [1.5, 2.5]) == 2
+    assert load_latency(str(path), ["a", "b"]) == {"a": 1.5, "b": 2.5}
+    assert np.load(path).dtype == np.float32
+    with pytest.raises(ValueError):
+        load_latency(str(path), ["a", "b", "c"])
+
+
+def test_generate_records_latency_per_anchor(monkeypatch):
+    searched: list[int] = []
+    topk_for_block = generate._topk_for_block
+
+    def recording(anchors, corpus, norms, self_idx, start, stop, *args):
+        searched.append(stop - start)
+        return topk_for_block(anchors, corpus, norms, self_idx, start, stop, *args)
+
+    monkeypatch.setattr(generate, "_topk_for_block", recording)
+    rng = np.random.default_rng(1)
+    anchors = rng.standard_normal((10, 4)).astype(np.float32)
+    corpus = rng.standard_normal((30, 4)).astype(np.float32)
+    latency_ms: list[float] = []
+    entries = list(
+        generate_snapshot(
+            anchors,
+            corpus,
+            [f"a{i}" for i in range(10)],
+            [f"c{j}" for j in range(30)],
+            k=3,
+            anchor_block_size=4,
+            latency_ms=latency_ms,
+        )
+    )
+
+    assert len(latency_ms) == len(entries) == 10
+    assert all(ms > 0.0 for ms in latency_ms)
+    # Each anchor is timed on its own rather than sharing its block's time
+    assert searched == [1] * 10
+
+
+def test_cli_compare_with_latency_arrays(tmp_path, capsys):
+    snap = tmp_path / "snap.json"
+    snap.write_text(json.dumps(SNAPSHOT), encoding="utf-8")
+    b_lat = tmp_path / "b.npy"
+    c_lat = tmp_path / "c.npy"
+    dump_latency(str(b_lat), [10.0] * len(SNAPSHOT))
+    dump_latency(str(c_lat), [12.0] * len(SNAPSHOT))
+
+    args = ["compare", "--baseline", str(snap), "--candidate", str(snap), "--k", "5"]
+    code = main(
+        [*args, "--baseline-latency", str(b_lat), "--candidate-latency", str(c_lat)]
+        + ["--format", "json"]
+    )
+    payload = json.loads(capsys.readouterr().out)
+    assert code == 0
+    assert payload["latency"]["ratios"]["p95"] == pytest.approx(1.2)
+
+    dump_latency(str(c_lat), [20.0] * len(SNAPSHOT))
+    assert main([*args, "--baseline-latency", str(b_lat), "--candidate-latency", str(c_lat)]) == 2
+    assert "LATENCY:" in capsys.readouterr().out
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+
+from vector_guardrails.compare import compare
+from vector_guardrails.interning import encode_neighbor_lists
+from vector_guardrails.metrics import rank_aware_metrics_batch
+from vector_guardrails.models import ComparisonConfig, RiskLevel, ThresholdPreset
+
+
+def _batch(baseline: list[list[str]], candidate: list[list[str]], k: int):
+    vocab: dict[str, int] = {}
+    b = encode_neighbor_lists(baseline, k, vocab)
+    c = encode_neighbor_lists(candidate, k, vocab)
+    return rank_aware_metrics_batch(b, c, p=0.9)
+
+
+def test_encode_pads_short_lists():
+    vocab: dict[str, int] = {}
+    out = encode_neighbor_lists([["A", "B"], ["B"]], 3, vocab)
+    assert out.tolist() == [[0, 1, -1], [1, -1, -1]]
+    assert vocab == {"A": 0, "B": 1}
+
+
+def test_identical_lists_score_one():
+    rbo, tau, wov = _batch([["A", "B", "C"]], [["A", "B", "C"]], k=3)
+    assert math.isclose(rbo[0], 1.0)
+    assert tau[0] == 1.0
+    assert math.isclose(wov[0], 1.0)
+
+
+def test_identical_short_lists_score_below_one():
+    # Agreement is divided by depth up to K, like overlap@K
+    rbo, tau, _ = _batch([["A", "B", "C"]], [["A", "B", "C"]], k=10)
+    assert math.isclose(rbo[0], 0.566, abs_tol=1e-3)
+    assert tau[0] == 1.0
+
+
+def test_disjoint_lists_score_zero():
+    rbo, tau, wov = _batch([["A", "B", "C"]], [["X", "Y", "Z"]], k=3)
+    assert rbo[0] == 0.0
+    assert np.isnan(tau[0])
+    assert wov[0] == 0.0
+
+
+def test_reversed_lists_have_negative_tau():
+    rbo, tau, _ = _batch([["A", "B", "C"]], [["C", "B", "A"]], k=3)
+    assert tau[0] == -1.0
+    assert rbo[0] < 1.0
+
+
+def test_top_swap_costs_more_than_tail_swap():
+    baseline = [["A", "B", "C", "D"], ["A", "B", "C", "D"]]
+    candidate = [["B", "A", "C", "D"], ["A", "B", "D", "C"]]
+    rbo, tau, _ = _batch(baseline, candidate, k=4)
+
+    # Same single inversion, but RBO is top-weighted
+    assert tau[0] == tau[1]
+    assert rbo[0] < rbo[1]
+
+
+def test_weighted_overlap_penalizes_losing_rank_one():
+    baseline = [["A", "B", "C"], ["A", "B", "C"]]
+    candidate = [["X", "B", "C"], ["A", "B", "X"]]
+    _, _, wov = _batch(baseline, candidate, k=3)
+    assert wov[0] < wov[1]
+
+
+def test_compare_reports_rank_aware_metrics_and_thresholds():
+    baseline = {"A1": ["X", "Y", "Z"], "A2": ["M", "N", "O"]}
+    candidate = {"A1": ["X", "Y", "Z"], "A2": ["O", "N", "M"]}
+
+    cfg = ComparisonConfig(k=3, thresholds=ThresholdPreset(kendall_tau_critical=0.0))
+    report = compare(baseline=baseline, candidate=candidate, config=cfg)
+
+    by_id = {m.anchor_id: m for m in report.anchor_metrics}
+    assert by_id["A1"].kendall_tau == 1.0
+    assert by_id["A2"].kendall_tau == -1.0
+    assert by_id["A2"].risk_level == RiskLevel.CRITICAL
+    assert any("kendall tau" in r for r in by_id["A2"].reasons)
+
+    assert report.overall_mean_kendall_tau == 0.0
+    assert report.overall_mean_rbo is not None
+    assert report.overall_mean_weighted_overlap == 1.0
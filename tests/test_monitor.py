@@ -0,0 +1,151 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from vector_guardrails import monitor as monitor_module
+from vector_guardrails import risk as risk_module
+from vector_guardrails.cli import main
+from vector_guardrails.compare import compare
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+from vector_guardrails.monitor import DriftMonitor, follow_events, iter_events, parse_events
+
+STABLE = (["d1", "d2", "d3", "d4"], ["d1", "d2", "d3", "d4"])
+DRIFTED = (["d1", "d2", "d3", "d4"], ["d1", "x2", "x3", "x4"])
+
+
+def _events(n: int, drifted_every: int | None = None, offset: int = 0):
+    for i in range(n):
+        b, c = DRIFTED if drifted_every and i % drifted_every == 0 else STABLE
+        yield f"a{offset + i}", list(b), list(c)
+
+
+def test_window_summary_matches_batch_compare():
+    events = list(_events(500, drifted_every=7))
+    cfg = ComparisonConfig(k=4)
+    summary = DriftMonitor(cfg, window=1000, batch_size=64).consume(events)
+
+    report = compare({a: b for a, b, _ in events}, {a: c for a, _, c in events}, cfg)
+    assert summary.window_events == 500
+    assert summary.mean_overlap == pytest.approx(report.overall_mean_overlap)
+    assert summary.mean_displacement == pytest.approx(report.overall_mean_displacement)
+    assert summary.churn_rate == pytest.approx(report.overall_churn_rate)
+    assert summary.critical_anchors == len(report.get_critical_anchors())
+    assert summary.risk_level == report.overall_risk_level
+
+
+def test_window_only_keeps_most_recent_events():
+    monitor = DriftMonitor(ComparisonConfig(k=4), window=100, batch_size=32)
+    monitor.consume(_events(300, drifted_every=1))
+    summary = monitor.consume(_events(100, offset=300))
+
+    assert summary.events_seen == 400
+    assert summary.window_events == 100
+    assert summary.mean_overlap == 1.0
+    assert summary.risk_level == RiskLevel.INFO
+
+
+def test_periodic_summaries_and_verdict_changes():
+    summaries = []
+    changes = []
+    monitor = DriftMonitor(
+        ComparisonConfig(k=4),
+        window=50,
+        summary_every=50,
+        batch_size=16,
+        on_summary=summaries.append,
+        on_verdict_change=lambda prev, s: changes.append((prev, s.risk_level)),
+    )
+    monitor.consume(_events(100))
+    monitor.consume(_events(100, drifted_every=1, offset=100))
+    monitor.consume(_events(100, offset=200))
+
+    # Every 50 events, plus the final summary returned by each consume() call
+    assert [s.events_seen for s in summaries] == [50, 100, 100, 150, 200, 200, 250, 300, 300]
+    assert changes == [
+        (None, RiskLevel.INFO),
+        (RiskLevel.INFO, RiskLevel.CRITICAL),
+        (RiskLevel.CRITICAL, RiskLevel.INFO),
+    ]
+
+
+def test_parse_events_accepts_objects_and_arrays_and_reports_bad_lines():
+    lines = [
+        json.dumps({"anchor_id": "a", "baseline": ["x"], "candidate": ["y"]}) + "\n",
+        "\n",
+        json.dumps(["b", ["x"], ["x"]]) + "\n",
+    ]
+    assert parse_events(lines) == [("a", ["x"], ["y"]), ("b", ["x"], ["x"])]
+
+    with pytest.raises(ValueError):
+        parse_events(['["a", ["x"], ["y"]]\n', "{not json\n"])
+
+
+def test_iter_events_streams_in_blocks():
+    text = "".join(json.dumps([f"a{i}", ["x"], ["x"]]) + "\n" for i in range(10))
+    assert len(list(iter_events(io.StringIO(text), block_lines=3))) == 10
+
+
+def test_follow_events_picks_up_appended_lines(tmp_path):
+    path = tmp_path / "events.ndjson"
+    path.write_text(json.dumps(["a0", ["x"], ["x"]]) + "\n", encoding="utf-8")
+
+    def append_later():
+        time.sleep(0.1)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(["a1", ["x"], ["y"]]))  # partial line first
+            f.flush()
+            time.sleep(0.1)
+            f.write("\n")
+
+    writer = threading.Thread(target=append_later)
+    writer.start()
+    events = list(follow_events(str(path), poll_interval=0.02, idle_timeout=0.5))
+    writer.join()
+
+    assert [e[0] for e in events] == ["a0", "a1"]
+
+
+def test_cli_monitor_exit_code_reflects_worst_verdict(tmp_path, capsys):
+    events = [*_events(50), *_events(50, drifted_every=1, offset=50), *_events(200, offset=100)]
+    path = tmp_path / "events.ndjson"
+    path.write_text("".join(json.dumps(list(e)) + "\n" for e in events), encoding="utf-8")
+
+    code = main(
+        ["monitor", "--input", str(path), "--k", "4", "--window", "50", "--summary-every", "50"]
+    )
+    out = capsys.readouterr().out
+
+    assert code == 2
+    assert "VERDICT CHANGE: INFO → CRITICAL" in out
+    assert out.strip().splitlines()[-1].startswith("[300 events] INFO")
+
+
+def test_consume_scores_whole_batches(monkeypatch):
+    # Throughput comes from per-batch kernels: the per-event loop only validates and
+    # buffers, and no anchor is ever classified on its own
+    calls = {"kernel": 0, "masks": 0}
+    kernel, masks = monitor_module.overlap_displacement_batch, monitor_module.anchor_risk_masks
+
+    def counting_kernel(*args):
+        calls["kernel"] += 1
+        return kernel(*args)
+
+    def counting_masks(*args, **kwargs):
+        calls["masks"] += 1
+        return masks(*args, **kwargs)
+
+    def per_anchor(*args, **kwargs):
+        raise AssertionError("anchor classified on its own")
+
+    monkeypatch.setattr(monitor_module, "overlap_displacement_batch", counting_kernel)
+    monkeypatch.setattr(monitor_module, "anchor_risk_masks", counting_masks)
+    monkeypatch.setattr(risk_module, "classify_anchor_risk", per_anchor)
+
+    monitor = DriftMonitor(ComparisonConfig(k=4), window=1000, batch_size=256)
+    summary = monitor.consume(_events(5000, drifted_every=3))
+
+    assert calls == {"kernel": 20, "masks": 20}  # ceil(5000 / 256)
+    assert summary.events_seen == 5000
@@ -0,0 +1,108 @@
+import json
+
+import numpy as np
+import pytest
+
+from vector_guardrails import compare, compare_arrays, metrics
+from vector_guardrails.cli import main
+from vector_guardrails.metrics import (
+    overlap_at_k,
+    rank_displacement,
+    take_flat_rows,
+    unique_flat_row_pairs,
+    unique_row_pairs,
+)
+from vector_guardrails.models import ComparisonConfig
+
+
+def _first_occurrences(keys: list) -> list[int]:
+    first: dict = {}
+    for i, key in enumerate(keys):
+        first.setdefault(key, i)
+    return sorted(first.values())
+
+
+@pytest.mark.parametrize("collide", [False, True])
+def test_unique_row_pairs(monkeypatch, collide):
+    if collide:
+        # Every row hashes alike: matches must still be confirmed row by row
+        monkeypatch.setattr(metrics, "_hash_weights", lambda n: np.zeros(n, dtype=np.int64))
+    rng = np.random.default_rng(3)
+    b = rng.integers(-1, 3, (300, 3))
+    c = rng.integers(-1, 3, (300, 3))
+    first, inverse = unique_row_pairs(b, c)
+    keys = [(*b[i], *c[i]) for i in range(len(b))]
+    assert all(keys[first[inverse[i]]] == keys[i] for i in range(len(b)))
+    if not collide:
+        assert first.tolist() == _first_occurrences(keys)
+
+    lengths = rng.integers(0, 4, (2, 300))
+    b_off, c_off = (np.concatenate([[0], np.cumsum(n)]) for n in lengths)
+    b_codes, c_codes = rng.integers(0, 2, b_off[-1]), rng.integers(0, 2, c_off[-1])
+    first, inverse = unique_flat_row_pairs(b_codes, b_off, c_codes, c_off)
+    keys = [
+        (tuple(b_codes[b_off[i] : b_off[i + 1]]), tuple(c_codes[c_off[i] : c_off[i + 1]]))
+        for i in range(300)
+    ]
+    assert all(keys[first[inverse[i]]] == keys[i] for i in range(300))
+    if not collide:
+        assert first.tolist() == _first_occurrences(keys)
+    codes, offsets = take_flat_rows(b_codes, b_off, first)
+    assert [tuple(codes[offsets[j] : offsets[j + 1]]) for j in range(len(first))] == [
+        keys[i][0] for i in first
+    ]
+
+
+@pytest.mark.parametrize("large_k_threshold", [32, 2])
+def test_duplicate_pairs_share_metrics(large_k_threshold):
+    lists = [["a", "b", "c", "d"], ["b", "a", "e"], ["c", "d", "a", "f"], []]
+    baseline, candidate = {}, {}
+    for i in range(40):
+        baseline[f"q{i:02d}"] = lists[i % 4]
+        # Every third anchor keeps its list; the rest pair with the next list
+        candidate[f"q{i:02d}"] = lists[i % 4] if i % 3 == 0 else lists[(i + 1) % 4]
+    cfg = ComparisonConfig(k=4, min_anchors=1, large_k_threshold=large_k_threshold)
+
+    report = compare(baseline, candidate, cfg.model_copy(update={"profile": True}))
+    assert report.model_dump(exclude={"timestamp", "config", "profile"}) == compare(
+        baseline, candidate, cfg
+    ).model_dump(exclude={"timestamp", "config", "profile"})
+    for m in report.anchor_metrics:
+        b, c = baseline[m.anchor_id], candidate[m.anchor_id]
+        assert m.overlap == overlap_at_k(b, c, 4)
+        assert m.rank_displacement == rank_displacement(b, c, 4)
+
+    profile = report.profile
+    assert profile.anchors == 40
+    # 4 identical pairs and 4 shifted pairs
+    assert profile.unique_pairs == 8
+    assert profile.dedup_hit_rate == pytest.approx(0.8)
+    assert profile.identical_pairs == 14
+    assert profile.identical_pair_rate == pytest.approx(0.35)
+    assert compare(baseline, candidate, cfg).profile is None
+
+
+def test_compare_arrays_profile():
+    b = np.tile(np.arange(5), (50, 1))
+    c = b.copy()
+    c[25:, 4] = 9
+    report = compare_arrays(b, c, ComparisonConfig(k=5, profile=True))
+    assert (report.profile.anchors, report.profile.unique_pairs) == (50, 2)
+    assert report.profile.identical_pairs == 25
+    assert report.overall_mean_overlap == pytest.approx(0.9)
+
+
+def test_cli_profile(tmp_path, capsys):
+    snapshot = {f"q{i}": ["a", "b", "c"] for i in range(20)}
+    path = tmp_path / "s.json"
+    path.write_text(json.dumps(snapshot), encoding="utf-8")
+    args = ["compare", "--baseline", str(path), "--candidate", str(path), "--k", "3"]
+
+    assert main([*args, "--profile"]) == 0
+    out = capsys.readouterr().out
+    assert "PROFILE:" in out
+    assert "distinct list pairs: 1 (dedup hit rate 95.00%)" in out
+    assert main([*args, "--profile", "--format", "json"]) == 0
+    assert json.loads(capsys.readouterr().out)["profile"]["identical_pairs"] == 20
+    assert main([*args, "--format", "json"]) == 0
+    assert json.loads(capsys.readouterr().out)["profile"] is None
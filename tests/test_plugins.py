@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+
+from vector_guardrails.compare import compare
+from vector_guardrails.interning import VocabLookup
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+from vector_guardrails.plugins import BatchMetric, MetricBatch, register_metric, unregister_metric
+from vector_guardrails.report_index import IndexedReport, save_indexed_report
+
+
+class SponsoredShare(BatchMetric):
+    """Share of sponsored items in the candidate top-K (IDs prefixed 'sp-')."""
+
+    name = "sponsored_share"
+    warning = 0.25
+    critical = 0.5
+    higher_is_worse = True
+
+    def __init__(self) -> None:
+        self.batches = 0
+
+    def compute(self, batch: MetricBatch) -> np.ndarray:
+        self.batches += 1
+        sponsored = np.array([i.startswith("sp-") for i in batch.id_lookup] + [False])
+        present = batch.candidate >= 0
+        hits = (sponsored[batch.candidate] & present).sum(axis=1)
+        counts = present.sum(axis=1)
+        with np.errstate(invalid="ignore"):
+            return np.where(counts > 0, hits / np.maximum(counts, 1), np.nan)
+
+
+@pytest.fixture
+def sponsored():
+    metric = SponsoredShare()
+    register_metric(metric)
+    yield metric
+    unregister_metric(metric.name)
+
+
+BASELINE = {
+    "a1": ["d1", "d2", "d3", "d4"],
+    "a2": ["d1", "d2", "d3", "d4"],
+    "a3": ["d1", "d2", "d3", "d4"],
+    "a4": [],
+}
+CANDIDATE = {
+    "a1": ["d1", "d2", "d3", "d4"],
+    "a2": ["d1", "d2", "d3", "sp-1"],
+    "a3": ["sp-1", "sp-2", "d1", "d2"],
+    "a4": [],
+}
+
+
+def test_plugin_columns_and_aggregate(sponsored):
+    report = compare(BASELINE, CANDIDATE, ComparisonConfig(k=4))
+
+    shares = {m.anchor_id: m.custom_metrics["sponsored_share"] for m in report.anchor_metrics}
+    assert shares == {"a1": 0.0, "a2": 0.25, "a3": 0.5, "a4": None}
+    assert report.overall_custom_metrics == {"sponsored_share": pytest.approx(0.25)}
+
+
+def test_plugin_thresholds_feed_risk(sponsored):
+    sponsored.critical = 0.4
+    report = compare(BASELINE, CANDIDATE, ComparisonConfig(k=4))
+
+    a3 = report.get_anchor("a3")
+    assert a3.risk_level == RiskLevel.CRITICAL
+    assert any(r.startswith("sponsored_share above CRITICAL") for r in a3.reasons)
+    assert report.get_anchor("a2").risk_level == RiskLevel.INFO  # 0.25 is not above 0.25
+    assert report.overall_risk_level == RiskLevel.CRITICAL
+
+
+def test_chunked_pass_gives_same_columns(sponsored):
+    cfg = ComparisonConfig(k=4, thresholds={"overlap_critical": 0.0, "overlap_warning": 0.0})
+    full = compare(BASELINE, CANDIDATE, cfg)
+    calls_before = sponsored.batches
+    chunked = compare(
+        BASELINE, CANDIDATE, cfg.model_copy(update={"fail_fast": True, "chunk_size": 1})
+    )
+
+    assert sponsored.batches - calls_before == 4
+    assert [m.custom_metrics for m in chunked.anchor_metrics] == [
+        m.custom_metrics for m in full.anchor_metrics
+    ]
+    assert chunked.overall_custom_metrics == full.overall_custom_metrics
+
+
+def test_indexed_report_keeps_plugin_columns(sponsored, tmp_path):
+    report = compare(BASELINE, CANDIDATE, ComparisonConfig(k=4))
+    save_indexed_report(report, str(tmp_path / "idx"))
+
+    indexed = IndexedReport(str(tmp_path / "idx"))
+    assert indexed.get("a3") == report.get_anchor("a3")
+    assert indexed.get("a4").custom_metrics == {"sponsored_share": None}
+
+
+def test_registry_rejects_bad_names(sponsored):
+    with pytest.raises(ValueError):
+        register_metric(SponsoredShare())
+
+    class Unnamed(BatchMetric):
+        def compute(self, batch: MetricBatch) -> np.ndarray:
+            return np.zeros(len(batch.anchor_ids))
+
+    class Shadowing(Unnamed):
+        name = "overlap"
+
+    with pytest.raises(ValueError):
+        register_metric(Unnamed())
+    with pytest.raises(ValueError):
+        register_metric(Shadowing())
+    with pytest.raises(ValueError):
+        unregister_metric("missing")
+
+
+def test_no_plugins_means_empty_custom_metrics():
+    report = compare(BASELINE, CANDIDATE, ComparisonConfig(k=4))
+    assert report.overall_custom_metrics == {}
+    assert all(m.custom_metrics == {} for m in report.anchor_metrics)
+
+
+def test_compute_is_abstract():
+    class Incomplete(BatchMetric):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_chunks_share_one_id_lookup(sponsored):
+    lookups = []
+    compute = SponsoredShare.compute
+
+    def recording(self, batch):
+        lookups.append(batch.id_lookup)
+        return compute(self, batch)
+
+    sponsored.compute = recording.__get__(sponsored)
+    cfg = ComparisonConfig(k=4, thresholds={"overlap_critical": 0.0, "overlap_warning": 0.0})
+    chunked = compare(
+        BASELINE, CANDIDATE, cfg.model_copy(update={"fail_fast": True, "chunk_size": 1})
+    )
+
+    assert len(lookups) == 4 and all(lookup is lookups[0] for lookup in lookups)
+    assert list(lookups[0]) == ["d1", "d2", "d3", "d4", "sp-1", "sp-2"]
+    assert chunked.get_anchor("a3").custom_metrics == {"sponsored_share": 0.5}
+
+
+def test_vocab_lookup_follows_a_growing_vocab():
+    vocab = {"x": 0}
+    lookup = VocabLookup(vocab)
+    assert list(lookup) == ["x"]
+    vocab.update({"y": 1, "z": 2})
+    assert len(lookup) == 3
+    assert lookup[2] == "z" and lookup[np.int64(1)] == "y"
@@ -0,0 +1,88 @@
+import subprocess
+import sys
+
+from vector_guardrails.compare import compare
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+from vector_guardrails.report_index import IndexedReport, save_indexed_report
+
+
+def _report():
+    baseline = {f"a{i:02d}": ["X", "Y", "Z", "W"] for i in range(30)}
+    candidate = {}
+    for i in range(30):
+        if i % 5 == 0:
+            candidate[f"a{i:02d}"] = ["P", "Q", "R", "S"]  # CRITICAL
+        elif i % 3 == 0:
+            candidate[f"a{i:02d}"] = ["X", "Y", "R", "S"] if i % 2 else ["X", "Y", "Z", "S"]
+        else:
+            candidate[f"a{i:02d}"] = ["X", "Y", "Z", "W"]
+    return compare(baseline, candidate, ComparisonConfig(k=4))
+
+
+def test_report_lookup_and_buckets():
+    report = _report()
+
+    assert report.get_anchor("a05").risk_level == RiskLevel.CRITICAL
+    assert report.get_anchor("missing") is None
+    assert report.get_critical_anchors() == [
+        m for m in report.anchor_metrics if m.risk_level == RiskLevel.CRITICAL
+    ]
+
+    warnings = report.get_anchors_by_risk(RiskLevel.WARNING, sort_by="overlap")
+    assert [m.overlap for m in warnings] == sorted(m.overlap for m in warnings)
+
+
+def test_report_lookup_follows_copies_and_mutation():
+    report = _report()
+    assert report.get_anchor("a05").risk_level == RiskLevel.CRITICAL
+
+    safe = [m.model_copy(update={"risk_level": RiskLevel.SAFE}) for m in report.anchor_metrics]
+    copy = report.model_copy(update={"anchor_metrics": safe})
+    assert copy.get_anchor("a05").risk_level == RiskLevel.SAFE
+    assert copy.get_anchors_by_risk(RiskLevel.CRITICAL) == []
+
+    report.anchor_metrics.pop(5)
+    assert report.get_anchor("a05") is None
+
+
+def test_indexed_report_round_trip(tmp_path):
+    report = _report()
+    save_indexed_report(report, str(tmp_path / "idx"))
+    indexed = IndexedReport(str(tmp_path / "idx"))
+
+    assert len(indexed) == len(report.anchor_metrics)
+    assert indexed.summary.verdict_summary == report.verdict_summary
+    for m in report.anchor_metrics:
+        assert indexed.get(m.anchor_id) == m
+    assert indexed.get("missing") is None
+
+    for level in RiskLevel:
+        expected = report.get_anchors_by_risk(level, sort_by="overlap")
+        assert indexed.count(level) == len(expected)
+        assert indexed.anchors_at_risk(level) == expected
+
+    page = indexed.anchors_at_risk(RiskLevel.INFO, offset=2, limit=3)
+    assert page == report.get_anchors_by_risk(RiskLevel.INFO, sort_by="overlap")[2:5]
+    assert indexed.worst_by_overlap(limit=1)[0].overlap == 0.0
+
+
+def test_indexed_report_opens_in_separate_process(tmp_path):
+    save_indexed_report(_report(), str(tmp_path / "idx"))
+    code = (
+        "import sys; from vector_guardrails.report_index import IndexedReport; "
+        "r = IndexedReport(sys.argv[1]); print(r.get('a10').risk_level.value)"
+    )
+    res = subprocess.run(
+        [sys.executable, "-c", code, str(tmp_path / "idx")], capture_output=True, text=True
+    )
+    assert res.returncode == 0, res.stderr
+    assert res.stdout.strip() == "CRITICAL"
+
+
+def test_empty_report_index(tmp_path):
+    report = compare({"a": ["x"]}, {"b": ["y"]}, ComparisonConfig(k=1))
+    save_indexed_report(report, str(tmp_path / "idx"))
+    indexed = IndexedReport(str(tmp_path / "idx"))
+    assert len(indexed) == 0
+    assert indexed.get("a") is None
+    assert indexed.anchors_at_risk(RiskLevel.CRITICAL) == []
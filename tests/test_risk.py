@@ -1,5 +1,9 @@
+import math
+
+import numpy as np
+
 from vector_guardrails.models import ComparisonConfig, RiskLevel
-from vector_guardrails.risk import classify_anchor_risk, classify_overall_risk
+from vector_guardrails.risk import anchor_risk_masks, classify_anchor_risk, classify_overall_risk
 
 
 def test_anchor_risk_safe_when_above_thresholds():
@@ -52,3 +56,30 @@ def test_overall_risk_critical_if_any_anchor_critical():
     )
     assert risk == RiskLevel.CRITICAL
     assert any("critical" in r.lower() for r in reasons)
+
+
+def test_anchor_risk_masks_match_scalar_rules():
+    rng = np.random.default_rng(0)
+    n = 2000
+    overlap = rng.integers(0, 11, n) / 10.0
+    disp = np.where(rng.random(n) < 0.1, np.nan, rng.random(n) * 6)
+    rbo, tau = rng.random(n), rng.random(n) * 2 - 1
+    cfg = ComparisonConfig(
+        k=10, thresholds={"rbo_warning": 0.6, "rbo_critical": 0.3, "kendall_tau_warning": 0.0}
+    )
+
+    critical, warning = anchor_risk_masks(overlap, disp, cfg, rbo=rbo, kendall_tau=tau)
+    for i in range(n):
+        level, _ = classify_anchor_risk(
+            overlap=overlap[i],
+            displacement=None if math.isnan(disp[i]) else disp[i],
+            cfg=cfg,
+            rbo=rbo[i],
+            kendall_tau=tau[i],
+        )
+        expected = RiskLevel.INFO
+        if critical[i]:
+            expected = RiskLevel.CRITICAL
+        elif warning[i]:
+            expected = RiskLevel.WARNING
+        assert level == expected
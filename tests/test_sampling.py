@@ -0,0 +1,77 @@
+import pytest
+
+from vector_guardrails.compare import compare
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+from vector_guardrails.sampling import decided_churn_level, serfling_radius
+
+
+def _snapshots(n: int, churn_every: int | None):
+    baseline = {f"a{i:05d}": ["X", "Y", "Z"] for i in range(n)}
+    candidate = {
+        f"a{i:05d}": (["X", "Y", "Q"] if churn_every and i % churn_every == 0 else ["X", "Y", "Z"])
+        for i in range(n)
+    }
+    return baseline, candidate
+
+
+def _cfg(**kwargs) -> ComparisonConfig:
+    return ComparisonConfig(k=3, sequential_sampling=True, chunk_size=200, **kwargs)
+
+
+def test_serfling_radius_shrinks_to_zero_at_full_population():
+    assert serfling_radius(10, 1000, 0.05) > serfling_radius(500, 1000, 0.05)
+    assert serfling_radius(1000, 1000, 0.05) == pytest.approx(0.0, abs=1e-9)
+
+
+def test_decided_churn_level_regions():
+    cfg = ComparisonConfig()
+    t = cfg.thresholds
+    assert decided_churn_level(0.0, 0.1, t) == RiskLevel.INFO
+    assert decided_churn_level(0.25, 0.30, t) == RiskLevel.WARNING
+    assert decided_churn_level(0.40, 0.60, t) == RiskLevel.CRITICAL
+    assert decided_churn_level(0.10, 0.30, t) is None
+
+
+def test_stable_snapshot_stops_early_with_info_verdict():
+    baseline, candidate = _snapshots(20000, churn_every=None)
+    report = compare(baseline, candidate, _cfg())
+
+    assert report.overall_risk_level == RiskLevel.INFO
+    assert report.sampling is not None
+    assert report.sampling.stopped_reason == "decided"
+    assert report.sampling.sample_size < 20000
+    assert report.partial is True
+    assert report.anchors_evaluated == report.sampling.sample_size
+    assert report.sampling.churn_upper <= report.config.thresholds.churn_warning
+
+
+def test_high_churn_is_decided_critical():
+    baseline, candidate = _snapshots(20000, churn_every=2)  # ~50% churn, no CRITICAL anchors
+    report = compare(baseline, candidate, _cfg())
+
+    assert report.overall_risk_level == RiskLevel.CRITICAL
+    assert report.sampling.stopped_reason == "decided"
+    assert report.sampling.churn_lower > report.config.thresholds.churn_critical
+
+
+def test_sampling_is_reproducible_from_seed():
+    baseline, candidate = _snapshots(5000, churn_every=4)
+    r1 = compare(baseline, candidate, _cfg(sample_seed=7, sample_budget=600))
+    r2 = compare(baseline, candidate, _cfg(sample_seed=7, sample_budget=600))
+    r3 = compare(baseline, candidate, _cfg(sample_seed=8, sample_budget=600))
+
+    assert [m.anchor_id for m in r1.anchor_metrics] == [m.anchor_id for m in r2.anchor_metrics]
+    assert r1.sampling == r2.sampling
+    assert [m.anchor_id for m in r1.anchor_metrics] != [m.anchor_id for m in r3.anchor_metrics]
+
+
+def test_budget_and_exhaustion():
+    baseline, candidate = _snapshots(1000, churn_every=4)  # 25% churn sits between thresholds
+    budgeted = compare(baseline, candidate, _cfg(sample_budget=300))
+    assert budgeted.sampling.sample_size == 300
+    assert budgeted.sampling.stopped_reason == "budget"
+
+    small_b, small_c = _snapshots(50, churn_every=None)
+    exhausted = compare(small_b, small_c, _cfg())
+    assert exhausted.sampling.stopped_reason == "exhausted"
+    assert exhausted.partial is False
@@ -0,0 +1,138 @@
+import json
+
+import numpy as np
+import pytest
+
+from vector_guardrails.cli import main
+from vector_guardrails.compare import compare
+from vector_guardrails.generate import generate_snapshot
+from vector_guardrails.io import dump_scores, load_scores
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+from vector_guardrails.scores import SnapshotScores, ks_statistic, score_summary
+
+SNAPSHOT = {f"a{i:03d}": [f"d{j}" for j in range(i % 7, i % 7 + 5)] for i in range(200)}
+SPREAD = [0.9, 0.8, 0.7, 0.6, 0.5]
+
+
+def _scores(snapshot, row):
+    return SnapshotScores.from_mapping({a: row for a in snapshot})
+
+
+def test_shared_neighbors_are_matched_by_id_not_rank():
+    baseline = {"q": ["x", "y", "z"], "r": ["u"]}
+    candidate = {"q": ["y", "x", "w"], "r": ["u"]}
+    b = SnapshotScores.from_mapping({"q": [0.9, 0.8, 0.7], "r": [0.5]})
+    c = SnapshotScores.from_mapping({"q": [0.85, 0.75, 0.7], "r": [0.5]})
+
+    summary = score_summary(baseline, candidate, b, c, ["q", "r"], k=3)
+
+    # x: 0.9 -> 0.75, y: 0.8 -> 0.85, u: unchanged
+    assert summary.shared_neighbors == 3
+    assert summary.mean_shared_drift == pytest.approx((-0.15 + 0.05) / 3, abs=1e-6)
+    assert summary.mean_abs_shared_drift == pytest.approx(0.2 / 3, abs=1e-6)
+    assert summary.baseline_mean_top1 == pytest.approx(0.7)
+    assert summary.baseline_mean_gap == pytest.approx(0.2)
+    assert summary.candidate_mean_gap == pytest.approx(0.15)
+    assert summary.gap_ratio == pytest.approx(0.75)
+
+
+def test_row_lengths_must_match_the_truncated_lists():
+    baseline = {"q": ["x", "y", "z", "w"]}
+    longer = SnapshotScores.from_mapping({"q": [0.9, 0.8, 0.7, 0.6]})
+    short = SnapshotScores.from_mapping({"q": [0.9, 0.8]})
+
+    # Scores for longer lists are truncated alongside the neighbors
+    assert score_summary(baseline, baseline, longer, longer, ["q"], k=3).shared_neighbors == 3
+    with pytest.raises(ValueError, match="anchor_id='q'"):
+        score_summary(baseline, baseline, longer, short, ["q"], k=3)
+    with pytest.raises(ValueError):
+        SnapshotScores(["q"], np.array([np.nan], dtype=np.float32), np.array([1]))
+
+
+def test_ks_statistic():
+    a = np.linspace(0.0, 1.0, 101)
+    assert ks_statistic(a, a) == 0.0
+    assert ks_statistic(a, a + 2.0) == 1.0
+    assert ks_statistic(a, a + 0.5) == pytest.approx(0.5, abs=0.01)
+
+
+def test_score_collapse_gates_an_unchanged_ranking():
+    cfg = ComparisonConfig(k=5)
+    collapsed = _scores(SNAPSHOT, [0.991, 0.99, 0.99, 0.99, 0.989])
+
+    plain = compare(SNAPSHOT, SNAPSHOT, cfg)
+    same = compare(
+        SNAPSHOT,
+        SNAPSHOT,
+        cfg,
+        baseline_scores=_scores(SNAPSHOT, SPREAD),
+        candidate_scores=_scores(SNAPSHOT, SPREAD),
+    )
+    report = compare(
+        SNAPSHOT,
+        SNAPSHOT,
+        cfg,
+        baseline_scores=_scores(SNAPSHOT, SPREAD),
+        candidate_scores=collapsed,
+    )
+
+    assert plain.scores is None
+    assert same.overall_risk_level == plain.overall_risk_level == RiskLevel.INFO
+    assert same.scores.gap_ratio == pytest.approx(1.0)
+    assert same.scores.distribution_shift == 0.0
+    assert report.overall_mean_overlap == 1.0
+    assert report.scores.gap_ratio == pytest.approx(0.005, abs=1e-3)
+    assert report.scores.distribution_shift == 1.0
+    assert report.overall_risk_level == RiskLevel.CRITICAL
+    assert "score gap ratio below CRITICAL" in report.verdict_summary
+
+    with pytest.raises(ValueError):
+        compare(SNAPSHOT, SNAPSHOT, cfg, baseline_scores=collapsed)
+
+
+def test_side_file_round_trip_and_generate(tmp_path):
+    rng = np.random.default_rng(1)
+    anchors = rng.standard_normal((10, 4)).astype(np.float32)
+    corpus = rng.standard_normal((30, 4)).astype(np.float32)
+    score_rows: list[np.ndarray] = []
+    entries = list(
+        generate_snapshot(
+            anchors,
+            corpus,
+            [f"a{i}" for i in range(10)],
+            [f"c{j}" for j in range(30)],
+            k=3,
+            anchor_block_size=4,
+            score_rows=score_rows,
+        )
+    )
+    path = tmp_path / "scores.npz"
+    assert dump_scores(str(path), score_rows) == len(entries) == 10
+
+    loaded = load_scores(str(path), [a for a, _ in entries])
+    assert loaded.values.dtype == np.float32
+    assert loaded.values.nbytes == 4 * sum(len(neighbors) for _, neighbors in entries)
+    np.testing.assert_array_equal(loaded.row("a2"), score_rows[2])
+    assert (np.diff(loaded.row("a0")) <= 0).all()
+    with pytest.raises(ValueError):
+        load_scores(str(path), ["a0", "a1"])
+
+
+def test_cli_compare_with_score_files(tmp_path, capsys):
+    snap = tmp_path / "snap.json"
+    snap.write_text(json.dumps(SNAPSHOT), encoding="utf-8")
+    b_scores = tmp_path / "b.npz"
+    c_scores = tmp_path / "c.npz"
+    dump_scores(str(b_scores), [SPREAD] * len(SNAPSHOT))
+    dump_scores(str(c_scores), [[s - 0.05 for s in SPREAD]] * len(SNAPSHOT))
+
+    args = ["compare", "--baseline", str(snap), "--candidate", str(snap), "--k", "5"]
+    args += ["--baseline-scores", str(b_scores), "--candidate-scores", str(c_scores)]
+    assert main([*args, "--format", "json"]) == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["scores"]["mean_shared_drift"] == pytest.approx(-0.05, abs=1e-6)
+    assert payload["scores"]["gap_ratio"] == pytest.approx(1.0)
+
+    dump_scores(str(c_scores), [[0.99] * 5] * len(SNAPSHOT))
+    assert main(args) == 2
+    assert "SCORES:" in capsys.readouterr().out
@@ -0,0 +1,118 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from vector_guardrails.compare import compare, compare_external
+from vector_guardrails.models import (
+    ComparisonConfig,
+    MetricDistribution,
+    RiskLevel,
+    ThresholdPreset,
+)
+from vector_guardrails.monitor import DriftMonitor
+from vector_guardrails.sketch import QuantileSketch, merge_distributions
+
+
+def _snapshots(n: int = 400, k: int = 10, seed: int = 0):
+    rng = random.Random(seed)
+    docs = [f"d{j}" for j in range(50)]
+    baseline = {f"a{i:04d}": rng.sample(docs, k) for i in range(n)}
+    candidate = {}
+    for anchor, neighbors in baseline.items():
+        neighbors = list(neighbors)
+        rng.shuffle(neighbors)
+        drop = rng.choice([0, 0, 0, 1, 2, 8])
+        fresh = [d for d in docs if d not in neighbors][:drop]
+        candidate[anchor] = neighbors[: k - drop] + fresh
+    return baseline, candidate
+
+
+def test_overlap_quantiles_are_exact():
+    k = 10
+    shared = np.random.default_rng(0).integers(0, k + 1, size=5000)
+    sketch = QuantileSketch.for_overlap(k)
+    sketch.add(shared / k)
+
+    dist = sketch.to_distribution()
+    values = np.sort(shared / k)
+    for q in (1, 5, 50, 95, 99):
+        # Nearest-rank percentile
+        assert dist.percentiles[f"p{q}"] == values[int(np.ceil(q / 100 * len(values))) - 1]
+    assert sketch.quantile(0.0) == values[0]
+    assert sketch.quantile(1.0) == values[-1]
+    assert sum(dist.histogram_counts) == dist.count == 5000
+
+
+def test_displacement_quantiles_within_half_a_bin():
+    values = np.random.default_rng(1).uniform(0.0, 9.0, size=2000)
+    sketch = QuantileSketch.for_displacement(10)
+    sketch.add(np.append(values, np.nan))
+
+    assert sketch.count == 2000
+    for q in (0.05, 0.5, 0.95):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.05)
+
+
+def test_shard_sketches_merge_to_the_full_distribution():
+    baseline, candidate = _snapshots()
+    cfg = ComparisonConfig(k=10)
+    full = compare(baseline, candidate, cfg)
+
+    anchors = sorted(baseline)
+    shards = [anchors[i::3] for i in range(3)]
+    distributions = []
+    for shard in shards:
+        report = compare({a: baseline[a] for a in shard}, {a: candidate[a] for a in shard}, cfg)
+        # Through JSON, as sketches from separate runs or days would arrive
+        payload = json.loads(json.dumps(report.model_dump()))
+        distributions.append(MetricDistribution.model_validate(payload["overlap_distribution"]))
+
+    assert merge_distributions(distributions) == full.overlap_distribution
+
+
+def test_merging_sketches_of_different_k_raises():
+    with pytest.raises(ValueError):
+        QuantileSketch.for_overlap(10).merge(QuantileSketch.for_overlap(20))
+    with pytest.raises(ValueError):
+        merge_distributions([])
+
+
+def test_distribution_threshold_catches_a_tail_the_mean_hides():
+    baseline = {f"a{i}": [f"d{j}" for j in range(10)] for i in range(100)}
+    candidate = dict(baseline)
+    for i in range(10):
+        candidate[f"a{i}"] = [f"d{j}" for j in range(6)] + ["x1", "x2", "x3", "x4"]
+    thresholds = ThresholdPreset(churn_warning=0.5, churn_critical=0.9)
+    cfg = ComparisonConfig(k=10, thresholds=thresholds)
+
+    plain = compare(baseline, candidate, cfg)
+    assert plain.overall_mean_overlap == pytest.approx(0.96)
+    assert plain.overall_risk_level == RiskLevel.INFO
+    assert plain.overlap_distribution.percentiles["p5"] == 0.6
+
+    strict = cfg.model_copy(
+        update={"thresholds": thresholds.model_copy(update={"overlap_p5_warning": 0.8})}
+    )
+    report = compare(baseline, candidate, strict)
+    assert report.overall_risk_level == RiskLevel.WARNING
+    assert "p5 overlap below WARNING threshold" in report.verdict_summary
+
+
+def test_external_and_monitor_carry_distributions(tmp_path):
+    baseline, candidate = _snapshots(n=200)
+    b = tmp_path / "b.json"
+    c = tmp_path / "c.json"
+    b.write_text(json.dumps(baseline), encoding="utf-8")
+    c.write_text(json.dumps(candidate), encoding="utf-8")
+    cfg = ComparisonConfig(k=10)
+
+    in_memory = compare(baseline, candidate, cfg)
+    external = compare_external(str(b), str(c), cfg, memory_limit=4 << 20)
+    assert external.overlap_distribution == in_memory.overlap_distribution
+    assert external.displacement_distribution == in_memory.displacement_distribution
+
+    monitor = DriftMonitor(cfg, window=1000)
+    summary = monitor.consume((a, baseline[a], candidate[a]) for a in sorted(baseline))
+    assert summary.overlap_distribution == in_memory.overlap_distribution
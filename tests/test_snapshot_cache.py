@@ -0,0 +1,184 @@
+import json
+import os
+import shutil
+import threading
+
+import pytest
+
+from vector_guardrails import compare, snapshot_cache
+from vector_guardrails.cli import main
+from vector_guardrails.models import ComparisonConfig
+from vector_guardrails.snapshot_cache import SnapshotCache, load_snapshot
+from vector_guardrails.validation import ValidatedSnapshot, validate_and_truncate_snapshot
+
+SNAPSHOT = {
+    "a1": ["d1", "d2", "d3", "d4"],
+    "a2": ["d4", "d3"],
+    "a3": [],
+    "ä4": ["ünïcode", "d1", "d5"],
+}
+
+
+def _write(path, snapshot):
+    path.write_text(json.dumps(snapshot), encoding="utf-8")
+    return str(path)
+
+
+def _entries(cache: SnapshotCache) -> list[str]:
+    return sorted(p.name for p in cache.directory.glob("*.npz"))
+
+
+def test_second_load_hits_the_cache(tmp_path, monkeypatch):
+    path = _write(tmp_path / "snap.json", SNAPSHOT)
+    cache = SnapshotCache(tmp_path / "cache")
+
+    first = cache.load(path, k=3)
+    assert first == validate_and_truncate_snapshot(SNAPSHOT, k=3)
+    assert len(_entries(cache)) == 1
+
+    def no_parse(_path):
+        raise AssertionError("cache hit should not parse JSON")
+
+    monkeypatch.setattr(snapshot_cache, "load_json", no_parse)
+    second = cache.load(path, k=3)
+    assert second == first
+    assert isinstance(second, ValidatedSnapshot) and second.k == 3
+
+
+def test_key_includes_k_and_content(tmp_path):
+    path = tmp_path / "snap.json"
+    cache = SnapshotCache(tmp_path / "cache")
+
+    _write(path, SNAPSHOT)
+    assert cache.load(str(path), k=2)["a1"] == ["d1", "d2"]
+    assert cache.load(str(path), k=4)["a1"] == ["d1", "d2", "d3", "d4"]
+    assert len(_entries(cache)) == 2
+
+    _write(path, dict(SNAPSHOT, a1=["x"]))
+    os.utime(path, ns=(1, 1))  # different mtime even on coarse filesystems
+    assert cache.load(str(path), k=2)["a1"] == ["x"]
+
+
+def test_identical_content_shares_one_entry(tmp_path):
+    path = _write(tmp_path / "snap.json", SNAPSHOT)
+    copy = tmp_path / "copy.json"
+    shutil.copy(path, copy)
+    cache = SnapshotCache(tmp_path / "cache")
+
+    assert cache.load(path, k=3) == cache.load(str(copy), k=3)
+    assert len(_entries(cache)) == 1
+
+
+def test_lru_eviction_keeps_cache_under_limit(tmp_path):
+    paths = [_write(tmp_path / f"s{i}.json", {f"a{i}": ["d1"]}) for i in range(3)]
+    probe = SnapshotCache(tmp_path / "probe")
+    probe.load(paths[0], k=1)
+    one_round = sum(p.stat().st_size for p in probe.directory.iterdir())
+
+    cache = SnapshotCache(tmp_path / "cache", max_bytes=2 * one_round)
+    cache.load(paths[0], k=1)
+    cache.load(paths[1], k=1)
+    oldest = next(cache.directory.glob("*.npz"))
+    os.utime(oldest, ns=(0, 0))
+    cache.load(paths[2], k=1)
+
+    assert sum(p.stat().st_size for p in cache.directory.iterdir()) <= cache.max_bytes
+    assert len(_entries(cache)) == 2
+    assert not oldest.exists()
+
+
+def test_corrupt_entry_is_replaced(tmp_path):
+    path = _write(tmp_path / "snap.json", SNAPSHOT)
+    cache = SnapshotCache(tmp_path / "cache")
+    cache.load(path, k=3)
+    entry = next(cache.directory.glob("*.npz"))
+    entry.write_bytes(b"not a zip file")
+
+    assert cache.load(path, k=3) == validate_and_truncate_snapshot(SNAPSHOT, k=3)
+    assert entry.read_bytes() != b"not a zip file"
+
+
+def test_concurrent_loads_agree(tmp_path):
+    path = _write(tmp_path / "snap.json", SNAPSHOT)
+    results = []
+
+    def load():
+        results.append(SnapshotCache(tmp_path / "cache").load(path, k=3))
+
+    threads = [threading.Thread(target=load) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 8
+    assert all(r == results[0] for r in results)
+    assert not list((tmp_path / "cache").glob("*.tmp"))
+
+
+def test_invalid_snapshot_still_raises(tmp_path):
+    path = _write(tmp_path / "bad.json", {"a1": ["d1", "d1"]})
+    with pytest.raises(ValueError):
+        load_snapshot(path, 2, cache=SnapshotCache(tmp_path / "cache"))
+
+
+def test_loaded_snapshot_skips_revalidation(tmp_path):
+    path = _write(tmp_path / "snap.json", SNAPSHOT)
+    loaded = load_snapshot(path, 3)
+
+    assert validate_and_truncate_snapshot(loaded, k=3) is loaded
+    assert validate_and_truncate_snapshot(loaded, k=1)["a1"] == ["d1"]
+    # Lists were cut at k=3, so a larger K cannot be served from it
+    with pytest.raises(ValueError, match="truncated"):
+        validate_and_truncate_snapshot(loaded, k=4)
+    # A cached copy remembers that too
+    cache = SnapshotCache(tmp_path / "cache")
+    cache.load(path, k=3)
+    with pytest.raises(ValueError, match="truncated"):
+        validate_and_truncate_snapshot(cache.load(path, k=3), k=4)
+
+
+def test_untruncated_snapshot_is_revalidated_at_larger_k(tmp_path):
+    path = _write(tmp_path / "snap.json", {"a1": ["d1", "d2"], "a2": ["d3"]})
+    loaded = load_snapshot(path, 5)
+
+    assert not loaded.truncated
+    assert validate_and_truncate_snapshot(loaded, k=10) == {"a1": ["d1", "d2"], "a2": ["d3"]}
+    assert compare(loaded, loaded, ComparisonConfig(k=10)).anchors_evaluated == 2
+
+
+def test_mutated_snapshot_is_revalidated(tmp_path):
+    path = _write(tmp_path / "snap.json", SNAPSHOT)
+    for mutate in (
+        lambda s: s.__setitem__("b", ["x", "x", 3]),
+        lambda s: s.update(b=["x", "x"]),
+        lambda s: s.setdefault("b", ["x", "x"]),
+        lambda s: s.__ior__({"b": ["x", "x"]}),
+    ):
+        loaded = load_snapshot(path, 3)
+        mutate(loaded)
+        with pytest.raises(ValueError, match="anchor_id='b'"):
+            validate_and_truncate_snapshot(loaded, k=3)
+
+    # Removing entries leaves the rest valid
+    loaded = load_snapshot(path, 3)
+    del loaded["a1"]
+    assert validate_and_truncate_snapshot(loaded, k=3) is loaded
+    # Snapshots built by hand are always validated
+    with pytest.raises(ValueError):
+        validate_and_truncate_snapshot(ValidatedSnapshot({"a": ["x", "x"]}, k=2), k=2)
+
+
+def test_cli_uses_cache_unless_disabled(tmp_path, capsys):
+    snapshot = {f"a{i}": ["d1", "d2"] for i in range(10)}
+    path = _write(tmp_path / "snap.json", snapshot)
+    cache_dir = tmp_path / "cli-cache"
+    args = ["compare", "--baseline", path, "--candidate", path, "--k", "2"]
+    args += ["--cache-dir", str(cache_dir), "--format", "json"]
+
+    assert main([*args, "--no-cache"]) == 0
+    assert not cache_dir.exists()
+    assert main(args) == 0
+    assert main(args) == 0
+    assert len(list(cache_dir.glob("*.npz"))) == 1
+    capsys.readouterr()
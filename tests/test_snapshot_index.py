@@ -0,0 +1,112 @@
+import json
+import os
+
+import pytest
+
+from vector_guardrails import compare
+from vector_guardrails.cli import main
+from vector_guardrails.models import ComparisonConfig
+from vector_guardrails.snapshot_index import SnapshotIndex, build_snapshot_index
+
+BASELINE = {f"a{i:03d}": [f"d{j}" for j in range(i % 5, i % 5 + 6)] for i in range(300)}
+CANDIDATE = {f"a{i:03d}": [f"d{j}" for j in range(i % 3, i % 3 + 6)] for i in range(20, 320)}
+
+
+def _write(path, snapshot):
+    path.write_text(json.dumps(snapshot), encoding="utf-8")
+    return str(path)
+
+
+def test_json_lookup_matches_load(tmp_path):
+    snapshot = {"é✓": ["ü", "x"], "plain": ["a", "b"], "z": []}
+    # Indented, CRLF line endings and a repeated anchor (the last entry wins)
+    text = json.dumps(snapshot, ensure_ascii=False, indent=2).replace("\n", "\r\n")
+    text = text[:-3] + ',\r\n  "plain": ["c"]\r\n}'
+    path = tmp_path / "snap.json"
+    path.write_bytes(text.encode("utf-8"))
+
+    assert build_snapshot_index(str(path)) == 3
+    index = SnapshotIndex(str(path))
+    assert list(index) == sorted(snapshot)
+    assert dict(index) == json.loads(text)
+    assert index["plain"] == ["c"]
+    assert "missing" not in index
+    with pytest.raises(KeyError):
+        index["missing"]
+
+
+def test_ndjson_lookup(tmp_path):
+    path = tmp_path / "snap.ndjson"
+    path.write_text(
+        '["a1", ["x", "y"]]\n\n{"anchor_id": "a2", "neighbors": ["z"]}\n', encoding="utf-8"
+    )
+    build_snapshot_index(str(path))
+    assert dict(SnapshotIndex(str(path))) == {"a1": ["x", "y"], "a2": ["z"]}
+
+    path.write_text('{"a1": ["x"]}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="NDJSON"):
+        build_snapshot_index(str(path))
+
+
+def test_missing_and_stale_index(tmp_path):
+    path = _write(tmp_path / "b.json", BASELINE)
+    with pytest.raises(FileNotFoundError, match="vector-guardrails index"):
+        SnapshotIndex(path)
+
+    build_snapshot_index(path)
+    _write(tmp_path / "b.json", CANDIDATE)
+    with pytest.raises(ValueError, match="stale"):
+        SnapshotIndex(path)
+
+
+def test_sampling_reads_only_sampled_entries(tmp_path, monkeypatch):
+    paths = _write(tmp_path / "b.json", BASELINE), _write(tmp_path / "c.json", CANDIDATE)
+    for path in paths:
+        build_snapshot_index(path)
+    cfg = ComparisonConfig(k=5, sequential_sampling=True, chunk_size=16, sample_budget=64)
+
+    reads: list[int] = []
+    get_many = SnapshotIndex.get_many
+
+    def counting(self, anchor_ids):
+        reads.append(len(anchor_ids))
+        return get_many(self, anchor_ids)
+
+    monkeypatch.setattr(SnapshotIndex, "get_many", counting)
+    indexed = compare(SnapshotIndex(paths[0]), SnapshotIndex(paths[1]), cfg)
+    expected = compare(BASELINE, CANDIDATE, cfg)
+
+    assert indexed.model_dump(exclude={"timestamp"}) == expected.model_dump(
+        exclude={"timestamp"}
+    )
+    assert indexed.sampling.population_size == 280
+    # One read per side and evaluated chunk, never the whole file
+    assert sum(reads) == 2 * indexed.anchors_evaluated <= 2 * 64
+
+
+def test_cli_index_show_and_sampled_compare(tmp_path, capsys):
+    b = _write(tmp_path / "b.json", BASELINE)
+    c = _write(tmp_path / "c.json", CANDIDATE)
+    assert main(["index", "--snapshots", b, c]) == 0
+    assert os.path.exists(b + ".idx")
+    capsys.readouterr()
+
+    show = ["show", "--anchor", "a030", "--baseline", b, "--candidate", c, "--k", "6"]
+    assert main([*show, "--format", "json"]) == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["baseline"] == BASELINE["a030"]
+    assert payload["candidate"] == CANDIDATE["a030"]
+    assert payload["metrics"]["shared_count"] == 6
+    assert main(show) == 0
+    assert "Overlap: 1.00" in capsys.readouterr().out
+    assert main(["show", "--anchor", "a005", "--baseline", b, "--candidate", c]) == 0
+    assert "candidate: (not in snapshot)" in capsys.readouterr().out
+    assert main(["show", "--anchor", "nope", "--baseline", b]) == 3
+
+    args = ["compare", "--baseline", b, "--candidate", c, "--k", "5", "--format", "json"]
+    args += ["--sample", "--sample-budget", "100"]
+    code = main(args)
+    plain = json.loads(capsys.readouterr().out)
+    assert main([*args, "--index"]) == code
+    assert json.loads(capsys.readouterr().out) == plain
+    assert main([*args[:-3], "--index"]) == 3
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+import random
+
+import numpy as np
+import pytest
+
+from vector_guardrails.cli import main
+from vector_guardrails.compare import compare
+from vector_guardrails.io import dump_json
+from vector_guardrails.models import ComparisonConfig, ExitCode, RiskLevel, ThresholdPreset
+from vector_guardrails.sweep import sweep_thresholds
+
+GRID = {
+    "overlap_warning": [0.6, 0.7, 0.8, 0.9],
+    "overlap_critical": [0.2, 0.4, 0.5],
+    "displacement_warning": [1.0, 2.0, 3.0],
+    "displacement_critical": [3.0, 5.0],
+    "churn_warning": [0.05, 0.2, 0.4],
+    "churn_critical": [0.3, 0.6, 1.0],
+}
+
+
+def _snapshots(n=300, k=10, seed=0):
+    rng = np.random.default_rng(seed)
+    pool = [f"d{i}" for i in range(200)]
+    baseline = {f"a{i}": list(rng.choice(pool, k, replace=False)) for i in range(n)}
+    candidate = {}
+    for i, (anchor, neighbors) in enumerate(baseline.items()):
+        kept = (
+            list(rng.permutation(neighbors[: k - i % 6])) if i % 4 == 0 else neighbors[: k - i % 6]
+        )
+        fresh = [p for p in rng.permutation(pool) if p not in neighbors][: k - len(kept)]
+        candidate[anchor] = kept + fresh
+    return baseline, candidate
+
+
+@pytest.mark.parametrize("rbo_warning", [None, 0.8])
+def test_sweep_matches_recomputing_each_preset(rbo_warning):
+    baseline, candidate = _snapshots()
+    cfg = ComparisonConfig(k=10, thresholds=ThresholdPreset(rbo_warning=rbo_warning))
+    report = compare(baseline, candidate, cfg)
+
+    sweep = sweep_thresholds(report, GRID)
+
+    assert len(sweep.risk_levels) == 4 * 3 * 3 * 2 * 3 * 3
+    assert set(sweep.risk_levels) == {RiskLevel.INFO, RiskLevel.WARNING, RiskLevel.CRITICAL}
+    for i in random.Random(0).sample(range(len(sweep.risk_levels)), 60):
+        preset = sweep.preset(cfg.thresholds, i)
+        expected = compare(baseline, candidate, cfg.model_copy(update={"thresholds": preset}))
+        levels = [m.risk_level for m in expected.anchor_metrics]
+        assert sweep.risk_levels[i] == expected.overall_risk_level
+        assert sweep.critical_anchors[i] == levels.count(RiskLevel.CRITICAL)
+        assert sweep.warning_anchors[i] == levels.count(RiskLevel.WARNING)
+        assert sweep.info_anchors[i] == levels.count(RiskLevel.INFO)
+        assert sweep.churn_rates[i] == expected.overall_churn_rate
+
+
+def test_unswept_parameters_keep_the_report_thresholds():
+    baseline, candidate = _snapshots()
+    report = compare(baseline, candidate, ComparisonConfig(k=10))
+
+    sweep = sweep_thresholds(report, {"churn_warning": [0.0, 1.0]})
+
+    assert sweep.thresholds == {"churn_warning": [0.0, 1.0]}
+    assert sweep.churn_rates == [report.overall_churn_rate] * 2
+    assert sweep_thresholds(report, {}).risk_levels == [report.overall_risk_level]
+    with pytest.raises(ValueError, match="cannot sweep"):
+        sweep_thresholds(report, {"anchor_jaccard_warning": [0.5]})
+    with pytest.raises(ValueError):
+        sweep_thresholds(report, {"overlap_warning": [1.5]})
+    with pytest.raises(ValueError, match="partial"):
+        sweep_thresholds(report.model_copy(update={"partial": True}), GRID)
+
+
+def test_cli_sweep_from_saved_report(tmp_path, capsys):
+    baseline, candidate = _snapshots()
+    path = tmp_path / "report.json"
+    dump_json(str(path), compare(baseline, candidate, ComparisonConfig(k=10)).model_dump())
+
+    args = ["sweep", "--report", str(path), "--grid", "overlap_warning=0.5:0.9:0.1"]
+    args += ["--grid", "churn_critical=0.3,0.9"]
+    assert main([*args, "--format", "csv"]) == 0
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert len(rows) == 10
+    assert [float(r["overlap_warning"]) for r in rows[::2]] == [0.5, 0.6, 0.7, 0.8, 0.9]
+
+    assert main([*args, "--format", "json"]) == 0
+    assert len(json.loads(capsys.readouterr().out)["risk_levels"]) == 10
+    assert main([*args, "--limit", "3"]) == 0
+    out = capsys.readouterr().out
+    assert "Swept 10 threshold combinations" in out
+    assert "... 7 more" in out
+    bad_grid = ["sweep", "--report", str(path), "--grid", "overlap_warning"]
+    assert main(bad_grid) == ExitCode.ERROR
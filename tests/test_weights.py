@@ -0,0 +1,158 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from vector_guardrails.cli import main
+from vector_guardrails.compare import compare
+from vector_guardrails.io import iter_weight_entries
+from vector_guardrails.models import ComparisonConfig, RiskLevel
+from vector_guardrails.weights import align_weights, traffic_plan
+
+
+@pytest.fixture
+def zipf_snapshots():
+    rng = random.Random(5)
+    docs = [f"d{j}" for j in range(40)]
+    anchors = [f"q{i:04d}" for i in range(2000)]
+    baseline = {a: rng.sample(docs, 10) for a in anchors}
+    candidate = {}
+    for a, neighbors in baseline.items():
+        neighbors = list(neighbors)
+        for slot in rng.sample(range(10), rng.choice([0, 0, 1, 3, 5])):
+            neighbors[slot] = next(d for d in docs if d not in neighbors)
+        candidate[a] = neighbors
+    weights = {a: 1.0 / (i + 1) for i, a in enumerate(anchors)}
+    return baseline, candidate, weights
+
+
+def test_uniform_weights_match_unweighted_compare(zipf_snapshots):
+    baseline, candidate, _ = zipf_snapshots
+    cfg = ComparisonConfig(k=10)
+    plain = compare(baseline, candidate, cfg)
+    weighted = compare(baseline, candidate, cfg, weights={a: 2.0 for a in baseline})
+
+    assert weighted.overall_mean_overlap == pytest.approx(plain.overall_mean_overlap)
+    assert weighted.overall_mean_displacement == pytest.approx(plain.overall_mean_displacement)
+    assert weighted.overall_churn_rate == pytest.approx(plain.overall_churn_rate)
+    assert weighted.anchor_metrics == plain.anchor_metrics
+    assert weighted.traffic.unweighted_churn_rate == plain.overall_churn_rate
+    assert not weighted.partial
+
+
+def test_weighted_churn_drives_the_verdict():
+    baseline = {f"a{i}": ["d1", "d2", "d3", "d4"] for i in range(20)}
+    candidate = dict(baseline, a0=["d1", "x2", "x3", "d4"])
+    cfg = ComparisonConfig(
+        k=4, min_anchors=1, thresholds={"overlap_critical": 0.0, "churn_critical": 0.5}
+    )
+
+    assert compare(baseline, candidate, cfg).overall_churn_rate == pytest.approx(0.05)
+
+    report = compare(baseline, candidate, cfg, weights={"a0": 90.0, "a1": 10.0})
+    assert report.overall_churn_rate == pytest.approx(0.9)
+    assert report.overall_mean_overlap == pytest.approx(0.9 * 0.5 + 0.1)
+    assert report.overall_risk_level == RiskLevel.CRITICAL
+    assert report.traffic.weighted_anchors == 2
+
+
+def test_align_weights_drops_unknown_and_defaults_missing_to_zero():
+    aligned = align_weights([("b", 2.0), ("zzz", 5.0), ("a", 1.0)], ["a", "b", "c"])
+    assert aligned.tolist() == [1.0, 2.0, 0.0]
+
+    with pytest.raises(ValueError):
+        align_weights({"a": -1.0}, ["a"])
+    with pytest.raises(ValueError):
+        align_weights({"zzz": 1.0}, ["a"])
+
+
+def test_iter_weight_entries_reads_json_and_text(tmp_path):
+    as_json = tmp_path / "w.json"
+    as_json.write_text(json.dumps({"a": 3, "b": 0.5}), encoding="utf-8")
+    as_text = tmp_path / "w.tsv"
+    as_text.write_text("# query\tclicks\na\t3\n\nb,c,0.5\n", encoding="utf-8")
+
+    assert list(iter_weight_entries(str(as_json))) == [("a", 3.0), ("b", 0.5)]
+    assert list(iter_weight_entries(str(as_text))) == [("a", 3.0), ("b,c", 0.5)]
+
+    bad = tmp_path / "bad.txt"
+    bad.write_text("a\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_weight_entries(str(bad)))
+
+
+def test_traffic_plan_head_covers_share():
+    weights = np.array([1.0, 50.0, 0.0, 30.0, 19.0])
+    head, draws = traffic_plan(weights, 0.8, 100, seed=0)
+
+    assert head.tolist() == [1, 3]
+    assert set(draws.tolist()) <= {0, 4}
+    assert 2 not in draws
+
+
+def test_traffic_sampling_is_unbiased(zipf_snapshots):
+    baseline, candidate, weights = zipf_snapshots
+    cfg = ComparisonConfig(k=10, traffic_head_share=0.5, traffic_tail_samples=100)
+    exact = compare(baseline, candidate, cfg, weights=weights)
+
+    estimates = []
+    for seed in range(30):
+        sampled = compare(
+            baseline,
+            candidate,
+            cfg.model_copy(update={"traffic_sampling": True, "sample_seed": seed}),
+            weights=weights,
+        )
+        estimates.append(sampled.overall_churn_rate)
+
+    assert sampled.partial
+    assert sampled.anchors_evaluated < len(baseline) // 4
+    assert sampled.traffic.head_weight_share >= 0.5
+    assert sampled.traffic.churn_std_error > 0.0
+    assert np.mean(estimates) == pytest.approx(exact.overall_churn_rate, abs=0.01)
+
+
+def test_full_head_share_is_exact(zipf_snapshots):
+    baseline, candidate, weights = zipf_snapshots
+    cfg = ComparisonConfig(k=10)
+    exact = compare(baseline, candidate, cfg, weights=weights)
+    sampled = compare(
+        baseline,
+        candidate,
+        cfg.model_copy(update={"traffic_sampling": True, "traffic_head_share": 1.0}),
+        weights=weights,
+    )
+
+    assert sampled.traffic.tail_draws == 0
+    assert sampled.overall_churn_rate == pytest.approx(exact.overall_churn_rate)
+    assert sampled.overall_mean_overlap == pytest.approx(exact.overall_mean_overlap)
+
+
+def test_traffic_sampling_requires_weights(zipf_snapshots):
+    baseline, candidate, weights = zipf_snapshots
+    with pytest.raises(ValueError):
+        compare(baseline, candidate, ComparisonConfig(traffic_sampling=True))
+    with pytest.raises(ValueError):
+        compare(baseline, candidate, ComparisonConfig(fail_fast=True), weights=weights)
+
+
+def test_cli_compare_with_weights(zipf_snapshots, tmp_path, capsys):
+    baseline, candidate, weights = zipf_snapshots
+    b = tmp_path / "baseline.json"
+    c = tmp_path / "candidate.json"
+    w = tmp_path / "weights.csv"
+    b.write_text(json.dumps(baseline), encoding="utf-8")
+    c.write_text(json.dumps(candidate), encoding="utf-8")
+    w.write_text("".join(f"{a},{x}\n" for a, x in weights.items()), encoding="utf-8")
+
+    code = main(
+        ["compare", "--baseline", str(b), "--candidate", str(c), "--weights", str(w)]
+        + ["--traffic-sample", "--tail-samples", "50", "--format", "json"]
+    )
+    payload = json.loads(capsys.readouterr().out)
+
+    assert code == payload["exit_code"]
+    assert payload["traffic"]["sampled"]
+    assert payload["traffic"]["tail_draws"] == 50
+    assert payload["partial"]